@@ -210,6 +210,10 @@ async def _cross_encode_rerank(
 ) -> List[MemoryQueryHit]:
     """
     Task 2: Rerank Top-20 hits using BGE-Reranker or fallback to TinyBERT (Requirement 2).
+
+    Both models are loaded once and scored on a shared RerankerWorker, which
+    batches pairs across concurrent requests off the event loop and memoizes
+    scores per (query, hit id) across turns.
     """
     if not hits or len(hits) <= 1:
         return hits[:top_n]
@@ -238,7 +242,7 @@ async def _cross_encode_rerank(
                     model_name=settings.BGE_RERANKER_MODEL,
                     batch_size=settings.BGE_RERANKER_BATCH_SIZE
                 )
-                reranked_results = reranker.rerank(query, search_results, top_k=top_n)
+                reranked_results = await reranker.arerank(query, search_results, top_k=top_n)
 
                 # Convert back to MemoryQueryHit
                 reranked_hits = []
@@ -256,11 +260,10 @@ async def _cross_encode_rerank(
                 logger.warning(f"BGE reranking failed, falling back to TinyBERT: {bge_error}")
 
         # Fallback to TinyBERT cross-encoder
-        from sentence_transformers import CrossEncoder
-        model = CrossEncoder('cross-encoder/ms-marco-TinyBERT-L-2-v2', max_length=512)
+        from app.infra.search.reranker_worker import get_cross_encoder_worker
+        worker = get_cross_encoder_worker('cross-encoder/ms-marco-TinyBERT-L-2-v2', max_length=512)
 
-        pairs = [[query, str(hit.content)] for hit in hits]
-        scores = model.predict(pairs)
+        scores = await worker.score(query, [(hit.id, str(hit.content)) for hit in hits])
 
         # Merge scores back to hits
         for hit, score in zip(hits, scores):
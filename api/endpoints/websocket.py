@@ -20,9 +20,16 @@ from api.deps import require_user
 from api.auth_schemas import UserSchema as User
 from api.deps import get_current_user_from_token
 from models.config_models import Course, CustomerPersona, ScenarioConfig
-from models.runtime_models import Message, Session, SessionState
+from models.runtime_models import Session, SessionState
 from schemas.fsm import FSMState, SalesStage
 from app.engine.state.recovery import state_recovery_service
+from app.engine.state.turn_context import (
+    TurnContext,
+    TurnRecord,
+    TurnWrite,
+    load_turn_context,
+    turn_write_behind,
+)
 from app.cognitive.errors import AuditBlockedError, CognitiveError, TimeoutError as CognitiveTimeoutError
 from app.engine.coordinator.production_coordinator import ProductionCoordinator, get_production_coordinator
 from app.infra.gateway.model_gateway import ModelGateway
@@ -38,8 +45,10 @@ class ConnectionManager:
     def __init__(self) -> None:
         self.active_connections: dict[str, WebSocket] = {}
         self.orchestrators: dict[str, ProductionCoordinator] = {}
+        self.turn_contexts: dict[str, TurnContext] = {}
         self.pending_events: dict[str, dict[str, set[int]]] = {}
         self.unacked_chunks: dict[str, dict[int, dict]] = {} # session_id -> {seq_id: chunk_data}
+        self.chunk_sequences: dict[str, int] = {}
         self.recovery_enabled = True
         self._retry_task: Optional[asyncio.Task] = None
         self.turn_guard: dict[str, dict[str, float]] = {}
@@ -93,8 +102,10 @@ class ConnectionManager:
 
         self.active_connections.pop(session_id, None)
         self.orchestrators.pop(session_id, None)
+        self.turn_contexts.pop(session_id, None)
         self.pending_events.pop(session_id, None)
         self.unacked_chunks.pop(session_id, None)
+        self.chunk_sequences.pop(session_id, None)
         self.turn_guard.pop(session_id, None)
         if not self.active_connections and self._retry_task:
             self._retry_task.cancel()
@@ -116,6 +127,12 @@ class ConnectionManager:
             }
         await self.send_json(session_id, chunk)
 
+    def next_sequence(self, session_id: str) -> int:
+        """Session-wide chunk sequence, so unacked chunks of different turns never collide."""
+        seq_id = self.chunk_sequences.get(session_id, 0)
+        self.chunk_sequences[session_id] = seq_id + 1
+        return seq_id
+
     async def ack_chunk(self, session_id: str, seq_id: int) -> None:
         if session_id in self.unacked_chunks:
             self.unacked_chunks[session_id].pop(seq_id, None)
@@ -158,6 +175,12 @@ class ConnectionManager:
     def get_orchestrator(self, session_id: str) -> Optional[ProductionCoordinator]:
         return self.orchestrators.get(session_id)
 
+    def set_turn_context(self, session_id: str, ctx: TurnContext) -> None:
+        self.turn_contexts[session_id] = ctx
+
+    def get_turn_context(self, session_id: str) -> Optional[TurnContext]:
+        return self.turn_contexts.get(session_id)
+
     def get_db(self, session_id: str) -> Optional[AsyncSession]:
         return None
 
@@ -206,6 +229,47 @@ class ConnectionManager:
 
 
 
+class NPCChunkStream:
+    """
+    Forwards NPC reply text to the client as it is generated.
+
+    Every piece becomes an ACK-tracked ``npc_chunk`` frame with a session-wide
+    sequence number; ``close`` sends the terminating frame once the reply is
+    complete and has passed compliance.
+    """
+
+    def __init__(self, session_id: str, turn_id: str, connection_manager: ConnectionManager) -> None:
+        self.session_id = session_id
+        self.turn_id = turn_id
+        self.manager = connection_manager
+        self.started_at = time.time()
+        self.first_chunk_ms: Optional[float] = None
+        self.chunks = 0
+
+    async def send(self, text: str) -> None:
+        if not text:
+            return
+        if self.first_chunk_ms is None:
+            self.first_chunk_ms = (time.time() - self.started_at) * 1000
+        await self._send_frame({"content": text})
+        self.chunks += 1
+
+    async def close(self, **extra) -> None:
+        await self._send_frame({"content": "", "final": True, "chunks": self.chunks, **extra})
+
+    async def _send_frame(self, fields: dict) -> None:
+        await self.manager.send_chunk(
+            self.session_id,
+            {
+                "type": "npc_chunk",
+                "turn_id": self.turn_id,
+                "sequence": self.manager.next_sequence(self.session_id),
+                "index": self.chunks,
+                **fields,
+            },
+        )
+
+
 class SimpleModelCaller:
     async def generate(self, prompt: str, context: dict) -> str:
         history = context.get("history", [])
@@ -361,7 +425,10 @@ async def websocket_training(
 
         async for db in get_db_session():
             state = await _load_or_init_state(db, session_id, customer_persona.initial_mood)
+            turn_context = await load_turn_context(db, session_id)
             break
+        if turn_context:
+            manager.set_turn_context(session_id, turn_context)
 
         budget_manager = BudgetManager()
         model_gateway = ModelGateway(budget_manager=budget_manager)
@@ -438,6 +505,7 @@ async def websocket_training(
                     orchestrator,
                     tenant_id=getattr(current_user, "tenant_id", None),
                     client_turn_id=client_turn_id,
+                    stream=bool(data.get("stream")) and settings.WEBSOCKET_STREAMING_ENABLED,
                 )
 
     except WebSocketDisconnect:
@@ -451,6 +519,12 @@ async def websocket_training(
             pass
     finally:
         if session_id:
+            try:
+                # Queued turns must land before the session is closed;
+                # transient errors are retried rather than dropped
+                await turn_write_behind.drain()
+            except Exception as exc:
+                logger.error("Turn write-behind drain failed for session %s: %s", session_id, exc)
             try:
                 async for db in get_db_session():
                     result = await db.execute(select(Session).where(Session.id == session_id))
@@ -499,49 +573,36 @@ def _build_ws_error_payload(exc: Exception, settings) -> dict:
     return payload
 
 
-async def _send_committed_turn(session_id: str, turn_id: str, db: AsyncSession) -> bool:
-    npc_result = await db.execute(
-        select(Message)
-        .where(
-            Message.session_id == session_id,
-            Message.turn_id == turn_id,
-            Message.role == "npc",
-            Message.status == "committed",
-        )
-        .order_by(Message.turn_number.desc())
-        .limit(1)
-    )
-    npc_msg = npc_result.scalar_one_or_none()
-    if not npc_msg:
+async def _send_committed_turn(session_id: str, record: Optional[TurnRecord]) -> bool:
+    if not record or not record.committed:
         return False
-    user_result = await db.execute(
-        select(Message)
-        .where(
-            Message.session_id == session_id,
-            Message.turn_id == turn_id,
-            Message.role == "user",
-            Message.status == "committed",
-        )
-        .order_by(Message.turn_number.desc())
-        .limit(1)
-    )
-    user_msg = user_result.scalar_one_or_none()
     await manager.send_json(
         session_id,
         {
             "type": "turn_result",
-            "turn": npc_msg.turn_number,
-            "user_message": user_msg.content if user_msg else "",
-            "npc_response": npc_msg.content,
-            "npc_mood": (npc_msg.npc_result or {}).get("mood_after", 0.5),
-            "stage": npc_msg.stage,
+            "turn": record.turn_number,
+            "user_message": record.user_message,
+            "npc_response": record.npc_response,
+            "npc_mood": record.npc_mood,
+            "stage": record.npc_stage,
             "ttfs_ms": 0,
-            "turn_id": turn_id,
+            "turn_id": record.turn_id,
         },
     )
     return True
 
 
+async def _get_turn_context(session_id: str) -> Optional[TurnContext]:
+    ctx = manager.get_turn_context(session_id)
+    if ctx is None:
+        async for db in get_db_session():
+            ctx = await load_turn_context(db, session_id)
+            break
+        if ctx is not None:
+            manager.set_turn_context(session_id, ctx)
+    return ctx
+
+
 async def _process_user_message(
     session_id: str,
     user_id: str,
@@ -549,114 +610,78 @@ async def _process_user_message(
     orchestrator: ProductionCoordinator,
     tenant_id: Optional[str] = None,
     client_turn_id: Optional[str] = None,
+    stream: bool = False,
 ) -> None:
-    db = None
-    async for db_tmp in get_db_session():
-        db = db_tmp
-        break
-    if not db:
-        return
-
-    session_result = await db.execute(select(Session).where(Session.id == session_id))
-    session_row = session_result.scalar_one_or_none()
-    if not session_row:
+    # Session, state, history and turn dedup all come from the in-memory
+    # context loaded at connect; the turn is persisted by the write-behind queue
+    ctx = await _get_turn_context(session_id)
+    if not ctx:
         await manager.send_json(session_id, {"type": "error", "message": "Session not found"})
         return
 
-    state_result = await db.execute(select(SessionState).where(SessionState.session_id == session_id))
-    session_state = state_result.scalar_one_or_none()
-    history_result = await db.execute(
-        select(Message)
-        .where(Message.session_id == session_id, Message.status == "committed")
-        .order_by(Message.turn_number.desc())
-        .limit(5)
-    )
-    history_msgs = list(reversed(history_result.scalars().all()))
-    session_ctx = {
-        "history": [{"role": m.role, "content": m.content} for m in history_msgs],
-        "persona": None,
-        "stage": session_state.current_stage if session_state else "training",
-    }
-    current_stage = session_ctx.get("stage", "training")
+    history_window = ctx.history_window()
+    current_stage = ctx.current_stage
     previous_stage = current_stage
-    turn_number = session_row.total_turns + 1
+    turn_number = ctx.total_turns + 1
     turn_id = _stable_turn_id(session_id, user_id, content, turn_number, client_turn_id=client_turn_id)
 
-    existing_user_result = await db.execute(
-        select(Message).where(
-            Message.session_id == session_id,
-            Message.turn_id == turn_id,
-            Message.role == "user",
-        )
-    )
-    existing_user = existing_user_result.scalar_one_or_none()
-    if existing_user:
-        if existing_user.status == "committed":
-            await _send_committed_turn(session_id, turn_id, db)
-            return
-        if not _is_recent(existing_user.created_at, 30):
-            if existing_user.content != content:
-                await manager.send_json(
-                    session_id,
-                    {"type": "error", "category": "system_error", "message": "Turn conflict"},
-                )
-                return
-        else:
-            return
-    else:
-        recent_user_result = await db.execute(
-            select(Message)
-            .where(
-                Message.session_id == session_id,
-                Message.role == "user",
-                Message.status == "committed",
+    existing = ctx.get_turn(turn_id)
+    if existing:
+        if existing.committed:
+            await _send_committed_turn(session_id, existing)
+        elif existing.user_message != content:
+            await manager.send_json(
+                session_id,
+                {"type": "error", "category": "system_error", "message": "Turn conflict"},
             )
-            .order_by(Message.turn_number.desc())
-            .limit(1)
-        )
-        recent_user = recent_user_result.scalar_one_or_none()
-        if recent_user and recent_user.content == content and _is_recent(recent_user.created_at, 30):
-            await _send_committed_turn(session_id, recent_user.turn_id or "", db)
-            return
+        # Otherwise the same turn is still in flight
+        return
+    recent = ctx.last_committed_turn()
+    if recent and recent.user_message == content and _is_recent(recent.created_at, 30):
+        await _send_committed_turn(session_id, recent)
+        return
 
     if manager.is_duplicate_turn(session_id, turn_id):
-        await _send_committed_turn(session_id, turn_id, db)
+        await _send_committed_turn(session_id, ctx.get_turn(turn_id))
         return
     manager.mark_turn_seen(session_id, turn_id)
-
-    if not existing_user:
-        user_msg = Message(
-            id=str(uuid.uuid4()),
-            session_id=session_id,
-            turn_number=turn_number,
-            role="user",
-            content=content,
-            stage=current_stage,
-            turn_id=turn_id,
-            status="pending",
-        )
-        db.add(user_msg)
-        await db.commit()
-    else:
-        user_msg = existing_user
+    ctx.begin_turn(turn_id, turn_number, content)
 
     def _emit(event: dict) -> None:
         asyncio.create_task(manager.send_json(session_id, {"type": "round_event", **event}))
 
+    # In streaming mode NPC tokens go out as they are generated; compliance
+    # runs on the complete reply inside the turn, persistence after it
+    chunk_stream = NPCChunkStream(session_id, turn_id, manager) if stream else None
     start_time = time.time()
     try:
         result = await orchestrator.execute_turn(
             turn_number=turn_number,
             user_message=content,
             enable_async_coach=True,
+            on_token=chunk_stream.send if chunk_stream else None,
         )
+        if chunk_stream and getattr(result, "error", None):
+            # The coordinator reports failures as a result; a partly streamed
+            # reply must end as an aborted turn, not a committed one
+            raise RuntimeError(result.error)
         reply = result.npc_response
         npc_mood = result.npc_mood
         current_stage = result.stage or current_stage
         ttfs_ms = result.ttft_ms
         bandit_decision = result.bandit_decision if hasattr(result, "bandit_decision") else None
         metadata = result.metadata if hasattr(result, "metadata") else None
+        if chunk_stream:
+            if chunk_stream.first_chunk_ms is not None:
+                ttfs_ms = chunk_stream.first_chunk_ms
+            await chunk_stream.close(risk_level=(metadata or {}).get("risk_level"))
     except Exception as e:
+        if chunk_stream and chunk_stream.chunks:
+            try:
+                await chunk_stream.close(aborted=True)
+            except Exception:
+                pass
+        ctx.abort_turn(turn_id)
         manager.clear_turn_seen(session_id, turn_id)
         if isinstance(e, AuditBlockedError):
             performance_metrics_collector.record_audit_block()
@@ -669,51 +694,21 @@ async def _process_user_message(
     latency_ms = (time.time() - start_time) * 1000
     performance_metrics_collector.record_turn(latency_ms=latency_ms)
 
-    npc_msg = Message(
-        id=str(uuid.uuid4()),
-        session_id=session_id,
-        turn_number=turn_number,
-        role="npc",
-        content=reply,
-        stage=current_stage,
-        npc_result={"mood_after": npc_mood if 'npc_mood' in locals() else 0.5},
-        turn_id=turn_id,
-        status="committed",
-    )
-    db.add(npc_msg)
-
-    user_msg.status = "committed"
-    session_row.total_turns = turn_number
-    session_row.last_activity_at = datetime.utcnow()
-
-    if session_state:
-        session_state.current_stage = current_stage
-        session_state.turn_count = turn_number
-        session_state.context_snapshot = {
-            "turn": turn_number,
-            "stage": current_stage,
-            "history_tail": session_ctx["history"],
-            "timestamp": datetime.utcnow().isoformat(),
-        }
-
-    await db.commit()
-
-    try:
-        from app.context_manager import context_manager
-
-        await context_manager.process_turn(
+    ctx.commit_turn(turn_id, reply, npc_mood, current_stage)
+    turn_write_behind.enqueue(
+        TurnWrite(
             session_id=session_id,
-            user_id=user_id,
-            tenant_id=tenant_id or "",
-            turn_id=turn_number,
-            current_stage=str(current_stage),
-            previous_stage=str(previous_stage),
-            user_input=content,
+            turn_id=turn_id,
+            turn_number=turn_number,
+            user_message=content,
+            user_stage=previous_stage,
             npc_response=reply,
-            history_window=session_ctx.get("history", []),
+            npc_stage=current_stage,
+            npc_mood=npc_mood,
+            history_tail=history_window,
+            update_state=ctx.has_state,
         )
-    except Exception as exc:
-        logger.warning("Context manager update failed: %s", exc)
+    )
 
     await manager.send_json(
         session_id,
@@ -724,13 +719,34 @@ async def _process_user_message(
             "npc_response": reply,
             "npc_mood": 0.5,
             "stage": current_stage,
-            "ttfs_ms": ttfs_ms if 'ttfs_ms' in locals() else 0,
+            "ttfs_ms": ttfs_ms,
             "turn_id": turn_id,
-            "bandit_decision_id": (bandit_decision or {}).get("decision_id") if 'bandit_decision' in locals() else None,
+            "bandit_decision_id": (bandit_decision or {}).get("decision_id"),
             "metadata": metadata or {},
         },
     )
 
+    # Context maintenance (scoring, compression, state sync) runs in the
+    # background; the reply above does not wait for it
+    try:
+        from app.context_manager import ContextTurn, context_pipeline
+
+        context_pipeline.submit(
+            session_id,
+            user_id,
+            tenant_id or "",
+            ContextTurn(
+                turn_id=turn_number,
+                current_stage=str(current_stage),
+                previous_stage=str(previous_stage),
+                user_input=content,
+                npc_response=reply,
+                history_window=list(history_window),
+            ),
+        )
+    except Exception as exc:
+        logger.warning("Context manager update failed: %s", exc)
+
 
 async def _load_course(db: AsyncSession, course_id: str, session_id: str) -> Optional[Course]:
     result = await db.execute(select(Course).where(Course.id == course_id))
@@ -16,6 +16,7 @@ from app.a2a.protocol import (
     AgentInfo,
 )
 from app.a2a.message_bus import A2AMessageBus
+from app.a2a.stream_bus import A2AStreamBus
 from app.a2a.agent_base import A2AAgent
 
 __all__ = [
@@ -28,5 +29,6 @@ __all__ = [
     "MessagePriority",
     "AgentInfo",
     "A2AMessageBus",
+    "A2AStreamBus",
     "A2AAgent",
 ]
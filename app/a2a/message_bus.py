@@ -2,6 +2,12 @@
 A2A Message Bus Implementation
 
 Redis-based message bus for agent-to-agent communication.
+
+One pubsub connection per bus carries the broadcast channel and every
+subscribed agent's channel; incoming messages are demultiplexed into
+bounded per-agent queues drained by a fixed number of worker tasks, so a
+slow handler only delays its own agent. Each publish (PUBLISH + history
+LPUSH + EXPIRE) is a single MULTI round trip.
 """
 
 from __future__ import annotations
@@ -10,17 +16,40 @@ import asyncio
 import json
 import logging
 import time
-from typing import Any, Callable, Coroutine, Dict, List, Optional, Set
+from dataclasses import dataclass, field
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Union
 
 from redis.asyncio import Redis
 
 from app.a2a.protocol import A2AMessage, AgentInfo, MessageType
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
 # Type alias for message handler
 MessageHandler = Callable[[A2AMessage], Coroutine[Any, Any, None]]
 
+SERIALIZERS = ("json", "orjson", "msgpack")
+
+
+@dataclass
+class _AgentSubscription:
+    """Per-agent delivery queue and the workers draining it"""
+
+    handler: MessageHandler
+    queue: asyncio.Queue
+    workers: List[asyncio.Task] = field(default_factory=list)
+    deferred: int = 0  # deliveries that found the queue full
+
 
 class A2AMessageBus:
     """
@@ -55,6 +84,11 @@ class A2AMessageBus:
 
         # Request-response
         response = await bus.request(request_message, timeout=30.0)
+
+    The ``msgpack`` serializer produces binary frames and needs a Redis
+    client created with ``decode_responses=False``; ``json`` and
+    ``orjson`` work with either. All processes sharing a channel prefix
+    must use the same serializer.
     """
 
     def __init__(
@@ -62,6 +96,11 @@ class A2AMessageBus:
         redis_client: Redis,
         channel_prefix: str = "a2a",
         history_ttl: int = 3600,  # 1 hour
+        serializer: str = "json",
+        agent_concurrency: int = 1,
+        agent_queue_size: int = 1000,
+        reconnect_min_delay: float = 0.5,
+        reconnect_max_delay: float = 30.0,
     ):
         """
         Initialize message bus
@@ -70,16 +109,44 @@ class A2AMessageBus:
             redis_client: Redis client instance
             channel_prefix: Prefix for Redis channels
             history_ttl: TTL for message history in seconds
+            serializer: Wire format: "json", "orjson" or "msgpack"
+            agent_concurrency: Default handler workers per subscribed agent
+                (1 = messages are handled one at a time, in order)
+            agent_queue_size: Per-agent queue bound; a full queue makes the
+                listener wait for that agent (backpressure)
+            reconnect_min_delay: First backoff delay after the pubsub connection fails
+            reconnect_max_delay: Cap on the (doubling) reconnect backoff
         """
+        if serializer not in SERIALIZERS:
+            raise ValueError(f"Unknown serializer {serializer!r}, expected one of {SERIALIZERS}")
+        if serializer == "orjson" and orjson is None:
+            raise RuntimeError("orjson is required for the orjson serializer")
+        if serializer == "msgpack" and msgpack is None:
+            raise RuntimeError("msgpack is required for the msgpack serializer")
+
         self.redis = redis_client
         self.channel_prefix = channel_prefix
         self.history_ttl = history_ttl
+        self.serializer = serializer
+        self.agent_concurrency = max(1, agent_concurrency)
+        self.agent_queue_size = agent_queue_size
 
         # Agent registry
         self.agent_registry: Dict[str, AgentInfo] = {}
 
         # Active subscriptions
-        self.subscriptions: Dict[str, asyncio.Task] = {}
+        self.subscriptions: Dict[str, _AgentSubscription] = {}
+
+        # Shared pubsub connection and its listener
+        self._pubsub = None
+        self._listener_task: Optional[asyncio.Task] = None
+        self._pubsub_lock = asyncio.Lock()
+        self._channel_agents: Dict[str, str] = {}
+        self.reconnect_min_delay = reconnect_min_delay
+        self.reconnect_max_delay = reconnect_max_delay
+        self._listener_connected = False
+        self._listener_reconnects = 0
+        self._listener_last_error: Optional[str] = None
 
         # Pending requests (for request-response pattern)
         self.pending_requests: Dict[str, asyncio.Future] = {}
@@ -104,6 +171,23 @@ class A2AMessageBus:
         """Get response channel for a message"""
         return f"{self.channel_prefix}:response:{message_id}"
 
+    def _encode(self, message: A2AMessage) -> Union[str, bytes]:
+        """Serialize a message in the configured wire format"""
+        data = message.to_dict()
+        if self.serializer == "orjson":
+            return orjson.dumps(data)
+        if self.serializer == "msgpack":
+            return msgpack.packb(data, use_bin_type=True)
+        return json.dumps(data)
+
+    def _decode(self, raw: Union[str, bytes]) -> A2AMessage:
+        """Deserialize a message in the configured wire format"""
+        if self.serializer == "msgpack":
+            return A2AMessage.from_dict(msgpack.unpackb(raw, raw=False))
+        if self.serializer == "orjson":
+            return A2AMessage.from_dict(orjson.loads(raw))
+        return A2AMessage.from_dict(json.loads(raw))
+
     async def register_agent(
         self,
         agent_id: str,
@@ -177,9 +261,7 @@ class A2AMessageBus:
             await self.redis.hdel(f"{self.channel_prefix}:agents", agent_id)
 
             # Cancel subscription
-            if agent_id in self.subscriptions:
-                self.subscriptions[agent_id].cancel()
-                del self.subscriptions[agent_id]
+            await self.unsubscribe(agent_id)
 
             logger.info(f"Agent unregistered: {agent_id}")
 
@@ -238,6 +320,9 @@ class A2AMessageBus:
         """
         Publish a message
 
+        PUBLISH, history LPUSH and EXPIRE go out as one MULTI/EXEC
+        pipeline, i.e. a single round trip.
+
         Args:
             message: Message to publish
         """
@@ -245,95 +330,262 @@ class A2AMessageBus:
         channel = self._get_channel(message.to_agent)
 
         # Serialize message
-        message_json = json.dumps(message.to_dict())
-
-        # Publish to Redis
-        await self.redis.publish(channel, message_json)
+        message_data = self._encode(message)
 
-        # Store in history
+        # Publish and store in history
         history_key = f"{self.channel_prefix}:history:{message.conversation_id}"
-        await self.redis.lpush(history_key, message_json)
-        await self.redis.expire(history_key, self.history_ttl)
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.publish(channel, message_data)
+        pipe.lpush(history_key, message_data)
+        pipe.expire(history_key, self.history_ttl)
+        await pipe.execute()
 
         logger.debug(
             f"Published message: {message.message_type} from {message.from_agent} "
             f"to {message.to_agent or 'broadcast'}"
         )
 
-    async def subscribe(self, agent_id: str, handler: MessageHandler):
+    async def subscribe(
+        self,
+        agent_id: str,
+        handler: MessageHandler,
+        concurrency: Optional[int] = None,
+    ):
         """
         Subscribe to messages for an agent
 
+        Messages are queued per agent and handled by ``concurrency``
+        worker tasks. The default of one worker handles them in order;
+        with more than one, handlers may run concurrently and out of order.
+
         Args:
             agent_id: Agent identifier
             handler: Async function to handle messages
+            concurrency: Handler workers for this agent (default: agent_concurrency)
         """
         if agent_id in self.subscriptions:
             logger.warning(f"Agent {agent_id} already subscribed")
             return
 
-        # Create subscription task
-        task = asyncio.create_task(self._subscription_loop(agent_id, handler))
-        self.subscriptions[agent_id] = task
+        channel = self._get_channel(agent_id)
+        self._start_subscription(agent_id, handler, concurrency)
+        self._channel_agents[channel] = agent_id
+        try:
+            pubsub = await self._ensure_pubsub()
+            await pubsub.subscribe(channel)
+        except BaseException:
+            # Don't leave workers running for an agent that never subscribed
+            self._channel_agents.pop(channel, None)
+            for task in self.subscriptions.pop(agent_id).workers:
+                task.cancel()
+            raise
 
         logger.info(f"Agent subscribed: {agent_id}")
 
-    async def _subscription_loop(self, agent_id: str, handler: MessageHandler):
+    def _start_subscription(
+        self,
+        agent_id: str,
+        handler: MessageHandler,
+        concurrency: Optional[int] = None,
+    ) -> _AgentSubscription:
+        """Create an agent's queue and start its handler workers"""
+        subscription = _AgentSubscription(
+            handler=handler,
+            queue=asyncio.Queue(maxsize=self.agent_queue_size),
+        )
+        subscription.workers = [
+            asyncio.create_task(self._agent_worker(agent_id, subscription))
+            for _ in range(max(1, concurrency or self.agent_concurrency))
+        ]
+        self.subscriptions[agent_id] = subscription
+        return subscription
+
+    async def unsubscribe(self, agent_id: str):
         """
-        Subscription loop for an agent
+        Stop delivering messages to an agent
 
         Args:
             agent_id: Agent identifier
-            handler: Message handler function
         """
-        # Subscribe to direct and broadcast channels
-        pubsub = self.redis.pubsub()
-        await pubsub.subscribe(
-            self._get_channel(agent_id), self._get_channel(None)
-        )
+        subscription = self.subscriptions.pop(agent_id, None)
+        if subscription is None:
+            return
 
-        try:
-            async for redis_message in pubsub.listen():
-                if redis_message["type"] != "message":
-                    continue
+        for task in subscription.workers:
+            task.cancel()
 
+        channel = self._get_channel(agent_id)
+        self._channel_agents.pop(channel, None)
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(channel)
+            except Exception as e:
+                # A reconnect only re-subscribes channels still in _channel_agents
+                logger.warning(f"Unsubscribe of {channel} failed: {e}")
+
+    async def _ensure_pubsub(self):
+        """Open the shared pubsub connection and start its listener once"""
+        async with self._pubsub_lock:
+            if self._pubsub is None:
+                pubsub = self.redis.pubsub()
                 try:
-                    # Parse message
-                    message = A2AMessage.from_dict(
-                        json.loads(redis_message["data"])
-                    )
-
-                    # Skip messages from self
-                    if message.from_agent == agent_id:
-                        continue
-
-                    # Send ACK if required
-                    if message.requires_ack:
-                        ack = message.create_ack(agent_id)
-                        await self.publish(ack)
-
-                    # Handle response messages
-                    if (
-                        message.message_type == MessageType.RESPONSE
-                        and message.reply_to in self.pending_requests
-                    ):
-                        # Resolve pending request
-                        future = self.pending_requests[message.reply_to]
-                        if not future.done():
-                            future.set_result(message)
-                        continue
-
-                    # Call handler
-                    await handler(message)
+                    await pubsub.subscribe(self._get_channel(None))
+                except BaseException:
+                    await pubsub.close()
+                    raise
+                self._pubsub = pubsub
+                self._listener_task = asyncio.create_task(self._listen_loop(pubsub))
+        return self._pubsub
+
+    async def _listen_loop(self, pubsub):
+        """
+        Keep the shared pubsub connection alive and route its messages
+
+        Every subscribed agent depends on this task, so a failed connection
+        is replaced rather than ending the loop: after an exponential
+        backoff a new pubsub connection re-subscribes the broadcast channel
+        and every agent channel. Connection state is reported by
+        ``get_stats``.
+        """
+        delay = self.reconnect_min_delay
+        while True:
+            self._listener_connected = True
+            try:
+                await self._read_pubsub(pubsub)
+                raise ConnectionError("pubsub stream ended")
+            except asyncio.CancelledError:
+                logger.info("A2A pubsub listener cancelled")
+                self._listener_connected = False
+                return
+            except Exception as e:
+                self._listener_connected = False
+                self._listener_last_error = str(e)
+                logger.error(f"A2A pubsub listener failed, reconnecting in {delay:.1f}s: {e}")
 
+            while True:
+                try:
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, self.reconnect_max_delay)
+                    pubsub = await self._reconnect_pubsub(pubsub)
+                    break
+                except asyncio.CancelledError:
+                    logger.info("A2A pubsub listener cancelled")
+                    return
                 except Exception as e:
-                    logger.error(f"Error handling message: {e}", exc_info=True)
+                    self._listener_last_error = str(e)
+                    logger.error(f"A2A pubsub reconnect failed, retrying in {delay:.1f}s: {e}")
+            self._listener_reconnects += 1
+            delay = self.reconnect_min_delay
+            logger.info(
+                f"A2A pubsub listener reconnected ({len(self._channel_agents)} agent channels)"
+            )
 
-        except asyncio.CancelledError:
-            logger.info(f"Subscription cancelled for agent: {agent_id}")
-        finally:
-            await pubsub.unsubscribe()
-            await pubsub.close()
+    async def _reconnect_pubsub(self, old_pubsub):
+        """Replace the shared pubsub connection and re-subscribe every channel"""
+        async with self._pubsub_lock:
+            try:
+                await old_pubsub.close()
+            except Exception:
+                pass
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self._get_channel(None), *self._channel_agents)
+            except Exception:
+                await pubsub.close()
+                raise
+            self._pubsub = pubsub
+        return pubsub
+
+    async def _read_pubsub(self, pubsub):
+        """
+        Read one pubsub connection until it fails
+
+        Responses to pending requests resolve their future directly;
+        everything else is queued for the addressed agent (or for every
+        local agent, for broadcasts), skipping the sender.
+        """
+        broadcast_channel = self._get_channel(None)
+        async for redis_message in pubsub.listen():
+            if redis_message["type"] != "message":
+                continue
+
+            try:
+                message = self._decode(redis_message["data"])
+            except Exception as e:
+                logger.error(f"Error decoding message: {e}", exc_info=True)
+                continue
+
+            # Handle response messages
+            if (
+                message.message_type == MessageType.RESPONSE
+                and message.reply_to in self.pending_requests
+            ):
+                # Resolve pending request
+                future = self.pending_requests[message.reply_to]
+                if not future.done():
+                    future.set_result(message)
+                continue
+
+            channel = redis_message["channel"]
+            if isinstance(channel, bytes):
+                channel = channel.decode()
+
+            if channel == broadcast_channel:
+                targets = list(self.subscriptions)
+            else:
+                agent_id = self._channel_agents.get(channel)
+                targets = [agent_id] if agent_id else []
+
+            for agent_id in targets:
+                # Skip messages from self
+                if agent_id != message.from_agent:
+                    await self._enqueue(agent_id, message)
+
+    async def _enqueue(self, agent_id: str, message: A2AMessage):
+        """
+        Queue a message for an agent
+
+        If the agent is backed up, the listener waits for queue space instead
+        of dropping the message; Redis buffers what arrives meanwhile.
+        """
+        subscription = self.subscriptions.get(agent_id)
+        if subscription is None:
+            return
+        try:
+            subscription.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            subscription.deferred += 1
+            logger.warning(
+                f"Queue full for agent {agent_id}, waiting to deliver {message.message_id} "
+                f"({subscription.deferred} deferred so far)"
+            )
+            await subscription.queue.put(message)
+
+    async def _agent_worker(self, agent_id: str, subscription: _AgentSubscription):
+        """
+        Handle queued messages for one agent
+
+        Args:
+            agent_id: Agent identifier
+            subscription: The agent's queue and handler
+        """
+        while True:
+            message = await subscription.queue.get()
+            try:
+                # Send ACK if required
+                if message.requires_ack:
+                    ack = message.create_ack(agent_id)
+                    await self.publish(ack)
+
+                # Call handler
+                await subscription.handler(message)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error handling message: {e}", exc_info=True)
+            finally:
+                subscription.queue.task_done()
 
     async def request(
         self, message: A2AMessage, timeout: float = 30.0
@@ -396,7 +648,7 @@ class A2AMessageBus:
         messages = []
         for message_data in reversed(messages_data):  # Reverse for chronological order
             try:
-                message = A2AMessage.from_dict(json.loads(message_data))
+                message = self._decode(message_data)
                 messages.append(message)
             except Exception as e:
                 logger.error(f"Error parsing message from history: {e}")
@@ -427,21 +679,40 @@ class A2AMessageBus:
             "registered_agents": agent_count,
             "active_subscriptions": len(self.subscriptions),
             "pending_requests": len(self.pending_requests),
+            "queued_messages": sum(s.queue.qsize() for s in self.subscriptions.values()),
+            "deferred_messages": sum(s.deferred for s in self.subscriptions.values()),
+            "listener_running": self._listener_task is not None and not self._listener_task.done(),
+            "listener_connected": self._listener_connected,
+            "listener_reconnects": self._listener_reconnects,
+            "listener_last_error": self._listener_last_error,
         }
 
     async def shutdown(self):
         """Shutdown message bus"""
         logger.info("Shutting down A2A Message Bus")
 
-        # Cancel all subscriptions
-        for task in self.subscriptions.values():
+        # Cancel all subscription workers and the shared listener
+        tasks = [task for sub in self.subscriptions.values() for task in sub.workers]
+        if self._listener_task is not None:
+            tasks.append(self._listener_task)
+        for task in tasks:
             task.cancel()
 
         # Wait for tasks to complete
-        if self.subscriptions:
-            await asyncio.gather(*self.subscriptions.values(), return_exceptions=True)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe()
+                await self._pubsub.close()
+            except Exception as e:
+                logger.warning(f"Error closing A2A pubsub connection: {e}")
+            self._pubsub = None
+            self._listener_task = None
 
         self.subscriptions.clear()
+        self._channel_agents.clear()
         self.pending_requests.clear()
 
         logger.info("A2A Message Bus shutdown complete")
@@ -0,0 +1,442 @@
+"""
+A2A Stream Bus Implementation
+
+Durable A2A transport on Redis Streams with consumer groups.
+
+Layout (``{prefix}`` = channel prefix):
+- ``{prefix}:stream:{agent_id}`` - agent inbox. Every worker process
+  hosting the agent reads it through the shared ``{prefix}`` consumer
+  group, so each message is handled by exactly one replica. Broadcasts
+  are fanned out into the inbox of every registered agent.
+- ``{prefix}:reply:{consumer}`` - per-worker reply stream. ``request``
+  tags the message with it, and the responding worker writes the
+  response there instead of the requester's inbox, so the reply always
+  reaches the process holding the pending future.
+
+Entries are acknowledged after their handler finishes. Entries left
+pending by a crashed or disconnected worker are taken over with
+XAUTOCLAIM once idle for ``claim_idle_ms``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+
+from app.a2a.message_bus import A2AMessageBus, MessageHandler, _AgentSubscription
+from app.a2a.protocol import A2AMessage, MessageType
+
+logger = logging.getLogger(__name__)
+
+
+def _as_str(value: Any) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class A2AStreamBus(A2AMessageBus):
+    """
+    A2A Message Bus over Redis Streams
+
+    Drop-in alternative to A2AMessageBus for multi-process deployments:
+    messages survive reconnects and worker restarts, replicas of the same
+    agent share its inbox without duplicate work, and request/response
+    does not depend on which worker receives the response.
+
+    Usage:
+        bus = A2AStreamBus(redis_client)
+        await bus.subscribe("sdr_001", message_handler)
+        response = await bus.request(request_message, timeout=30.0)
+
+    ``claim_idle_ms`` must exceed the longest time an entry can spend
+    queued plus in its handler, or another worker may take it over.
+    """
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        channel_prefix: str = "a2a",
+        history_ttl: int = 3600,
+        serializer: str = "json",
+        agent_concurrency: int = 1,
+        agent_queue_size: int = 1000,
+        consumer_name: Optional[str] = None,
+        read_count: int = 100,
+        block_ms: int = 1000,
+        claim_interval: float = 15.0,
+        claim_idle_ms: int = 60000,
+        stream_maxlen: int = 10000,
+    ):
+        """
+        Initialize stream bus
+
+        Args:
+            redis_client: Redis client instance
+            channel_prefix: Prefix for stream keys and the consumer group name
+            history_ttl: TTL for message history (and idle reply streams) in seconds
+            serializer: Wire format: "json", "orjson" or "msgpack"
+            agent_concurrency: Default handler workers per subscribed agent
+                (1 = entries are handled one at a time, in order)
+            agent_queue_size: Per-agent queue bound (overflow stays pending in Redis)
+            consumer_name: Consumer name of this worker (default: host:pid:random)
+            read_count: Maximum entries per XREADGROUP / XAUTOCLAIM call
+            block_ms: XREADGROUP block time in milliseconds
+            claim_interval: Seconds between XAUTOCLAIM sweeps
+            claim_idle_ms: Idle time after which pending entries are taken over
+            stream_maxlen: Approximate MAXLEN of inbox and reply streams
+        """
+        super().__init__(
+            redis_client,
+            channel_prefix=channel_prefix,
+            history_ttl=history_ttl,
+            serializer=serializer,
+            agent_concurrency=agent_concurrency,
+            agent_queue_size=agent_queue_size,
+        )
+        self.group = channel_prefix
+        self.consumer = consumer_name or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.reply_stream = f"{channel_prefix}:reply:{self.consumer}"
+        self.read_count = read_count
+        self.block_ms = block_ms
+        self.claim_interval = claim_interval
+        self.claim_idle_ms = claim_idle_ms
+        self.stream_maxlen = stream_maxlen
+
+        self._stream_agents: Dict[str, str] = {}
+        # request message_id -> reply stream, while the request is being handled
+        self._reply_routes: Dict[str, str] = {}
+        # (stream, entry_id) handed to a local worker and not yet acknowledged
+        self._in_flight: Set[Tuple[str, str]] = set()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._claim_task: Optional[asyncio.Task] = None
+        self._start_lock = asyncio.Lock()
+        self._running = False
+
+    def _get_stream(self, agent_id: str) -> str:
+        """Inbox stream of an agent"""
+        return f"{self.channel_prefix}:stream:{agent_id}"
+
+    async def _create_group(self, stream: str):
+        """Create the consumer group (from the start of the stream) if missing"""
+        try:
+            await self.redis.xgroup_create(stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    async def _ensure_started(self):
+        """Create the reply stream group and start the reader and claim loops once"""
+        async with self._start_lock:
+            if self._reader_task is None:
+                await self._create_group(self.reply_stream)
+                await self.redis.expire(self.reply_stream, self.history_ttl)
+                self._running = True
+                self._reader_task = asyncio.create_task(self._read_loop())
+                self._claim_task = asyncio.create_task(self._claim_loop())
+
+    async def publish(self, message: A2AMessage):
+        """
+        Publish a message
+
+        Responses to a request handled on this worker go to the
+        requester's reply stream; direct messages go to the target's
+        inbox; broadcasts go to the inbox of every other registered
+        agent. Stream appends and the history write share one MULTI.
+
+        Args:
+            message: Message to publish
+        """
+        message_data = self._encode(message)
+
+        reply_stream = None
+        if message.message_type == MessageType.RESPONSE and message.reply_to:
+            reply_stream = self._reply_routes.pop(message.reply_to, None)
+
+        if reply_stream:
+            streams = [reply_stream]
+        elif message.to_agent:
+            streams = [self._get_stream(message.to_agent)]
+        else:
+            agent_ids = await self.redis.hkeys(f"{self.channel_prefix}:agents")
+            streams = [
+                self._get_stream(_as_str(agent_id))
+                for agent_id in agent_ids
+                if _as_str(agent_id) != message.from_agent
+            ]
+
+        history_key = f"{self.channel_prefix}:history:{message.conversation_id}"
+        pipe = self.redis.pipeline(transaction=True)
+        for stream in streams:
+            pipe.xadd(stream, {"data": message_data}, maxlen=self.stream_maxlen, approximate=True)
+        if reply_stream:
+            pipe.expire(reply_stream, self.history_ttl)
+        pipe.lpush(history_key, message_data)
+        pipe.expire(history_key, self.history_ttl)
+        await pipe.execute()
+
+        logger.debug(
+            f"Published message: {message.message_type} from {message.from_agent} "
+            f"to {message.to_agent or 'broadcast'} ({len(streams)} streams)"
+        )
+
+    async def subscribe(
+        self,
+        agent_id: str,
+        handler: MessageHandler,
+        concurrency: Optional[int] = None,
+    ):
+        """
+        Subscribe to messages for an agent
+
+        Joins the agent's inbox consumer group; messages already waiting
+        in the inbox are delivered too.
+
+        Args:
+            agent_id: Agent identifier
+            handler: Async function to handle messages
+            concurrency: Handler workers for this agent (default: agent_concurrency)
+        """
+        if agent_id in self.subscriptions:
+            logger.warning(f"Agent {agent_id} already subscribed")
+            return
+
+        stream = self._get_stream(agent_id)
+        await self._create_group(stream)
+        self._start_subscription(agent_id, handler, concurrency)
+        self._stream_agents[stream] = agent_id
+        await self._ensure_started()
+
+        logger.info(f"Agent subscribed: {agent_id} (stream {stream}, consumer {self.consumer})")
+
+    async def unsubscribe(self, agent_id: str):
+        """
+        Stop reading an agent's inbox on this worker
+
+        Entries already read but not acknowledged stay pending and are
+        taken over by a worker (this one too, after re-subscribing) once
+        they have been idle for ``claim_idle_ms``.
+
+        Args:
+            agent_id: Agent identifier
+        """
+        subscription = self.subscriptions.pop(agent_id, None)
+        if subscription is None:
+            return
+
+        for task in subscription.workers:
+            task.cancel()
+        self._stream_agents.pop(self._get_stream(agent_id), None)
+
+        # Queued entries were never handled; forget them so a later claim
+        # dispatches them instead of skipping them as in flight
+        while not subscription.queue.empty():
+            _, stream, entry_id = subscription.queue.get_nowait()
+            self._in_flight.discard((stream, entry_id))
+
+    async def request(
+        self, message: A2AMessage, timeout: float = 30.0
+    ) -> A2AMessage:
+        """
+        Send a request and wait for its response on this worker's reply stream
+
+        Args:
+            message: Request message
+            timeout: Timeout in seconds
+
+        Returns:
+            Response message
+
+        Raises:
+            asyncio.TimeoutError: If no response within timeout
+        """
+        await self._ensure_started()
+        message.metadata["reply_stream"] = self.reply_stream
+        return await super().request(message, timeout=timeout)
+
+    async def _read_loop(self):
+        """Read the reply stream and every local inbox with one XREADGROUP per round"""
+        while self._running:
+            streams = {self.reply_stream: ">"}
+            for stream in self._stream_agents:
+                streams[stream] = ">"
+
+            try:
+                response = await self.redis.xreadgroup(
+                    self.group,
+                    self.consumer,
+                    streams,
+                    count=self.read_count,
+                    block=self.block_ms,
+                )
+                for stream, entries in response or []:
+                    await self._dispatch(_as_str(stream), entries)
+
+            except asyncio.CancelledError:
+                raise
+            except ResponseError as e:
+                if "NOGROUP" in str(e):
+                    # Stream was trimmed away or deleted; recreate groups
+                    for stream in list(streams):
+                        await self._create_group(stream)
+                    continue
+                logger.error(f"A2A stream read failed: {e}", exc_info=True)
+                await asyncio.sleep(1.0)
+            except Exception as e:
+                logger.error(f"A2A stream read failed: {e}", exc_info=True)
+                await asyncio.sleep(1.0)
+
+    async def _claim_loop(self):
+        """Periodically take over entries left pending by dead consumers"""
+        while True:
+            await asyncio.sleep(self.claim_interval)
+            for stream in list(self._stream_agents):
+                try:
+                    result = await self.redis.xautoclaim(
+                        stream,
+                        self.group,
+                        self.consumer,
+                        min_idle_time=self.claim_idle_ms,
+                        start_id="0-0",
+                        count=self.read_count,
+                    )
+                    entries = result[1]
+                    if entries:
+                        logger.info(f"Claimed {len(entries)} idle entries from {stream}")
+                        await self._dispatch(stream, entries)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"XAUTOCLAIM on {stream} failed: {e}", exc_info=True)
+
+    async def _dispatch(self, stream: str, entries: List[Tuple[Any, Any]]):
+        """
+        Route stream entries
+
+        Responses for pending requests resolve their future; other entries
+        are queued for the owning agent. Everything not handed to a worker
+        is acknowledged here, except entries that did not fit in a full
+        agent queue, which stay pending for a later claim.
+        """
+        acks = []
+        for entry_id, fields in entries:
+            entry_id = _as_str(entry_id)
+            if (stream, entry_id) in self._in_flight:
+                continue
+            if not fields:
+                # Claimed entry that was trimmed from the stream
+                acks.append(entry_id)
+                continue
+
+            try:
+                message = self._decode(fields.get("data", fields.get(b"data")))
+            except Exception as e:
+                logger.error(f"Error decoding stream entry {entry_id}: {e}", exc_info=True)
+                acks.append(entry_id)
+                continue
+
+            if message.message_type == MessageType.RESPONSE and message.reply_to in self.pending_requests:
+                future = self.pending_requests[message.reply_to]
+                if not future.done():
+                    future.set_result(message)
+                acks.append(entry_id)
+                continue
+
+            agent_id = self._stream_agents.get(stream)
+            if agent_id is None or agent_id == message.from_agent:
+                # Late reply for a timed-out request, or a message from self
+                acks.append(entry_id)
+                continue
+
+            subscription = self.subscriptions.get(agent_id)
+            if subscription is None:
+                continue
+            try:
+                subscription.queue.put_nowait((message, stream, entry_id))
+                self._in_flight.add((stream, entry_id))
+            except asyncio.QueueFull:
+                subscription.deferred += 1
+                logger.warning(
+                    f"Queue full for agent {agent_id}, leaving entry {entry_id} pending"
+                )
+
+        if acks:
+            await self.redis.xack(stream, self.group, *acks)
+
+    async def _agent_worker(self, agent_id: str, subscription: _AgentSubscription):
+        """
+        Handle queued stream entries for one agent, acknowledging each after its handler
+
+        Args:
+            agent_id: Agent identifier
+            subscription: The agent's queue and handler
+        """
+        while True:
+            message, stream, entry_id = await subscription.queue.get()
+            reply_stream = message.metadata.get("reply_stream")
+            if reply_stream and message.message_type in (MessageType.REQUEST, MessageType.QUERY):
+                self._reply_routes[message.message_id] = reply_stream
+            try:
+                # Send ACK if required
+                if message.requires_ack:
+                    await self.publish(message.create_ack(agent_id))
+
+                # Call handler
+                await subscription.handler(message)
+
+            except asyncio.CancelledError:
+                # Leave the entry pending so another worker can claim it
+                self._in_flight.discard((stream, entry_id))
+                raise
+            except Exception as e:
+                logger.error(f"Error handling message: {e}", exc_info=True)
+            finally:
+                self._reply_routes.pop(message.message_id, None)
+                subscription.queue.task_done()
+
+            try:
+                await self.redis.xack(stream, self.group, entry_id)
+            except Exception as e:
+                logger.error(f"XACK {entry_id} on {stream} failed: {e}")
+            finally:
+                self._in_flight.discard((stream, entry_id))
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """
+        Get message bus statistics
+
+        Returns:
+            Statistics dictionary
+        """
+        stats = await super().get_stats()
+        stats["consumer"] = self.consumer
+        stats["in_flight_entries"] = len(self._in_flight)
+        return stats
+
+    async def shutdown(self):
+        """Stop reading, leave unacknowledged entries pending, drop the reply stream"""
+        # Let the reader finish its current blocking read rather than
+        # cancelling it mid-command
+        self._running = False
+        if self._reader_task is not None:
+            try:
+                await asyncio.wait_for(self._reader_task, timeout=self.block_ms / 1000 + 1.0)
+            except asyncio.TimeoutError:
+                pass
+        if self._claim_task is not None:
+            self._claim_task.cancel()
+            await asyncio.gather(self._claim_task, return_exceptions=True)
+        if self._reader_task is not None:
+            await self.redis.delete(self.reply_stream)
+        self._reader_task = None
+        self._claim_task = None
+
+        await super().shutdown()
+        self._stream_agents.clear()
+        self._reply_routes.clear()
+        self._in_flight.clear()
@@ -1,9 +1,12 @@
+import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
 from pydantic import BaseModel
 
 from app.agents.roles.base import BaseAgent
 from app.agent_knowledge_interface import get_agent_knowledge_interface
+from app.infra.streaming.json_field import JSONFieldStreamExtractor
+from app.infra.streaming.utf8_buffer import UTF8StreamBuffer
 
 logger = logging.getLogger(__name__)
 
@@ -38,6 +41,71 @@ class NPCGenerator(BaseAgent):
                 mood=0.5
             )
 
+        call, call_ctx = self._build_call(message, history, persona, stage)
+        try:
+            raw_response = await self.gateway.call(call, call_ctx)
+            return self._parse_response(raw_response)
+        except Exception as e:
+            logger.error(f"NPC Generation failed: {e}")
+            return NPCResponse(content="[System Error] Let's continue.", mood=0.5)
+
+    async def stream_response(
+        self,
+        message: str,
+        history: List[Dict[str, str]],
+        persona: Any,
+        stage: str,
+        on_delta: Callable[[str], Awaitable[None]],
+    ) -> NPCResponse:
+        """
+        Stream the reply through the gateway.
+
+        Only the decoded ``content`` text of the JSON answer is passed to
+        ``on_delta``, as soon as it arrives. The full answer is parsed once the
+        stream ends, so the returned NPCResponse matches generate_response.
+
+        A failure before any text was emitted yields the usual fallback reply.
+        A failure after that is re-raised: the client already holds part of
+        the real reply, so the turn must be aborted rather than replaced.
+        """
+        logger.info(f"Streaming NPC response for stage: {stage}")
+
+        if not self.gateway:
+            response = await self.generate_response(message, history, persona, stage)
+            await on_delta(response.content)
+            return response
+
+        call, call_ctx = self._build_call(message, history, persona, stage)
+        extractor = JSONFieldStreamExtractor("content")
+        utf8_buffer = UTF8StreamBuffer()
+        emitted = False
+        try:
+            async for chunk in self.gateway.stream_call(call, call_ctx):
+                # Adapters yield text; raw SSE providers may yield bytes split
+                # mid-character
+                text = utf8_buffer.process_chunk(chunk) if isinstance(chunk, bytes) else chunk
+                delta = extractor.feed(text)
+                if delta:
+                    emitted = True
+                    await on_delta(delta)
+            delta = extractor.feed(utf8_buffer.flush())
+            if delta:
+                emitted = True
+                await on_delta(delta)
+            return self._parse_response(extractor.raw)
+        except Exception as e:
+            logger.error(f"NPC streaming failed: {e}")
+            if emitted:
+                raise
+            return NPCResponse(content="[System Error] Let's continue.", mood=0.5)
+
+    def _build_call(
+        self,
+        message: str,
+        history: List[Dict[str, str]],
+        persona: Any,
+        stage: str
+    ) -> Tuple[Any, Any]:
         # Check if message contains product-related questions (Fact Checking)
         product_keywords = ['年费', '权益', '额度', '积分', '优惠', '费用', 'annual fee', 'benefit', 'credit limit']
         is_product_question = any(keyword in message.lower() for keyword in product_keywords)
@@ -84,7 +152,6 @@ Output strictly JSON format:
         # User Message
         user_prompt = f"Salesperson says: {message}"
 
-        # Call Gateway
         from app.infra.gateway.schemas import ModelCall, RoutingContext, AgentType, LatencyMode
         
         call_ctx = RoutingContext(
@@ -98,28 +165,15 @@ Output strictly JSON format:
             session_id="sim-session",
             budget_authorized=True
         )
-        
+        return ModelCall(prompt=user_prompt, system_prompt=sys_prompt), call_ctx
+
+    def _parse_response(self, raw_response: str) -> NPCResponse:
+        # If the gateway returns the old mock string, we handle it
+        if "mock response" in raw_response.lower() or "{" not in raw_response:
+            return NPCResponse(content=raw_response, mood=0.5)
+
         try:
-            raw_response = await self.gateway.call(
-                ModelCall(prompt=user_prompt, system_prompt=sys_prompt), 
-                call_ctx
-            )
-            
-            # Simple simulation of JSON parsing/mock return for now since Gateway is still mock
-            # In real impl, we'd parse json.loads(raw_response)
-            # For this audit fix, we are trusting the Gateway updates below to return valid text/json
-            
-            # If the gateway returns the old mock string, we handle it
-            if "mock response" in raw_response.lower() or "{" not in raw_response:
-                 return NPCResponse(content=raw_response, mood=0.5)
-
-            import json
-            try:
-                data = json.loads(raw_response)
-                return NPCResponse(**data)
-            except json.JSONDecodeError:
-                 return NPCResponse(content=raw_response, mood=0.5)
-                 
-        except Exception as e:
-            logger.error(f"NPC Generation failed: {e}")
-            return NPCResponse(content="[System Error] Let's continue.", mood=0.5)
+            data = json.loads(raw_response)
+            return NPCResponse(**data)
+        except json.JSONDecodeError:
+            return NPCResponse(content=raw_response, mood=0.5)
@@ -413,7 +413,7 @@ class BGEM3QdrantStore:
         query_emb = self.embedder.embed_query(query)
 
         # Prepare query vectors
-        from qdrant_client.models import SparseVector, NamedVector, Prefetch
+        from qdrant_client.models import SparseVector, Prefetch
 
         dense_vec = query_emb["dense"][0].tolist()
         sparse_dict = query_emb["sparse"][0]
@@ -439,10 +439,8 @@ class BGEM3QdrantStore:
                     limit=top_k * 2,
                 ),
             ],
-            query=NamedVector(
-                name="dense",
-                vector=dense_vec,
-            ),
+            query=dense_vec,
+            using="dense",
             limit=top_k,
         )
 
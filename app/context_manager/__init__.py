@@ -1,7 +1,9 @@
 """Context management engine for SalesBoost."""
 from app.context_manager.engine import ContextManagerEngine
+from app.context_manager.pipeline import ContextPipeline, ContextTurn
 
 
 context_manager = ContextManagerEngine()
+context_pipeline = ContextPipeline(context_manager)
 
-__all__ = ["ContextManagerEngine", "context_manager"]
+__all__ = ["ContextManagerEngine", "ContextPipeline", "ContextTurn", "context_manager", "context_pipeline"]
@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional
 from app.context_manager.compression import compress_history, StructuredFacts
 from app.context_manager.memory import ContextMemoryStore
 from app.context_manager.scoring import compute_importance_score
+from app.context_manager.pipeline import ContextTurn
 from app.context_manager.state_sync import SalesStateStream
 from app.context_manager.librarian import Librarian
 from app.schemas.blackboard import DecisionTrace, StateConfidence
@@ -18,7 +19,7 @@ from app.infra.llm.adapters import AdapterFactory
 from app.infra.gateway.schemas import ModelConfig
 from app.infra.events.schemas import MemoryEventPayload
 from app.services.memory_event_writer import record_event
-from core.redis import get_redis
+from core.redis import get_redis, InMemoryCache
 
 logger = logging.getLogger(__name__)
 
@@ -47,56 +48,89 @@ class ContextManagerEngine:
         npc_response: str,
         history_window: Optional[List[Dict[str, str]]] = None,
     ) -> Dict[str, Any]:
+        turn = ContextTurn(
+            turn_id=turn_id,
+            current_stage=current_stage,
+            previous_stage=previous_stage,
+            user_input=user_input,
+            npc_response=npc_response,
+            history_window=list(history_window) if history_window else [],
+        )
+        return await self.process_turns(session_id, user_id, tenant_id, [turn])
+
+    async def process_turns(
+        self,
+        session_id: str,
+        user_id: str,
+        tenant_id: str,
+        turns: List[ContextTurn],
+    ) -> Dict[str, Any]:
+        """
+        Fold one or more consecutive turns of a session into its context.
+
+        Coalesced turns share one scoring call, one compression call and one
+        state publish; the blackboard still records a DecisionTrace per turn.
+        Against Redis, the reads and the writes are each sent as a single
+        pipeline; a failed write pipeline is raised to the caller.
+        """
+        if not turns:
+            raise ValueError("process_turns requires at least one turn")
+        first, last = turns[0], turns[-1]
+        current_stage = last.current_stage
+        messages: List[Dict[str, str]] = []
+        for turn in turns:
+            messages.append({"role": "user", "content": turn.user_input})
+            messages.append({"role": "npc", "content": turn.npc_response})
+        history = list(first.history_window) + messages
+        user_input = "\n".join(turn.user_input for turn in turns)
+        npc_response = "\n".join(turn.npc_response for turn in turns)
+
         # Task 5: Distributed Lock (Requirement 6)
         redis = await get_redis()
         lock_key = f"lock:ctx:{session_id}"
         async with redis.lock(lock_key, timeout=10):
-            blackboard = await self.librarian.get_blackboard(session_id=session_id, user_id=user_id)
-            history = list(history_window) if history_window else []
-            history.append({"role": "user", "content": user_input})
-            history.append({"role": "npc", "content": npc_response})
-
-            await self.memory.append_s0(session_id, {"role": "user", "content": user_input})
-            await self.memory.append_s0(session_id, {"role": "npc", "content": npc_response})
+            pipelined = not isinstance(redis, InMemoryCache) and hasattr(redis, "pipeline")
+            if pipelined:
+                blackboard, s1_prev, s2, s0_buffer = await self._load_pipelined(redis, session_id, user_id)
+            else:
+                blackboard = await self.librarian.get_blackboard(session_id=session_id, user_id=user_id)
+                s1_prev = await self.memory.read_json(f"ctx:s1:{session_id}")
+                s2 = await self.memory.read_json(f"ctx:s2:{user_id}")
+                s0_buffer = []
 
             # Task 4: Load Previous Facts for Delta
             previous_facts = None
             try:
-                s1_prev = await self.memory.read_json(f"ctx:s1:{session_id}")
                 if s1_prev and "structured_facts" in s1_prev:
                     sf_data = s1_prev["structured_facts"]
                     previous_facts = StructuredFacts(**sf_data)
             except Exception:
                 pass
 
-            known_facts = []
-            try:
-                s2 = await self.memory.read_json(f"ctx:s2:{user_id}")
-                known_facts = list(s2.values()) if isinstance(s2, dict) else []
-            except Exception:
-                known_facts = []
+            known_facts = list(s2.values()) if isinstance(s2, dict) else []
 
             # Get adapter for operations
             adapter = AdapterFactory.get_adapter(self.default_model_config.provider)
-            
-            # Module 1: Importance Scoring
-            scores = await compute_importance_score(
-                user_input=user_input,
-                npc_response=npc_response,
-                current_stage=current_stage,
-                adapter=adapter,
-                model_config=self.default_model_config,
-                known_facts=known_facts,
-            )
 
-            # Module 2: 3-Channel Compression (Actionable Delta)
-            compression = await compress_history(
-                history=history,
-                current_stage=current_stage,
-                previous_stage=previous_stage,
-                adapter=adapter,
-                model_config=self.default_model_config,
-                previous_facts=previous_facts, # Requirement 4
+            # Module 1 (Importance Scoring) and Module 2 (3-Channel Compression,
+            # Actionable Delta) are independent LLM calls, so run them together
+            scores, compression = await asyncio.gather(
+                compute_importance_score(
+                    user_input=user_input,
+                    npc_response=npc_response,
+                    current_stage=current_stage,
+                    adapter=adapter,
+                    model_config=self.default_model_config,
+                    known_facts=known_facts,
+                ),
+                compress_history(
+                    history=history,
+                    current_stage=current_stage,
+                    previous_stage=first.previous_stage,
+                    adapter=adapter,
+                    model_config=self.default_model_config,
+                    previous_facts=previous_facts, # Requirement 4
+                ),
             )
 
             summary_payload = {
@@ -105,45 +139,46 @@ class ContextManagerEngine:
                 "narrative_summary": compression.narrative_summary,
             }
 
-            await self.memory.write_s1(session_id, summary_payload)
-
-            # Module 3 & 4: State Logic and Persistence
-            if scores.persistent:
-                if compression.structured_facts.client_profile:
-                    await self.memory.write_s2(user_id, compression.structured_facts.client_profile)
-                if compression.structured_facts.objection_state:
-                    await self.memory.write_s3(tenant_id, {"objection_patterns": compression.structured_facts.objection_state})
-
             # Compliance Block
             compliance_block = compression.compliance_hit or (scores.compliance_risk > 0.5)
 
+            blackboard_ok = True
             try:
-                await self.librarian.estimate_state(blackboard, user_input=user_input, npc_response=npc_response)
+                for turn in turns:
+                    await self.librarian.estimate_state(
+                        blackboard, user_input=turn.user_input, npc_response=turn.npc_response
+                    )
+                    blackboard.history.append(
+                        DecisionTrace(
+                            turn_number=turn.turn_id,
+                            intent_detected=blackboard.last_intent or "unknown",
+                            active_branch="context_manager",
+                            mentor_candidates_count=0,
+                            selected_strategy_id=None,
+                            auditor_action="BLOCK" if compliance_block else "PASS",
+                            reasoning=scores.reasoning if hasattr(scores, "reasoning") else "context update",
+                        )
+                    )
                 next_stage = compression.structured_facts.current_stage or current_stage
                 if next_stage and next_stage != blackboard.stage_estimate.current:
                     blackboard.stage_estimate.previous = blackboard.stage_estimate.current
                     blackboard.stage_estimate.current = next_stage
                     blackboard.stage_estimate.transition_timestamp = datetime.utcnow()
                 blackboard.stage_estimate.confidence = StateConfidence(value=0.7, method="compression")
-                blackboard.history.append(
-                    DecisionTrace(
-                        turn_number=turn_id,
-                        intent_detected=blackboard.last_intent or "unknown",
-                        active_branch="context_manager",
-                        mentor_candidates_count=0,
-                        selected_strategy_id=None,
-                        auditor_action="BLOCK" if compliance_block else "PASS",
-                        reasoning=scores.reasoning if hasattr(scores, "reasoning") else "context update",
-                    )
-                )
-                await self.librarian.save_blackboard(blackboard)
             except Exception as exc:
+                blackboard_ok = False
                 logger.warning("Failed to update blackboard: %s", exc)
 
+            if pipelined:
+                s0_buffer = (s0_buffer + messages)[-self.memory.max_s0:]
+            else:
+                for message in messages:
+                    s0_buffer = await self.memory.append_s0(session_id, message)
+
             # Task 4: Context Budget Control (Value-per-Token)
             # Requirement 7: Knapsack selection
             context_memory = self._assemble_context_knapsack(
-                s0_buffer=await self.memory.get_s0(session_id),
+                s0_buffer=s0_buffer,
                 s1_summary=summary_payload,
                 s2_profile_ref=f"ctx:s2:{user_id}",
                 token_limit=1000
@@ -151,7 +186,7 @@ class ContextManagerEngine:
 
             state = {
                 "session_id": session_id,
-                "turn_id": turn_id,
+                "turn_id": last.turn_id,
                 "sales_stage": {
                     "current": compression.structured_facts.current_stage or current_stage,
                     "status": "In_Progress",
@@ -167,10 +202,16 @@ class ContextManagerEngine:
                 },
             }
 
-            try:
-                await self.stream.publish(session_id, turn_id, state)
-            except Exception as exc:
-                logger.warning("Failed to publish sales state: %s", exc)
+            if pipelined:
+                await self._store_pipelined(
+                    redis, session_id, user_id, tenant_id, last.turn_id, messages,
+                    summary_payload, scores, compression, blackboard if blackboard_ok else None, state,
+                )
+            else:
+                await self._store_sequential(
+                    session_id, user_id, tenant_id, last.turn_id,
+                    summary_payload, scores, compression, blackboard if blackboard_ok else None, state,
+                )
 
             if scores.persistent and scores.final_score >= 0.75:
                 event_payload = MemoryEventPayload(
@@ -178,7 +219,7 @@ class ContextManagerEngine:
                     tenant_id=tenant_id,
                     user_id=user_id,
                     session_id=session_id,
-                    turn_index=turn_id,
+                    turn_index=last.turn_id,
                     speaker="system",
                     summary=compression.narrative_summary,
                     intent_top1=next(iter(compression.structured_facts.objection_state.keys())) if compression.structured_facts.objection_state else None,
@@ -200,6 +241,71 @@ class ContextManagerEngine:
                 "blackboard": blackboard,
             }
 
+    async def _load_pipelined(self, redis, session_id: str, user_id: str):
+        """Read blackboard, S1, S2 and S0 in one round trip."""
+        pipe = redis.pipeline(transaction=False)
+        pipe.get(self.librarian.blackboard_key(session_id))
+        pipe.get(f"ctx:s1:{session_id}")
+        pipe.get(f"ctx:s2:{user_id}")
+        pipe.lrange(self.memory.s0_key(session_id), 0, self.memory.max_s0 - 1)
+        try:
+            raw_blackboard, raw_s1, raw_s2, raw_s0 = await pipe.execute()
+        except Exception as exc:
+            logger.warning("Pipelined context read failed for session %s: %s", session_id, exc)
+            raw_blackboard, raw_s1, raw_s2, raw_s0 = None, None, None, []
+        return (
+            self.librarian.parse_blackboard(raw_blackboard, session_id, user_id),
+            self.memory.parse_json(raw_s1),
+            self.memory.parse_json(raw_s2),
+            self.memory.parse_s0(raw_s0),
+        )
+
+    async def _store_pipelined(
+        self, redis, session_id, user_id, tenant_id, turn_id, messages,
+        summary_payload, scores, compression, blackboard, state,
+    ) -> None:
+        """Write S0..S3, the blackboard and the published state in one round trip (raises on failure)."""
+        pipe = redis.pipeline(transaction=False)
+        self.memory.queue_append_s0(pipe, session_id, messages)
+        self.memory.queue_write_json(pipe, f"ctx:s1:{session_id}", summary_payload)
+        # Module 3 & 4: State Logic and Persistence
+        if scores.persistent:
+            if compression.structured_facts.client_profile and user_id:
+                self.memory.queue_write_json(pipe, f"ctx:s2:{user_id}", compression.structured_facts.client_profile)
+            if compression.structured_facts.objection_state and tenant_id:
+                self.memory.queue_write_json(
+                    pipe, f"ctx:s3:{tenant_id}", {"objection_patterns": compression.structured_facts.objection_state}
+                )
+        if blackboard is not None:
+            self.librarian.queue_save_blackboard(pipe, blackboard)
+        published = self.stream.queue_publish(pipe, session_id, turn_id, state)
+        # Propagate failures: this write is the only one carrying the batch's
+        # S0 messages, so the caller must see (and count) the loss
+        await pipe.execute()
+        if published:
+            self.stream.mark_published(session_id, turn_id)
+
+    async def _store_sequential(
+        self, session_id, user_id, tenant_id, turn_id,
+        summary_payload, scores, compression, blackboard, state,
+    ) -> None:
+        await self.memory.write_s1(session_id, summary_payload)
+
+        # Module 3 & 4: State Logic and Persistence
+        if scores.persistent:
+            if compression.structured_facts.client_profile:
+                await self.memory.write_s2(user_id, compression.structured_facts.client_profile)
+            if compression.structured_facts.objection_state:
+                await self.memory.write_s3(tenant_id, {"objection_patterns": compression.structured_facts.objection_state})
+
+        if blackboard is not None:
+            await self.librarian.save_blackboard(blackboard)
+
+        try:
+            await self.stream.publish(session_id, turn_id, state)
+        except Exception as exc:
+            logger.warning("Failed to publish sales state: %s", exc)
+
     async def _sync_persistent_memory(self, payload: MemoryEventPayload) -> None:
         try:
             await record_event(payload)
@@ -21,17 +21,27 @@ class Librarian:
     def __init__(self):
         self._redis_prefix = "blackboard:"
 
+    def blackboard_key(self, session_id: str) -> str:
+        return f"{self._redis_prefix}{session_id}"
+
     async def get_blackboard(self, session_id: str, user_id: str) -> BlackboardSchema:
         """获取或初始化黑板状态"""
         redis = await get_redis()
-        key = f"{self._redis_prefix}{session_id}"
+        key = self.blackboard_key(session_id)
         
+        raw = None
         try:
             if isinstance(redis, InMemoryCache):
                 raw = getattr(redis, "_store", {}).get(key)
             else:
                 raw = await redis.get(key)
-                
+        except Exception as e:
+            logger.warning(f"Failed to load blackboard for session {session_id}: {e}")
+        return self.parse_blackboard(raw, session_id, user_id)
+
+    def parse_blackboard(self, raw, session_id: str, user_id: str) -> BlackboardSchema:
+        """从Redis原始值解析黑板；为空或损坏时初始化新黑板"""
+        try:
             if raw:
                 data = json.loads(raw)
                 return BlackboardSchema(**data)
@@ -55,10 +65,22 @@ class Librarian:
             )
         )
 
+    def queue_save_blackboard(self, pipe, blackboard: BlackboardSchema) -> None:
+        """
+        将黑板写入与更新事件加入Redis pipeline。
+        调用方需持有会话级上下文锁（ContextManagerEngine），因此不再单独加黑板锁。
+        """
+        pipe.set(self.blackboard_key(blackboard.session_id), blackboard.model_dump_json())
+        pipe.xadd(
+            f"stream:blackboard_update:{blackboard.session_id}",
+            {"session_id": blackboard.session_id, "turn": str(blackboard.turn_count)},
+            maxlen=100,
+        )
+
     async def save_blackboard(self, blackboard: BlackboardSchema) -> None:
         """保存黑板状态到 Redis (原子性更新)"""
         redis = await get_redis()
-        key = f"{self._redis_prefix}{blackboard.session_id}"
+        key = self.blackboard_key(blackboard.session_id)
         lock_key = f"lock:{key}"
         
         try:
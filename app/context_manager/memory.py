@@ -26,8 +26,42 @@ class ContextMemoryStore:
         self._s0: Dict[str, List[Dict[str, str]]] = {}
         self._s0_script = None
 
+    @staticmethod
+    def s0_key(session_id: str) -> str:
+        return f"ctx:s0:{{{session_id}}}"
+
+    def queue_append_s0(self, pipe: Any, session_id: str, messages: List[Dict[str, str]]) -> None:
+        """Queue LPUSH + LTRIM of several messages (and the update event) on a Redis pipeline."""
+        key = self.s0_key(session_id)
+        pipe.lpush(key, *[json.dumps(message, ensure_ascii=True) for message in messages])
+        pipe.ltrim(key, 0, self.max_s0 - 1)
+        pipe.xadd(f"stream:ctx_update:{{{session_id}}}", {"session_id": session_id, "event": "s0_updated"}, maxlen=1000)
+
+    def queue_write_json(self, pipe: Any, key: str, payload: Dict[str, Any]) -> None:
+        pipe.set(key, json.dumps(payload, ensure_ascii=True))
+
+    @staticmethod
+    def parse_s0(raw_items: List[str]) -> List[Dict[str, str]]:
+        """Decode an LRANGE of the S0 list (newest first) into oldest-first messages."""
+        result: List[Dict[str, str]] = []
+        for item in reversed(raw_items or []):
+            try:
+                result.append(json.loads(item))
+            except Exception:
+                continue
+        return result
+
+    @staticmethod
+    def parse_json(raw: Any) -> Dict[str, Any]:
+        if not raw:
+            return {}
+        try:
+            return json.loads(raw)
+        except Exception:
+            return {}
+
     async def append_s0(self, session_id: str, message: Dict[str, str]) -> List[Dict[str, str]]:
-        key = f"ctx:s0:{{{session_id}}}"
+        key = self.s0_key(session_id)
         message_json = json.dumps(message, ensure_ascii=True)
 
         client = await get_redis()
@@ -60,19 +94,13 @@ class ContextMemoryStore:
         return await self.get_s0(session_id)
 
     async def get_s0(self, session_id: str) -> List[Dict[str, str]]:
-        key = f"ctx:s0:{{{session_id}}}"
+        key = self.s0_key(session_id)
         client = await get_redis()
         if isinstance(client, InMemoryCache):
             return self._s0.get(session_id, [])
         try:
             raw_items = await client.lrange(key, 0, self.max_s0 - 1)
-            result: List[Dict[str, str]] = []
-            for item in reversed(raw_items):
-                try:
-                    result.append(json.loads(item))
-                except Exception:
-                    continue
-            return result
+            return self.parse_s0(raw_items)
         except Exception as exc:
             logger.warning("Failed to read S0 from Redis: %s", exc)
             return self._s0.get(session_id, [])
@@ -96,12 +124,7 @@ class ContextMemoryStore:
             raw = getattr(client, "_store", {}).get(key)
         else:
             raw = await client.get(key)
-        if not raw:
-            return {}
-        try:
-            return json.loads(raw)
-        except Exception:
-            return {}
+        return self.parse_json(raw)
 
     async def _write_json(self, key: str, payload: Dict[str, Any]) -> None:
         client = await get_redis()
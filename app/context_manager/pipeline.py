@@ -0,0 +1,163 @@
+"""
+Background pipeline for context maintenance.
+
+ContextManagerEngine.process_turn (scoring, compression, blackboard and state
+sync) used to be awaited inside the WebSocket turn loop, so every reply waited
+on two extra LLM calls and a dozen Redis round trips. ContextPipeline takes
+that work off the critical path: turns are queued per session and processed
+in order by one worker per session. Turns that pile up while a worker is busy
+are coalesced into a single engine call.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ContextTurn:
+    """One completed turn waiting to be folded into the session context."""
+    turn_id: int
+    current_stage: Optional[str]
+    previous_stage: Optional[str]
+    user_input: str
+    npc_response: str
+    history_window: List[Dict[str, str]] = field(default_factory=list)
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+@dataclass
+class _SessionQueue:
+    user_id: str
+    tenant_id: str
+    turns: Deque[ContextTurn] = field(default_factory=deque)
+    worker: Optional[asyncio.Task] = None
+
+
+class ContextPipeline:
+    """
+    Per-session ordered work queue in front of ContextManagerEngine.
+
+    ``submit`` never blocks. Each session has at most one worker task, so its
+    turns reach the engine in submission order; up to ``max_coalesce`` queued
+    turns are handed over as one batch. ``max_concurrency`` bounds how many
+    sessions are processed at the same time.
+    """
+
+    def __init__(
+        self,
+        engine: Any,
+        max_coalesce: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+    ):
+        settings = get_settings()
+        self.engine = engine
+        self.max_coalesce = max(1, max_coalesce if max_coalesce is not None else settings.CONTEXT_PIPELINE_MAX_COALESCE)
+        self.max_concurrency = (
+            max_concurrency if max_concurrency is not None else settings.CONTEXT_PIPELINE_MAX_CONCURRENCY
+        )
+        self._sessions: Dict[str, _SessionQueue] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.stats = {"submitted": 0, "batches": 0, "coalesced": 0, "failed": 0}
+
+    @property
+    def depth(self) -> int:
+        return sum(len(queue.turns) for queue in self._sessions.values())
+
+    def submit(self, session_id: str, user_id: str, tenant_id: str, turn: ContextTurn) -> None:
+        """Queue a turn and make sure its session has a running worker."""
+        queue = self._sessions.get(session_id)
+        if queue is None:
+            queue = _SessionQueue(user_id=user_id, tenant_id=tenant_id)
+            self._sessions[session_id] = queue
+        queue.turns.append(turn)
+        self.stats["submitted"] += 1
+        self._update_depth()
+        if queue.worker is None or queue.worker.done():
+            queue.worker = asyncio.get_running_loop().create_task(self._drain_session(session_id, queue))
+
+    async def _drain_session(self, session_id: str, queue: _SessionQueue) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            while queue.turns:
+                async with self._semaphore:
+                    batch = [queue.turns.popleft() for _ in range(min(self.max_coalesce, len(queue.turns)))]
+                    self._update_depth()
+                    await self._process_batch(session_id, queue, batch)
+        finally:
+            if not queue.turns and self._sessions.get(session_id) is queue:
+                del self._sessions[session_id]
+
+    async def _process_batch(self, session_id: str, queue: _SessionQueue, batch: List[ContextTurn]) -> None:
+        started = time.monotonic()
+        lag = started - batch[0].enqueued_at
+        status = "success"
+        try:
+            await self.engine.process_turns(session_id, queue.user_id, queue.tenant_id, batch)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            # A failed update is not retried, so one bad batch cannot stall
+            # the session: its turns are missing from the context (S0 and
+            # summary) and later batches build on the last stored state
+            status = "error"
+            self.stats["failed"] += 1
+            logger.error(
+                f"[ContextPipeline] Context update failed for session {session_id} "
+                f"(turns {batch[0].turn_id}-{batch[-1].turn_id}): {exc}"
+            )
+        self.stats["batches"] += 1
+        self.stats["coalesced"] += len(batch) - 1
+        try:
+            from app.observability import context_metrics
+            context_metrics.record_context_batch(
+                lag_seconds=lag,
+                turns=len(batch),
+                status=status,
+                duration_seconds=time.monotonic() - started,
+            )
+        except Exception:
+            pass
+
+    def _update_depth(self) -> None:
+        try:
+            from app.observability import context_metrics
+            context_metrics.update_context_queue_depth(self.depth)
+        except Exception:
+            pass
+
+    async def drain(self, session_id: Optional[str] = None) -> None:
+        """Wait until the queued turns (of one session, or all) are processed."""
+        while True:
+            if session_id is not None:
+                queue = self._sessions.get(session_id)
+                workers = [queue.worker] if queue and queue.worker else []
+            else:
+                workers = [queue.worker for queue in self._sessions.values() if queue.worker]
+            workers = [worker for worker in workers if not worker.done()]
+            if not workers:
+                return
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Process what is queued, cancelling whatever is still running after ``timeout``."""
+        try:
+            await asyncio.wait_for(self.drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pending = self.depth
+            for queue in list(self._sessions.values()):
+                if queue.worker is not None:
+                    queue.worker.cancel()
+            self._sessions.clear()
+            self._update_depth()
+            logger.warning(f"[ContextPipeline] Stopped with {pending} turns unprocessed")
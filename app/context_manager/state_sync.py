@@ -35,6 +35,31 @@ class SalesStateStream:
         await self._write_latest(session_id, state, turn_id)
         return True
 
+    def queue_publish(self, pipe: Any, session_id: str, turn_id: int, state: Dict[str, Any]) -> bool:
+        """
+        Queue the stream entry and latest-state write on a Redis pipeline.
+
+        Returns False for a duplicate turn. Call ``mark_published`` once the
+        pipeline has executed.
+        """
+        if self._last_turn.get(session_id) == turn_id:
+            return False
+        payload = {
+            "session_id": session_id,
+            "turn_id": turn_id,
+            "timestamp": time.time(),
+            "state": state,
+        }
+        pipe.xadd(self.stream_name, {"data": json.dumps(payload, ensure_ascii=True)})
+        pipe.set(
+            f"sales_state:{session_id}",
+            json.dumps({"turn_id": turn_id, "state": state}, ensure_ascii=True),
+        )
+        return True
+
+    def mark_published(self, session_id: str, turn_id: int) -> None:
+        self._last_turn[session_id] = turn_id
+
     async def get_latest(self, session_id: str) -> Dict[str, Any]:
         client = await get_redis()
         key = f"sales_state:{session_id}"
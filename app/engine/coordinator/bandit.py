@@ -1,14 +1,23 @@
 import random
 import time
 import uuid
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from app.engine.coordinator.bandit_decisions import DecisionLog, DecisionRecord
 
 
 class SimpleContextualBandit:
-    def __init__(self, epsilon: float = 0.1) -> None:
+    def __init__(
+        self,
+        epsilon: float = 0.1,
+        decision_capacity: int = 10000,
+        decision_ttl: Optional[float] = 1800.0,
+    ) -> None:
         self.epsilon = max(0.0, min(1.0, epsilon))
         self._stats: Dict[str, Dict[str, float]] = {}
-        self._decisions: Dict[str, Dict[str, Any]] = {}
+        self.decision_log = DecisionLog(capacity=decision_capacity, ttl_seconds=decision_ttl)
+        # Set by DecisionFeedbackUpdater to batch feedback instead of applying inline
+        self.feedback_updater = None
 
     def choose(self, context: Dict[str, Any], candidates: Iterable[str]) -> Dict[str, Any]:
         arms = [c for c in candidates if isinstance(c, str)]
@@ -30,11 +39,10 @@ class SimpleContextualBandit:
             chosen, score = scored[0]
 
         decision_id = uuid.uuid4().hex
-        self._decisions[decision_id] = {
-            "chosen": chosen,
-            "context": context,
-            "timestamp": time.time(),
-        }
+        timestamp = time.time()
+        self.decision_log.put(decision_id, chosen, timestamp=timestamp)
+        if self.feedback_updater is not None:
+            self.feedback_updater.decision_made(DecisionRecord(decision_id, chosen, timestamp))
         return {
             "decision_id": decision_id,
             "chosen": chosen,
@@ -43,18 +51,29 @@ class SimpleContextualBandit:
         }
 
     def record_feedback(self, decision_id: str, reward: float, signals: Optional[Dict[str, float]] = None) -> bool:
-        decision = self._decisions.pop(decision_id, None)
+        if self.feedback_updater is not None:
+            self.feedback_updater.feedback_received(decision_id, reward)
+            return True
+        decision = self.decision_log.pop(decision_id)
         if not decision:
             return False
-        chosen = decision["chosen"]
-        stats = self._stats.setdefault(chosen, {"count": 0.0, "value": 0.0})
-        count = stats["count"]
-        value = stats["value"]
-        new_value = (value * count + reward) / (count + 1.0)
-        stats["count"] = count + 1.0
-        stats["value"] = new_value
+        self.apply_feedback([decision], [reward])
         return True
 
+    def apply_feedback(self, records: List[DecisionRecord], rewards: Sequence[float]) -> None:
+        # Aggregate per arm, then one running-mean update per arm
+        totals: Dict[str, List[float]] = {}
+        for record, reward in zip(records, rewards):
+            total = totals.setdefault(record.chosen, [0.0, 0.0])
+            total[0] += 1.0
+            total[1] += float(reward)
+        for chosen, (n, reward_sum) in totals.items():
+            stats = self._stats.setdefault(chosen, {"count": 0.0, "value": 0.0})
+            count = stats["count"]
+            value = stats["value"]
+            stats["count"] = count + n
+            stats["value"] = (value * count + reward_sum) / (count + n)
+
     def get_stats(self) -> Dict[str, Dict[str, float]]:
         return {k: dict(v) for k, v in self._stats.items()}
 
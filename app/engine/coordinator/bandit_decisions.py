@@ -0,0 +1,490 @@
+"""
+Decision log and delayed-feedback joins for routing bandits.
+
+Most routing decisions never receive feedback, so bandits cannot keep every
+decision until it does. This module provides:
+
+- DecisionLog: fixed-capacity ring buffer of decisions (arm code, timestamp,
+  optional context vector) stored in preallocated numpy arrays, with a TTL.
+  The oldest decision is overwritten once the log is full.
+- DecisionSpill: shared transport so feedback can be joined on a different
+  worker than the one that made the decision (Redis Streams or local disk).
+- DecisionFeedbackUpdater: buffers decisions and feedback, exchanges them
+  through the spill, joins feedback to decisions and applies each batch to
+  the bandit in one ``apply_feedback`` call.
+
+Bandits using the log implement ``apply_feedback(records, rewards)``.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+Feedback = Tuple[str, float]
+
+
+@dataclass
+class DecisionRecord:
+    """A routing decision awaiting feedback."""
+
+    decision_id: str
+    chosen: str
+    timestamp: float
+    context_vector: Optional[np.ndarray] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data: Dict[str, Any] = {
+            "decision_id": self.decision_id,
+            "chosen": self.chosen,
+            "timestamp": self.timestamp,
+        }
+        if self.context_vector is not None:
+            data["context_vector"] = [float(v) for v in np.ravel(self.context_vector)]
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "DecisionRecord":
+        vector = data.get("context_vector")
+        return cls(
+            decision_id=str(data["decision_id"]),
+            chosen=str(data["chosen"]),
+            timestamp=float(data["timestamp"]),
+            context_vector=np.asarray(vector, dtype=np.float64).reshape(-1, 1) if vector is not None else None,
+        )
+
+
+class DecisionLog:
+    """
+    Bounded, expiring decision store backed by preallocated arrays.
+
+    Decisions are written in time order into a ring buffer, so the slot
+    after the write cursor always holds the oldest decision. Expired
+    decisions are treated as absent and purged lazily.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        ttl_seconds: Optional[float] = 1800.0,
+        vector_dim: Optional[int] = None,
+    ):
+        """
+        Initialize decision log.
+
+        Args:
+            capacity: Maximum number of decisions held
+            ttl_seconds: Decision lifetime in seconds (None = no expiry)
+            vector_dim: Context vector dimension (None = no vectors stored)
+        """
+        self.capacity = max(1, capacity)
+        self.ttl_seconds = ttl_seconds
+        self.vector_dim = vector_dim
+
+        self._ids: List[Optional[str]] = [None] * self.capacity
+        self._timestamps = np.zeros(self.capacity, dtype=np.float64)
+        self._arm_codes = np.full(self.capacity, -1, dtype=np.int32)
+        self._vectors = (
+            np.zeros((self.capacity, vector_dim), dtype=np.float32)
+            if vector_dim else None
+        )
+        self._arm_names: List[str] = []
+        self._arm_lookup: Dict[str, int] = {}
+        self._index: Dict[str, int] = {}
+        self._cursor = 0
+
+        self.evicted = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, decision_id: str) -> bool:
+        return decision_id in self._index
+
+    def put(
+        self,
+        decision_id: str,
+        chosen: str,
+        context_vector: Optional[np.ndarray] = None,
+        timestamp: Optional[float] = None,
+    ) -> None:
+        """Record a decision, overwriting the oldest one when full."""
+        if decision_id in self._index:
+            return
+
+        slot = self._cursor
+        old_id = self._ids[slot]
+        if old_id is not None:
+            del self._index[old_id]
+            self.evicted += 1
+
+        code = self._arm_lookup.get(chosen)
+        if code is None:
+            code = len(self._arm_names)
+            self._arm_names.append(chosen)
+            self._arm_lookup[chosen] = code
+
+        self._ids[slot] = decision_id
+        self._timestamps[slot] = time.time() if timestamp is None else timestamp
+        self._arm_codes[slot] = code
+        if self._vectors is not None and context_vector is not None:
+            self._vectors[slot] = np.ravel(context_vector)
+        self._index[decision_id] = slot
+        self._cursor = (slot + 1) % self.capacity
+
+    def pop(self, decision_id: str, now: Optional[float] = None) -> Optional[DecisionRecord]:
+        """Remove and return a decision, or None if unknown or expired."""
+        slot = self._index.pop(decision_id, None)
+        if slot is None:
+            return None
+
+        self._ids[slot] = None
+        timestamp = float(self._timestamps[slot])
+        if self._is_expired(timestamp, now):
+            self.expired += 1
+            return None
+
+        vector = None
+        if self._vectors is not None:
+            vector = self._vectors[slot].astype(np.float64).reshape(-1, 1)
+        return DecisionRecord(
+            decision_id=decision_id,
+            chosen=self._arm_names[self._arm_codes[slot]],
+            timestamp=timestamp,
+            context_vector=vector,
+        )
+
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop expired decisions, oldest first. Returns the number dropped."""
+        if self.ttl_seconds is None:
+            return 0
+
+        purged = 0
+        for step in range(self.capacity):
+            slot = (self._cursor + step) % self.capacity
+            decision_id = self._ids[slot]
+            if decision_id is None:
+                continue
+            if not self._is_expired(float(self._timestamps[slot]), now):
+                break
+            del self._index[decision_id]
+            self._ids[slot] = None
+            purged += 1
+
+        self.expired += purged
+        return purged
+
+    def _is_expired(self, timestamp: float, now: Optional[float]) -> bool:
+        if self.ttl_seconds is None:
+            return False
+        return (time.time() if now is None else now) - timestamp > self.ttl_seconds
+
+
+class DecisionSpill(ABC):
+    """Shared decision/feedback transport between workers."""
+
+    @abstractmethod
+    async def publish(self, decisions: List[DecisionRecord], feedback: List[Feedback]) -> None:
+        """Append local decisions and feedback to the shared log."""
+
+    @abstractmethod
+    async def poll(self) -> Tuple[List[DecisionRecord], List[Feedback]]:
+        """Return decisions and feedback appended since the last poll (all workers)."""
+
+
+class RedisStreamDecisionSpill(DecisionSpill):
+    """
+    Redis Streams spill: ``{prefix}:decisions`` and ``{prefix}:feedback``.
+
+    Streams are capped with approximate MAXLEN trimming. Each reader starts
+    ``ttl_seconds`` back in time, so decisions still eligible for feedback
+    are picked up by newly started workers.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        stream_prefix: str = "bandit",
+        maxlen: int = 100000,
+        ttl_seconds: float = 1800.0,
+        read_count: int = 1000,
+    ):
+        """
+        Initialize Redis Streams spill.
+
+        Args:
+            redis_client: redis.asyncio client
+            stream_prefix: Stream key prefix
+            maxlen: Approximate maximum entries per stream
+            ttl_seconds: How far back a new reader starts
+            read_count: Maximum entries read per stream per poll
+        """
+        self.redis = redis_client
+        self.decisions_key = f"{stream_prefix}:decisions"
+        self.feedback_key = f"{stream_prefix}:feedback"
+        self.maxlen = maxlen
+        self.read_count = read_count
+        start = f"{int((time.time() - ttl_seconds) * 1000)}-0"
+        self._last_ids = {self.decisions_key: start, self.feedback_key: start}
+
+    async def publish(self, decisions: List[DecisionRecord], feedback: List[Feedback]) -> None:
+        if not decisions and not feedback:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        for record in decisions:
+            pipe.xadd(
+                self.decisions_key,
+                {"data": json.dumps(record.to_dict())},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        for decision_id, reward in feedback:
+            pipe.xadd(
+                self.feedback_key,
+                {"decision_id": decision_id, "reward": repr(float(reward))},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        await pipe.execute()
+
+    async def poll(self) -> Tuple[List[DecisionRecord], List[Feedback]]:
+        response = await self.redis.xread(self._last_ids, count=self.read_count)
+        decisions: List[DecisionRecord] = []
+        feedback: List[Feedback] = []
+        for stream, entries in response or []:
+            key = stream.decode() if isinstance(stream, bytes) else stream
+            for entry_id, fields in entries:
+                self._last_ids[key] = entry_id.decode() if isinstance(entry_id, bytes) else entry_id
+                fields = {
+                    (k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+                    for k, v in fields.items()
+                }
+                if key == self.decisions_key:
+                    decisions.append(DecisionRecord.from_dict(json.loads(fields["data"])))
+                else:
+                    feedback.append((fields["decision_id"], float(fields["reward"])))
+        return decisions, feedback
+
+
+class FileDecisionSpill(DecisionSpill):
+    """
+    Local-disk spill: JSON lines appended to ``decisions.jsonl`` and
+    ``feedback.jsonl`` in a directory shared by workers on one host.
+
+    Each batch is written with a single append; readers start at the
+    current end of both files and only consume complete lines.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.decisions_path = os.path.join(directory, "decisions.jsonl")
+        self.feedback_path = os.path.join(directory, "feedback.jsonl")
+        self._offsets = {
+            path: (os.path.getsize(path) if os.path.exists(path) else 0)
+            for path in (self.decisions_path, self.feedback_path)
+        }
+
+    async def publish(self, decisions: List[DecisionRecord], feedback: List[Feedback]) -> None:
+        await asyncio.to_thread(self._publish_sync, decisions, feedback)
+
+    async def poll(self) -> Tuple[List[DecisionRecord], List[Feedback]]:
+        return await asyncio.to_thread(self._poll_sync)
+
+    def _publish_sync(self, decisions: List[DecisionRecord], feedback: List[Feedback]) -> None:
+        if decisions:
+            self._append(self.decisions_path, [record.to_dict() for record in decisions])
+        if feedback:
+            self._append(
+                self.feedback_path,
+                [{"decision_id": decision_id, "reward": reward} for decision_id, reward in feedback],
+            )
+
+    def _poll_sync(self) -> Tuple[List[DecisionRecord], List[Feedback]]:
+        decisions = [DecisionRecord.from_dict(row) for row in self._read_new(self.decisions_path)]
+        feedback = [(row["decision_id"], float(row["reward"])) for row in self._read_new(self.feedback_path)]
+        return decisions, feedback
+
+    @staticmethod
+    def _append(path: str, rows: List[Dict[str, Any]]) -> None:
+        payload = "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+        finally:
+            os.close(fd)
+
+    def _read_new(self, path: str) -> List[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            f.seek(self._offsets[path])
+            data = f.read()
+        end = data.rfind(b"\n")
+        if end < 0:
+            return []
+        self._offsets[path] += end + 1
+        return [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+
+
+class DecisionFeedbackUpdater:
+    """
+    Periodic batch updater joining delayed feedback to logged decisions.
+
+    Once attached, the bandit hands decisions and feedback to the updater
+    instead of updating its model inline. Every ``interval_seconds`` the
+    updater publishes them to the spill (if any), pulls decisions and
+    feedback from other workers, joins feedback against the bandit's
+    DecisionLog and applies all matches in one ``apply_feedback`` call.
+    Feedback whose decision has not arrived yet is retried until
+    ``feedback_ttl_seconds``. A flush that fails keeps its decisions and
+    feedback for the next one.
+    """
+
+    def __init__(
+        self,
+        bandit: Any,
+        spill: Optional[DecisionSpill] = None,
+        interval_seconds: float = 1.0,
+        feedback_ttl_seconds: float = 60.0,
+        max_pending: int = 10000,
+    ):
+        """
+        Initialize feedback updater and attach it to ``bandit``.
+
+        Args:
+            bandit: Bandit exposing ``decision_log`` and ``apply_feedback``
+            spill: Shared transport for cross-worker joins (None = local only)
+            interval_seconds: Flush interval of the background task
+            feedback_ttl_seconds: How long unmatched feedback is retried
+            max_pending: Cap on buffered feedback awaiting its decision
+        """
+        self.bandit = bandit
+        self.spill = spill
+        self.interval_seconds = interval_seconds
+        self.feedback_ttl_seconds = feedback_ttl_seconds
+        self.max_pending = max_pending
+
+        self._new_decisions: List[DecisionRecord] = []
+        self._new_feedback: List[Feedback] = []
+        # decision_id -> (reward, first seen)
+        self._unmatched: Dict[str, Tuple[float, float]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+        self.applied = 0
+        self.dropped = 0
+
+        bandit.feedback_updater = self
+
+    def decision_made(self, record: DecisionRecord) -> None:
+        """Called by the bandit after logging a decision."""
+        if self.spill is not None:
+            self._new_decisions.append(record)
+        self.ensure_started()
+
+    def feedback_received(self, decision_id: str, reward: float) -> None:
+        """Queue feedback for the next flush."""
+        self._new_feedback.append((decision_id, float(reward)))
+        self.ensure_started()
+
+    async def flush(self) -> int:
+        """Exchange with the spill, join and apply. Returns feedback applied."""
+        async with self._flush_lock:
+            decisions, feedback = self._new_decisions, self._new_feedback
+            self._new_decisions, self._new_feedback = [], []
+
+            if self.spill is not None:
+                try:
+                    await self.spill.publish(decisions, feedback)
+                except Exception:
+                    # Re-queue ahead of anything buffered meanwhile
+                    self._new_decisions[:0] = decisions
+                    self._new_feedback[:0] = feedback
+                    raise
+                # Once published, a failed poll loses nothing: the entries
+                # stay in the spill and are read by the next poll
+                remote_decisions, feedback = await self.spill.poll()
+                log = self.bandit.decision_log
+                for record in remote_decisions:
+                    log.put(record.decision_id, record.chosen, record.context_vector, record.timestamp)
+
+            now = time.time()
+            for decision_id, reward in feedback:
+                self._unmatched.setdefault(decision_id, (reward, now))
+
+            records: List[DecisionRecord] = []
+            rewards: List[float] = []
+            seen_at: List[float] = []
+            for decision_id, (reward, seen) in list(self._unmatched.items()):
+                record = self.bandit.decision_log.pop(decision_id, now)
+                if record is not None:
+                    records.append(record)
+                    rewards.append(reward)
+                    seen_at.append(seen)
+                    del self._unmatched[decision_id]
+                elif now - seen > self.feedback_ttl_seconds:
+                    del self._unmatched[decision_id]
+                    self.dropped += 1
+
+            while len(self._unmatched) > self.max_pending:
+                self._unmatched.pop(next(iter(self._unmatched)))
+                self.dropped += 1
+
+            self.bandit.decision_log.purge_expired(now)
+
+            if records:
+                try:
+                    result = self.bandit.apply_feedback(records, rewards)
+                    if inspect.isawaitable(result):
+                        await result
+                except Exception:
+                    # Return the joined pairs so the next flush applies them
+                    log = self.bandit.decision_log
+                    for record, reward, seen in zip(records, rewards, seen_at):
+                        log.put(record.decision_id, record.chosen, record.context_vector, record.timestamp)
+                        self._unmatched[record.decision_id] = (reward, seen)
+                    raise
+                self.applied += len(records)
+            return len(records)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[DecisionFeedbackUpdater] Flush failed: {e}")
+
+    def ensure_started(self) -> None:
+        """Start the background flush task if an event loop is running."""
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._task = loop.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Cancel the background task and flush what is buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
@@ -5,9 +5,11 @@ Advanced bandit algorithm that uses context features to make decisions
 import numpy as np
 import time
 import uuid
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 import logging
 
+from app.engine.coordinator.bandit_decisions import DecisionLog, DecisionRecord
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,7 +51,9 @@ class LinUCBBandit:
         arms: List[str],
         context_dim: int = 10,
         alpha: float = 0.5,
-        lambda_: float = 1.0
+        lambda_: float = 1.0,
+        decision_capacity: int = 10000,
+        decision_ttl: Optional[float] = 1800.0
     ):
         """
         Initialize LinUCB bandit
@@ -59,26 +63,36 @@ class LinUCBBandit:
             context_dim: Dimension of context feature vector
             alpha: Exploration parameter (higher = more exploration)
             lambda_: Regularization parameter
+            decision_capacity: Maximum decisions kept awaiting feedback
+            decision_ttl: Seconds a decision stays eligible for feedback
         """
         self.arms = arms
         self.context_dim = context_dim
         self.alpha = alpha
         self.lambda_ = lambda_
 
-        # Initialize parameters for each arm
+        # Initialize parameters for each arm, stacked so all arms score in
+        # one batched operation. _A and _b are per-arm views into the stacks.
         # A: design matrix (d x d)
         # b: response vector (d x 1)
-        self._A = {
-            arm: np.identity(context_dim) * lambda_
-            for arm in arms
-        }
-        self._b = {
-            arm: np.zeros((context_dim, 1))
-            for arm in arms
-        }
+        # A_inv / theta are maintained incrementally (Sherman-Morrison)
+        n_arms = len(arms)
+        self._arm_index = {arm: i for i, arm in enumerate(arms)}
+        self._A_all = np.tile(np.identity(context_dim) * lambda_, (n_arms, 1, 1))
+        self._b_all = np.zeros((n_arms, context_dim, 1))
+        self._A_inv = np.tile(np.identity(context_dim) / lambda_, (n_arms, 1, 1))
+        self._theta = np.zeros((n_arms, context_dim))
+        self._A = {arm: self._A_all[i] for arm, i in self._arm_index.items()}
+        self._b = {arm: self._b_all[i] for arm, i in self._arm_index.items()}
 
         # Decision tracking
-        self._decisions: Dict[str, Dict[str, Any]] = {}
+        self.decision_log = DecisionLog(
+            capacity=decision_capacity,
+            ttl_seconds=decision_ttl,
+            vector_dim=context_dim
+        )
+        # Set by DecisionFeedbackUpdater to batch feedback instead of applying inline
+        self.feedback_updater = None
 
         # Statistics
         self._arm_pulls = {arm: 0 for arm in arms}
@@ -99,73 +113,90 @@ class LinUCBBandit:
         Returns:
             Decision dictionary with chosen arm and metadata
         """
+        return self.choose_many([context], candidates)[0]
+
+    def choose_many(
+        self,
+        contexts: List[Dict[str, Any]],
+        candidates: Optional[Iterable[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Choose an arm for each of several contexts (e.g. concurrent sessions)
+
+        All contexts are scored against all candidate arms in one batched
+        operation; each decision is recorded as if made by ``choose``.
+
+        Args:
+            contexts: Context dictionaries, one per decision
+            candidates: Optional subset of arms to consider
+
+        Returns:
+            Decision dictionaries, in the order of ``contexts``
+        """
+        if not contexts:
+            return []
+
         # Filter candidates
         if candidates:
-            valid_arms = [arm for arm in candidates if arm in self.arms]
+            valid_arms = [arm for arm in candidates if arm in self._arm_index]
         else:
             valid_arms = self.arms
 
         if not valid_arms:
             logger.warning("[LinUCB] No valid arms, defaulting to first arm")
-            return {
-                "decision_id": uuid.uuid4().hex,
-                "chosen": self.arms[0],
-                "score": 0.0,
-                "ucb": 0.0,
-                "exploration": True
-            }
-
-        # Convert context to feature vector
-        context_vector = self._context_to_features(context)
-
-        # Compute UCB for each arm
-        ucb_scores = {}
-        theta_estimates = {}
-
-        for arm in valid_arms:
-            A_inv = np.linalg.inv(self._A[arm])
-            theta = A_inv @ self._b[arm]  # Parameter estimate
-
-            # Expected reward
-            expected_reward = (theta.T @ context_vector)[0, 0]
-
-            # Confidence bound
-            confidence = self.alpha * np.sqrt(
-                (context_vector.T @ A_inv @ context_vector)[0, 0]
-            )
-
-            # UCB score
-            ucb = expected_reward + confidence
-
-            ucb_scores[arm] = ucb
-            theta_estimates[arm] = expected_reward
-
-        # Choose arm with highest UCB
-        chosen_arm = max(ucb_scores, key=ucb_scores.get)
-        chosen_ucb = ucb_scores[chosen_arm]
-        chosen_expected = theta_estimates[chosen_arm]
-
-        # Record decision
-        decision_id = uuid.uuid4().hex
-        self._decisions[decision_id] = {
-            "chosen": chosen_arm,
-            "context": context,
-            "context_vector": context_vector,
-            "timestamp": time.time(),
-            "ucb_scores": ucb_scores
-        }
-
-        # Update statistics
-        self._arm_pulls[chosen_arm] += 1
-
-        return {
-            "decision_id": decision_id,
-            "chosen": chosen_arm,
-            "score": float(chosen_expected),
-            "ucb": float(chosen_ucb),
-            "exploration": chosen_ucb > chosen_expected + 0.01,  # Exploring if UCB significantly higher
-            "all_scores": {arm: float(score) for arm, score in ucb_scores.items()}
-        }
+            return [
+                {
+                    "decision_id": uuid.uuid4().hex,
+                    "chosen": self.arms[0],
+                    "score": 0.0,
+                    "ucb": 0.0,
+                    "exploration": True
+                }
+                for _ in contexts
+            ]
+
+        # Convert contexts to a feature matrix (n x d)
+        context_vectors = [self._context_to_features(context) for context in contexts]
+        X = np.hstack(context_vectors).T
+
+        # Expected reward and confidence bound for every (context, arm) pair
+        idx = np.array([self._arm_index[arm] for arm in valid_arms])
+        A_inv = self._A_inv[idx]
+        expected = X @ self._theta[idx].T
+        variance = np.einsum("nd,kde,ne->nk", X, A_inv, X)
+        ucb = expected + self.alpha * np.sqrt(np.maximum(variance, 0.0))
+
+        decisions = []
+        for row, context in enumerate(contexts):
+            # Choose arm with highest UCB
+            best = int(np.argmax(ucb[row]))
+            chosen_arm = valid_arms[best]
+            chosen_ucb = float(ucb[row, best])
+            chosen_expected = float(expected[row, best])
+            ucb_scores = {arm: float(score) for arm, score in zip(valid_arms, ucb[row])}
+
+            # Record decision
+            decision_id = uuid.uuid4().hex
+            timestamp = time.time()
+            self.decision_log.put(decision_id, chosen_arm, context_vectors[row], timestamp)
+            if self.feedback_updater is not None:
+                self.feedback_updater.decision_made(
+                    DecisionRecord(decision_id, chosen_arm, timestamp, context_vectors[row])
+                )
+
+            # Update statistics
+            self._arm_pulls[chosen_arm] += 1
+
+            decisions.append({
+                "decision_id": decision_id,
+                "chosen": chosen_arm,
+                "score": chosen_expected,
+                "ucb": chosen_ucb,
+                "exploration": chosen_ucb > chosen_expected + 0.01,  # Exploring if UCB significantly higher
+                "all_scores": ucb_scores
+            })
+
+        return decisions
 
     def record_feedback(
         self,
@@ -184,18 +215,29 @@ class LinUCBBandit:
         Returns:
             True if feedback was recorded
         """
-        decision = self._decisions.pop(decision_id, None)
+        if self.feedback_updater is not None:
+            self.feedback_updater.feedback_received(decision_id, reward)
+            return True
+
+        decision = self.decision_log.pop(decision_id)
         if not decision:
-            logger.warning(f"[LinUCB] Decision {decision_id} not found")
+            logger.warning(f"[LinUCB] Decision {decision_id} not found or expired")
             return False
 
-        chosen_arm = decision["chosen"]
-        context_vector = decision["context_vector"]
+        chosen_arm = decision.chosen
+        context_vector = decision.context_vector
 
         # Update parameters
         self._A[chosen_arm] += context_vector @ context_vector.T
         self._b[chosen_arm] += reward * context_vector
 
+        # Rank-one Sherman-Morrison update of A^-1, then theta = A^-1 b
+        i = self._arm_index[chosen_arm]
+        x = context_vector[:, 0]
+        A_inv_x = self._A_inv[i] @ x
+        self._A_inv[i] -= np.outer(A_inv_x, A_inv_x) / (1.0 + x @ A_inv_x)
+        self._theta[i] = self._A_inv[i] @ self._b_all[i, :, 0]
+
         # Update statistics
         self._arm_rewards[chosen_arm] += reward
 
@@ -206,6 +248,44 @@ class LinUCBBandit:
 
         return True
 
+    def apply_feedback(
+        self,
+        records: List[DecisionRecord],
+        rewards: Sequence[float]
+    ) -> None:
+        """
+        Apply a batch of joined feedback in one vectorized step
+
+        Accumulates x x^T and r x into every touched arm at once, then
+        re-inverts only the touched arms with one stacked inverse (which
+        also resets any drift from incremental updates).
+
+        Args:
+            records: Decisions the feedback belongs to
+            rewards: Reward per decision
+        """
+        known = [
+            (self._arm_index[record.chosen], record.context_vector[:, 0], float(reward))
+            for record, reward in zip(records, rewards)
+            if record.chosen in self._arm_index and record.context_vector is not None
+        ]
+        if not known:
+            return
+
+        arm_idx = np.array([i for i, _, _ in known])
+        X = np.stack([x for _, x, _ in known])
+        r = np.array([reward for _, _, reward in known])
+
+        np.add.at(self._A_all, arm_idx, X[:, :, None] * X[:, None, :])
+        np.add.at(self._b_all, arm_idx, (r[:, None] * X)[:, :, None])
+
+        touched = np.unique(arm_idx)
+        self._A_inv[touched] = np.linalg.inv(self._A_all[touched])
+        self._theta[touched] = (self._A_inv[touched] @ self._b_all[touched])[:, :, 0]
+
+        for i, _, reward in known:
+            self._arm_rewards[self.arms[i]] += reward
+
     def _context_to_features(self, context: Dict[str, Any]) -> np.ndarray:
         """
         Convert context dictionary to feature vector
@@ -277,9 +357,7 @@ class LinUCBBandit:
             total_reward = self._arm_rewards[arm]
             avg_reward = total_reward / pulls if pulls > 0 else 0.0
 
-            # Get theta estimate
-            A_inv = np.linalg.inv(self._A[arm])
-            theta = A_inv @ self._b[arm]
+            theta = self._theta[self._arm_index[arm]]
 
             stats[arm] = {
                 "pulls": pulls,
@@ -295,9 +373,7 @@ class LinUCBBandit:
         if arm not in self.arms:
             return None
 
-        A_inv = np.linalg.inv(self._A[arm])
-        theta = A_inv @ self._b[arm]
-        return theta
+        return self._theta[self._arm_index[arm]].reshape(-1, 1).copy()
 
 
 class HybridLinUCBBandit(LinUCBBandit):
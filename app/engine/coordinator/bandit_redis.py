@@ -1,20 +1,75 @@
+import asyncio
+import logging
 import random
+import time
 import uuid
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from app.engine.coordinator.bandit_decisions import (
+    DecisionFeedbackUpdater,
+    DecisionLog,
+    DecisionRecord,
+    RedisStreamDecisionSpill,
+)
 
 try:
-    import redis  # type: ignore
+    import redis.asyncio as aioredis  # type: ignore
 except Exception:  # pragma: no cover - optional dependency
-    redis = None
+    aioredis = None
+
+logger = logging.getLogger(__name__)
 
 
 class RedisContextualBandit:
-    def __init__(self, redis_url: str, epsilon: float = 0.1, key_prefix: str = "bandit") -> None:
-        if redis is None:
+    """
+    Epsilon-greedy bandit whose arm statistics live in Redis.
+
+    Decisions and feedback travel through Redis Streams, so feedback can be
+    joined on any worker. Every worker's background updater joins every
+    feedback event; a per-decision SET NX claim makes sure only one of them
+    counts it. Counts are applied in batches (HINCRBYFLOAT per arm in one
+    MULTI/EXEC); if that fails the batch's claims are released so the
+    re-queued feedback is counted on retry. The locally cached scores are
+    then refreshed; ``choose`` does no I/O.
+    An arm seen for the first time is loaded from Redis in the background.
+
+    Arm hashes hold ``{count, total}``. Hashes written by the previous
+    layout hold ``{count, value}`` (value = mean reward); they are read as
+    such and get ``total = value * count`` before this worker first
+    increments them.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        epsilon: float = 0.1,
+        key_prefix: str = "bandit",
+        decision_capacity: int = 10000,
+        decision_ttl: float = 1800.0,
+        flush_interval: float = 1.0,
+    ) -> None:
+        if aioredis is None:
             raise RuntimeError("redis is required for RedisContextualBandit")
-        self._client = redis.Redis.from_url(redis_url, decode_responses=True)
+        self._client = aioredis.Redis.from_url(redis_url, decode_responses=True)
         self._epsilon = max(0.0, min(1.0, epsilon))
         self._key_prefix = key_prefix
+        self._decision_ttl = decision_ttl
+        self._scores: Dict[str, float] = {}
+        self._loaded: set = set()
+        self._loading: set = set()
+        self._tasks: set = set()
+        self.decision_log = DecisionLog(capacity=decision_capacity, ttl_seconds=decision_ttl)
+        self.feedback_updater: Optional[DecisionFeedbackUpdater] = None
+        DecisionFeedbackUpdater(
+            self,
+            spill=RedisStreamDecisionSpill(
+                self._client,
+                stream_prefix=key_prefix,
+                maxlen=decision_capacity * 10,
+                ttl_seconds=decision_ttl,
+            ),
+            interval_seconds=flush_interval,
+        )
 
     def choose(self, context: Dict[str, Any], candidates: Iterable[str]) -> Dict[str, Any]:
         arms = [c for c in candidates if isinstance(c, str)]
@@ -26,12 +81,13 @@ class RedisContextualBandit:
                 "exploration": True,
             }
 
+        self._ensure_loaded(arms)
         exploration = random.random() < self._epsilon
         if exploration:
             best_arm = random.choice(arms)
             best_score = self._get_score(best_arm)
         else:
-            # Redis-backed scoring (simple mean reward per arm)
+            # Cached Redis scores (simple mean reward per arm)
             best_arm = arms[0]
             best_score = self._get_score(best_arm)
             for arm in arms[1:]:
@@ -41,6 +97,9 @@ class RedisContextualBandit:
                     best_score = score
 
         decision_id = uuid.uuid4().hex
+        timestamp = time.time()
+        self.decision_log.put(decision_id, best_arm, timestamp=timestamp)
+        self.feedback_updater.decision_made(DecisionRecord(decision_id, best_arm, timestamp))
         return {
             "decision_id": decision_id,
             "chosen": best_arm,
@@ -48,14 +107,99 @@ class RedisContextualBandit:
             "exploration": exploration,
         }
 
-    def record_feedback(self, decision_id: str, chosen: str, reward: float) -> None:
-        key = f"{self._key_prefix}:{chosen}"
-        data = self._client.hgetall(key) or {}
-        count = float(data.get("count", 0.0))
-        value = float(data.get("value", 0.0))
-        new_value = (value * count + reward) / (count + 1.0)
-        self._client.hset(key, mapping={"count": count + 1.0, "value": new_value})
+    def record_feedback(self, decision_id: str, reward: float, signals: Optional[Dict[str, float]] = None) -> bool:
+        self.feedback_updater.feedback_received(decision_id, reward)
+        return True
+
+    async def apply_feedback(self, records: List[DecisionRecord], rewards: Sequence[float]) -> None:
+        pipe = self._client.pipeline(transaction=False)
+        for record in records:
+            pipe.set(
+                f"{self._key_prefix}:applied:{record.decision_id}",
+                1,
+                nx=True,
+                ex=int(self._decision_ttl),
+            )
+        claimed = await pipe.execute()
+
+        totals: Dict[str, List[float]] = {}
+        claim_keys: List[str] = []
+        for record, reward, ok in zip(records, rewards, claimed):
+            if not ok:
+                continue
+            claim_keys.append(f"{self._key_prefix}:applied:{record.decision_id}")
+            total = totals.setdefault(record.chosen, [0.0, 0.0])
+            total[0] += 1.0
+            total[1] += float(reward)
+
+        # Legacy {count, value} hashes must get their total before the first increment
+        unloaded = [arm for arm in totals if arm not in self._loaded]
+        if unloaded:
+            await self.refresh_scores(unloaded)
+
+        # MULTI/EXEC: the increments land together or not at all
+        pipe = self._client.pipeline(transaction=True)
+        for chosen, (n, reward_sum) in totals.items():
+            key = f"{self._key_prefix}:{chosen}"
+            pipe.hincrbyfloat(key, "count", n)
+            pipe.hincrbyfloat(key, "total", reward_sum)
+        if totals:
+            try:
+                await pipe.execute()
+            except Exception:
+                # Release the claims so the re-queued feedback is counted on retry
+                try:
+                    await self._client.delete(*claim_keys)
+                except Exception as e:
+                    logger.error(f"Failed to release bandit feedback claims: {e}")
+                raise
+        await self.refresh_scores(list(set(self._scores) | {r.chosen for r in records}))
+
+    async def refresh_scores(self, arms: Optional[List[str]] = None) -> None:
+        """Reload cached mean rewards from Redis (all known arms by default)."""
+        arms = arms if arms is not None else list(self._scores)
+        if not arms:
+            return
+        pipe = self._client.pipeline(transaction=False)
+        for arm in arms:
+            pipe.hmget(f"{self._key_prefix}:{arm}", "count", "total", "value")
+        migrate = self._client.pipeline(transaction=False)
+        legacy = False
+        for arm, (count, total, value) in zip(arms, await pipe.execute()):
+            count = float(count or 0.0)
+            if total is None and value is not None:
+                # Previous layout: value is already the mean reward
+                self._scores[arm] = float(value)
+                # HSETNX: a total written meanwhile by another worker already includes it
+                migrate.hsetnx(f"{self._key_prefix}:{arm}", "total", float(value) * count)
+                legacy = True
+            else:
+                self._scores[arm] = float(total or 0.0) / count if count else 0.0
+        if legacy:
+            await migrate.execute()
+        self._loaded.update(arms)
+
+    def _ensure_loaded(self, arms: List[str]) -> None:
+        """Load arms this worker has not seen yet, without blocking ``choose``."""
+        missing = [arm for arm in arms if arm not in self._loaded and arm not in self._loading]
+        if not missing:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._loading.update(missing)
+        task = loop.create_task(self._load(missing))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load(self, arms: List[str]) -> None:
+        try:
+            await self.refresh_scores(arms)
+        except Exception as e:
+            logger.warning(f"Failed to load bandit scores for {arms}: {e}")
+        finally:
+            self._loading.difference_update(arms)
 
     def _get_score(self, arm: str) -> float:
-        data = self._client.hgetall(f"{self._key_prefix}:{arm}") or {}
-        return float(data.get("value", 0.0))
+        return self._scores.get(arm, 0.0)
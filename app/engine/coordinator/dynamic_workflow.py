@@ -2,10 +2,13 @@
 Dynamic Workflow Builder
 Constructs LangGraph execution graphs based on runtime configuration
 """
+import asyncio
+import hashlib
+import json
 import logging
 import time
 import uuid
-from typing import Dict, Any, List, Optional, Set
+from typing import Awaitable, Callable, Dict, Any, List, Optional, Set
 from pydantic import BaseModel, Field, model_validator
 from enum import Enum
 
@@ -172,6 +175,13 @@ class WorkflowConfig(BaseModel):
         description="Minimum confidence required to accept routing policy output"
     )
 
+    # Speculative execution: start the NPC draft (and knowledge prefetch for the
+    # predicted route) concurrently with reasoning/routing LLM calls
+    enable_speculation: bool = Field(
+        default=False,
+        description="Overlap NPC generation and knowledge retrieval with reasoning/routing"
+    )
+
     # Bandit routing (optional)
     enable_bandit: bool = Field(
         default=False,
@@ -192,6 +202,19 @@ class WorkflowConfig(BaseModel):
     class Config:
         use_enum_values = True
 
+    def fingerprint(self) -> str:
+        """
+        Stable identity of everything that shapes the compiled graph
+
+        Metadata (name/version/description) is excluded, so equivalent
+        configs share one compiled graph.
+        """
+        data = self.model_dump(mode="json", exclude={"name", "version", "description"})
+        data["enabled_nodes"] = sorted(data["enabled_nodes"])
+        data["parallel_nodes"] = [sorted(group) for group in data["parallel_nodes"]]
+        encoded = json.dumps(data, sort_keys=True, ensure_ascii=True)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
     @model_validator(mode='after')
     def validate_dag(self):
         """
@@ -307,6 +330,59 @@ class WorkflowConfig(BaseModel):
         return self
 
 
+def without_coach(config: WorkflowConfig) -> WorkflowConfig:
+    """
+    Derive the TTFT variant of a config with the coach node bypassed
+
+    Edges into coach are dropped (falling through to compliance when that is
+    enabled) and edges out of coach are removed. Returns the config itself if
+    coach is not enabled.
+    """
+    if NodeType.COACH not in config.enabled_nodes:
+        return config
+
+    enabled_names = {n.value if hasattr(n, "value") else str(n) for n in config.enabled_nodes}
+    enabled_names.discard(NodeType.COACH.value)
+
+    patched_rules = {}
+    for from_node, to_nodes in config.routing_rules.items():
+        from_name = from_node.value if hasattr(from_node, "value") else str(from_node)
+        if from_name == NodeType.COACH.value:
+            continue
+        filtered = []
+        for target in to_nodes:
+            target_name = target.value if hasattr(target, "value") else str(target)
+            if target_name == NodeType.COACH.value:
+                continue
+            filtered.append(target_name)
+        if not filtered and NodeType.COMPLIANCE.value in enabled_names:
+            filtered = [NodeType.COMPLIANCE.value]
+        if filtered:
+            patched_rules[from_name] = filtered
+
+    patched_conditional = {}
+    for from_node, conditions in config.conditional_routing.items():
+        from_name = from_node.value if hasattr(from_node, "value") else str(from_node)
+        if from_name == NodeType.COACH.value:
+            continue
+        new_conditions = {}
+        for key, target in conditions.items():
+            target_name = target.value if hasattr(target, "value") else str(target)
+            if target_name == NodeType.COACH.value:
+                continue
+            new_conditions[key] = target_name
+        if new_conditions:
+            patched_conditional[from_name] = new_conditions
+
+    return WorkflowConfig.model_validate({
+        **config.model_dump(),
+        "enabled_nodes": enabled_names,
+        "routing_rules": patched_rules,
+        "conditional_routing": patched_conditional,
+        "name": f"{config.name}_no_coach",
+    })
+
+
 class DynamicWorkflowCoordinator:
     """
     动态工作流编排器
@@ -324,6 +400,9 @@ class DynamicWorkflowCoordinator:
 
         coordinator = DynamicWorkflowCoordinator(dependencies, config)
         result = await coordinator.execute_turn(...)
+
+    每个节点组合（完整 / 跳过coach / A/B变体）在初始化时编译一次，按配置指纹缓存；
+    execute_turn只选择已编译的图，不修改self.config，可安全并发。
     """
 
     def __init__(
@@ -331,19 +410,48 @@ class DynamicWorkflowCoordinator:
         model_gateway,
         budget_manager,
         persona,
-        config: WorkflowConfig
+        config: WorkflowConfig,
+        variants: Optional[Dict[str, WorkflowConfig]] = None,
     ):
+        """
+        Args:
+            config: 默认工作流配置
+            variants: 可选的命名变体（如get_ab_test_configs()），通过execute_turn(variant=...)选择
+        """
         self.model_gateway = model_gateway
         self.budget_manager = budget_manager
         self.persona = persona
         self.config = config
+        self.variants: Dict[Optional[str], WorkflowConfig] = {None: config, **(variants or {})}
 
-        # 初始化节点实现
+        # 初始化节点实现（任一变体启用的组件都会创建，是否调用由每回合的变体决定）
         self._init_node_implementations()
 
+        # 流式回合：stream_id -> NPC token回调
+        self._token_sinks: Dict[str, Callable[[str], Awaitable[None]]] = {}
+
+        # 推测执行：speculation_id -> {"npc"/"knowledge": task}
+        self._speculations: Dict[str, Dict[str, asyncio.Task]] = {}
+        self.speculation_stats = {
+            "turns": 0,
+            "route_hits": 0,
+            "npc_committed": 0,
+            "knowledge_committed": 0,
+            "cancelled": 0,
+            "saved_ms": 0.0,
+        }
+
+        # 预编译所有变体：fingerprint -> compiled app
+        self._compiled_apps: Dict[str, Any] = {}
+        # (variant, skip_coach) -> fingerprint
+        self._variant_keys: Dict[tuple, str] = {}
+        for name, variant_config in self.variants.items():
+            self._variant_keys[(name, False)] = self._compile_variant(variant_config)
+            self._variant_keys[(name, True)] = self._compile_variant(without_coach(variant_config))
+
         # 动态构建图
         self.graph = self._build_dynamic_graph()
-        self.app = self.graph.compile()
+        self.app = self._compiled_apps[self._variant_keys[(None, False)]]
 
         logger.info(
             f"[DynamicWorkflow] Built workflow '{config.name}' "
@@ -367,27 +475,42 @@ class DynamicWorkflowCoordinator:
         self.tool_registry = build_default_registry()
         self.tool_executor = ToolExecutor(self.tool_registry)
 
-        self.reasoning_engine = ReasoningEngine(self.model_gateway, self.tool_registry)
-        self.routing_advisor = RoutingAdvisor(self.model_gateway, self.tool_registry)
+        configs = list(self.variants.values())
+        self.reasoning_engine = None
+        self.routing_advisor = None
         self.bandit = None
-        if self.config.enable_bandit:
+        if any(c.enable_reasoning for c in configs):
+            self.reasoning_engine = ReasoningEngine(self.model_gateway, self.tool_registry)
+        if any(c.enable_routing_policy for c in configs):
+            self.routing_advisor = RoutingAdvisor(self.model_gateway, self.tool_registry)
+        bandit_configs = [c for c in configs if c.enable_bandit]
+        if bandit_configs:
+            exploration_rate = bandit_configs[0].bandit_exploration_rate
             settings = get_settings()
             if settings.BANDIT_REDIS_ENABLED:
                 try:
                     self.bandit = RedisContextualBandit(
                         settings.REDIS_URL,
-                        epsilon=self.config.bandit_exploration_rate,
+                        epsilon=exploration_rate,
                     )
                 except Exception:
-                    self.bandit = SimpleContextualBandit(self.config.bandit_exploration_rate)
+                    self.bandit = SimpleContextualBandit(exploration_rate)
             else:
-                self.bandit = SimpleContextualBandit(self.config.bandit_exploration_rate)
-        if not self.config.enable_reasoning:
-            self.reasoning_engine = None
-        if not self.config.enable_routing_policy:
-            self.routing_advisor = None
-        if not self.config.enable_bandit:
-            self.bandit = None
+                self.bandit = SimpleContextualBandit(exploration_rate)
+
+    def _compile_variant(self, config: WorkflowConfig) -> str:
+        """编译（或复用）一个配置对应的图，返回其指纹"""
+        key = config.fingerprint()
+        if key not in self._compiled_apps:
+            self._compiled_apps[key] = self._build_dynamic_graph(config).compile()
+            logger.debug(f"[DynamicWorkflow] Compiled variant '{config.name}' ({key})")
+        return key
+
+    def get_app(self, variant: Optional[str] = None, skip_coach: bool = False):
+        """获取预编译的图"""
+        if (variant, skip_coach) not in self._variant_keys:
+            raise ValueError(f"Unknown workflow variant: {variant}")
+        return self._compiled_apps[self._variant_keys[(variant, skip_coach)]]
 
     def _make_tool_call_id(self, tool_name: str, state: CoordinatorState) -> str:
         session_id = state.get("session_id", "unknown")
@@ -395,15 +518,16 @@ class DynamicWorkflowCoordinator:
         suffix = uuid.uuid4().hex[:8]
         return f"{session_id}-{turn_number}-{tool_name}-{suffix}"
 
-    def _get_intent_candidates(self) -> List[str]:
+    def _get_intent_candidates(self, config: Optional[WorkflowConfig] = None) -> List[str]:
+        config = config or self.config
         candidates: List[str] = []
-        conditions = self.config.conditional_routing.get("intent") or {}
+        conditions = config.conditional_routing.get("intent") or {}
         if conditions:
             candidates = list(conditions.values())
         if not candidates:
-            candidates = list(self.config.routing_rules.get("intent", []))
+            candidates = list(config.routing_rules.get("intent", []))
         if not candidates:
-            enabled = {n.value if hasattr(n, "value") else str(n) for n in self.config.enabled_nodes}
+            enabled = {n.value if hasattr(n, "value") else str(n) for n in config.enabled_nodes}
             if "knowledge" in enabled:
                 candidates.append("knowledge")
             if "tools" in enabled:
@@ -420,8 +544,10 @@ class DynamicWorkflowCoordinator:
             ordered.append(item)
         return ordered
 
-    def _policy_candidates(self, graph_candidates: List[str]) -> List[str]:
-        aliases = self.config.routing_aliases or {}
+    def _policy_candidates(
+        self, graph_candidates: List[str], config: Optional[WorkflowConfig] = None
+    ) -> List[str]:
+        aliases = (config or self.config).routing_aliases or {}
         inverse = {v: k for k, v in aliases.items()}
         mapped = [inverse.get(c, c) for c in graph_candidates]
         seen = set()
@@ -433,22 +559,25 @@ class DynamicWorkflowCoordinator:
             ordered.append(item)
         return ordered
 
-    def _map_policy_target(self, target: str, graph_candidates: List[str]) -> str:
-        aliases = self.config.routing_aliases or {}
+    def _map_policy_target(
+        self, target: str, graph_candidates: List[str], config: Optional[WorkflowConfig] = None
+    ) -> str:
+        aliases = (config or self.config).routing_aliases or {}
         mapped = aliases.get(target, target)
         if mapped in graph_candidates:
             return mapped
         return target
 
-    def _build_dynamic_graph(self) -> StateGraph:
+    def _build_dynamic_graph(self, config: Optional[WorkflowConfig] = None) -> StateGraph:
         """根据配置动态构建图"""
+        config = config or self.config
         workflow = StateGraph(CoordinatorState)
 
         # 1. add enabled nodes
-        enabled_names = {n.value if hasattr(n, 'value') else str(n) for n in self.config.enabled_nodes}
-        for node_type in self.config.enabled_nodes:
+        enabled_names = {n.value if hasattr(n, 'value') else str(n) for n in config.enabled_nodes}
+        for node_type in config.enabled_nodes:
             node_name = node_type.value if hasattr(node_type, 'value') else str(node_type)
-            node_func = self._get_node_function(node_name)
+            node_func = self._get_node_function(node_name, config)
             workflow.add_node(node_name, node_func)
 
         # 2. set entry point
@@ -462,14 +591,20 @@ class DynamicWorkflowCoordinator:
             workflow.set_entry_point(first_node)
 
         # 3. 添加路由边
-        self._add_routing_edges(workflow)
+        self._add_routing_edges(workflow, config)
 
         return workflow
 
-    def _get_node_function(self, node_type: str):
+    def _get_node_function(self, node_type: str, config: Optional[WorkflowConfig] = None):
         """获取节点对应的执行函数"""
+        config = config or self.config
+
+        # Intent routing depends on the variant's routing config; bind it here
+        async def intent_node(state: CoordinatorState) -> Dict:
+            return await self._intent_node(state, config)
+
         node_map = {
-            NodeType.INTENT.value: self._intent_node,
+            NodeType.INTENT.value: intent_node,
             NodeType.KNOWLEDGE.value: self._knowledge_node,
             NodeType.NPC.value: self._npc_node,
             NodeType.COACH.value: self._coach_node,
@@ -492,10 +627,11 @@ class DynamicWorkflowCoordinator:
 
         return func
 
-    def _add_routing_edges(self, workflow: StateGraph):
+    def _add_routing_edges(self, workflow: StateGraph, config: Optional[WorkflowConfig] = None):
         """添加路由边"""
+        config = config or self.config
         # 1. 简单路由（固定连接）
-        for from_node, to_nodes in self.config.routing_rules.items():
+        for from_node, to_nodes in config.routing_rules.items():
             if len(to_nodes) == 1:
                 # 单一路径 -> 直接边
                 workflow.add_edge(from_node, to_nodes[0])
@@ -507,13 +643,13 @@ class DynamicWorkflowCoordinator:
                 )
 
         # 2. 条件路由
-        for from_node, conditions in self.config.conditional_routing.items():
+        for from_node, conditions in config.conditional_routing.items():
             router_func = self._create_router_function(from_node, conditions)
             workflow.add_conditional_edges(from_node, router_func, conditions)
 
         # 3. 自动推断终止节点
         # 如果启用了compliance，连接到END
-        enabled_names = {n.value if hasattr(n, 'value') else str(n) for n in self.config.enabled_nodes}
+        enabled_names = {n.value if hasattr(n, 'value') else str(n) for n in config.enabled_nodes}
         if NodeType.COMPLIANCE.value in enabled_names:
             workflow.add_edge(NodeType.COMPLIANCE.value, END)
         elif NodeType.NPC.value in enabled_names:
@@ -541,8 +677,11 @@ class DynamicWorkflowCoordinator:
 
     # ==================== 节点实现 ====================
 
-    async def _intent_node(self, state: CoordinatorState) -> Dict:
+    async def _intent_node(
+        self, state: CoordinatorState, config: Optional[WorkflowConfig] = None
+    ) -> Dict:
         """?????????"""
+        config = config or self.config
         result = await self.intent_classifier.classify_with_context(
             message=state["user_message"],
             history=state.get("history", []),
@@ -562,18 +701,27 @@ class DynamicWorkflowCoordinator:
             "recent_tool_calls": recent_tool_calls,
         })
 
+        # Components are shared by all variants; the turn's variant decides which run
+        reasoning_engine = self.reasoning_engine if config.enable_reasoning else None
+        routing_advisor = self.routing_advisor if config.enable_routing_policy else None
+        bandit = self.bandit if config.enable_bandit else None
+
+        graph_candidates = self._get_intent_candidates(config)
+        predicted_route = None
+        if config.enable_speculation and (reasoning_engine or routing_advisor):
+            predicted_route = self._start_speculation(analysis_state, config, graph_candidates)
+
         reasoning = None
         reasoning_source = "disabled"
-        if self.reasoning_engine:
-            reasoning, reasoning_source = await self.reasoning_engine.analyze(analysis_state)
+        if reasoning_engine:
+            reasoning, reasoning_source = await reasoning_engine.analyze(analysis_state)
         analysis_state["reasoning"] = reasoning or {}
 
-        graph_candidates = self._get_intent_candidates()
-        policy_candidates = self._policy_candidates(graph_candidates)
+        policy_candidates = self._policy_candidates(graph_candidates, config)
         routing_recommendation = None
         routing_source = "disabled"
-        if self.routing_advisor and policy_candidates:
-            routing_recommendation, routing_source = await self.routing_advisor.advise(
+        if routing_advisor and policy_candidates:
+            routing_recommendation, routing_source = await routing_advisor.advise(
                 analysis_state, reasoning or {}, policy_candidates
             )
 
@@ -583,8 +731,8 @@ class DynamicWorkflowCoordinator:
 
         if routing_recommendation:
             policy_target = routing_recommendation.get("target_node")
-            mapped_target = self._map_policy_target(policy_target, graph_candidates)
-            if mapped_target in graph_candidates and routing_recommendation.get("confidence", 0.0) >= self.config.routing_min_confidence:
+            mapped_target = self._map_policy_target(policy_target, graph_candidates, config)
+            if mapped_target in graph_candidates and routing_recommendation.get("confidence", 0.0) >= config.routing_min_confidence:
                 routing_decision = {
                     "target_node": mapped_target,
                     "confidence": routing_recommendation.get("confidence", 0.0),
@@ -593,7 +741,7 @@ class DynamicWorkflowCoordinator:
                 }
                 route_choice = mapped_target
 
-        if not route_choice and self.bandit and graph_candidates:
+        if not route_choice and bandit and graph_candidates:
             risk_flags = []
             if reasoning and reasoning.get("risk", {}).get("compliance_risk"):
                 risk_flags.append("compliance")
@@ -609,8 +757,8 @@ class DynamicWorkflowCoordinator:
             }
             try:
                 BanditContextSchema.model_validate(context)
-                bandit_decision = self.bandit.choose(context, graph_candidates)
-                bandit_target = self._map_policy_target(bandit_decision["chosen"], graph_candidates)
+                bandit_decision = bandit.choose(context, graph_candidates)
+                bandit_target = self._map_policy_target(bandit_decision["chosen"], graph_candidates, config)
                 if bandit_target in graph_candidates:
                     routing_decision = {
                         "target_node": bandit_target,
@@ -628,17 +776,21 @@ class DynamicWorkflowCoordinator:
             routing_decision = fallback_decision
             route_choice = fallback_decision.get("target_node")
 
+        detail = {
+            "intent": intent,
+            "route_choice": route_choice,
+            "reasoning_source": reasoning_source,
+            "routing_source": routing_source,
+            "policy_confidence": routing_recommendation.get("confidence") if routing_recommendation else None,
+            "bandit_decision_id": bandit_decision.get("decision_id") if bandit_decision else None,
+        }
+        if predicted_route is not None:
+            detail["speculation"] = self._settle_speculation(state, predicted_route, route_choice)
+
         trace_entry = build_trace_event(
             node="intent",
             source=routing_decision.get("source") if routing_decision else routing_source,
-            detail={
-                "intent": intent,
-                "route_choice": route_choice,
-                "reasoning_source": reasoning_source,
-                "routing_source": routing_source,
-                "policy_confidence": routing_recommendation.get("confidence") if routing_recommendation else None,
-                "bandit_decision_id": bandit_decision.get("decision_id") if bandit_decision else None,
-            },
+            detail=detail,
         )
 
         return {
@@ -658,6 +810,17 @@ class DynamicWorkflowCoordinator:
 
     async def _knowledge_node(self, state: CoordinatorState) -> Dict:
         """??????"""
+        prefetch = self._take_speculation(state, "knowledge")
+        if prefetch is not None:
+            committed = await self._await_speculation(prefetch)
+            if committed is not None:
+                update, saved_ms = committed
+                self.speculation_stats["knowledge_committed"] += 1
+                update["trace_log"][0].setdefault("detail", {}).update({"speculative": True, "saved_ms": saved_ms})
+                return update
+        return await self._retrieve_knowledge(state)
+
+    async def _retrieve_knowledge(self, state: CoordinatorState) -> Dict:
         start = time.perf_counter()
         try:
             exec_result = await self.tool_executor.execute(
@@ -702,12 +865,24 @@ class DynamicWorkflowCoordinator:
     async def _npc_node(self, state: CoordinatorState) -> Dict:
         """NPC??????"""
         start = time.perf_counter()
-        npc_resp = await self.npc_agent.generate_response(
-            message=state["user_message"],
-            history=state.get("history", []),
-            persona=state.get("persona", self.persona),
-            stage=state.get("fsm_state", {}).get("current_stage", "discovery")
-        )
+        npc_resp = None
+        detail: Dict[str, Any] = {}
+
+        # The draft only depends on message/history/persona/stage, so it is
+        # valid whichever route led here
+        draft = self._take_speculation(state, "npc")
+        if draft is not None:
+            # A streamed draft may already have sent part of its reply to the
+            # client, so a failure must abort the turn instead of re-running
+            streaming = self._token_sinks.get(state.get("stream_id") or "") is not None
+            committed = await self._await_speculation(draft, reraise=streaming)
+            if committed is not None:
+                npc_resp, saved_ms = committed
+                self.speculation_stats["npc_committed"] += 1
+                detail = {"speculative": True, "saved_ms": saved_ms}
+
+        if npc_resp is None:
+            npc_resp = await self._generate_npc(state)
         latency_ms = round((time.perf_counter() - start) * 1000, 2)
 
         return {
@@ -717,11 +892,116 @@ class DynamicWorkflowCoordinator:
                 build_trace_event(
                     node="npc",
                     latency_ms=latency_ms,
-                    detail={"response_len": len(npc_resp.content)},
+                    detail={"response_len": len(npc_resp.content), **detail},
                 )
             ],
         }
 
+    async def _generate_npc(self, state: CoordinatorState):
+        kwargs = dict(
+            message=state["user_message"],
+            history=state.get("history", []),
+            persona=state.get("persona", self.persona),
+            stage=state.get("fsm_state", {}).get("current_stage", "discovery")
+        )
+        on_token = self._token_sinks.get(state.get("stream_id") or "")
+        if on_token is not None and hasattr(self.npc_agent, "stream_response"):
+            return await self.npc_agent.stream_response(on_delta=on_token, **kwargs)
+        return await self.npc_agent.generate_response(**kwargs)
+
+    # ==================== 推测执行 ====================
+
+    def _start_speculation(
+        self,
+        state: Dict[str, Any],
+        config: WorkflowConfig,
+        graph_candidates: List[str],
+    ) -> Optional[str]:
+        """
+        基于快速意图预测路由，并发启动NPC草稿与知识预取
+
+        Returns:
+            预测的路由目标；未启动推测时返回None
+        """
+        speculation_id = state.get("speculation_id")
+        if not speculation_id:
+            return None
+        enabled = {n.value if hasattr(n, "value") else str(n) for n in config.enabled_nodes}
+        predicted = fallback_route({**state, "reasoning": {}}, graph_candidates)["target_node"]
+
+        async def timed(coro):
+            started = time.perf_counter()
+            result = await coro
+            return result, started, time.perf_counter()
+
+        tasks: Dict[str, asyncio.Task] = {}
+        if NodeType.NPC.value in enabled:
+            tasks["npc"] = asyncio.create_task(timed(self._generate_npc(state)))
+        if predicted == NodeType.KNOWLEDGE.value:
+            tasks["knowledge"] = asyncio.create_task(timed(self._retrieve_knowledge(state)))
+        if not tasks:
+            return None
+        self._speculations[speculation_id] = tasks
+        self.speculation_stats["turns"] += 1
+        return predicted
+
+    def _settle_speculation(
+        self, state: CoordinatorState, predicted: str, route_choice: Optional[str]
+    ) -> Dict[str, Any]:
+        """最终路由确定后：命中则保留，预取目标未被选中则取消"""
+        tasks = self._speculations.get(state.get("speculation_id"), {})
+        hit = predicted == route_choice
+        if hit:
+            self.speculation_stats["route_hits"] += 1
+        if route_choice != NodeType.KNOWLEDGE.value and "knowledge" in tasks:
+            tasks.pop("knowledge").cancel()
+            self.speculation_stats["cancelled"] += 1
+        return {"predicted_route": predicted, "hit": hit, "pending": sorted(tasks)}
+
+    def _take_speculation(self, state: CoordinatorState, kind: str) -> Optional[asyncio.Task]:
+        tasks = self._speculations.get(state.get("speculation_id") or "")
+        return tasks.pop(kind, None) if tasks else None
+
+    async def _await_speculation(self, task: asyncio.Task, reraise: bool = False) -> Optional[tuple]:
+        """
+        等待推测结果
+
+        Args:
+            reraise: 推测失败时向上抛出，而不是交由调用方重新执行
+
+        Returns:
+            (result, saved_ms)；推测失败返回None，由调用方重新执行
+        """
+        node_start = time.perf_counter()
+        try:
+            result, started, finished = await task
+        except Exception as e:
+            if reraise:
+                logger.error(f"[Speculation] Streamed draft failed, aborting turn: {e}")
+                raise
+            logger.warning(f"[Speculation] Draft failed, re-running: {e}")
+            return None
+        saved_ms = round((min(node_start, finished) - started) * 1000, 2)
+        self.speculation_stats["saved_ms"] += saved_ms
+        return result, saved_ms
+
+    def _discard_speculation(self, speculation_id: str) -> None:
+        """回合结束时取消未被使用的推测任务"""
+        for task in self._speculations.pop(speculation_id, {}).values():
+            if not task.done():
+                self.speculation_stats["cancelled"] += 1
+                task.cancel()
+            elif not task.cancelled():
+                task.exception()  # Consume failures of unused drafts
+
+    def get_speculation_stats(self) -> Dict[str, Any]:
+        """推测执行统计（命中率、节省时间）"""
+        stats = dict(self.speculation_stats)
+        turns = stats["turns"]
+        stats["hit_rate"] = stats["route_hits"] / turns if turns else 0.0
+        stats["avg_saved_ms"] = stats["saved_ms"] / turns if turns else 0.0
+        return stats
+
     async def _coach_node(self, state: CoordinatorState) -> Dict:
         """
         Coach???? (Enhanced with Graceful Degradation)
@@ -871,7 +1151,9 @@ class DynamicWorkflowCoordinator:
         history: list,
         fsm_state: dict,
         session_id: str = "default",
-        skip_coach: bool = False
+        skip_coach: bool = False,
+        variant: Optional[str] = None,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
     ) -> Dict[str, Any]:
         """
         执行一轮对话
@@ -883,6 +1165,9 @@ class DynamicWorkflowCoordinator:
             fsm_state: FSM state
             session_id: Session ID
             skip_coach: If True, skip coach node for TTFT optimization (先答后评)
+            variant: Optional name of a variant passed to the constructor
+            on_token: Optional async callback receiving NPC reply text as it is
+                generated; compliance still runs on the complete reply
 
         Returns:
             Dict with NPC reply and optional coach advice
@@ -905,86 +1190,34 @@ class DynamicWorkflowCoordinator:
             route_choice="",
             recent_tool_calls=False,
             bandit_decision={},
+            speculation_id=uuid.uuid4().hex,
+            stream_id=uuid.uuid4().hex if on_token else "",
         )
 
-        # If skip_coach is enabled, temporarily remove coach from enabled nodes
-        original_enabled_nodes = None
-        original_routing_rules = None
-        original_conditional = None
-        if skip_coach and NodeType.COACH in self.config.enabled_nodes:
-            original_enabled_nodes = self.config.enabled_nodes.copy()
-            original_routing_rules = {k: list(v) for k, v in self.config.routing_rules.items()}
-            original_conditional = {k: dict(v) for k, v in self.config.conditional_routing.items()}
-
-            enabled_names = {n.value if hasattr(n, "value") else str(n) for n in self.config.enabled_nodes}
-            enabled_names.discard(NodeType.COACH.value)
-
-            # Temporarily disable coach
-            self.config.enabled_nodes = {
-                n for n in self.config.enabled_nodes if n != NodeType.COACH
-            }
-
-            # Patch routing to bypass coach
-            patched_rules = {}
-            for from_node, to_nodes in original_routing_rules.items():
-                from_name = from_node.value if hasattr(from_node, "value") else str(from_node)
-                if from_name == NodeType.COACH.value:
-                    continue
-                filtered = []
-                for target in to_nodes:
-                    target_name = target.value if hasattr(target, "value") else str(target)
-                    if target_name == NodeType.COACH.value:
-                        continue
-                    filtered.append(target_name)
-                if not filtered and NodeType.COMPLIANCE.value in enabled_names:
-                    filtered = [NodeType.COMPLIANCE.value]
-                if filtered:
-                    patched_rules[from_name] = filtered
-            self.config.routing_rules = patched_rules
-
-            patched_conditional = {}
-            for from_node, conditions in original_conditional.items():
-                from_name = from_node.value if hasattr(from_node, "value") else str(from_node)
-                if from_name == NodeType.COACH.value:
-                    continue
-                new_conditions = {}
-                for key, target in conditions.items():
-                    target_name = target.value if hasattr(target, "value") else str(target)
-                    if target_name == NodeType.COACH.value:
-                        continue
-                    new_conditions[key] = target_name
-                if new_conditions:
-                    patched_conditional[from_name] = new_conditions
-            self.config.conditional_routing = patched_conditional
-
-            # Rebuild graph without coach
-            self.graph = self._build_dynamic_graph()
-            self.app = self.graph.compile()
+        # Pick the precompiled graph; self.config is never mutated per turn
+        app = self.get_app(variant, skip_coach)
+        if skip_coach and NodeType.COACH in self.variants[variant].enabled_nodes:
             logger.info("[TTFT Optimization] Coach node skipped for immediate response")
 
+        if on_token:
+            self._token_sinks[initial_state["stream_id"]] = on_token
         try:
-            final_state = await self.app.ainvoke(initial_state)
-
-            return {
-                "npc_reply": final_state.get("npc_response", ""),
-                "npc_mood": final_state.get("npc_mood", 0.5),
-                "coach_advice": final_state.get("coach_advice") if not skip_coach else None,
-                "intent": final_state.get("intent"),
-                "trace": final_state.get("trace_log", []),
-                "bandit_decision": final_state.get("bandit_decision", {}),
-                "tool_outputs": final_state.get("tool_outputs", []),
-                "tool_results": final_state.get("tool_results", []),
-            }
+            final_state = await app.ainvoke(initial_state)
         finally:
-            # Restore original configuration
-            if original_enabled_nodes is not None:
-                self.config.enabled_nodes = original_enabled_nodes
-                if original_routing_rules is not None:
-                    self.config.routing_rules = original_routing_rules
-                if original_conditional is not None:
-                    self.config.conditional_routing = original_conditional
-                self.graph = self._build_dynamic_graph()
-                self.app = self.graph.compile()
+            self._discard_speculation(initial_state["speculation_id"])
+            self._token_sinks.pop(initial_state["stream_id"], None)
+
+        return {
+            "npc_reply": final_state.get("npc_response", ""),
+            "npc_mood": final_state.get("npc_mood", 0.5),
+            "coach_advice": final_state.get("coach_advice") if not skip_coach else None,
+            "intent": final_state.get("intent"),
+            "trace": final_state.get("trace_log", []),
+            "bandit_decision": final_state.get("bandit_decision", {}),
+            "tool_outputs": final_state.get("tool_outputs", []),
+            "tool_results": final_state.get("tool_results", []),
+            "compliance_result": final_state.get("compliance_result", {}),
+        }
 
     async def record_bandit_feedback(
         self,
@@ -1001,6 +1234,7 @@ class DynamicWorkflowCoordinator:
 
 def get_minimal_config() -> WorkflowConfig:
     """最小化配置（仅Intent + NPC）"""
+    settings = get_settings()
     return WorkflowConfig(
         name="minimal_workflow",
         enabled_nodes={NodeType.INTENT, NodeType.NPC},
@@ -1038,12 +1272,14 @@ def get_full_config() -> WorkflowConfig:
         description="Full workflow with all nodes enabled",
         enable_reasoning=True,
         enable_routing_policy=True,
+        enable_speculation=True,
         enable_bandit=settings.BANDIT_ROUTING_ENABLED
     )
 
 
 def get_ab_test_configs() -> Dict[str, WorkflowConfig]:
     """A/B测试配置组"""
+    settings = get_settings()
     return {
         "variant_A": WorkflowConfig(
             name="ab_test_control",
@@ -38,7 +38,7 @@ Usage:
 """
 
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 from dataclasses import dataclass
 from enum import Enum
 
@@ -307,7 +307,8 @@ class ProductionCoordinator:
         self,
         turn_number: int,
         user_message: str,
-        enable_async_coach: bool = True
+        enable_async_coach: bool = True,
+        on_token: Optional[Callable[[str], Awaitable[None]]] = None,
     ) -> TurnResult:
         """
         Execute one conversation turn
@@ -318,6 +319,8 @@ class ProductionCoordinator:
             turn_number: Current turn number
             user_message: User input message
             enable_async_coach: Enable TTFT optimization (default: True)
+            on_token: Async callback for NPC reply text as it is generated
+                (DYNAMIC_WORKFLOW only; other engines deliver the reply whole)
 
         Returns:
             TurnResult with NPC response and optional coach advice
@@ -353,7 +356,8 @@ class ProductionCoordinator:
                     history=self.history,
                     fsm_state=fsm_state_dict,
                     session_id=self.session_id,
-                    skip_coach=enable_async_coach  # TTFT optimization
+                    skip_coach=enable_async_coach,  # TTFT optimization
+                    on_token=on_token,
                 )
 
             elif self.engine == CoordinatorEngine.LANGGRAPH:
@@ -409,6 +413,7 @@ class ProductionCoordinator:
                 metadata={
                     "cache_hit": cache_hit,
                     "cache_key": cache_key,
+                    "risk_level": (result.get("compliance_result") or {}).get("risk_level"),
                 },
                 error=None
             )
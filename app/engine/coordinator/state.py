@@ -78,6 +78,14 @@ class CoordinatorState(TypedDict, total=False):
     tool_outputs: list
         Canonical tool outputs [{"tool": "...", "ok": true, "result": {...}}]
 
+    speculation_id: str
+        Key of this turn's speculative NPC draft / knowledge prefetch
+        (DynamicWorkflowCoordinator speculative mode)
+
+    stream_id: str
+        Key of this turn's NPC token callback; empty when the turn is not
+        streamed
+
     # Compliance & Audit
     compliance_result: dict
         Compliance check result {"is_compliant": true, "risk_flags": []}
@@ -141,6 +149,8 @@ class CoordinatorState(TypedDict, total=False):
     route_choice: str
     recent_tool_calls: bool
     bandit_decision: dict
+    speculation_id: str
+    stream_id: str
 
     # Compliance
     compliance_result: dict
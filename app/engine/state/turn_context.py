@@ -0,0 +1,420 @@
+"""
+Per-session turn context with write-behind persistence.
+
+The WebSocket turn loop used to re-read the session, its state and recent
+messages from the database for every user message. It also committed twice
+around the LLM call. TurnContext keeps that data in memory for the lifetime
+of a connection: it is loaded once at connect and updated in place as turns
+complete. Completed turns are handed to TurnWriteBehind, which persists them
+in batches off the critical path.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.config import get_settings
+from models.runtime_models import Message, Session, SessionState
+
+logger = logging.getLogger(__name__)
+
+HISTORY_WINDOW = 5
+
+
+@dataclass
+class TurnRecord:
+    """One user turn, pending until its NPC reply is committed."""
+    turn_id: str
+    turn_number: int
+    user_message: str
+    stage: str
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    npc_response: Optional[str] = None
+    npc_mood: float = 0.5
+    npc_stage: Optional[str] = None
+    committed: bool = False
+
+
+@dataclass
+class TurnContext:
+    """In-memory view of a session, authoritative while the connection is open."""
+    session_id: str
+    total_turns: int = 0
+    current_stage: str = "training"
+    has_state: bool = False
+    history: Deque[dict] = field(default_factory=lambda: deque(maxlen=HISTORY_WINDOW))
+    # turn_id -> record, oldest first
+    turns: "OrderedDict[str, TurnRecord]" = field(default_factory=OrderedDict)
+    max_turns: int = 200
+
+    def history_window(self) -> List[dict]:
+        return list(self.history)
+
+    def get_turn(self, turn_id: str) -> Optional[TurnRecord]:
+        return self.turns.get(turn_id)
+
+    def last_committed_turn(self) -> Optional[TurnRecord]:
+        for record in reversed(self.turns.values()):
+            if record.committed:
+                return record
+        return None
+
+    def begin_turn(self, turn_id: str, turn_number: int, user_message: str) -> TurnRecord:
+        record = TurnRecord(
+            turn_id=turn_id,
+            turn_number=turn_number,
+            user_message=user_message,
+            stage=self.current_stage,
+        )
+        self.turns[turn_id] = record
+        return record
+
+    def abort_turn(self, turn_id: str) -> None:
+        record = self.turns.get(turn_id)
+        if record is not None and not record.committed:
+            del self.turns[turn_id]
+
+    def commit_turn(self, turn_id: str, npc_response: str, npc_mood: float, stage: str) -> TurnRecord:
+        record = self.turns[turn_id]
+        record.npc_response = npc_response
+        record.npc_mood = npc_mood
+        record.npc_stage = stage
+        record.committed = True
+        self.total_turns = max(self.total_turns, record.turn_number)
+        self.current_stage = stage
+        self.history.append({"role": "user", "content": record.user_message})
+        self.history.append({"role": "npc", "content": npc_response})
+        while len(self.turns) > self.max_turns:
+            self.turns.popitem(last=False)
+        return record
+
+
+async def load_turn_context(db: AsyncSession, session_id: str, max_turns: int = 200) -> Optional[TurnContext]:
+    """Build a TurnContext from the database; None if the session does not exist."""
+    session_row = (await db.execute(select(Session).where(Session.id == session_id))).scalar_one_or_none()
+    if not session_row:
+        return None
+    state_row = (
+        await db.execute(select(SessionState).where(SessionState.session_id == session_id))
+    ).scalar_one_or_none()
+    message_rows = (
+        await db.execute(
+            select(Message)
+            .where(Message.session_id == session_id, Message.status == "committed")
+            .order_by(Message.turn_number.desc())
+            .limit(max_turns * 2)
+        )
+    ).scalars().all()
+
+    ctx = TurnContext(
+        session_id=session_id,
+        total_turns=session_row.total_turns or 0,
+        current_stage=state_row.current_stage if state_row else "training",
+        has_state=state_row is not None,
+        max_turns=max_turns,
+    )
+    messages = sorted(message_rows, key=lambda m: (m.turn_number, 0 if m.role == "user" else 1))
+    for message in messages[-HISTORY_WINDOW:]:
+        ctx.history.append({"role": message.role, "content": message.content})
+    for message in messages:
+        if not message.turn_id:
+            continue
+        if message.role == "user":
+            ctx.turns[message.turn_id] = TurnRecord(
+                turn_id=message.turn_id,
+                turn_number=message.turn_number,
+                user_message=message.content,
+                stage=message.stage,
+                created_at=message.created_at or datetime.utcnow(),
+            )
+        elif message.turn_id in ctx.turns:
+            record = ctx.turns[message.turn_id]
+            record.npc_response = message.content
+            record.npc_mood = (message.npc_result or {}).get("mood_after", 0.5)
+            record.npc_stage = message.stage
+            record.committed = True
+    # A user row without its NPC reply is a turn that never completed
+    for turn_id in [t for t, record in ctx.turns.items() if not record.committed]:
+        del ctx.turns[turn_id]
+    return ctx
+
+
+@dataclass
+class TurnWrite:
+    """Rows produced by one completed turn."""
+    session_id: str
+    turn_id: str
+    turn_number: int
+    user_message: str
+    user_stage: str
+    npc_response: str
+    npc_stage: str
+    npc_mood: float
+    history_tail: List[dict]
+    update_state: bool = True
+    written_at: datetime = field(default_factory=datetime.utcnow)
+    user_message_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    npc_message_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    attempts: int = 0
+
+
+# Errors worth retrying: the database or the connection to it, not the rows
+_TRANSIENT_ERRORS = (OperationalError, InterfaceError, ConnectionError, OSError, asyncio.TimeoutError)
+
+
+def _is_transient(error: BaseException) -> bool:
+    return isinstance(error, _TRANSIENT_ERRORS)
+
+
+class TurnWriteBehind:
+    """
+    Batched, ordered persistence of completed turns.
+
+    Writes are flushed every ``interval_seconds``, or as soon as ``max_batch``
+    are queued. A flush uses one transaction: it inserts both message rows of
+    every queued turn and then updates each session's counters and state
+    snapshot to its latest turn. A turn is therefore never half persisted,
+    and ``total_turns`` never points past the stored messages.
+
+    A batch that fails with a transient error (connection, timeout) is put
+    back at the head of the queue so later turns cannot overtake it, up to
+    ``max_attempts`` times. Any other error, or running out of attempts,
+    splits the batch by session: sessions that still fail are moved to
+    ``dead_letters`` and logged, so one bad session cannot block the rest.
+
+    Turns are acknowledged to the client before they are written, so the
+    queue is the only copy for at most ``interval_seconds``; the interval is
+    capped at ``MAX_INTERVAL_SECONDS`` to bound that window. Closing sessions
+    and application shutdown ``drain`` the queue, retrying transient errors
+    instead of dropping what is buffered.
+    """
+
+    # Upper bound on how long an acknowledged turn may exist only in memory
+    MAX_INTERVAL_SECONDS = 2.0
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Any]] = None,
+        interval_seconds: Optional[float] = None,
+        max_batch: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+    ):
+        """
+        Args:
+            session_factory: Callable returning an AsyncSession context manager
+                (default: core.database.async_session_factory)
+            interval_seconds: Upper bound on how long a write stays queued
+                (capped at MAX_INTERVAL_SECONDS)
+            max_batch: Queue length that triggers an immediate flush
+            max_attempts: Transient failures a turn survives before it is dead-lettered
+        """
+        settings = get_settings()
+        self._session_factory = session_factory
+        interval_seconds = (
+            interval_seconds if interval_seconds is not None else settings.TURN_WRITE_BEHIND_INTERVAL_SECONDS
+        )
+        if interval_seconds > self.MAX_INTERVAL_SECONDS:
+            logger.warning(
+                f"[TurnWriteBehind] Flush interval {interval_seconds}s capped at {self.MAX_INTERVAL_SECONDS}s"
+            )
+        self.interval_seconds = min(interval_seconds, self.MAX_INTERVAL_SECONDS)
+        self.max_batch = max_batch if max_batch is not None else settings.TURN_WRITE_BEHIND_MAX_BATCH
+        self.max_attempts = max(
+            1, max_attempts if max_attempts is not None else settings.TURN_WRITE_BEHIND_MAX_ATTEMPTS
+        )
+
+        self._queue: Deque[TurnWrite] = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock = asyncio.Lock()
+
+        self.flushed = 0
+        self.failed_flushes = 0
+        self.dead_lettered = 0
+        # (write, error) of turns given up on, newest last
+        self.dead_letters: Deque[tuple] = deque(maxlen=1000)
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def enqueue(self, write: TurnWrite) -> None:
+        self._queue.append(write)
+        self.ensure_started()
+        if len(self._queue) >= self.max_batch and self._wakeup is not None:
+            self._wakeup.set()
+
+    async def flush(self) -> int:
+        """
+        Persist everything queued so far. Returns the number of turns written.
+
+        Raises the error of a batch that failed transiently and was re-queued.
+        """
+        async with self._flush_lock:
+            written = 0
+            try:
+                while self._queue:
+                    batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+                    try:
+                        await self._write(batch)
+                        written += len(batch)
+                        continue
+                    except Exception as e:
+                        self.failed_flushes += 1
+                        if _is_transient(e) and max(w.attempts for w in batch) + 1 < self.max_attempts:
+                            for write in batch:
+                                write.attempts += 1
+                            self._queue.extendleft(reversed(batch))
+                            raise
+                        error = e
+                    written += await self._isolate(batch, error)
+            finally:
+                self.flushed += written
+            return written
+
+    async def drain(self) -> int:
+        """
+        Flush until the queue is empty. Returns the number of turns written.
+
+        Transient failures are retried after a short pause; every retry counts
+        against ``max_attempts``, so a database that stays down ends in
+        ``dead_letters`` rather than an endless wait.
+        """
+        flushed_before = self.flushed
+        while self._queue:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.warning(f"[TurnWriteBehind] Drain retrying, {len(self._queue)} turns queued: {e!r}")
+                await asyncio.sleep(min(self.interval_seconds, 0.1))
+        return self.flushed - flushed_before
+
+    async def _isolate(self, batch: List[TurnWrite], error: Exception) -> int:
+        """Write each session of a failed batch on its own; dead-letter the ones that still fail."""
+        by_session: Dict[str, List[TurnWrite]] = {}
+        for write in batch:
+            by_session.setdefault(write.session_id, []).append(write)
+        if len(by_session) == 1:
+            self._dead_letter(batch, error)
+            return 0
+
+        written = 0
+        for writes in by_session.values():
+            try:
+                await self._write(writes)
+                written += len(writes)
+            except Exception as e:
+                self._dead_letter(writes, e)
+        return written
+
+    def _dead_letter(self, writes: List[TurnWrite], error: Exception) -> None:
+        self.dead_lettered += len(writes)
+        for write in writes:
+            self.dead_letters.append((write, repr(error)))
+        logger.error(
+            f"[TurnWriteBehind] Dropping {len(writes)} turns of session {writes[0].session_id} "
+            f"({', '.join(w.turn_id for w in writes)}) after {writes[0].attempts + 1} attempts: {error!r}"
+        )
+
+    async def _write(self, batch: List[TurnWrite]) -> None:
+        factory = self._session_factory
+        if factory is None:
+            from core.database import async_session_factory as factory
+
+        async with factory() as db:
+            latest: Dict[str, TurnWrite] = {}
+            for write in batch:
+                db.add_all([
+                    Message(
+                        id=write.user_message_id,
+                        session_id=write.session_id,
+                        turn_number=write.turn_number,
+                        role="user",
+                        content=write.user_message,
+                        stage=write.user_stage,
+                        turn_id=write.turn_id,
+                        status="committed",
+                    ),
+                    Message(
+                        id=write.npc_message_id,
+                        session_id=write.session_id,
+                        turn_number=write.turn_number,
+                        role="npc",
+                        content=write.npc_response,
+                        stage=write.npc_stage,
+                        npc_result={"mood_after": write.npc_mood},
+                        turn_id=write.turn_id,
+                        status="committed",
+                    ),
+                ])
+                latest[write.session_id] = write
+
+            for write in latest.values():
+                await db.execute(
+                    update(Session)
+                    .where(Session.id == write.session_id)
+                    .values(total_turns=write.turn_number, last_activity_at=write.written_at)
+                )
+                if write.update_state:
+                    await db.execute(
+                        update(SessionState)
+                        .where(SessionState.session_id == write.session_id)
+                        .values(
+                            current_stage=write.npc_stage,
+                            turn_count=write.turn_number,
+                            context_snapshot={
+                                "turn": write.turn_number,
+                                "stage": write.npc_stage,
+                                "history_tail": write.history_tail,
+                                "timestamp": write.written_at.isoformat(),
+                            },
+                        )
+                    )
+            await db.commit()
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[TurnWriteBehind] Flush failed, {len(self._queue)} turns queued: {e}")
+
+    def ensure_started(self) -> None:
+        """Start the background flush task if an event loop is running."""
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Cancel the background task and drain what is buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.drain()
+
+
+turn_write_behind = TurnWriteBehind()
@@ -0,0 +1,260 @@
+"""
+Memory Vector Index
+
+语义缓存的L1向量索引 - 连续float32矩阵 + O(1) LRU/TTL
+
+设计要点：
+1. 所有向量（已归一化）存放在一个连续的float32矩阵中，按槽位（slot）寻址
+2. 一次查询 = 一次矩阵-向量乘法 + 掩码 + argmax，不在Python里逐条循环
+3. OrderedDict维护 entry_id -> slot 的LRU顺序，命中/淘汰均为O(1)
+4. 每个槽位记录过期时间和分区编码，过期/跨分区条目在打分时被掩码掉；
+   分区的最后一个条目被删除时回收其编码，分区标签再多也不会无限增长
+5. 矩阵按需倍增扩容，直到容量上限，不预先分配全部内存
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class MemoryVectorIndex:
+    """
+    进程内向量索引（LRU + TTL）
+
+    条目以稳定的 entry_id 标识（同ID覆盖写），相同ID重复写入不会占用新槽位。
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        ttl: Optional[float] = None,
+        initial_rows: int = 64,
+    ):
+        """
+        初始化索引
+
+        Args:
+            capacity: 最大条目数
+            ttl: 默认过期时间（秒），None表示不过期
+            initial_rows: 初始分配的矩阵行数
+        """
+        self.capacity = capacity
+        self.ttl = ttl
+        self.initial_rows = max(1, min(initial_rows, capacity))
+
+        self.dim: Optional[int] = None
+        self._matrix: Optional[np.ndarray] = None
+        self._expires_at = np.zeros(0, dtype=np.float64)
+        self._partition_codes = np.zeros(0, dtype=np.int32)
+
+        self._slots: "OrderedDict[str, int]" = OrderedDict()  # LRU: 最旧在前
+        self._slot_ids: List[Optional[str]] = []
+        self._payloads: List[Any] = []
+        self._free_slots: List[int] = []
+        self._next_slot = 0
+
+        self._partitions: Dict[str, int] = {}
+        self._partition_names: Dict[int, str] = {}
+        self._partition_counts: Dict[int, int] = {}
+        self._free_codes: List[int] = []
+        self._next_code = 1  # 0 表示空槽位
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._slots
+
+    def _acquire_partition(self, partition: str) -> int:
+        """分区引用计数+1，返回其编码（新分区优先复用已回收的编码）"""
+        code = self._partitions.get(partition)
+        if code is None:
+            if self._free_codes:
+                code = self._free_codes.pop()
+            else:
+                code = self._next_code
+                self._next_code += 1
+            self._partitions[partition] = code
+            self._partition_names[code] = partition
+        self._partition_counts[code] = self._partition_counts.get(code, 0) + 1
+        return code
+
+    def _release_partition(self, code: int) -> None:
+        """分区引用计数-1，最后一个条目移除时回收编码"""
+        if code == 0:
+            return
+        remaining = self._partition_counts[code] - 1
+        if remaining:
+            self._partition_counts[code] = remaining
+            return
+        del self._partition_counts[code]
+        del self._partitions[self._partition_names.pop(code)]
+        self._free_codes.append(code)
+
+    def _ensure_rows(self, dim: int, rows: int) -> None:
+        """按需分配/扩容矩阵（倍增，不超过容量）"""
+        if self._matrix is None:
+            self.dim = dim
+            size = max(self.initial_rows, rows)
+            self._matrix = np.zeros((size, dim), dtype=np.float32)
+            self._expires_at = np.zeros(size, dtype=np.float64)
+            self._partition_codes = np.zeros(size, dtype=np.int32)
+            self._slot_ids = [None] * size
+            self._payloads = [None] * size
+            return
+
+        if dim != self.dim:
+            raise ValueError(f"Embedding dimension mismatch: expected {self.dim}, got {dim}")
+
+        current = self._matrix.shape[0]
+        if rows <= current:
+            return
+
+        size = min(self.capacity, max(rows, current * 2))
+        matrix = np.zeros((size, dim), dtype=np.float32)
+        matrix[:current] = self._matrix
+        expires_at = np.zeros(size, dtype=np.float64)
+        expires_at[:current] = self._expires_at
+        codes = np.zeros(size, dtype=np.int32)
+        codes[:current] = self._partition_codes
+
+        self._matrix = matrix
+        self._expires_at = expires_at
+        self._partition_codes = codes
+        self._slot_ids.extend([None] * (size - current))
+        self._payloads.extend([None] * (size - current))
+
+    def _release(self, entry_id: str) -> None:
+        slot = self._slots.pop(entry_id)
+        self._release_partition(int(self._partition_codes[slot]))
+        self._expires_at[slot] = 0.0
+        self._partition_codes[slot] = 0
+        self._slot_ids[slot] = None
+        self._payloads[slot] = None
+        self._free_slots.append(slot)
+
+    def _purge_expired(self, now: float) -> int:
+        """回收已过期的槽位（向量化查找）"""
+        if self._next_slot == 0:
+            return 0
+        expired = np.nonzero(
+            (self._expires_at[: self._next_slot] <= now)
+            & (self._partition_codes[: self._next_slot] != 0)
+        )[0]
+        for slot in expired:
+            entry_id = self._slot_ids[slot]
+            if entry_id is not None:
+                self._release(entry_id)
+        return len(expired)
+
+    def _allocate_slot(self, dim: int) -> int:
+        if len(self._slots) >= self.capacity:
+            if not self._purge_expired(time.time()):
+                # 淘汰最久未使用的条目
+                oldest_id = next(iter(self._slots))
+                self._release(oldest_id)
+
+        if self._free_slots:
+            return self._free_slots.pop()
+
+        slot = self._next_slot
+        self._ensure_rows(dim, slot + 1)
+        self._next_slot += 1
+        return slot
+
+    def add(
+        self,
+        entry_id: str,
+        embedding: np.ndarray,
+        payload: Any,
+        partition: str = "global",
+        ttl: Optional[float] = None,
+    ) -> None:
+        """
+        写入条目
+
+        Args:
+            entry_id: 稳定的条目ID
+            embedding: 已归一化的向量
+            payload: 命中时返回的数据
+            partition: 分区标签
+            ttl: 过期时间（秒），默认使用索引的ttl
+        """
+        vector = np.asarray(embedding, dtype=np.float32)
+        dim = int(vector.shape[0])
+        if self._matrix is None:
+            self._ensure_rows(dim, 1)
+        elif dim != self.dim:
+            raise ValueError(f"Embedding dimension mismatch: expected {self.dim}, got {dim}")
+
+        slot = self._slots.get(entry_id)
+        if slot is None:
+            slot = self._allocate_slot(dim)
+            self._slots[entry_id] = slot
+        else:
+            self._slots.move_to_end(entry_id)
+
+        ttl = self.ttl if ttl is None else ttl
+        previous_code = int(self._partition_codes[slot])
+        self._matrix[slot] = vector
+        self._expires_at[slot] = time.time() + ttl if ttl is not None else np.inf
+        self._partition_codes[slot] = self._acquire_partition(partition)
+        self._release_partition(previous_code)
+        self._slot_ids[slot] = entry_id
+        self._payloads[slot] = payload
+
+    def search(
+        self,
+        embedding: np.ndarray,
+        partition: str = "global",
+        threshold: float = -1.0,
+    ) -> Optional[Tuple[str, float, Any]]:
+        """
+        检索最相似的条目（一次矩阵-向量乘法）
+
+        Args:
+            embedding: 已归一化的查询向量
+            partition: 分区标签
+            threshold: 相似度阈值
+
+        Returns:
+            (entry_id, 相似度, payload)，未命中返回None
+        """
+        code = self._partitions.get(partition)
+        if code is None or not self._slots:
+            return None
+
+        n = self._next_slot
+        scores = self._matrix[:n] @ np.asarray(embedding, dtype=np.float32)
+        valid = (self._partition_codes[:n] == code) & (self._expires_at[:n] > time.time())
+        scores = np.where(valid, scores, -np.inf)
+
+        slot = int(np.argmax(scores))
+        similarity = float(scores[slot])
+        if not np.isfinite(similarity) or similarity < threshold:
+            return None
+
+        entry_id = self._slot_ids[slot]
+        self._slots.move_to_end(entry_id)
+        return entry_id, similarity, self._payloads[slot]
+
+    def remove(self, entry_id: str) -> bool:
+        """删除条目"""
+        if entry_id not in self._slots:
+            return False
+        self._release(entry_id)
+        return True
+
+    def clear(self) -> None:
+        """清空索引（保留已分配的矩阵）"""
+        for entry_id in list(self._slots):
+            self._release(entry_id)
+        self._free_slots.clear()
+        self._next_slot = 0
+        self._partitions.clear()
+        self._partition_names.clear()
+        self._partition_counts.clear()
+        self._free_codes.clear()
+        self._next_code = 1
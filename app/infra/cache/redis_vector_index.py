@@ -0,0 +1,308 @@
+"""
+Redis Vector Index
+
+语义缓存的L2向量索引 - 基于RediSearch HNSW的近似最近邻检索
+
+设计要点：
+1. 每个缓存条目存为一个Hash（partition / embedding / payload），由Redis负责TTL过期
+2. 首选RediSearch向量索引（FT.CREATE ... VECTOR HNSW），KNN查询按partition标签过滤，
+   查询延迟与缓存规模基本无关
+3. Redis未加载RediSearch模块时，降级为按partition分桶的有界候选集：
+   ZSET维护最近写入的N个条目，一次pipeline批量取回后用矩阵乘法计算相似度
+4. 全部使用 redis.asyncio，不阻塞事件循环
+"""
+
+import base64
+import logging
+import time
+from typing import Any, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class RedisVectorIndex:
+    """
+    Redis向量索引（异步）
+
+    条目以 ``{prefix}:{entry_id}`` 的Hash存储，字段：
+        - partition: 分区标签（通常是上下文哈希）
+        - embedding: float32向量（RediSearch模式为原始字节，降级模式为base64）
+        - payload: 调用方的序列化数据（JSON字符串）
+        - created_at: 写入时间戳
+    """
+
+    def __init__(
+        self,
+        redis_client: Any,
+        prefix: str = "semantic_cache",
+        index_name: str = "idx:semantic_cache",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 200,
+        hnsw_ef_runtime: int = 64,
+        fallback_candidates: int = 512,
+    ):
+        """
+        初始化向量索引
+
+        Args:
+            redis_client: redis.asyncio 客户端
+            prefix: 条目键前缀
+            index_name: RediSearch索引名
+            hnsw_m: HNSW图每个节点的邻居数
+            hnsw_ef_construction: HNSW构建时的候选队列大小
+            hnsw_ef_runtime: HNSW查询时的候选队列大小
+            fallback_candidates: 降级模式下每个分区保留的候选条目数
+        """
+        self.redis = redis_client
+        self.prefix = prefix
+        self.index_name = index_name
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.hnsw_ef_runtime = hnsw_ef_runtime
+        self.fallback_candidates = fallback_candidates
+
+        self.dim: Optional[int] = None
+        # None = 尚未探测；True = RediSearch可用；False = 降级模式
+        self.use_search: Optional[bool] = None
+
+    def _entry_key(self, entry_id: str) -> str:
+        return f"{self.prefix}:{entry_id}"
+
+    def _partition_key(self, partition: str) -> str:
+        return f"{self.prefix}:partition:{partition}"
+
+    async def ensure_index(self, dim: int) -> bool:
+        """
+        创建（或复用）RediSearch向量索引
+
+        仅在Redis明确不支持FT命令（unknown command）时降级；连接超时等
+        临时错误直接抛出，下次调用重新探测。已存在的索引维度与 ``dim``
+        不一致时（更换了embedding模型）删除并按新维度重建。
+
+        Args:
+            dim: 向量维度
+
+        Returns:
+            RediSearch是否可用
+        """
+        if self.use_search is not None and self.dim == dim:
+            return self.use_search
+
+        try:
+            await self._create_index(dim)
+            self.use_search = True
+            logger.info(f"RediSearch vector index created: {self.index_name} (dim={dim})")
+        except Exception as e:
+            message = str(e).lower()
+            if "unknown command" in message:
+                self.use_search = False
+                logger.warning(
+                    f"RediSearch unavailable ({e}), using bounded partition scan for L2 cache"
+                )
+            elif "already exists" in message:
+                existing_dim = await self._index_dim()
+                if existing_dim is not None and existing_dim != dim:
+                    logger.warning(
+                        f"RediSearch index {self.index_name} has dim={existing_dim}, "
+                        f"expected {dim}; recreating it"
+                    )
+                    await self.redis.execute_command("FT.DROPINDEX", self.index_name)
+                    await self._create_index(dim)
+                self.use_search = True
+            else:
+                raise
+
+        self.dim = dim
+        return self.use_search
+
+    async def _create_index(self, dim: int) -> None:
+        await self.redis.execute_command(
+            "FT.CREATE", self.index_name,
+            "ON", "HASH",
+            "PREFIX", "1", f"{self.prefix}:",
+            "SCHEMA",
+            "partition", "TAG",
+            "embedding", "VECTOR", "HNSW", "10",
+            "TYPE", "FLOAT32",
+            "DIM", str(dim),
+            "DISTANCE_METRIC", "COSINE",
+            "M", str(self.hnsw_m),
+            "EF_CONSTRUCTION", str(self.hnsw_ef_construction),
+        )
+
+    async def _index_dim(self) -> Optional[int]:
+        """从FT.INFO读取embedding字段的维度（无法确定时返回None）"""
+        info = await self.redis.execute_command("FT.INFO", self.index_name)
+        fields = _pairs(info)
+        for attribute in fields.get("attributes", []) or []:
+            values = _pairs(attribute)
+            if _to_str(values.get("identifier", "")) != "embedding":
+                continue
+            dim = values.get("dim")
+            return int(_to_str(dim)) if dim is not None else None
+        return None
+
+    async def add(
+        self,
+        entry_id: str,
+        partition: str,
+        embedding: np.ndarray,
+        payload: str,
+        ttl: int,
+    ) -> None:
+        """
+        写入条目
+
+        Args:
+            entry_id: 条目ID（同ID覆盖写）
+            partition: 分区标签
+            embedding: 已归一化的float32向量
+            payload: 序列化后的条目数据
+            ttl: 过期时间（秒）
+        """
+        vector = np.ascontiguousarray(embedding, dtype=np.float32)
+        use_search = await self.ensure_index(int(vector.shape[0]))
+        key = self._entry_key(entry_id)
+        now = time.time()
+
+        pipe = self.redis.pipeline(transaction=False)
+        if use_search:
+            pipe.hset(key, mapping={
+                "partition": partition,
+                "embedding": vector.tobytes(),
+                "payload": payload,
+                "created_at": now,
+            })
+            pipe.expire(key, ttl)
+        else:
+            partition_key = self._partition_key(partition)
+            pipe.hset(key, mapping={
+                "partition": partition,
+                "embedding": base64.b64encode(vector.tobytes()).decode("ascii"),
+                "payload": payload,
+                "created_at": now,
+            })
+            pipe.expire(key, ttl)
+            pipe.zadd(partition_key, {entry_id: now})
+            # 只保留最近的N个候选，保证查询代价有界
+            pipe.zremrangebyrank(partition_key, 0, -(self.fallback_candidates + 1))
+            pipe.expire(partition_key, ttl)
+        await pipe.execute()
+
+    async def search(
+        self,
+        embedding: np.ndarray,
+        partition: str,
+        k: int = 1,
+    ) -> List[Tuple[float, str]]:
+        """
+        Top-k检索
+
+        Args:
+            embedding: 已归一化的float32查询向量
+            partition: 分区标签
+            k: 返回条目数
+
+        Returns:
+            [(余弦相似度, payload)]，按相似度降序
+        """
+        vector = np.ascontiguousarray(embedding, dtype=np.float32)
+        if await self.ensure_index(int(vector.shape[0])):
+            return await self._search_index(vector, partition, k)
+        return await self._search_partition(vector, partition, k)
+
+    async def _search_index(
+        self,
+        vector: np.ndarray,
+        partition: str,
+        k: int,
+    ) -> List[Tuple[float, str]]:
+        """RediSearch KNN查询（COSINE距离 = 1 - 相似度）"""
+        query = f"(@partition:{{{partition}}})=>[KNN {k} @embedding $vec EF_RUNTIME {self.hnsw_ef_runtime} AS distance]"
+        raw = await self.redis.execute_command(
+            "FT.SEARCH", self.index_name, query,
+            "PARAMS", "2", "vec", vector.tobytes(),
+            "SORTBY", "distance",
+            "RETURN", "2", "payload", "distance",
+            "LIMIT", "0", str(k),
+            "DIALECT", "2",
+        )
+
+        results: List[Tuple[float, str]] = []
+        # 返回格式: [total, key1, [field, value, ...], key2, [...], ...]
+        for i in range(2, len(raw), 2):
+            fields = raw[i]
+            values = {
+                _to_str(fields[j]): fields[j + 1]
+                for j in range(0, len(fields) - 1, 2)
+            }
+            if "payload" not in values:
+                continue
+            distance = float(_to_str(values.get("distance", 1.0)))
+            results.append((1.0 - distance, _to_str(values["payload"])))
+        return results
+
+    async def _search_partition(
+        self,
+        vector: np.ndarray,
+        partition: str,
+        k: int,
+    ) -> List[Tuple[float, str]]:
+        """降级模式：有界候选集 + 一次pipeline批量读取 + 矩阵乘法打分"""
+        partition_key = self._partition_key(partition)
+        entry_ids = await self.redis.zrevrange(partition_key, 0, self.fallback_candidates - 1)
+        if not entry_ids:
+            return []
+
+        pipe = self.redis.pipeline(transaction=False)
+        for entry_id in entry_ids:
+            pipe.hmget(self._entry_key(_to_str(entry_id)), "embedding", "payload")
+        rows = await pipe.execute()
+
+        vectors: List[np.ndarray] = []
+        payloads: List[str] = []
+        expired: List[str] = []
+        for entry_id, (encoded, payload) in zip(entry_ids, rows):
+            if encoded is None or payload is None:
+                expired.append(_to_str(entry_id))
+                continue
+            vectors.append(np.frombuffer(base64.b64decode(encoded), dtype=np.float32))
+            payloads.append(_to_str(payload))
+
+        if expired:
+            await self.redis.zrem(partition_key, *expired)
+        if not vectors:
+            return []
+
+        scores = np.vstack(vectors) @ vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(float(scores[i]), payloads[i]) for i in top]
+
+    async def clear(self) -> None:
+        """删除全部条目（SCAN分批删除，避免阻塞的KEYS）"""
+        batch: List[Any] = []
+        async for key in self.redis.scan_iter(match=f"{self.prefix}:*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self.redis.delete(*batch)
+                batch = []
+        if batch:
+            await self.redis.delete(*batch)
+
+
+def _to_str(value: Any) -> str:
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return str(value)
+
+
+def _pairs(value: Any) -> dict:
+    """FT.INFO的 [key, value, ...] 列表（或RESP3字典）转为小写键的字典"""
+    if isinstance(value, dict):
+        return {_to_str(k).lower(): v for k, v in value.items()}
+    items = list(value or [])
+    return {_to_str(items[i]).lower(): items[i + 1] for i in range(0, len(items) - 1, 2)}
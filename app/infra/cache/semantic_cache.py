@@ -16,9 +16,13 @@ import time
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
-import redis
+import redis.asyncio as aioredis
 from openai import AsyncOpenAI
 
+from app.infra.cache.memory_vector_index import MemoryVectorIndex
+from app.infra.cache.redis_vector_index import RedisVectorIndex
+from app.infra.search.embedding_service import EmbeddingService
+
 logger = logging.getLogger(__name__)
 
 
@@ -29,9 +33,12 @@ class SemanticCache:
     核心特性：
     1. 语义相似度匹配（不是精确匹配）
     2. 向量检索（使用embedding）
-    3. 多级缓存（内存 + Redis）
+    3. 多级缓存（内存 + Redis向量索引）
     4. 智能过期策略
 
+    L2按上下文分区：带context的查询只会命中同一context写入的条目，
+    不带context的查询落在全局分区。
+
     示例：
         用户问："如何提升销售业绩？"
         缓存中有："怎样提高销售成绩？"
@@ -40,31 +47,50 @@ class SemanticCache:
 
     def __init__(
         self,
-        redis_client: redis.Redis,
+        redis_client: aioredis.Redis,
         openai_client: AsyncOpenAI,
         similarity_threshold: float = 0.85,
         ttl: int = 3600,
         max_memory_cache: int = 100,
+        redis_top_k: int = 4,
+        vector_index: Optional[RedisVectorIndex] = None,
+        embedding_service: Optional[EmbeddingService] = None,
+        embedding_model: str = "text-embedding-3-small",
     ):
         """
         初始化语义缓存
 
         Args:
-            redis_client: Redis客户端
+            redis_client: Redis客户端（redis.asyncio）
             openai_client: OpenAI客户端（用于生成embedding）
             similarity_threshold: 相似度阈值（0-1），超过此值视为命中
             ttl: 缓存过期时间（秒）
             max_memory_cache: 内存缓存最大条目数
+            redis_top_k: L2向量检索返回的候选数
+            vector_index: 可选的自定义L2向量索引
+            embedding_service: 可选的共享embedding服务（记忆化 + 合并 + 微批）
+            embedding_model: embedding模型名
         """
         self.redis = redis_client
         self.openai = openai_client
         self.similarity_threshold = similarity_threshold
         self.ttl = ttl
         self.max_memory_cache = max_memory_cache
+        self.redis_top_k = redis_top_k
 
-        # L1缓存：内存（最快）
-        self.memory_cache: Dict[str, Dict[str, Any]] = {}
-        self.memory_cache_order: List[str] = []  # LRU顺序
+        # L2缓存：Redis向量索引（ANN）
+        self.vector_index = vector_index or RedisVectorIndex(redis_client)
+
+        # get/set对同一查询只会触发一次远程embedding调用
+        self.embedding_model = embedding_model
+        self.embedder = embedding_service or EmbeddingService(
+            self._embed_batch,
+            namespace=embedding_model,
+            ttl=ttl,
+        )
+
+        # L1缓存：内存向量矩阵（最快），按缓存键稳定寻址，O(1) LRU/TTL
+        self.memory_index = MemoryVectorIndex(capacity=max_memory_cache, ttl=ttl)
 
         # 统计信息
         self.stats = {
@@ -100,22 +126,26 @@ class SemanticCache:
         query_embedding = await self._generate_embedding(query)
 
         # 1. 检查内存缓存（L1）
-        memory_result = self._check_memory_cache(query_embedding)
+        memory_result = self._check_memory_cache(query_embedding, context)
         if memory_result:
             self.stats["memory_hits"] += 1
             logger.debug(f"Memory cache hit: {query[:50]}...")
             return memory_result
 
         # 2. 检查Redis缓存（L2）
-        redis_result = await self._check_redis_cache(query_embedding, context)
-        if redis_result:
+        redis_entry = await self._check_redis_cache(query_embedding, context)
+        if redis_entry:
             self.stats["redis_hits"] += 1
             logger.debug(f"Redis cache hit: {query[:50]}...")
 
             # 提升到内存缓存
-            self._add_to_memory_cache(query_embedding, redis_result)
+            self._add_to_memory_cache(
+                self._generate_cache_key(redis_entry["query"], redis_entry.get("context")),
+                np.asarray(redis_entry["embedding"], dtype=np.float32),
+                redis_entry,
+            )
 
-            return redis_result
+            return redis_entry["result"]
 
         # 3. 缓存未命中
         self.stats["misses"] += 1
@@ -153,67 +183,71 @@ class SemanticCache:
         await self._store_to_redis(cache_key, cache_entry)
 
         # 存储到内存缓存
-        self._add_to_memory_cache(query_embedding, cache_entry)
+        self._add_to_memory_cache(cache_key, query_embedding, cache_entry)
 
         logger.debug(f"Cached: {query[:50]}...")
 
     async def _generate_embedding(self, text: str) -> np.ndarray:
         """
-        生成文本的embedding向量
+        生成文本的embedding向量（经由共享embedding服务）
 
         Args:
             text: 输入文本
 
         Returns:
-            Embedding向量（numpy数组）
+            归一化后的Embedding向量（float32，只读）
         """
         try:
-            response = await self.openai.embeddings.create(
-                model="text-embedding-3-small",  # 更快更便宜
-                input=text,
-            )
-
-            embedding = np.array(response.data[0].embedding)
-            return embedding
-
+            return await self.embedder.embed(text)
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise
 
+    async def _embed_batch(self, texts: List[str]) -> List[np.ndarray]:
+        """
+        批量调用embedding API
+
+        Args:
+            texts: 输入文本列表
+
+        Returns:
+            归一化后的Embedding向量列表
+        """
+        response = await self.openai.embeddings.create(
+            model=self.embedding_model,  # 默认 text-embedding-3-small，更快更便宜
+            input=texts,
+        )
+
+        embeddings = np.asarray([item.embedding for item in response.data], dtype=np.float32)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return list(embeddings / norms)
+
     def _check_memory_cache(
         self,
         query_embedding: np.ndarray,
+        context: Optional[Dict[str, Any]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
-        检查内存缓存
+        检查内存缓存（一次矩阵-向量乘法 + argmax）
 
         Args:
             query_embedding: 查询的embedding
+            context: 上下文信息
 
         Returns:
             缓存结果或None
         """
-        best_similarity = 0.0
-        best_entry = None
-
-        for cache_key, entry in self.memory_cache.items():
-            cached_embedding = np.array(entry["embedding"])
-            similarity = self._cosine_similarity(query_embedding, cached_embedding)
-
-            if similarity > best_similarity and similarity >= self.similarity_threshold:
-                best_similarity = similarity
-                best_entry = entry
-
-        if best_entry:
-            # 更新LRU顺序
-            cache_key = self._embedding_to_key(best_entry["embedding"])
-            if cache_key in self.memory_cache_order:
-                self.memory_cache_order.remove(cache_key)
-            self.memory_cache_order.append(cache_key)
+        hit = self.memory_index.search(
+            query_embedding,
+            partition=self._context_partition(context),
+            threshold=self.similarity_threshold,
+        )
+        if hit is None:
+            return None
 
-            return best_entry["result"]
-
-        return None
+        _, _, entry = hit
+        return entry["result"]
 
     async def _check_redis_cache(
         self,
@@ -221,7 +255,7 @@ class SemanticCache:
         context: Optional[Dict[str, Any]] = None,
     ) -> Optional[Dict[str, Any]]:
         """
-        检查Redis缓存
+        检查Redis缓存（向量索引Top-k检索）
 
         Args:
             query_embedding: 查询的embedding
@@ -231,39 +265,19 @@ class SemanticCache:
             缓存结果或None
         """
         try:
-            # 获取所有缓存键
-            pattern = "semantic_cache:*"
-            keys = self.redis.keys(pattern)
-
-            if not keys:
-                return None
-
-            best_similarity = 0.0
-            best_entry = None
+            candidates = await self.vector_index.search(
+                query_embedding,
+                partition=self._context_partition(context),
+                k=self.redis_top_k,
+            )
 
-            # 遍历所有缓存条目
-            for key in keys:
-                entry_json = self.redis.get(key)
-                if not entry_json:
-                    continue
+            for similarity, entry_json in candidates:
+                if similarity < self.similarity_threshold:
+                    break
 
                 entry = json.loads(entry_json)
-
-                # 检查上下文匹配
-                if context and entry.get("context") != context:
-                    continue
-
-                # 计算相似度
-                cached_embedding = np.array(entry["embedding"])
-                similarity = self._cosine_similarity(query_embedding, cached_embedding)
-
-                if similarity > best_similarity and similarity >= self.similarity_threshold:
-                    best_similarity = similarity
-                    best_entry = entry
-
-            if best_entry:
-                logger.debug(f"Redis cache hit with similarity: {best_similarity:.3f}")
-                return best_entry["result"]
+                logger.debug(f"Redis cache hit with similarity: {similarity:.3f}")
+                return entry
 
             return None
 
@@ -284,17 +298,20 @@ class SemanticCache:
             cache_entry: 缓存条目
         """
         try:
-            entry_json = json.dumps(cache_entry)
-            self.redis.setex(
-                f"semantic_cache:{cache_key}",
-                self.ttl,
-                entry_json,
+            embedding = np.asarray(cache_entry["embedding"], dtype=np.float32)
+            await self.vector_index.add(
+                entry_id=cache_key,
+                partition=self._context_partition(cache_entry.get("context")),
+                embedding=embedding,
+                payload=json.dumps(cache_entry),
+                ttl=self.ttl,
             )
         except Exception as e:
             logger.error(f"Failed to store to Redis: {e}")
 
     def _add_to_memory_cache(
         self,
+        cache_key: str,
         embedding: np.ndarray,
         entry: Dict[str, Any],
     ) -> None:
@@ -302,47 +319,16 @@ class SemanticCache:
         添加到内存缓存（LRU）
 
         Args:
+            cache_key: 缓存键（同一查询+上下文稳定不变）
             embedding: Embedding向量
             entry: 缓存条目
         """
-        cache_key = self._embedding_to_key(embedding)
-
-        # 如果已存在，更新
-        if cache_key in self.memory_cache:
-            self.memory_cache_order.remove(cache_key)
-        # 如果缓存满了，删除最旧的
-        elif len(self.memory_cache) >= self.max_memory_cache:
-            oldest_key = self.memory_cache_order.pop(0)
-            del self.memory_cache[oldest_key]
-
-        # 添加新条目
-        self.memory_cache[cache_key] = entry
-        self.memory_cache_order.append(cache_key)
-
-    def _cosine_similarity(
-        self,
-        vec1: np.ndarray,
-        vec2: np.ndarray,
-    ) -> float:
-        """
-        计算余弦相似度
-
-        Args:
-            vec1: 向量1
-            vec2: 向量2
-
-        Returns:
-            相似度（0-1）
-        """
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-
-        similarity = dot_product / (norm1 * norm2)
-        return float(similarity)
+        self.memory_index.add(
+            cache_key,
+            embedding,
+            entry,
+            partition=self._context_partition(entry.get("context")),
+        )
 
     def _generate_cache_key(
         self,
@@ -365,19 +351,19 @@ class SemanticCache:
 
         return hashlib.md5(content.encode()).hexdigest()
 
-    def _embedding_to_key(self, embedding: List[float]) -> str:
+    def _context_partition(self, context: Optional[Dict[str, Any]] = None) -> str:
         """
-        将embedding转换为缓存键
+        生成上下文分区标签
 
         Args:
-            embedding: Embedding向量
+            context: 上下文
 
         Returns:
-            缓存键
+            分区标签（十六进制哈希，可直接用作RediSearch TAG）
         """
-        # 使用前10个维度生成键（足够区分）
-        key_data = str(embedding[:10])
-        return hashlib.md5(key_data.encode()).hexdigest()
+        if not context:
+            return "global"
+        return hashlib.md5(json.dumps(context, sort_keys=True).encode()).hexdigest()
 
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -396,19 +382,16 @@ class SemanticCache:
         return {
             **self.stats,
             "hit_rate": hit_rate,
-            "memory_cache_size": len(self.memory_cache),
+            "memory_cache_size": len(self.memory_index),
+            "embedding": self.embedder.get_stats(),
         }
 
-    def clear(self) -> None:
+    async def clear(self) -> None:
         """清空缓存"""
-        self.memory_cache.clear()
-        self.memory_cache_order.clear()
+        self.memory_index.clear()
 
         # 清空Redis缓存
-        pattern = "semantic_cache:*"
-        keys = self.redis.keys(pattern)
-        if keys:
-            self.redis.delete(*keys)
+        await self.vector_index.clear()
 
         logger.info("Cache cleared")
 
@@ -538,11 +521,10 @@ class PredictiveCache:
 # 使用示例
 async def example_usage():
     """使用示例"""
-    import redis.asyncio as aioredis
     from openai import AsyncOpenAI
 
     # 初始化
-    redis_client = redis.Redis(host="localhost", port=6379, db=0)
+    redis_client = aioredis.Redis(host="localhost", port=6379, db=0)
     openai_client = AsyncOpenAI(api_key="sk-...")
 
     cache = SemanticCache(
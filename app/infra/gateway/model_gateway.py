@@ -161,6 +161,7 @@ class ModelGateway:
 
             logger.info(f"Streaming via {selected_config.provider}/{selected_config.model_name}")
 
+            emitted = False
             while True:
                 try:
                     messages = []
@@ -183,11 +184,16 @@ class ModelGateway:
                             yield chunk
 
                     async for chunk in streaming_guard.audit_stream(audited_stream()):
+                        emitted = True
                         yield chunk
                     return
 
                 except Exception as e:
                     logger.error(f"Streaming failed: {e}")
+                    if emitted:
+                        # The consumer already has part of the reply; a retry or
+                        # the mock fallback would replay it from the start
+                        raise
                     if error_recovery.should_retry(e):
                         delay = error_recovery.get_retry_delay()
                         await asyncio.sleep(delay)
@@ -195,6 +195,181 @@ class BGEM3Encoder:
         return results[0]
 
 
+class BGEM3CorpusIndex:
+    """
+    Prebuilt corpus index for dual-path scoring.
+
+    Holds every document's dense vector L2-normalized in one float32 matrix
+    and its lexical weights in CSR layout (row-contiguous token ids and
+    weights plus row pointers). A query then costs one dense GEMV and one
+    sparse mat-vec. Storage grows geometrically, so adding documents is
+    amortized O(batch); removed documents are masked out of scoring and
+    the storage is compacted once they exceed ``compact_threshold`` of the
+    rows, so churn does not keep dead rows in every query.
+
+    Args:
+        dense_dim: Dense vector dimension (default: inferred from first document)
+        compact_threshold: Fraction of dead rows that triggers compaction (default: 0.25)
+    """
+
+    def __init__(self, dense_dim: Optional[int] = None, compact_threshold: float = 0.25):
+        self.dense_dim = dense_dim
+        self.compact_threshold = compact_threshold
+        self.documents: List[Optional[Dict[str, Any]]] = []
+        self._row_by_id: Dict[str, int] = {}
+
+        self._dense = np.zeros((0, dense_dim or 0), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+
+        # CSR storage; _rows repeats each row id per non-zero so the
+        # sparse mat-vec is a single bincount
+        self._indptr: List[int] = [0]
+        self._indices = np.zeros(0, dtype=np.int64)
+        self._data = np.zeros(0, dtype=np.float32)
+        self._rows = np.zeros(0, dtype=np.int64)
+        self._nnz = 0
+        self._vocab_size = 0
+
+    def __len__(self) -> int:
+        return len(self._row_by_id)
+
+    @property
+    def num_rows(self) -> int:
+        return len(self.documents)
+
+    @staticmethod
+    def _grow(array: np.ndarray, size: int) -> np.ndarray:
+        if size <= array.shape[0]:
+            return array
+        new_size = max(size, array.shape[0] * 2, 16)
+        grown = np.zeros((new_size,) + array.shape[1:], dtype=array.dtype)
+        grown[: array.shape[0]] = array
+        return grown
+
+    def add_documents(self, documents: List[Dict[str, Any]]) -> None:
+        """
+        Append documents with "id", "dense_vector" and "sparse_vector".
+
+        A document whose id is already indexed replaces the previous version.
+        """
+        if not documents:
+            return
+
+        if self.dense_dim is None:
+            self.dense_dim = len(documents[0]["dense_vector"])
+            self._dense = np.zeros((0, self.dense_dim), dtype=np.float32)
+
+        dense = np.asarray([doc["dense_vector"] for doc in documents], dtype=np.float32)
+        if dense.ndim != 2 or dense.shape[1] != self.dense_dim:
+            raise ValueError(f"Expected dense vectors of dimension {self.dense_dim}")
+        dense /= np.linalg.norm(dense, axis=1, keepdims=True) + 1e-8
+
+        start = self.num_rows
+        end = start + len(documents)
+        self._dense = self._grow(self._dense, end)
+        self._alive = self._grow(self._alive, end)
+        self._dense[start:end] = dense
+        self._alive[start:end] = True
+
+        indices: List[int] = []
+        data: List[float] = []
+        rows: List[int] = []
+        for offset, doc in enumerate(documents):
+            doc_id = str(doc["id"])
+            previous = self._row_by_id.get(doc_id)
+            if previous is not None:
+                self._alive[previous] = False
+                self.documents[previous] = None
+            self._row_by_id[doc_id] = start + offset
+            self.documents.append(doc)
+
+            for token_id, weight in (doc.get("sparse_vector") or {}).items():
+                indices.append(int(token_id))
+                data.append(float(weight))
+                rows.append(start + offset)
+            self._indptr.append(self._nnz + len(indices))
+
+        nnz_end = self._nnz + len(indices)
+        self._indices = self._grow(self._indices, nnz_end)
+        self._data = self._grow(self._data, nnz_end)
+        self._rows = self._grow(self._rows, nnz_end)
+        self._indices[self._nnz:nnz_end] = indices
+        self._data[self._nnz:nnz_end] = data
+        self._rows[self._nnz:nnz_end] = rows
+        self._nnz = nnz_end
+        if indices:
+            self._vocab_size = max(self._vocab_size, max(indices) + 1)
+        self._maybe_compact()
+
+    def remove_documents(self, ids: List[str]) -> int:
+        """Mask documents out of scoring. Returns the number removed."""
+        removed = 0
+        for doc_id in ids:
+            row = self._row_by_id.pop(str(doc_id), None)
+            if row is not None:
+                self._alive[row] = False
+                self.documents[row] = None
+                removed += 1
+        if removed:
+            self._maybe_compact()
+        return removed
+
+    def _maybe_compact(self) -> None:
+        dead = self.num_rows - len(self._row_by_id)
+        if dead and dead > self.compact_threshold * self.num_rows:
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop dead rows from the dense matrix and CSR storage."""
+        n = self.num_rows
+        keep = np.nonzero(self._alive[:n])[0]
+        if keep.shape[0] == n:
+            return
+
+        new_row = np.full(n, -1, dtype=np.int64)
+        new_row[keep] = np.arange(keep.shape[0])
+
+        nnz = self._nnz
+        live = self._alive[self._rows[:nnz]]
+        rows = new_row[self._rows[:nnz][live]]
+        counts = np.bincount(rows, minlength=keep.shape[0])
+
+        self._dense = self._dense[keep]
+        self._alive = np.ones(keep.shape[0], dtype=bool)
+        self._indices = self._indices[:nnz][live]
+        self._data = self._data[:nnz][live]
+        self._rows = rows
+        self._nnz = int(rows.shape[0])
+        self._indptr = [0] + np.cumsum(counts).tolist()
+        self.documents = [self.documents[row] for row in keep]
+        self._row_by_id = {doc_id: int(new_row[row]) for doc_id, row in self._row_by_id.items()}
+
+    def dense_scores(self, query_vector: List[float]) -> np.ndarray:
+        """Cosine similarity of the query against every row (one GEMV)."""
+        query = np.asarray(query_vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) + 1e-8)
+        return self._dense[: self.num_rows] @ query
+
+    def sparse_scores(self, query_sparse: Dict[Any, float]) -> np.ndarray:
+        """Lexical-weight dot product against every row (one sparse mat-vec)."""
+        n = self.num_rows
+        if not query_sparse or self._nnz == 0:
+            return np.zeros(n, dtype=np.float32)
+
+        query = np.zeros(self._vocab_size, dtype=np.float32)
+        for token_id, weight in query_sparse.items():
+            token_id = int(token_id)
+            if token_id < self._vocab_size:
+                query[token_id] = weight
+
+        nnz = self._nnz
+        contributions = self._data[:nnz] * query[self._indices[:nnz]]
+        return np.bincount(self._rows[:nnz], weights=contributions, minlength=n).astype(np.float32)
+
+    def alive_mask(self) -> np.ndarray:
+        return self._alive[: self.num_rows]
+
+
 class BGEM3DualPathRetriever:
     """
     Dual-path retriever using BGE-M3.
@@ -205,6 +380,10 @@ class BGEM3DualPathRetriever:
 
     Fusion strategy: Weighted sum or RRF (Reciprocal Rank Fusion)
 
+    Documents indexed with ``index_documents``/``add_documents`` live in a
+    BGEM3CorpusIndex, so ``retrieve`` does not rebuild or renormalize
+    document vectors per query.
+
     Args:
         encoder: BGE-M3 encoder instance
         dense_weight: Weight for dense retrieval (default: 0.5)
@@ -226,6 +405,7 @@ class BGEM3DualPathRetriever:
         self.sparse_weight = sparse_weight
         self.fusion_method = fusion_method
         self.rrf_k = rrf_k
+        self.index = BGEM3CorpusIndex()
 
         # Validate weights
         if abs(dense_weight + sparse_weight - 1.0) > 0.01:
@@ -237,6 +417,24 @@ class BGEM3DualPathRetriever:
             self.dense_weight = dense_weight / total
             self.sparse_weight = sparse_weight / total
 
+    def index_documents(self, documents: List[Dict[str, Any]]) -> None:
+        """
+        Replace the prebuilt corpus index.
+
+        Args:
+            documents: List of documents with "id", "content", "dense_vector", "sparse_vector"
+        """
+        self.index = BGEM3CorpusIndex()
+        self.index.add_documents(documents)
+
+    def add_documents(self, documents: List[Dict[str, Any]]) -> None:
+        """Incrementally add documents to the prebuilt corpus index."""
+        self.index.add_documents(documents)
+
+    def remove_documents(self, ids: List[str]) -> int:
+        """Remove documents from the prebuilt corpus index."""
+        return self.index.remove_documents(ids)
+
     def compute_dense_similarity(
         self,
         query_vector: List[float],
@@ -252,15 +450,15 @@ class BGEM3DualPathRetriever:
         Returns:
             List of similarity scores
         """
-        query_np = np.array(query_vector)
-        doc_np = np.array(doc_vectors)
+        query_np = np.asarray(query_vector, dtype=np.float32)
+        doc_np = np.asarray(doc_vectors, dtype=np.float32)
 
         # Normalize
         query_norm = query_np / (np.linalg.norm(query_np) + 1e-8)
         doc_norm = doc_np / (np.linalg.norm(doc_np, axis=1, keepdims=True) + 1e-8)
 
         # Cosine similarity
-        similarities = np.dot(doc_norm, query_norm)
+        similarities = doc_norm @ query_norm
 
         return similarities.tolist()
 
@@ -272,7 +470,7 @@ class BGEM3DualPathRetriever:
         """
         Compute similarity for sparse vectors.
 
-        Uses dot product of sparse vectors.
+        Uses dot product of sparse vectors (one CSR mat-vec).
 
         Args:
             query_sparse: Query sparse vector
@@ -281,18 +479,43 @@ class BGEM3DualPathRetriever:
         Returns:
             List of similarity scores
         """
-        scores = []
+        index = BGEM3CorpusIndex(dense_dim=0)
+        index.add_documents([
+            {"id": i, "dense_vector": [], "sparse_vector": sparse}
+            for i, sparse in enumerate(doc_sparse_list)
+        ])
+        return index.sparse_scores(query_sparse).tolist()
+
+    def _fuse_arrays(
+        self,
+        dense_scores: np.ndarray,
+        sparse_scores: np.ndarray,
+    ) -> np.ndarray:
+        """Fuse score arrays into one fused score per document."""
+        if self.fusion_method == "weighted":
+            return self.dense_weight * dense_scores + self.sparse_weight * sparse_scores
+
+        elif self.fusion_method == "rrf":
+            # RRF (Reciprocal Rank Fusion) over the full rankings
+            n = dense_scores.shape[0]
+            dense_ranks = np.empty(n, dtype=np.float64)
+            dense_ranks[np.argsort(-dense_scores, kind="stable")] = np.arange(n)
+            sparse_ranks = np.empty(n, dtype=np.float64)
+            sparse_ranks[np.argsort(-sparse_scores, kind="stable")] = np.arange(n)
 
-        for doc_sparse in doc_sparse_list:
-            # Compute dot product
-            score = 0.0
-            for token_id, weight in query_sparse.items():
-                if token_id in doc_sparse:
-                    score += weight * doc_sparse[token_id]
+            return 1.0 / (self.rrf_k + dense_ranks + 1) + 1.0 / (self.rrf_k + sparse_ranks + 1)
 
-            scores.append(score)
+        else:
+            raise ValueError(f"Unknown fusion method: {self.fusion_method}")
 
-        return scores
+    @staticmethod
+    def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+        """Indices of the k best scores, best first."""
+        k = min(k, scores.shape[0])
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind="stable")]
 
     def fuse_scores(
         self,
@@ -311,55 +534,17 @@ class BGEM3DualPathRetriever:
         Returns:
             List of (doc_id, fused_score) tuples, sorted by score descending
         """
-        if self.fusion_method == "weighted":
-            # Weighted sum
-            fused_scores = [
-                self.dense_weight * d + self.sparse_weight * s
-                for d, s in zip(dense_scores, sparse_scores)
-            ]
-
-            results = list(zip(doc_ids, fused_scores))
-            results.sort(key=lambda x: x[1], reverse=True)
-
-            return results
-
-        elif self.fusion_method == "rrf":
-            # RRF (Reciprocal Rank Fusion)
-            # Sort by dense scores
-            dense_ranked = sorted(
-                enumerate(dense_scores), key=lambda x: x[1], reverse=True
-            )
-            dense_ranks = {idx: rank for rank, (idx, _) in enumerate(dense_ranked)}
-
-            # Sort by sparse scores
-            sparse_ranked = sorted(
-                enumerate(sparse_scores), key=lambda x: x[1], reverse=True
-            )
-            sparse_ranks = {idx: rank for rank, (idx, _) in enumerate(sparse_ranked)}
-
-            # Compute RRF scores
-            rrf_scores = []
-            for idx in range(len(doc_ids)):
-                dense_rank = dense_ranks.get(idx, len(doc_ids))
-                sparse_rank = sparse_ranks.get(idx, len(doc_ids))
-
-                rrf_score = (1.0 / (self.rrf_k + dense_rank + 1)) + (
-                    1.0 / (self.rrf_k + sparse_rank + 1)
-                )
-                rrf_scores.append(rrf_score)
-
-            results = list(zip(doc_ids, rrf_scores))
-            results.sort(key=lambda x: x[1], reverse=True)
-
-            return results
-
-        else:
-            raise ValueError(f"Unknown fusion method: {self.fusion_method}")
+        fused = self._fuse_arrays(
+            np.asarray(dense_scores, dtype=np.float64),
+            np.asarray(sparse_scores, dtype=np.float64),
+        )
+        order = np.argsort(-fused, kind="stable")
+        return [(doc_ids[i], float(fused[i])) for i in order]
 
     async def retrieve(
         self,
         query: str,
-        documents: List[Dict[str, Any]],
+        documents: Optional[List[Dict[str, Any]]] = None,
         top_k: int = 5,
     ) -> List[Dict[str, Any]]:
         """
@@ -367,7 +552,8 @@ class BGEM3DualPathRetriever:
 
         Args:
             query: Search query
-            documents: List of documents with "id", "content", "dense_vector", "sparse_vector"
+            documents: Optional ad-hoc list of documents with "id", "content",
+                "dense_vector", "sparse_vector"; defaults to the prebuilt index
             top_k: Number of results to return
 
         Returns:
@@ -381,34 +567,34 @@ class BGEM3DualPathRetriever:
             return_colbert=False,
         )
 
-        # Extract document vectors
-        doc_ids = [doc["id"] for doc in documents]
-        doc_dense = [doc["dense_vector"] for doc in documents]
-        doc_sparse = [doc["sparse_vector"] for doc in documents]
+        if documents is not None:
+            # Ad-hoc corpus: build a throwaway index for this call
+            index = BGEM3CorpusIndex()
+            index.add_documents(documents)
+        else:
+            index = self.index
 
-        # Compute dense similarities
-        dense_scores = self.compute_dense_similarity(
-            query_embedding.dense_vector, doc_dense
-        )
+        if index.num_rows == 0:
+            return []
 
-        # Compute sparse similarities
-        sparse_scores = self.compute_sparse_similarity(
-            query_embedding.sparse_vector, doc_sparse
-        )
+        dense_scores = index.dense_scores(query_embedding.dense_vector)
+        sparse_scores = index.sparse_scores(query_embedding.sparse_vector)
 
-        # Fuse scores
-        fused_results = self.fuse_scores(dense_scores, sparse_scores, doc_ids)
+        alive = index.alive_mask()
+        if not alive.all():
+            rows = np.nonzero(alive)[0]
+            dense_scores, sparse_scores = dense_scores[rows], sparse_scores[rows]
+        else:
+            rows = np.arange(index.num_rows)
 
-        # Return top-k
-        top_results = fused_results[:top_k]
+        # Fuse scores and take top-k
+        fused = self._fuse_arrays(dense_scores, sparse_scores)
+        top = self._top_k(fused, top_k)
 
-        # Build result documents
-        doc_map = {doc["id"]: doc for doc in documents}
         results = []
-
-        for doc_id, score in top_results:
-            doc = doc_map[doc_id].copy()
-            doc["score"] = score
+        for i in top:
+            doc = index.documents[rows[i]].copy()
+            doc["score"] = float(fused[i])
             results.append(doc)
 
         logger.info(
@@ -0,0 +1,443 @@
+"""
+Incremental Inverted Index for BM25 retrieval.
+
+Native replacement for ``rank_bm25.BM25Okapi`` full rebuilds:
+
+- Postings lists (doc slot + term frequency) per term, appended in O(doc length)
+- Corpus statistics (live document count, total length, document frequency)
+  updated on add/delete; deleted slots are tombstoned and compacted lazily
+- Term-at-a-time MaxScore pruning: once ``top_k`` candidates exist, terms whose
+  remaining upper bound cannot lift a new document into the top-k only update
+  existing candidates
+- On-disk snapshot of flat numpy arrays that can be memory-mapped on load
+- Per-field/value slot lists for metadata, turned into boolean masks that
+  are AND-ed into the score vector
+"""
+import json
+import logging
+import math
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class _Postings:
+    """
+    Postings list for one term.
+
+    ``base_*`` hold a (possibly memory-mapped) snapshot segment, the
+    ``array`` tails receive documents added after the snapshot.
+    """
+
+    __slots__ = ("base_docs", "base_tfs", "docs", "tfs", "max_tf")
+
+    def __init__(
+        self,
+        base_docs: Optional[np.ndarray] = None,
+        base_tfs: Optional[np.ndarray] = None,
+        max_tf: float = 0.0,
+    ):
+        self.base_docs = base_docs
+        self.base_tfs = base_tfs
+        self.docs = array("i")
+        self.tfs = array("f")
+        self.max_tf = max_tf
+
+    def append(self, slot: int, tf: float) -> None:
+        self.docs.append(slot)
+        self.tfs.append(tf)
+        if tf > self.max_tf:
+            self.max_tf = tf
+
+    def __len__(self) -> int:
+        base = len(self.base_docs) if self.base_docs is not None else 0
+        return base + len(self.docs)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (doc slots, term frequencies) as numpy arrays."""
+        tail_docs = np.frombuffer(self.docs, dtype=np.int32) if self.docs else None
+        tail_tfs = np.frombuffer(self.tfs, dtype=np.float32) if self.tfs else None
+
+        if self.base_docs is None:
+            if tail_docs is None:
+                return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+            return tail_docs, tail_tfs
+        if tail_docs is None:
+            return self.base_docs, self.base_tfs
+        return (
+            np.concatenate([self.base_docs, tail_docs]),
+            np.concatenate([self.base_tfs, tail_tfs]),
+        )
+
+
+def _is_indexable(value: Any) -> bool:
+    return isinstance(value, (str, int, float, bool))
+
+
+class MetadataIndex:
+    """
+    Metadata filter index: (field, value) -> ascending list of slots.
+
+    Slots are only ever appended, so each list stays sorted. Deleted slots
+    are not removed here; callers combine the mask with the live-slot mask.
+    Non-scalar values (lists, dicts, None) are not indexed and make
+    ``mask`` fall back to the caller's generic filter path.
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, Dict[Hashable, array]] = {}
+
+    def add(self, slot: int, metadata: Dict[str, Any]) -> None:
+        for key, value in metadata.items():
+            if _is_indexable(value):
+                field = self._slots.setdefault(key, {})
+                slots = field.get(value)
+                if slots is None:
+                    slots = field[value] = array("i")
+                slots.append(slot)
+
+    def mask(self, filters: Dict[str, Any], num_slots: int) -> Optional[np.ndarray]:
+        """
+        Build a boolean slot mask for ``filters``.
+
+        A scalar filter value means equality, a list/tuple/set means "any of".
+
+        Args:
+            filters: Metadata filters
+            num_slots: Length of the mask
+
+        Returns:
+            Boolean mask, or None if a filter value cannot be served by the index
+        """
+        result: Optional[np.ndarray] = None
+        for key, value in filters.items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            if not all(_is_indexable(v) for v in values):
+                return None
+
+            field = self._slots.get(key, {})
+            field_mask = np.zeros(num_slots, dtype=bool)
+            for v in values:
+                slots = field.get(v)
+                if slots:
+                    field_mask[np.frombuffer(slots, dtype=np.int32)] = True
+
+            result = field_mask if result is None else result & field_mask
+            if not result.any():
+                break
+        return result
+
+    def remap(self, remap: np.ndarray) -> None:
+        """Apply a slot renumbering produced by ``InvertedIndexBM25.compact``."""
+        for key, field in list(self._slots.items()):
+            for value, slots in list(field.items()):
+                new = remap[np.frombuffer(slots, dtype=np.int32)]
+                new = new[new >= 0]
+                if new.size:
+                    field[value] = array("i", new.astype(np.int32).tobytes())
+                else:
+                    del field[value]
+            if not field:
+                del self._slots[key]
+
+    def clear(self) -> None:
+        self._slots = {}
+
+
+class InvertedIndexBM25:
+    """
+    Incremental BM25 inverted index.
+
+    Documents are addressed by internal integer slots. Callers map their own
+    document IDs to slots; ``add`` returns the slot assigned to a document.
+    """
+
+    SNAPSHOT_VERSION = 1
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, compact_ratio: float = 0.25):
+        """
+        Initialize empty index.
+
+        Args:
+            k1: BM25 k1 parameter (term frequency saturation)
+            b: BM25 b parameter (length normalization)
+            compact_ratio: Rebuild postings when this fraction of slots is deleted
+        """
+        self.k1 = k1
+        self.b = b
+        self.compact_ratio = compact_ratio
+
+        self._postings: Dict[str, _Postings] = {}
+        self._df: Dict[str, int] = {}
+        self._doc_len = array("f")
+        self._alive = array("b")
+
+        self.num_docs = 0
+        self.total_len = 0.0
+        self.num_deleted = 0
+
+    @property
+    def num_slots(self) -> int:
+        return len(self._alive)
+
+    @property
+    def avgdl(self) -> float:
+        return self.total_len / self.num_docs if self.num_docs else 0.0
+
+    def add(self, tokens: Sequence[str]) -> int:
+        """
+        Index one document.
+
+        Args:
+            tokens: Document tokens
+
+        Returns:
+            Slot assigned to the document
+        """
+        slot = len(self._alive)
+        counts: Dict[str, int] = {}
+        for token in tokens:
+            counts[token] = counts.get(token, 0) + 1
+
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.append(slot, float(tf))
+            self._df[term] = self._df.get(term, 0) + 1
+
+        self._doc_len.append(float(len(tokens)))
+        self._alive.append(1)
+        self.num_docs += 1
+        self.total_len += len(tokens)
+        return slot
+
+    def delete(self, slot: int, tokens: Sequence[str]) -> bool:
+        """
+        Tombstone a document slot and update corpus statistics.
+
+        Args:
+            slot: Slot returned by ``add``
+            tokens: The tokens the document was indexed with
+
+        Returns:
+            True if the slot was live
+        """
+        if slot < 0 or slot >= len(self._alive) or not self._alive[slot]:
+            return False
+
+        self._alive[slot] = 0
+        for term in set(tokens):
+            remaining = self._df.get(term, 0) - 1
+            if remaining > 0:
+                self._df[term] = remaining
+            else:
+                self._df.pop(term, None)
+        self.num_docs -= 1
+        self.total_len -= self._doc_len[slot]
+        self.num_deleted += 1
+        return True
+
+    def needs_compaction(self) -> bool:
+        return self.num_slots > 0 and self.num_deleted / self.num_slots > self.compact_ratio
+
+    def compact(self) -> np.ndarray:
+        """
+        Drop tombstoned slots and renumber the remaining ones.
+
+        Returns:
+            Array mapping old slot -> new slot (-1 for deleted slots)
+        """
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        remap = np.full(alive.size, -1, dtype=np.int32)
+        remap[alive] = np.arange(int(alive.sum()), dtype=np.int32)
+
+        postings: Dict[str, _Postings] = {}
+        for term, old in self._postings.items():
+            docs, tfs = old.arrays()
+            keep = alive[docs]
+            if not keep.any():
+                continue
+            new = _Postings()
+            new.docs = array("i", remap[docs[keep]].astype(np.int32).tobytes())
+            kept_tfs = np.asarray(tfs[keep], dtype=np.float32)
+            new.tfs = array("f", kept_tfs.tobytes())
+            new.max_tf = float(kept_tfs.max())
+            postings[term] = new
+
+        doc_len = np.frombuffer(self._doc_len, dtype=np.float32)[alive]
+        self._postings = postings
+        self._doc_len = array("f", doc_len.tobytes())
+        self._alive = array("b", np.ones(doc_len.size, dtype=np.int8).tobytes())
+        self.num_deleted = 0
+
+        logger.info(f"BM25 index compacted: {alive.size} -> {doc_len.size} slots")
+        return remap
+
+    def idf(self, term: str) -> float:
+        """Lucene-style BM25 IDF (always positive)."""
+        df = self._df.get(term, 0)
+        return math.log(1.0 + (self.num_docs - df + 0.5) / (df + 0.5))
+
+    def _upper_bound(self, term: str, idf: float) -> float:
+        """Max contribution of ``term`` to any document (tf=max_tf, shortest length)."""
+        max_tf = self._postings[term].max_tf
+        return idf * max_tf * (self.k1 + 1.0) / (max_tf + self.k1 * (1.0 - self.b))
+
+    def top_k(
+        self,
+        query_tokens: Iterable[str],
+        k: int,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Score matching documents and return the best ``k``.
+
+        Args:
+            query_tokens: Query tokens (duplicates add weight, as in BM25Okapi)
+            k: Number of results
+            allowed: Optional boolean mask over slots restricting the result set
+
+        Returns:
+            [(slot, score)] sorted by descending score
+        """
+        if k <= 0 or self.num_docs == 0:
+            return []
+
+        weights: Dict[str, int] = {}
+        for token in query_tokens:
+            if token in self._df:
+                weights[token] = weights.get(token, 0) + 1
+        if not weights:
+            return []
+
+        n_slots = self.num_slots
+        alive = np.frombuffer(self._alive, dtype=np.int8).astype(bool)
+        if allowed is not None:
+            alive &= allowed[:n_slots]
+        doc_len = np.frombuffer(self._doc_len, dtype=np.float32)
+        avgdl = self.avgdl or 1.0
+
+        terms = []
+        for term, weight in weights.items():
+            idf = self.idf(term) * weight
+            terms.append((self._upper_bound(term, idf), term, idf))
+        # MaxScore: essential (high upper bound) terms first
+        terms.sort(reverse=True)
+        suffix_bounds = np.cumsum([ub for ub, _, _ in terms][::-1])[::-1]
+
+        scores = np.zeros(n_slots, dtype=np.float32)
+        touched = np.zeros(n_slots, dtype=bool)
+        threshold = -1.0
+
+        for i, (_, term, idf) in enumerate(terms):
+            docs, tfs = self._postings[term].arrays()
+            keep = alive[docs]
+
+            if threshold >= 0 and suffix_bounds[i] < threshold:
+                # Non-essential term: an untouched document can't reach the
+                # top-k any more, so only refresh surviving candidates.
+                candidates = touched & (scores + suffix_bounds[i] >= threshold)
+                keep &= candidates[docs]
+
+            docs = docs[keep]
+            if docs.size == 0:
+                continue
+            tfs = tfs[keep]
+            norm = self.k1 * (1.0 - self.b + self.b * doc_len[docs] / avgdl)
+            scores[docs] += idf * tfs * (self.k1 + 1.0) / (tfs + norm)
+            touched[docs] = True
+
+            touched_scores = scores[touched]
+            if touched_scores.size >= k:
+                threshold = float(np.partition(touched_scores, -k)[-k])
+
+        candidates = np.nonzero(touched)[0]
+        if candidates.size == 0:
+            return []
+        cand_scores = scores[candidates]
+        if candidates.size > k:
+            top = np.argpartition(-cand_scores, k - 1)[:k]
+            candidates, cand_scores = candidates[top], cand_scores[top]
+        order = np.argsort(-cand_scores, kind="stable")
+        return [(int(candidates[i]), float(cand_scores[i])) for i in order]
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write a snapshot directory.
+
+        Layout: ``meta.json`` (params, stats, term dictionary with offsets),
+        ``doc_len.npy``, ``alive.npy``, ``post_docs.npy`` and ``post_tfs.npy``
+        (all postings concatenated in term order).
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        terms: Dict[str, List[float]] = {}
+        doc_chunks: List[np.ndarray] = []
+        tf_chunks: List[np.ndarray] = []
+        offset = 0
+        for term, postings in self._postings.items():
+            docs, tfs = postings.arrays()
+            terms[term] = [offset, int(len(docs)), postings.max_tf, self._df.get(term, 0)]
+            doc_chunks.append(np.asarray(docs, dtype=np.int32))
+            tf_chunks.append(np.asarray(tfs, dtype=np.float32))
+            offset += len(docs)
+
+        np.save(path / "post_docs.npy", np.concatenate(doc_chunks) if doc_chunks else np.empty(0, np.int32))
+        np.save(path / "post_tfs.npy", np.concatenate(tf_chunks) if tf_chunks else np.empty(0, np.float32))
+        np.save(path / "doc_len.npy", np.frombuffer(self._doc_len, dtype=np.float32))
+        np.save(path / "alive.npy", np.frombuffer(self._alive, dtype=np.int8))
+
+        meta = {
+            "version": self.SNAPSHOT_VERSION,
+            "k1": self.k1,
+            "b": self.b,
+            "num_docs": self.num_docs,
+            "total_len": self.total_len,
+            "num_deleted": self.num_deleted,
+            "terms": terms,
+        }
+        (path / "meta.json").write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "InvertedIndexBM25":
+        """
+        Load a snapshot written by ``save``.
+
+        Args:
+            path: Snapshot directory
+            mmap: Memory-map the postings arrays instead of reading them
+
+        Returns:
+            Index ready for queries and further incremental adds
+        """
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != cls.SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported BM25 snapshot version: {meta.get('version')}")
+
+        mode = "r" if mmap else None
+        post_docs = np.load(path / "post_docs.npy", mmap_mode=mode)
+        post_tfs = np.load(path / "post_tfs.npy", mmap_mode=mode)
+
+        index = cls(k1=meta["k1"], b=meta["b"])
+        index._doc_len = array("f", np.load(path / "doc_len.npy").astype(np.float32).tobytes())
+        index._alive = array("b", np.load(path / "alive.npy").astype(np.int8).tobytes())
+        index.num_docs = meta["num_docs"]
+        index.total_len = meta["total_len"]
+        index.num_deleted = meta["num_deleted"]
+
+        for term, (offset, length, max_tf, df) in meta["terms"].items():
+            index._postings[term] = _Postings(
+                post_docs[offset:offset + length],
+                post_tfs[offset:offset + length],
+                max_tf,
+            )
+            if df:
+                index._df[term] = df
+        return index
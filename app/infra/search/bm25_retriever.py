@@ -2,22 +2,23 @@
 BM25 Retriever Implementation for SalesBoost RAG System.
 
 Provides keyword-based retrieval using BM25 algorithm with Chinese text support.
+Backed by an incremental inverted index (see bm25_index), so adding a batch
+of documents costs O(batch) and queries only touch matching postings.
 """
+import json
 import logging
-import asyncio
-from typing import Any, Dict, List, Optional
-from dataclasses import dataclass
-
-try:
-    from rank_bm25 import BM25Okapi
-except ImportError:
-    BM25Okapi = None
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+from dataclasses import asdict, dataclass
 
 try:
     import jieba
 except ImportError:
     jieba = None
 
+import numpy as np
+
+from app.infra.search.bm25_index import InvertedIndexBM25, MetadataIndex
 from app.infra.search.vector_store import SearchResult
 
 logger = logging.getLogger(__name__)
@@ -41,6 +42,7 @@ class BM25Retriever:
     - Async interface for consistency with vector retriever
     - Metadata filtering support
     - Configurable tokenization
+    - Incremental add/delete and on-disk snapshots
     """
 
     def __init__(
@@ -59,14 +61,14 @@ class BM25Retriever:
             k1: BM25 k1 parameter (term frequency saturation)
             b: BM25 b parameter (length normalization)
         """
-        if BM25Okapi is None:
-            raise ImportError("rank_bm25 is not installed. Install with: pip install rank-bm25")
-
         self.use_jieba = use_jieba and jieba is not None
         self.k1 = k1
         self.b = b
-        self.documents: List[BM25Document] = []
-        self.bm25: Optional[BM25Okapi] = None
+        # Slot-addressed; deleted slots hold None until the index is compacted
+        self.documents: List[Optional[BM25Document]] = []
+        self._slot_by_id: Dict[str, int] = {}
+        self.index = InvertedIndexBM25(k1=k1, b=b)
+        self.metadata_index = MetadataIndex()
 
         if documents:
             self.index_documents(documents)
@@ -101,63 +103,87 @@ class BM25Retriever:
 
     def index_documents(self, documents: List[Dict[str, Any]]) -> None:
         """
-        Index documents for BM25 retrieval.
+        Index documents for BM25 retrieval, replacing any existing index.
 
         Args:
             documents: List of documents with 'id', 'content', and 'metadata'
         """
-        self.documents = []
-
-        for doc in documents:
-            doc_id = doc.get("id", "")
-            content = doc.get("content", "")
-            metadata = doc.get("metadata", {})
-
-            tokens = self._tokenize(content)
-
-            self.documents.append(BM25Document(
-                id=str(doc_id),
-                content=content,
-                metadata=metadata,
-                tokens=tokens
-            ))
+        self.clear()
+        self.add_documents(documents)
 
-        # Build BM25 index
         if self.documents:
-            tokenized_corpus = [doc.tokens for doc in self.documents]
-            self.bm25 = BM25Okapi(tokenized_corpus, k1=self.k1, b=self.b)
-            logger.info(f"BM25 index built with {len(self.documents)} documents")
+            logger.info(f"BM25 index built with {len(self._slot_by_id)} documents")
         else:
-            self.bm25 = None
             logger.warning("No documents to index for BM25")
 
     def add_documents(self, documents: List[Dict[str, Any]]) -> None:
         """
         Add new documents to existing index.
 
+        Only the new documents are tokenized and indexed. A document whose
+        id is already indexed replaces the previous version.
+
         Args:
             documents: List of documents to add
         """
-        # Append new documents
         for doc in documents:
-            doc_id = doc.get("id", "")
+            doc_id = str(doc.get("id", ""))
             content = doc.get("content", "")
             metadata = doc.get("metadata", {})
 
-            tokens = self._tokenize(content)
+            if doc_id in self._slot_by_id:
+                self._delete_slot(self._slot_by_id.pop(doc_id))
 
+            tokens = self._tokenize(content)
+            slot = self.index.add(tokens)
+            self.metadata_index.add(slot, metadata)
+            self._slot_by_id[doc_id] = slot
             self.documents.append(BM25Document(
-                id=str(doc_id),
+                id=doc_id,
                 content=content,
                 metadata=metadata,
                 tokens=tokens
             ))
 
-        # Rebuild index
-        if self.documents:
-            tokenized_corpus = [doc.tokens for doc in self.documents]
-            self.bm25 = BM25Okapi(tokenized_corpus, k1=self.k1, b=self.b)
-            logger.info(f"BM25 index rebuilt with {len(self.documents)} documents")
+        self._maybe_compact()
+        logger.debug(f"BM25 index now holds {len(self._slot_by_id)} documents")
+
+    def delete_documents(self, ids: Iterable[str]) -> int:
+        """
+        Remove documents from the index.
+
+        Args:
+            ids: Document IDs to remove
+
+        Returns:
+            Number of documents removed
+        """
+        removed = 0
+        for doc_id in ids:
+            slot = self._slot_by_id.pop(str(doc_id), None)
+            if slot is not None:
+                self._delete_slot(slot)
+                removed += 1
+
+        self._maybe_compact()
+        return removed
+
+    def _delete_slot(self, slot: int) -> None:
+        doc = self.documents[slot]
+        self.index.delete(slot, doc.tokens if doc else [])
+        self.documents[slot] = None
+
+    def _maybe_compact(self) -> None:
+        """Reclaim tombstoned slots once enough documents were deleted."""
+        if not self.index.needs_compaction():
+            return
+
+        remap = self.index.compact()
+        self.metadata_index.remap(remap)
+        self.documents = [doc for doc in self.documents if doc is not None]
+        self._slot_by_id = {
+            doc_id: int(remap[slot]) for doc_id, slot in self._slot_by_id.items()
+        }
 
     def _apply_filters(
         self,
@@ -199,6 +225,16 @@ class BM25Retriever:
 
         return filtered
 
+    def _filter_mask(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Generic (unindexed) filter path for non-scalar filter values."""
+        allowed = np.zeros(self.index.num_slots, dtype=bool)
+        filtered_docs = self._apply_filters(
+            [doc for doc in self.documents if doc is not None], filters
+        )
+        if filtered_docs:
+            allowed[[self._slot_by_id[doc.id] for doc in filtered_docs]] = True
+        return allowed
+
     async def search(
         self,
         query: str,
@@ -216,7 +252,7 @@ class BM25Retriever:
         Returns:
             List of search results
         """
-        if not self.bm25 or not self.documents:
+        if not self._slot_by_id:
             logger.warning("BM25 index is empty, returning no results")
             return []
 
@@ -227,34 +263,20 @@ class BM25Retriever:
             logger.warning("Query tokenization resulted in empty tokens")
             return []
 
-        # Run BM25 search in thread pool (BM25 is CPU-bound)
-        loop = asyncio.get_running_loop()
-        scores = await loop.run_in_executor(
-            None,
-            lambda: self.bm25.get_scores(query_tokens)
-        )
-
-        # Apply filters
-        filtered_docs = self._apply_filters(self.documents, filters)
-
-        if not filtered_docs:
-            logger.warning("No documents match the filters")
-            return []
-
-        # Create filtered indices mapping
-        filtered_indices = {id(doc): idx for idx, doc in enumerate(self.documents) if doc in filtered_docs}
-
-        # Get top-k results from filtered documents
-        doc_scores = []
-        for idx, doc in enumerate(self.documents):
-            if id(doc) in filtered_indices:
-                doc_scores.append((idx, scores[idx], doc))
-
-        # Sort by score descending
-        doc_scores.sort(key=lambda x: x[1], reverse=True)
-
-        # Take top-k
-        top_results = doc_scores[:top_k]
+        # Apply filters: bitmap AND over precomputed (field, value) slot lists
+        allowed = None
+        if filters:
+            allowed = self.metadata_index.mask(filters, self.index.num_slots)
+            if allowed is None:
+                allowed = self._filter_mask(filters)
+            if not allowed.any():
+                logger.warning("No documents match the filters")
+                return []
+
+        top_results = [
+            (slot, score, self.documents[slot])
+            for slot, score in self.index.top_k(query_tokens, top_k, allowed)
+        ]
 
         # Convert to SearchResult
         results = []
@@ -272,14 +294,69 @@ class BM25Retriever:
 
     def get_document_count(self) -> int:
         """Get number of indexed documents."""
-        return len(self.documents)
+        return len(self._slot_by_id)
 
     def clear(self) -> None:
         """Clear all indexed documents."""
         self.documents = []
-        self.bm25 = None
+        self._slot_by_id = {}
+        self.index = InvertedIndexBM25(k1=self.k1, b=self.b)
+        self.metadata_index = MetadataIndex()
         logger.info("BM25 index cleared")
 
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Persist the index as a snapshot directory.
+
+        The postings arrays can be memory-mapped by ``load``; documents are
+        stored alongside as JSON lines in slot order.
+
+        Args:
+            path: Snapshot directory
+        """
+        path = Path(path)
+        self.index.save(path)
+        with open(path / "documents.jsonl", "w", encoding="utf-8") as f:
+            for doc in self.documents:
+                f.write(json.dumps(asdict(doc) if doc else None, ensure_ascii=False) + "\n")
+        logger.info(f"BM25 snapshot saved to {path} ({len(self._slot_by_id)} documents)")
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        use_jieba: bool = True,
+        mmap: bool = True,
+    ) -> "BM25Retriever":
+        """
+        Load a snapshot written by ``save``.
+
+        Args:
+            path: Snapshot directory
+            use_jieba: Use jieba for Chinese tokenization of new documents/queries
+            mmap: Memory-map postings instead of reading them into memory
+
+        Returns:
+            BM25Retriever ready for search and incremental updates
+        """
+        path = Path(path)
+        index = InvertedIndexBM25.load(path, mmap=mmap)
+        retriever = cls(use_jieba=use_jieba, k1=index.k1, b=index.b)
+        retriever.index = index
+
+        with open(path / "documents.jsonl", encoding="utf-8") as f:
+            for slot, line in enumerate(f):
+                data = json.loads(line)
+                if data is None:
+                    retriever.documents.append(None)
+                    continue
+                retriever.documents.append(BM25Document(**data))
+                retriever.metadata_index.add(slot, data["metadata"])
+                retriever._slot_by_id[data["id"]] = slot
+
+        logger.info(f"BM25 snapshot loaded from {path} ({len(retriever._slot_by_id)} documents)")
+        return retriever
+
 
 class AsyncBM25Adapter:
     """
@@ -4,6 +4,7 @@ Embedding Model Manager for SalesBoost RAG System.
 Supports multiple embedding models with automatic dimension detection
 and seamless model switching.
 """
+import asyncio
 import logging
 from typing import List, Optional, Dict, Any
 from dataclasses import dataclass
@@ -18,6 +19,7 @@ try:
 except ImportError:
     openai = None
 
+from app.infra.search.embedding_service import EmbeddingService
 from core.config import Settings
 
 logger = logging.getLogger(__name__)
@@ -90,6 +92,7 @@ class EmbeddingModelManager:
     - Model caching (singleton pattern)
     - Batch processing
     - Normalization support
+    - Async path memoized, coalesced and micro-batched via EmbeddingService
     """
 
     _instance: Optional["EmbeddingModelManager"] = None
@@ -126,6 +129,12 @@ class EmbeddingModelManager:
 
         self._load_model()
 
+        self._service = EmbeddingService(
+            self._encode_batch_async,
+            max_batch_size=self.batch_size,
+            namespace=f"{self.model_name}:{int(bool(self.normalize))}",
+        )
+
     def _load_model(self):
         """Load embedding model with caching."""
         # Use singleton pattern for model caching
@@ -265,6 +274,14 @@ class EmbeddingModelManager:
 
             return embeddings.tolist()
 
+    async def _encode_batch_async(self, texts: List[str]) -> List[List[float]]:
+        """Run one backend ``encode`` call off the event loop."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None,
+            lambda: self.encode(texts)
+        )
+
     async def encode_async(
         self,
         texts: List[str],
@@ -273,20 +290,18 @@ class EmbeddingModelManager:
         """
         Encode texts asynchronously.
 
+        Repeated texts are served from the memo, concurrent identical
+        texts share one computation, and texts from concurrent callers
+        are grouped into batches of up to ``self.batch_size``.
+
         Args:
             texts: List of texts to encode
-            batch_size: Batch size
+            batch_size: Unused; kept for backwards compatibility
 
         Returns:
             List of embeddings
         """
-        import asyncio
-
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.encode(texts, batch_size)
-        )
+        return await self._service.embed_many(texts)
 
     def encode_single(self, text: str) -> List[float]:
         """
@@ -313,6 +328,15 @@ class EmbeddingModelManager:
         embeddings = await self.encode_async([text])
         return embeddings[0]
 
+    def get_embedding_stats(self) -> Dict[str, Any]:
+        """
+        Get memo hit rate and batch-size metrics for the async path.
+
+        Returns:
+            Embedding service statistics
+        """
+        return self._service.get_stats()
+
     @staticmethod
     def list_models() -> Dict[str, EmbeddingModelInfo]:
         """List all supported models."""
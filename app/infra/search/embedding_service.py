@@ -0,0 +1,116 @@
+"""
+Embedding Service for SalesBoost.
+
+Shared front-end for embedding backends (local SentenceTransformers,
+OpenAI-compatible APIs). Sits between callers and a batch ``encode``
+function and provides, via MicroBatcher:
+
+- Content-hash keyed LRU/TTL memoization
+- In-flight deduplication (concurrent identical texts share one future)
+- Micro-batching (requests arriving within a few milliseconds are sent
+  to the backend as a single batch call)
+- Hit-rate and batch-size metrics
+"""
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from app.infra.search.micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+BatchEncoder = Callable[[List[str]], Awaitable[Sequence[Any]]]
+
+
+class EmbeddingService:
+    """
+    Memoizing, coalescing, micro-batching wrapper around a batch encoder.
+
+    The encoder receives a list of texts and must return one vector per
+    text, in order. Returned vectors are shared between callers and must
+    be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        encode_batch: BatchEncoder,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        cache_size: int = 10000,
+        ttl: Optional[float] = 3600.0,
+        namespace: str = "",
+    ):
+        """
+        Initialize embedding service.
+
+        Args:
+            encode_batch: Async function encoding a list of texts
+            max_batch_size: Flush a batch as soon as it reaches this size
+            max_wait_ms: Maximum time the first request of a batch waits
+            cache_size: Maximum number of memoized embeddings (0 = disabled)
+            ttl: Memo entry lifetime in seconds (None = no expiry)
+            namespace: Included in the content hash (e.g. the model name)
+        """
+        self.encode_batch = encode_batch
+        self.namespace = namespace
+        self._batcher = MicroBatcher(
+            encode_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            cache_size=cache_size,
+            ttl=ttl,
+            name="Embedding",
+        )
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.namespace}\x00{text}".encode("utf-8")).hexdigest()
+
+    async def embed(self, text: str) -> Any:
+        """
+        Embed a single text.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            Embedding vector as returned by the encoder
+        """
+        # shield: a cancelled caller must not cancel a future shared with others
+        return await asyncio.shield(self._batcher.submit(self._key(text), text))
+
+    async def embed_many(self, texts: List[str]) -> List[Any]:
+        """
+        Embed several texts; duplicates and memoized texts are not re-encoded.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Embedding vectors in input order
+        """
+        return await self._batcher.get_many([(self._key(text), text) for text in texts])
+
+    def clear(self) -> None:
+        """Drop all memoized embeddings."""
+        self._batcher.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get service metrics.
+
+        Returns:
+            Counters plus derived hit rate and average batch size
+        """
+        stats = dict(self._batcher.stats)
+        stats["requests"] = stats.pop("items")
+        stats["batched_texts"] = stats.pop("batched_items")
+        requests = stats["requests"]
+        hits = stats["memo_hits"] + stats["coalesced"]
+        batches = stats["batches"]
+        return {
+            **stats,
+            "hit_rate": hits / requests if requests else 0.0,
+            "avg_batch_size": stats["batched_texts"] / batches if batches else 0.0,
+            "memo_size": len(self._batcher),
+        }
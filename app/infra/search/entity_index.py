@@ -0,0 +1,169 @@
+"""
+Entity Name Index for GraphRAG entity linking.
+
+Aho–Corasick automaton over entity names and aliases:
+
+- Names are inserted into a character trie as entities arrive; failure
+  and output links are recomputed lazily (one BFS over the trie) on the
+  first lookup after a change
+- A lookup is a single left-to-right pass over the query text and reports
+  every entity whose name or alias occurs in it
+- Matching is case-insensitive (``str.casefold``)
+"""
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+
+def entity_terms(name: str, properties: Optional[Dict] = None) -> List[str]:
+    """Name plus ``properties["aliases"]`` (a string or a list of strings)."""
+    terms = [name]
+    aliases = (properties or {}).get("aliases")
+    if isinstance(aliases, str):
+        terms.append(aliases)
+    elif isinstance(aliases, (list, tuple, set)):
+        terms.extend(a for a in aliases if isinstance(a, str))
+    return terms
+
+
+class EntityNameIndex:
+    """
+    Incremental Aho–Corasick index: term -> entity IDs.
+
+    Trie nodes are dense integers; ``_goto[node]`` maps a character to the
+    child node. ``_fail`` and ``_link`` (nearest suffix node that ends a
+    term) are only valid while ``_dirty`` is False.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._link: List[int] = [-1]
+        self._outputs: List[Set[str]] = [set()]
+        self._entity_terms: Dict[str, List[str]] = {}
+        self._dirty = False
+
+        self.max_length = 0
+
+    def __len__(self) -> int:
+        return len(self._entity_terms)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self._entity_terms
+
+    def _node(self, term: str) -> int:
+        node = 0
+        for char in term:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._link.append(-1)
+                self._outputs.append(set())
+                self._dirty = True
+            node = child
+        return node
+
+    def _find(self, term: str) -> Optional[int]:
+        node = 0
+        for char in term:
+            node = self._goto[node].get(char)
+            if node is None:
+                return None
+        return node
+
+    def add(self, entity_id: str, terms: Iterable[str]) -> None:
+        """
+        Index an entity under its name and aliases (replaces earlier terms).
+
+        Args:
+            entity_id: Entity ID
+            terms: Name and aliases
+        """
+        if entity_id in self._entity_terms:
+            self.remove(entity_id)
+
+        normalized = []
+        for term in terms:
+            term = term.strip().casefold()
+            if term and term not in normalized:
+                normalized.append(term)
+
+        for term in normalized:
+            node = self._node(term)
+            if not self._outputs[node]:
+                # A new terminal changes output links of deeper nodes
+                self._dirty = True
+            self._outputs[node].add(entity_id)
+            self.max_length = max(self.max_length, len(term))
+        self._entity_terms[entity_id] = normalized
+
+    def remove(self, entity_id: str) -> bool:
+        """Stop matching an entity (trie nodes are kept for reuse)."""
+        terms = self._entity_terms.pop(entity_id, None)
+        if terms is None:
+            return False
+        for term in terms:
+            node = self._find(term)
+            if node is not None:
+                self._outputs[node].discard(entity_id)
+                if not self._outputs[node]:
+                    self._dirty = True
+        return True
+
+    def _build(self) -> None:
+        """Recompute failure and output links (BFS over the trie)."""
+        goto, fail, link, outputs = self._goto, self._fail, self._link, self._outputs
+        queue = deque()
+        for child in goto[0].values():
+            fail[child] = 0
+            link[child] = -1
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                target = goto[state].get(char, 0)
+                fail[child] = target if target != child else 0
+                link[child] = fail[child] if outputs[fail[child]] else link[fail[child]]
+                queue.append(child)
+
+        self._dirty = False
+
+    def match(self, text: str) -> List[str]:
+        """
+        Find every indexed entity whose name or alias occurs in ``text``.
+
+        Args:
+            text: Query text
+
+        Returns:
+            Entity IDs in order of first match end position, without duplicates
+        """
+        if not self._entity_terms or not text:
+            return []
+        if self._dirty:
+            self._build()
+
+        goto, fail, link, outputs = self._goto, self._fail, self._link, self._outputs
+        found: Dict[str, None] = {}
+        node = 0
+        for char in text.casefold():
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            hit = node if outputs[node] else link[node]
+            while hit > 0:
+                for entity_id in outputs[hit]:
+                    found.setdefault(entity_id)
+                hit = link[hit]
+        return list(found)
+
+    def clear(self) -> None:
+        """Drop all entities and trie nodes."""
+        self.__init__()
@@ -4,11 +4,16 @@ GraphRAG Implementation for SalesBoost.
 Implements knowledge graph-enhanced RAG with entity extraction,
 relation extraction, and graph-based retrieval.
 """
+import json
 import logging
-from typing import List, Dict, Any, Optional, Set
+from array import array
+from pathlib import Path
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 
+import numpy as np
+
 logger = logging.getLogger(__name__)
 
 
@@ -78,6 +83,56 @@ class Subgraph:
     relevance_score: float = 0.0
 
 
+class _EdgeLists:
+    """
+    Per-node lists of relation indices (one instance for out-, one for in-edges).
+
+    ``base_offsets``/``base_edges`` hold a (possibly memory-mapped) CSR
+    snapshot, the ``array`` tails receive edges added after the snapshot.
+    """
+
+    __slots__ = ("base_offsets", "base_edges", "tails")
+
+    def __init__(
+        self,
+        base_offsets: Optional[np.ndarray] = None,
+        base_edges: Optional[np.ndarray] = None,
+    ):
+        self.base_offsets = base_offsets
+        self.base_edges = base_edges
+        self.tails: Dict[int, array] = {}
+
+    def append(self, node: int, rel: int) -> None:
+        tail = self.tails.get(node)
+        if tail is None:
+            tail = self.tails[node] = array("i")
+        tail.append(rel)
+
+    def get(self, node: int) -> List[int]:
+        edges: List[int] = []
+        offsets = self.base_offsets
+        if offsets is not None and node + 1 < len(offsets):
+            start, end = int(offsets[node]), int(offsets[node + 1])
+            if end > start:
+                edges = self.base_edges[start:end].tolist()
+        tail = self.tails.get(node)
+        if tail:
+            edges.extend(tail)
+        return edges
+
+
+def _build_csr(keys: np.ndarray, num_nodes: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Group relation indices by node (stable, so insertion order is kept)."""
+    order = np.argsort(keys, kind="stable").astype(np.int32)
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=num_nodes), out=offsets[1:])
+    return offsets, order
+
+
+_RELATION_TYPES: List[RelationType] = list(RelationType)
+_RELATION_CODES: Dict[RelationType, int] = {t: i for i, t in enumerate(_RELATION_TYPES)}
+
+
 class KnowledgeGraph:
     """
     In-memory knowledge graph for sales knowledge.
@@ -87,62 +142,190 @@ class KnowledgeGraph:
     - Graph traversal
     - Subgraph extraction
     - Community detection (optional)
+
+    Storage: entities and relations get dense integer indices. Relation
+    endpoints, types and weights live in flat arrays; every node has an
+    out- and an in-edge list of relation indices, and every relation type
+    a list of its relations. Traversals touch only the edges of visited
+    nodes instead of scanning ``relations``. ``save``/``load`` write the
+    edge lists as CSR ``.npy`` files that can be memory-mapped.
     """
 
+    SNAPSHOT_VERSION = 1
+
     def __init__(self):
         """Initialize knowledge graph."""
         self.entities: Dict[str, Entity] = {}
         self.relations: Dict[str, Relation] = {}
-        self.adjacency: Dict[str, Set[str]] = {}  # entity_id -> set of related entity_ids
+
+        self._node_ids: List[str] = []
+        self._node_index: Dict[str, int] = {}
+
+        # Relation index -> relation id (None once removed/replaced)
+        self._rel_ids: List[Optional[str]] = []
+        self._rel_index: Dict[str, int] = {}
+        self._rel_src = array("i")
+        self._rel_dst = array("i")
+        self._rel_type = array("b")
+        self._rel_weight = array("f")
+
+        self._out = _EdgeLists()
+        self._in = _EdgeLists()
+        self._by_type: Dict[int, array] = {}
+
+        # Parent-pointer buffers reused by find_paths
+        self._path_nodes: List[int] = []
+        self._path_parents: List[int] = []
+        self._path_rels: List[int] = []
+        self._path_weights: List[float] = []
+
+    def _node(self, entity_id: str) -> int:
+        index = self._node_index.get(entity_id)
+        if index is None:
+            index = self._node_index[entity_id] = len(self._node_ids)
+            self._node_ids.append(entity_id)
+        return index
 
     def add_entity(self, entity: Entity) -> None:
         """Add entity to graph."""
         self.entities[entity.id] = entity
-        if entity.id not in self.adjacency:
-            self.adjacency[entity.id] = set()
+        self._node(entity.id)
 
     def add_relation(self, relation: Relation) -> None:
-        """Add relation to graph."""
+        """Add relation to graph (same ID replaces the previous relation)."""
+        if relation.id in self._rel_index:
+            self.remove_relation(relation.id)
+
+        src = self._node(relation.source_id)
+        dst = self._node(relation.target_id)
+        code = _RELATION_CODES[RelationType(relation.type)]
+
+        rel = len(self._rel_ids)
+        self._rel_ids.append(relation.id)
+        self._rel_index[relation.id] = rel
+        self._rel_src.append(src)
+        self._rel_dst.append(dst)
+        self._rel_type.append(code)
+        self._rel_weight.append(float(relation.weight))
+
+        self._out.append(src, rel)
+        self._in.append(dst, rel)
+        by_type = self._by_type.get(code)
+        if by_type is None:
+            by_type = self._by_type[code] = array("i")
+        by_type.append(rel)
+
         self.relations[relation.id] = relation
 
-        # Update adjacency
-        if relation.source_id not in self.adjacency:
-            self.adjacency[relation.source_id] = set()
-        if relation.target_id not in self.adjacency:
-            self.adjacency[relation.target_id] = set()
+    def remove_relation(self, relation_id: str) -> bool:
+        """
+        Remove a relation.
 
-        self.adjacency[relation.source_id].add(relation.target_id)
+        The relation index is tombstoned; edge lists skip it on traversal.
+
+        Returns:
+            True if the relation existed
+        """
+        rel = self._rel_index.pop(relation_id, None)
+        if rel is None:
+            return False
+        self._rel_ids[rel] = None
+        self.relations.pop(relation_id, None)
+        return True
 
     def get_entity(self, entity_id: str) -> Optional[Entity]:
         """Get entity by ID."""
         return self.entities.get(entity_id)
 
-    def get_neighbors(self, entity_id: str, max_hops: int = 1) -> Set[str]:
+    @property
+    def adjacency(self) -> Dict[str, Set[str]]:
+        """entity_id -> set of target entity_ids (built on demand)."""
+        return {
+            node_id: {self._node_ids[self._rel_dst[rel]] for rel in self._live(self._out.get(node))}
+            for node, node_id in enumerate(self._node_ids)
+        }
+
+    def _live(self, rels: List[int]) -> List[int]:
+        rel_ids = self._rel_ids
+        return [rel for rel in rels if rel_ids[rel] is not None]
+
+    def out_relations(
+        self,
+        entity_id: str,
+        relation_type: Optional[RelationType] = None,
+    ) -> List[Relation]:
+        """Relations whose source is ``entity_id``, optionally of one type."""
+        return self._edge_relations(self._out, entity_id, relation_type)
+
+    def in_relations(
+        self,
+        entity_id: str,
+        relation_type: Optional[RelationType] = None,
+    ) -> List[Relation]:
+        """Relations whose target is ``entity_id``, optionally of one type."""
+        return self._edge_relations(self._in, entity_id, relation_type)
+
+    def _edge_relations(
+        self,
+        edges: _EdgeLists,
+        entity_id: str,
+        relation_type: Optional[RelationType],
+    ) -> List[Relation]:
+        node = self._node_index.get(entity_id)
+        if node is None:
+            return []
+        code = None if relation_type is None else _RELATION_CODES[RelationType(relation_type)]
+        return [
+            self.relations[self._rel_ids[rel]]
+            for rel in self._live(edges.get(node))
+            if code is None or self._rel_type[rel] == code
+        ]
+
+    def relations_of_type(self, relation_type: RelationType) -> List[Relation]:
+        """All relations of one type."""
+        rels = self._by_type.get(_RELATION_CODES[RelationType(relation_type)])
+        if not rels:
+            return []
+        return [self.relations[self._rel_ids[rel]] for rel in self._live(rels)]
+
+    def get_neighbors(self, entity_id: str, max_hops: int = 1, direction: str = "out") -> Set[str]:
         """
         Get neighboring entities within max_hops.
 
         Args:
             entity_id: Starting entity ID
             max_hops: Maximum number of hops
+            direction: Follow "out" edges, "in" edges or "both"
 
         Returns:
             Set of neighboring entity IDs
         """
-        if entity_id not in self.adjacency:
+        start = self._node_index.get(entity_id)
+        if start is None:
             return set()
 
-        neighbors = set()
-        current_level = {entity_id}
+        follow = []
+        if direction in ("out", "both"):
+            follow.append((self._out, self._rel_dst))
+        if direction in ("in", "both"):
+            follow.append((self._in, self._rel_src))
 
+        seen: Set[int] = set()
+        expanded = {start}
+        current_level = [start]
         for _ in range(max_hops):
-            next_level = set()
-            for eid in current_level:
-                if eid in self.adjacency:
-                    next_level.update(self.adjacency[eid])
-            neighbors.update(next_level)
+            next_level = []
+            for node in current_level:
+                for edges, other in follow:
+                    for rel in self._live(edges.get(node)):
+                        neighbor = other[rel]
+                        seen.add(neighbor)
+                        if neighbor not in expanded:
+                            expanded.add(neighbor)
+                            next_level.append(neighbor)
             current_level = next_level
 
-        return neighbors
+        return {self._node_ids[node] for node in seen}
 
     def extract_subgraph(
         self,
@@ -161,33 +344,41 @@ class KnowledgeGraph:
         Returns:
             Extracted subgraph
         """
-        # Collect entities
-        entity_ids = set(seed_entities)
+        # Collect entities (seeds first, then their neighborhoods)
+        entity_ids: Dict[str, None] = dict.fromkeys(seed_entities)
         for seed in seed_entities:
             neighbors = self.get_neighbors(seed, max_hops)
-            entity_ids.update(neighbors)
+            entity_ids.update(dict.fromkeys(sorted(neighbors, key=self._node_index.__getitem__)))
             if len(entity_ids) >= max_entities:
                 break
 
-        entity_ids = list(entity_ids)[:max_entities]
+        selected = list(entity_ids)[:max_entities]
 
         # Collect entities and relations
-        entities = [self.entities[eid] for eid in entity_ids if eid in self.entities]
+        entities = [self.entities[eid] for eid in selected if eid in self.entities]
+
+        nodes = {self._node_index[eid] for eid in selected if eid in self._node_index}
+        rels = sorted(
+            rel
+            for node in nodes
+            for rel in self._live(self._out.get(node))
+            if self._rel_dst[rel] in nodes
+        )
 
         relations = []
         triples = []
-        for rel in self.relations.values():
-            if rel.source_id in entity_ids and rel.target_id in entity_ids:
-                relations.append(rel)
-
-                # Create triple
-                if rel.source_id in self.entities and rel.target_id in self.entities:
-                    triple = Triple(
-                        subject=self.entities[rel.source_id],
-                        predicate=rel,
-                        object=self.entities[rel.target_id]
-                    )
-                    triples.append(triple)
+        for rel_index in rels:
+            rel = self.relations[self._rel_ids[rel_index]]
+            relations.append(rel)
+
+            # Create triple
+            if rel.source_id in self.entities and rel.target_id in self.entities:
+                triple = Triple(
+                    subject=self.entities[rel.source_id],
+                    predicate=rel,
+                    object=self.entities[rel.target_id]
+                )
+                triples.append(triple)
 
         return Subgraph(
             entities=entities,
@@ -195,6 +386,108 @@ class KnowledgeGraph:
             triples=triples
         )
 
+    def find_paths(
+        self,
+        start_id: str,
+        max_hops: int = 3,
+        target_type: Optional[EntityType] = None,
+        relation_types: Optional[Iterable[RelationType]] = None,
+        beam_width: Optional[int] = None,
+        max_paths: Optional[int] = None,
+    ) -> List[List[Tuple[Entity, Relation]]]:
+        """
+        Bounded breadth-first search for simple outgoing paths.
+
+        A path is returned when it ends at an entity of ``target_type`` or
+        reaches ``max_hops`` edges. Partial paths are kept as parent pointers
+        in reused buffers, so no per-path visited set is copied.
+
+        Args:
+            start_id: Starting entity ID
+            max_hops: Maximum path length in edges
+            target_type: Entity type that ends a path (optional)
+            relation_types: Only follow these relation types (optional)
+            beam_width: Keep at most this many partial paths per hop,
+                highest cumulative relation weight first (None = unbounded)
+            max_paths: Return at most this many paths, highest average
+                relation weight first (None = all)
+
+        Returns:
+            Paths as lists of (entity reached, relation followed)
+        """
+        start = self._node_index.get(start_id)
+        if start is None or start_id not in self.entities or max_hops <= 0:
+            return []
+
+        codes = None
+        if relation_types is not None:
+            codes = {_RELATION_CODES[RelationType(t)] for t in relation_types}
+
+        nodes, parents, rels, weights = (
+            self._path_nodes, self._path_parents, self._path_rels, self._path_weights
+        )
+        for buffer in (nodes, parents, rels, weights):
+            buffer.clear()
+        nodes.append(start)
+        parents.append(-1)
+        rels.append(-1)
+        weights.append(0.0)
+
+        rel_ids, rel_dst, rel_type, rel_weight = self._rel_ids, self._rel_dst, self._rel_type, self._rel_weight
+        node_ids, entities = self._node_ids, self.entities
+
+        found: List[Tuple[int, int]] = []  # (entry, depth)
+        frontier = [0]
+        for depth in range(1, max_hops + 1):
+            next_frontier = []
+            for entry in frontier:
+                for rel in self._out.get(nodes[entry]):
+                    if rel_ids[rel] is None or (codes is not None and rel_type[rel] not in codes):
+                        continue
+                    nxt = rel_dst[rel]
+                    entity = entities.get(node_ids[nxt])
+                    if entity is None:
+                        continue
+
+                    # Simple paths only: walk the (at most max_hops long) parent chain
+                    ancestor = entry
+                    while ancestor >= 0 and nodes[ancestor] != nxt:
+                        ancestor = parents[ancestor]
+                    if ancestor >= 0:
+                        continue
+
+                    child = len(nodes)
+                    nodes.append(nxt)
+                    parents.append(entry)
+                    rels.append(rel)
+                    weights.append(weights[entry] + rel_weight[rel])
+
+                    if depth == max_hops or (target_type is not None and entity.type == target_type):
+                        found.append((child, depth))
+                    next_frontier.append(child)
+
+            if beam_width is not None and len(next_frontier) > beam_width:
+                next_frontier.sort(key=weights.__getitem__, reverse=True)
+                del next_frontier[beam_width:]
+            frontier = next_frontier
+            if not frontier:
+                break
+
+        if max_paths is not None and len(found) > max_paths:
+            found.sort(key=lambda item: weights[item[0]] / item[1], reverse=True)
+            del found[max_paths:]
+
+        paths = []
+        for entry, _ in found:
+            path = []
+            while parents[entry] >= 0:
+                relation = self.relations[rel_ids[rels[entry]]]
+                path.append((entities[node_ids[nodes[entry]]], relation))
+                entry = parents[entry]
+            path.reverse()
+            paths.append(path)
+        return paths
+
     def get_stats(self) -> Dict[str, int]:
         """Get graph statistics."""
         return {
@@ -204,6 +497,124 @@ class KnowledgeGraph:
             "num_relation_types": len(set(r.type for r in self.relations.values())),
         }
 
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Write a snapshot directory.
+
+        Layout: ``meta.json``, ``nodes.json``, ``entities.jsonl``,
+        ``relations.jsonl`` (live relations in index order), the relation
+        arrays ``rel_src/rel_dst/rel_type/rel_weight.npy`` and the CSR edge
+        lists ``out_offsets/out_edges/in_offsets/in_edges.npy``. Removed
+        relations are dropped and the rest renumbered.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        live = np.array([i for i, rid in enumerate(self._rel_ids) if rid is not None], dtype=np.int64)
+        src = np.frombuffer(self._rel_src, dtype=np.int32)[live] if live.size else np.empty(0, np.int32)
+        dst = np.frombuffer(self._rel_dst, dtype=np.int32)[live] if live.size else np.empty(0, np.int32)
+        types = np.frombuffer(self._rel_type, dtype=np.int8)[live] if live.size else np.empty(0, np.int8)
+        weight = np.frombuffer(self._rel_weight, dtype=np.float32)[live] if live.size else np.empty(0, np.float32)
+
+        num_nodes = len(self._node_ids)
+        out_offsets, out_edges = _build_csr(src, num_nodes)
+        in_offsets, in_edges = _build_csr(dst, num_nodes)
+        for name, data in (
+            ("rel_src", src), ("rel_dst", dst), ("rel_type", types), ("rel_weight", weight),
+            ("out_offsets", out_offsets), ("out_edges", out_edges),
+            ("in_offsets", in_offsets), ("in_edges", in_edges),
+        ):
+            np.save(path / f"{name}.npy", data)
+
+        (path / "nodes.json").write_text(json.dumps(self._node_ids, ensure_ascii=False), encoding="utf-8")
+        with open(path / "entities.jsonl", "w", encoding="utf-8") as f:
+            for entity in self.entities.values():
+                f.write(json.dumps({
+                    "id": entity.id,
+                    "name": entity.name,
+                    "type": EntityType(entity.type).value,
+                    "properties": entity.properties,
+                    "embedding": entity.embedding,
+                }, ensure_ascii=False) + "\n")
+        with open(path / "relations.jsonl", "w", encoding="utf-8") as f:
+            for rel in live.tolist():
+                relation = self.relations[self._rel_ids[rel]]
+                f.write(json.dumps({
+                    "id": relation.id,
+                    "source_id": relation.source_id,
+                    "target_id": relation.target_id,
+                    "type": RelationType(relation.type).value,
+                    "properties": relation.properties,
+                    "weight": relation.weight,
+                }, ensure_ascii=False) + "\n")
+
+        meta = {
+            "version": self.SNAPSHOT_VERSION,
+            "num_nodes": num_nodes,
+            "num_relations": int(live.size),
+            "relation_types": [t.value for t in _RELATION_TYPES],
+        }
+        (path / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> "KnowledgeGraph":
+        """
+        Load a snapshot written by ``save``.
+
+        Args:
+            path: Snapshot directory
+            mmap: Memory-map the CSR edge lists instead of reading them
+
+        Returns:
+            Graph ready for traversal and further incremental adds
+        """
+        path = Path(path)
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("version") != cls.SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported graph snapshot version: {meta.get('version')}")
+        # Type codes are positional; remap if RelationType changed since the save
+        type_map = np.array(
+            [_RELATION_CODES[RelationType(value)] for value in meta["relation_types"]], dtype=np.int8
+        )
+
+        graph = cls()
+        graph._node_ids = json.loads((path / "nodes.json").read_text(encoding="utf-8"))
+        graph._node_index = {node_id: i for i, node_id in enumerate(graph._node_ids)}
+
+        with open(path / "entities.jsonl", encoding="utf-8") as f:
+            for line in f:
+                data = json.loads(line)
+                data["type"] = EntityType(data["type"])
+                graph.entities[data["id"]] = Entity(**data)
+
+        with open(path / "relations.jsonl", encoding="utf-8") as f:
+            for rel, line in enumerate(f):
+                data = json.loads(line)
+                data["type"] = RelationType(data["type"])
+                relation = Relation(**data)
+                graph.relations[relation.id] = relation
+                graph._rel_ids.append(relation.id)
+                graph._rel_index[relation.id] = rel
+
+        graph._rel_src = array("i", np.load(path / "rel_src.npy").astype(np.int32).tobytes())
+        graph._rel_dst = array("i", np.load(path / "rel_dst.npy").astype(np.int32).tobytes())
+        types = type_map[np.load(path / "rel_type.npy").astype(np.int64)]
+        graph._rel_type = array("b", types.astype(np.int8).tobytes())
+        graph._rel_weight = array("f", np.load(path / "rel_weight.npy").astype(np.float32).tobytes())
+
+        mode = "r" if mmap else None
+        graph._out = _EdgeLists(
+            np.load(path / "out_offsets.npy", mmap_mode=mode),
+            np.load(path / "out_edges.npy", mmap_mode=mode),
+        )
+        graph._in = _EdgeLists(
+            np.load(path / "in_offsets.npy", mmap_mode=mode),
+            np.load(path / "in_edges.npy", mmap_mode=mode),
+        )
+        for code in np.unique(types).tolist():
+            graph._by_type[code] = array("i", np.nonzero(types == code)[0].astype(np.int32).tobytes())
+        return graph
+
 
 class EntityExtractor:
     """
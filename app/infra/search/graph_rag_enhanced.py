@@ -13,9 +13,10 @@ Architecture:
 
 import logging
 import json
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
+from app.infra.search.entity_index import EntityNameIndex, entity_terms
 from app.infra.search.graph_rag import (
     Entity, Relation, Subgraph, KnowledgeGraph,
     EntityType, RelationType
@@ -62,18 +63,19 @@ class LLMKnowledgeExtractor:
 10. 竞品 (competitor): 竞争对手产品
 
 输出格式（JSON）：
-{
+{{
   "entities": [
-    {
+    {{
       "name": "实体名称",
       "type": "实体类型",
-      "properties": {
+      "properties": {{
         "description": "实体描述",
-        "context": "出现的上下文"
-      }
-    }
+        "context": "出现的上下文",
+        "aliases": ["同义说法或简称（可选）"]
+      }}
+    }}
   ]
-}
+}}
 
 只输出JSON，不要其他内容。"""
 
@@ -98,19 +100,19 @@ class LLMKnowledgeExtractor:
 10. part_of: 是某个实体的一部分
 
 输出格式（JSON）：
-{
+{{
   "relations": [
-    {
+    {{
       "source": "源实体名称",
       "target": "目标实体名称",
       "type": "关系类型",
-      "properties": {
+      "properties": {{
         "confidence": 0.95,
         "evidence": "支持该关系的证据文本"
-      }
-    }
+      }}
+    }}
   ]
-}
+}}
 
 只输出JSON，不要其他内容。"""
 
@@ -248,6 +250,8 @@ class MultiHopReasoner:
         llm_client: Any,
         max_hops: int = 3,
         max_paths: int = 5,
+        beam_width: Optional[int] = 256,
+        max_candidates: Optional[int] = 200,
     ):
         """
         Initialize multi-hop reasoner.
@@ -257,11 +261,15 @@ class MultiHopReasoner:
             llm_client: LLM client for path ranking
             max_hops: Maximum reasoning hops
             max_paths: Maximum paths to return
+            beam_width: Partial paths kept per hop (None = exhaustive)
+            max_candidates: Candidate paths passed to ranking per start entity
         """
         self.knowledge_graph = knowledge_graph
         self.llm_client = llm_client
         self.max_hops = max_hops
         self.max_paths = max_paths
+        self.beam_width = beam_width
+        self.max_candidates = max_candidates
 
     async def reason(
         self,
@@ -284,13 +292,7 @@ class MultiHopReasoner:
         all_paths = []
 
         for start_id in start_entities:
-            paths = self._find_paths(
-                start_id=start_id,
-                target_type=target_type,
-                current_path=[],
-                visited=set(),
-                depth=0
-            )
+            paths = self._find_paths(start_id=start_id, target_type=target_type)
             all_paths.extend(paths)
 
         # Rank paths by relevance
@@ -303,59 +305,28 @@ class MultiHopReasoner:
         self,
         start_id: str,
         target_type: Optional[EntityType],
-        current_path: List[Tuple[Entity, Relation]],
-        visited: Set[str],
-        depth: int,
     ) -> List[List[Tuple[Entity, Relation]]]:
         """
-        Recursively find paths through the graph.
+        Find candidate paths from one entity.
+
+        Uses the graph's indexed out-edges with a bounded beam, so the cost
+        depends on the visited neighborhood rather than on the total number
+        of relations.
 
         Args:
-            start_id: Current entity ID
+            start_id: Starting entity ID
             target_type: Target entity type
-            current_path: Current path
-            visited: Visited entity IDs
-            depth: Current depth
 
         Returns:
             List of paths
         """
-        if depth >= self.max_hops:
-            return [current_path] if current_path else []
-
-        if start_id in visited:
-            return []
-
-        visited.add(start_id)
-        paths = []
-
-        # Get current entity
-        current_entity = self.knowledge_graph.get_entity(start_id)
-        if not current_entity:
-            return []
-
-        # Check if we reached target type
-        if target_type and current_entity.type == target_type and current_path:
-            paths.append(current_path)
-
-        # Explore neighbors
-        for relation in self.knowledge_graph.relations.values():
-            if relation.source_id == start_id:
-                next_id = relation.target_id
-                next_entity = self.knowledge_graph.get_entity(next_id)
-
-                if next_entity and next_id not in visited:
-                    new_path = current_path + [(next_entity, relation)]
-                    sub_paths = self._find_paths(
-                        start_id=next_id,
-                        target_type=target_type,
-                        current_path=new_path,
-                        visited=visited.copy(),
-                        depth=depth + 1
-                    )
-                    paths.extend(sub_paths)
-
-        return paths
+        return self.knowledge_graph.find_paths(
+            start_id,
+            max_hops=self.max_hops,
+            target_type=target_type,
+            beam_width=self.beam_width,
+            max_paths=self.max_candidates,
+        )
 
     async def _rank_paths(
         self,
@@ -468,6 +439,7 @@ class EnhancedGraphRAGService:
         # Initialize components
         self.knowledge_graph = KnowledgeGraph()
         self.llm_extractor = LLMKnowledgeExtractor(llm_client)
+        self.entity_index = EntityNameIndex()
 
         if enable_multi_hop:
             self.multi_hop_reasoner = MultiHopReasoner(
@@ -503,9 +475,10 @@ class EnhancedGraphRAGService:
         # Extract entities using LLM
         entities = await self.llm_extractor.extract_entities(conversation_text)
 
-        # Add entities to graph
+        # Add entities to graph and to the name index
         for entity in entities:
             self.knowledge_graph.add_entity(entity)
+            self.entity_index.add(entity.id, entity_terms(entity.name, entity.properties))
 
         # Extract relations using LLM
         relations = await self.llm_extractor.extract_relations(
@@ -605,14 +578,38 @@ class EnhancedGraphRAGService:
                 "confidence": 0.5,
             }
 
+    def rebuild_entity_index(self) -> None:
+        """Re-index all graph entities (e.g. after replacing ``knowledge_graph``)."""
+        self.entity_index.clear()
+        for entity in self.knowledge_graph.entities.values():
+            self.entity_index.add(entity.id, entity_terms(entity.name, entity.properties))
+
     def _find_query_entities(self, query: str) -> List[Entity]:
-        """Find entities relevant to query."""
-        relevant_entities = []
+        """
+        Find entities relevant to query.
 
-        for entity in self.knowledge_graph.entities.values():
-            # Simple keyword matching
-            if entity.name.lower() in query.lower() or query.lower() in entity.name.lower():
-                relevant_entities.append(entity)
+        One Aho–Corasick pass finds every entity whose name or alias occurs
+        in the query. Only when nothing matches and the query is no longer
+        than the longest name does it fall back to scanning for names that
+        contain the query.
+        """
+        if len(self.entity_index) != len(self.knowledge_graph.entities):
+            self.rebuild_entity_index()
+
+        relevant_entities = [
+            self.knowledge_graph.entities[entity_id]
+            for entity_id in self.entity_index.match(query)
+            if entity_id in self.knowledge_graph.entities
+        ]
+        if relevant_entities:
+            return relevant_entities
+
+        query_lower = query.lower().strip()
+        if query_lower and len(query_lower) <= self.entity_index.max_length:
+            relevant_entities = [
+                entity for entity in self.knowledge_graph.entities.values()
+                if query_lower in entity.name.lower()
+            ]
 
         return relevant_entities
 
@@ -0,0 +1,203 @@
+"""
+Micro-batcher shared by EmbeddingService and RerankerWorker.
+
+Both services put a slow batch function (an embedding encoder, a
+cross-encoder) behind per-item requests. MicroBatcher provides:
+
+- LRU/TTL memoization keyed by a caller-supplied key
+- In-flight deduplication (concurrent requests for one key share a future)
+- Micro-batching (items arriving within ``max_wait_ms`` go to the batch
+  function as one call; a full batch flushes immediately)
+
+Failures are propagated to every waiting caller and never memoized; a
+cancelled batch cancels its callers' futures.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+BatchFunction = Callable[[List[Any]], Awaitable[Sequence[Any]]]
+
+
+class MicroBatcher:
+    """
+    Memoizing, coalescing, micro-batching front-end for a batch function.
+
+    ``run_batch`` receives a list of items and must return one result per
+    item, in order. Results are shared between callers and must be treated
+    as read-only.
+    """
+
+    def __init__(
+        self,
+        run_batch: BatchFunction,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        cache_size: int = 10000,
+        ttl: Optional[float] = 3600.0,
+        name: str = "batch",
+    ):
+        """
+        Initialize micro-batcher.
+
+        Args:
+            run_batch: Async function processing a list of items
+            max_batch_size: Flush a batch as soon as it reaches this size
+            max_wait_ms: Maximum time the first item of a batch waits
+            cache_size: Maximum number of memoized results (0 = disabled)
+            ttl: Memo entry lifetime in seconds (None = no expiry)
+            name: Used in log messages
+        """
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.cache_size = cache_size
+        self.ttl = ttl
+        self.name = name
+
+        self._memo: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._pending: List[Tuple[Hashable, Any]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: set = set()
+
+        self.stats = {
+            "items": 0,
+            "memo_hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+            "batches": 0,
+            "batched_items": 0,
+            "max_batch_size": 0,
+            "errors": 0,
+        }
+
+    def __len__(self) -> int:
+        """Number of memoized results."""
+        return len(self._memo)
+
+    def _memo_get(self, key: Hashable) -> Optional[Any]:
+        item = self._memo.get(key)
+        if item is None:
+            return None
+        expires_at, result = item
+        if expires_at < time.monotonic():
+            del self._memo[key]
+            return None
+        self._memo.move_to_end(key)
+        return result
+
+    def _memo_put(self, key: Hashable, result: Any) -> None:
+        if self.cache_size <= 0:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else float("inf")
+        self._memo[key] = (expires_at, result)
+        self._memo.move_to_end(key)
+        while len(self._memo) > self.cache_size:
+            self._memo.popitem(last=False)
+
+    def submit(self, key: Hashable, item: Any) -> "asyncio.Future":
+        """
+        Return a future resolving to the result for ``item``.
+
+        Callers awaiting the future should wrap it in ``asyncio.shield``: it
+        may be shared with other callers.
+        """
+        loop = asyncio.get_running_loop()
+        self.stats["items"] += 1
+
+        cached = self._memo_get(key)
+        if cached is not None:
+            self.stats["memo_hits"] += 1
+            future = loop.create_future()
+            future.set_result(cached)
+            return future
+
+        future = self._inflight.get(key)
+        if future is not None and not future.done():
+            self.stats["coalesced"] += 1
+            return future
+
+        self.stats["misses"] += 1
+        future = loop.create_future()
+        self._inflight[key] = future
+        self._pending.append((key, item))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._schedule_flush(loop, immediate=True)
+        elif self._flush_handle is None:
+            self._schedule_flush(loop, immediate=False)
+        return future
+
+    async def get_many(self, keyed_items: List[Tuple[Hashable, Any]]) -> List[Any]:
+        """Submit (key, item) pairs and wait for all results, in input order."""
+        if not keyed_items:
+            return []
+        # shield: a cancelled caller must not cancel a future shared with others
+        futures = [asyncio.shield(self.submit(key, item)) for key, item in keyed_items]
+        return list(await asyncio.gather(*futures))
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop, immediate: bool) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if immediate:
+            batch, self._pending = self._pending, []
+            self._start_batch(loop, batch)
+        else:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush_pending, loop)
+
+    def _flush_pending(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._flush_handle = None
+        if self._pending:
+            batch, self._pending = self._pending, []
+            self._start_batch(loop, batch)
+
+    def _start_batch(self, loop: asyncio.AbstractEventLoop, batch: List[Tuple[Hashable, Any]]) -> None:
+        task = loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[Hashable, Any]]) -> None:
+        keys = [key for key, _ in batch]
+        items = [item for _, item in batch]
+
+        self.stats["batches"] += 1
+        self.stats["batched_items"] += len(items)
+        self.stats["max_batch_size"] = max(self.stats["max_batch_size"], len(items))
+
+        try:
+            results = await self.run_batch(items)
+            if len(results) != len(items):
+                raise ValueError(f"{self.name} returned {len(results)} results for {len(items)} items")
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"{self.name} batch of {len(items)} failed: {e}")
+            for key in keys:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(e)
+            return
+        except BaseException:
+            # Cancelled mid-batch: release the keys so later callers start a
+            # new batch instead of coalescing onto futures nobody resolves
+            for key in keys:
+                future = self._inflight.pop(key, None)
+                if future is not None and not future.done():
+                    future.cancel()
+            raise
+
+        for key, result in zip(keys, results):
+            self._memo_put(key, result)
+            future = self._inflight.pop(key, None)
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    def clear(self) -> None:
+        """Drop all memoized results."""
+        self._memo.clear()
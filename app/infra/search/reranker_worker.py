@@ -0,0 +1,189 @@
+"""
+Reranker Worker for SalesBoost.
+
+Async front-end for cross-encoder rerankers (BGE FlagReranker,
+sentence-transformers CrossEncoder). Sits between callers and a sync
+``score_pairs`` function and provides:
+
+- Off-loop inference on a dedicated worker thread (torch releases the GIL)
+- Dynamic micro-batching (MicroBatcher): pairs from concurrent requests arriving within
+  ``max_wait_ms`` are scored in one model call, sorted by length so each
+  padded sub-batch wastes as little padding as possible
+- Score memoization keyed by (query hash, doc id), so candidates that come
+  back on the next turn are not rescored
+- Process-wide registry so each model is loaded once
+"""
+import asyncio
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from app.infra.search.micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+PairScorer = Callable[[List[Tuple[str, str]]], Sequence[float]]
+
+
+class RerankerWorker:
+    """
+    Memoizing, coalescing, micro-batching wrapper around a pair scorer.
+
+    The scorer receives a list of (query, document) pairs and must return
+    one relevance score per pair, in order. It runs on the worker thread,
+    never on the event loop.
+    """
+
+    def __init__(
+        self,
+        score_pairs: PairScorer,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        cache_size: int = 50000,
+        ttl: Optional[float] = 600.0,
+        namespace: str = "",
+        executor: Optional[ThreadPoolExecutor] = None,
+    ):
+        """
+        Initialize reranker worker.
+
+        Args:
+            score_pairs: Sync function scoring a list of (query, document) pairs
+            max_batch_size: Flush a batch as soon as it reaches this many pairs
+            max_wait_ms: Maximum time the first pair of a batch waits
+            cache_size: Maximum number of memoized scores (0 = disabled)
+            ttl: Memo entry lifetime in seconds (None = no expiry)
+            namespace: Included in the score key (e.g. the model name)
+            executor: Executor running the scorer (default: one dedicated thread)
+        """
+        self.score_pairs = score_pairs
+        self.namespace = namespace
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="reranker"
+        )
+        self._batcher = MicroBatcher(
+            self._score_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            cache_size=cache_size,
+            ttl=ttl,
+            name="Reranker",
+        )
+        self.requests = 0
+
+    def _query_hash(self, query: str) -> str:
+        return hashlib.sha1(f"{self.namespace}\x00{query}".encode("utf-8")).hexdigest()
+
+    async def _score_batch(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._score_sorted, pairs)
+
+    def _score_sorted(self, pairs: List[Tuple[str, str]]) -> List[float]:
+        """Score pairs ordered by length (less padding per sub-batch), then restore order."""
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+        scores = self.score_pairs([pairs[i] for i in order])
+        if isinstance(scores, (int, float)):
+            scores = [scores]
+        scores = [float(s) for s in scores]
+        if len(scores) != len(pairs):
+            raise ValueError(f"Reranker returned {len(scores)} scores for {len(pairs)} pairs")
+
+        restored = [0.0] * len(pairs)
+        for position, index in enumerate(order):
+            restored[index] = scores[position]
+        return restored
+
+    async def score(
+        self,
+        query: str,
+        documents: Sequence[Tuple[Optional[str], str]],
+    ) -> List[float]:
+        """
+        Score documents against a query.
+
+        Args:
+            query: Query text
+            documents: (doc id, document text) pairs; a missing id falls back
+                to a hash of the text for memoization
+
+        Returns:
+            Relevance scores in input order
+        """
+        if not documents:
+            return []
+        self.requests += 1
+        query_hash = self._query_hash(query)
+        keyed_pairs = []
+        for doc_id, text in documents:
+            if not doc_id:
+                doc_id = hashlib.sha1(text.encode("utf-8")).hexdigest()
+            keyed_pairs.append(((query_hash, doc_id), (query, text)))
+        return await self._batcher.get_many(keyed_pairs)
+
+    def clear(self) -> None:
+        """Drop all memoized scores."""
+        self._batcher.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get worker metrics.
+
+        Returns:
+            Counters plus derived hit rate and average batch size
+        """
+        stats = dict(self._batcher.stats)
+        stats["requests"] = self.requests
+        stats["pairs"] = stats.pop("items")
+        stats["batched_pairs"] = stats.pop("batched_items")
+        pairs = stats["pairs"]
+        hits = stats["memo_hits"] + stats["coalesced"]
+        batches = stats["batches"]
+        return {
+            **stats,
+            "hit_rate": hits / pairs if pairs else 0.0,
+            "avg_batch_size": stats["batched_pairs"] / batches if batches else 0.0,
+            "memo_size": len(self._batcher),
+        }
+
+
+_workers: Dict[str, RerankerWorker] = {}
+_workers_lock = threading.Lock()
+
+
+def get_cross_encoder_worker(
+    model_name: str = "cross-encoder/ms-marco-TinyBERT-L-2-v2",
+    max_length: int = 512,
+    batch_size: int = 32,
+) -> RerankerWorker:
+    """
+    Get the shared worker for a sentence-transformers CrossEncoder.
+
+    The model is loaded lazily on the worker thread by the first batch and
+    reused for the lifetime of the process.
+
+    Args:
+        model_name: CrossEncoder model name
+        max_length: Maximum input length in tokens
+        batch_size: Model forward batch size
+
+    Returns:
+        Shared reranker worker for the model
+    """
+    key = f"cross-encoder:{model_name}"
+    with _workers_lock:
+        worker = _workers.get(key)
+        if worker is None:
+            model_holder: List[Any] = []
+
+            def score_pairs(pairs: List[Tuple[str, str]]) -> Sequence[float]:
+                if not model_holder:
+                    from sentence_transformers import CrossEncoder
+
+                    logger.info(f"Loading cross-encoder model: {model_name}")
+                    model_holder.append(CrossEncoder(model_name, max_length=max_length))
+                return model_holder[0].predict([list(pair) for pair in pairs], batch_size=batch_size)
+
+            worker = _workers[key] = RerankerWorker(score_pairs, namespace=key)
+        return worker
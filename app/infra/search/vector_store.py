@@ -1,9 +1,15 @@
+import asyncio
 import logging
+import time
+from contextvars import ContextVar
 from dataclasses import dataclass
-from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
 
 from pydantic import BaseModel
 
+from app.infra.search.reranker_worker import RerankerWorker
+from app.observability.tracing.execution_tracer import trace_manager
+
 try:
     from sentence_transformers import SentenceTransformer
 except ImportError:
@@ -215,14 +221,15 @@ class VectorStoreAdapter(VectorStore):
             raise RuntimeError("embedding_fn is required for Qdrant search")
         vector = await embedding_fn(query)
         query_filter = self._build_filter(filters, ids)
-        results = await self._client.search(
+        response = await self._client.query_points(
             collection_name=self.collection_name,
-            query_vector=vector,
+            query=vector,
             query_filter=query_filter,
             limit=top_k,
+            with_payload=True,
         )
         hits: List[SearchResult] = []
-        for rank, res in enumerate(results):
+        for rank, res in enumerate(response.points):
             payload = res.payload or {}
             content = payload.get("content", "")
             hits.append(
@@ -267,6 +274,7 @@ class BGEReranker:
 
     _instance: Optional["BGEReranker"] = None
     _model: Optional[Any] = None
+    _worker: Optional[RerankerWorker] = None
 
     def __init__(self, model_name: str = "BAAI/bge-reranker-base", batch_size: int = 32):
         """
@@ -331,34 +339,87 @@ class BGEReranker:
             if not isinstance(scores, list):
                 scores = [scores]
 
-            # Create reranked results with new scores
-            reranked = []
-            for result, score in zip(results, scores):
-                reranked.append(SearchResult(
-                    id=result.id,
-                    content=result.content,
-                    score=float(score),
-                    metadata=result.metadata,
-                    rank=0  # Will be assigned after sorting
-                ))
+            return self._build_reranked(results, scores, top_k)
+
+        except Exception as e:
+            logger.error(f"BGE reranking failed: {e}", exc_info=True)
+            return results
+
+    async def arerank(self, query: str, results: List[SearchResult], top_k: Optional[int] = None) -> List[SearchResult]:
+        """
+        Rerank search results without blocking the event loop.
 
-            # Sort by BGE score descending
-            reranked.sort(key=lambda x: x.score, reverse=True)
+        Pairs are scored by the shared ``RerankerWorker``: concurrent requests
+        are batched together and scores are memoized per (query, doc id).
 
-            # Assign ranks
-            for rank, result in enumerate(reranked):
-                result.rank = rank
+        Args:
+            query: Search query
+            results: List of search results to rerank
+            top_k: Number of top results to return (None = all)
 
-            # Return top_k if specified
-            if top_k is not None:
-                return reranked[:top_k]
+        Returns:
+            Reranked list of search results
+        """
+        if not results:
+            return results
 
-            return reranked
+        if BGEReranker._model is None:
+            logger.warning("BGE reranker not available, returning original results")
+            return results
 
+        try:
+            scores = await self.worker.score(query, [(result.id, result.content) for result in results])
+            return self._build_reranked(results, scores, top_k)
         except Exception as e:
             logger.error(f"BGE reranking failed: {e}", exc_info=True)
             return results
 
+    @property
+    def worker(self) -> RerankerWorker:
+        """Shared micro-batching worker around the loaded model."""
+        if BGEReranker._worker is None:
+            batch_size = self.batch_size
+
+            def score_pairs(pairs):
+                return BGEReranker._model.compute_score([list(pair) for pair in pairs], batch_size=batch_size)
+
+            BGEReranker._worker = RerankerWorker(
+                score_pairs,
+                max_batch_size=max(batch_size * 2, 64),
+                namespace=self.model_name,
+            )
+        return BGEReranker._worker
+
+    @staticmethod
+    def _build_reranked(
+        results: List[SearchResult],
+        scores: Iterable[float],
+        top_k: Optional[int],
+    ) -> List[SearchResult]:
+        # Create reranked results with new scores
+        reranked = []
+        for result, score in zip(results, scores):
+            reranked.append(SearchResult(
+                id=result.id,
+                content=result.content,
+                score=float(score),
+                metadata=result.metadata,
+                rank=0  # Will be assigned after sorting
+            ))
+
+        # Sort by BGE score descending
+        reranked.sort(key=lambda x: x.score, reverse=True)
+
+        # Assign ranks
+        for rank, result in enumerate(reranked):
+            result.rank = rank
+
+        # Return top_k if specified
+        if top_k is not None:
+            return reranked[:top_k]
+
+        return reranked
+
 
 @dataclass
 class PrefilterResult:
@@ -366,20 +427,123 @@ class PrefilterResult:
     candidate_ids: List[str]
 
 
+async def _run_leg(
+    name: str,
+    awaitable: Awaitable[Any],
+    timeout: Optional[float],
+) -> Tuple[Optional[Any], Dict[str, Any], Optional[BaseException]]:
+    """
+    Run one retrieval leg under its latency budget.
+
+    Returns:
+        (result, trace entry, error); a late or failed leg yields None
+    """
+    start = time.perf_counter()
+    error: Optional[BaseException] = None
+    try:
+        if timeout is None:
+            results = await awaitable
+        else:
+            results = await asyncio.wait_for(awaitable, timeout)
+        status = "ok"
+    except asyncio.TimeoutError:
+        results, status = None, "timeout"
+        logger.warning(f"Search leg '{name}' missed its {timeout * 1000:.0f}ms budget, fusing without it")
+    except Exception as e:
+        results, status, error = None, "error", e
+        logger.warning(f"Search leg '{name}' failed: {e}")
+
+    entry = {
+        "status": status,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+        "hits": len(results) if isinstance(results, list) else 0,
+    }
+    return results, entry, error
+
+
+# (engine, trace) of the last search made from the current task; a context
+# variable so concurrent searches on a shared engine keep their own trace
+_last_search_trace: ContextVar[Tuple[Any, Dict[str, Any]]] = ContextVar("last_search_trace", default=(None, {}))
+
+
+def _finish_trace(
+    engine: Any,
+    step_name: str,
+    legs: Dict[str, Dict[str, Any]],
+    start: float,
+    trace_id: Optional[str],
+) -> Dict[str, Any]:
+    trace = {
+        "legs": legs,
+        "contributing": [name for name, leg in legs.items() if leg["status"] == "ok" and leg["hits"]],
+        "latency_ms": round((time.perf_counter() - start) * 1000, 2),
+    }
+    _last_search_trace.set((engine, trace))
+    if trace_id:
+        trace_manager.record_step(trace_id, step_name, trace)
+    return trace
+
+
+def _trace_for(engine: Any) -> Dict[str, Any]:
+    owner, trace = _last_search_trace.get()
+    return trace if owner is engine else {}
+
+
 class HybridSearchEngine:
-    def __init__(self, vector_store: VectorStore, keyword_store: VectorStore, rrf_k: int = 60):
+    def __init__(
+        self,
+        vector_store: VectorStore,
+        keyword_store: VectorStore,
+        rrf_k: int = 60,
+        leg_timeout: Optional[float] = None,
+        leg_timeouts: Optional[Dict[str, float]] = None,
+    ):
+        """
+        Args:
+            vector_store: Dense retrieval leg
+            keyword_store: Keyword (BM25) retrieval leg
+            rrf_k: RRF k constant
+            leg_timeout: Latency budget in seconds for every leg (None = wait)
+            leg_timeouts: Per-leg overrides keyed by "vector" / "keyword"
+        """
         self.vector_store = vector_store
         self.keyword_store = keyword_store
         self.rrf_k = rrf_k  # Configurable k, default 60
+        self.leg_timeout = leg_timeout
+        self.leg_timeouts = leg_timeouts or {}
+
+    @property
+    def last_trace(self) -> Dict[str, Any]:
+        """Trace of the last search this engine ran in the current task."""
+        return _trace_for(self)
 
-    async def search(self, query: str, top_k: int = 10) -> List[SearchResult]:
+    def _budget(self, leg: str) -> Optional[float]:
+        return self.leg_timeouts.get(leg, self.leg_timeout)
+
+    async def search(self, query: str, top_k: int = 10, trace_id: Optional[str] = None) -> List[SearchResult]:
         """
         Perform hybrid search using RRF (Reciprocal Rank Fusion).
+
+        Both legs run concurrently, each under its own latency budget; a leg
+        that times out or fails is left out of the fusion. Leg status and
+        the contributing legs are available from ``last_trace`` (per task)
+        and, when ``trace_id`` is given, recorded as a trace step.
         """
-        vec_results = await self.vector_store.search(query, top_k)
-        kw_results = await self.keyword_store.search(query, top_k)
-        
-        return self.rrf_fusion(vec_results, kw_results, top_k)
+        start = time.perf_counter()
+        (vec_results, vec_leg, vec_error), (kw_results, kw_leg, kw_error) = await asyncio.gather(
+            _run_leg("vector", self.vector_store.search(query, top_k), self._budget("vector")),
+            _run_leg("keyword", self.keyword_store.search(query, top_k), self._budget("keyword")),
+        )
+        _finish_trace(
+            self,
+            "hybrid_search", {"vector": vec_leg, "keyword": kw_leg}, start, trace_id
+        )
+
+        # Nothing to fuse and nothing timed out: surface the failure to the caller
+        if vec_error is not None and kw_error is not None:
+            raise vec_error
+
+        return self.rrf_fusion(vec_results or [], kw_results or [], top_k)
 
     def rrf_fusion(self, vec_results: List[SearchResult], kw_results: List[SearchResult], limit: int = 10) -> List[SearchResult]:
         """
@@ -424,6 +588,11 @@ class HSRSearchEngine:
     1) PG prefilter (metadata/keyword)
     2) Qdrant vector recall (Top-50)
     3) RRF fusion
+
+    The prefilter runs concurrently with query embedding, the slow half of
+    the vector leg. If the prefilter misses its budget, vector recall runs
+    unrestricted (metadata filters still apply) and fusion uses the vector
+    hits alone.
     """
     def __init__(
         self,
@@ -431,11 +600,23 @@ class HSRSearchEngine:
         prefilter: Callable[[str, int, Dict[str, Any]], Awaitable[PrefilterResult]],
         rrf_k: int = 60,
         vector_top_k: int = 50,
+        leg_timeout: Optional[float] = None,
+        leg_timeouts: Optional[Dict[str, float]] = None,
     ) -> None:
         self.vector_store = vector_store
         self.prefilter = prefilter
         self.rrf_k = rrf_k
         self.vector_top_k = vector_top_k
+        self.leg_timeout = leg_timeout
+        self.leg_timeouts = leg_timeouts or {}
+
+    @property
+    def last_trace(self) -> Dict[str, Any]:
+        """Trace of the last search this engine ran in the current task."""
+        return _trace_for(self)
+
+    def _budget(self, leg: str) -> Optional[float]:
+        return self.leg_timeouts.get(leg, self.leg_timeout)
 
     async def search(
         self,
@@ -443,18 +624,62 @@ class HSRSearchEngine:
         top_k: int,
         filters: Dict[str, Any],
         embedding_fn: Callable[[str], Awaitable[List[float]]],
+        trace_id: Optional[str] = None,
     ) -> List[SearchResult]:
-        prefilter_result = await self.prefilter(query, top_k, filters)
-        vec_results = await self.vector_store.search(
-            query=query,
-            top_k=self.vector_top_k,
-            filters=filters,
-            ids=prefilter_result.candidate_ids or None,
-            embedding_fn=embedding_fn,
+        """
+        Prefilter + vector recall + RRF under per-leg budgets ("prefilter", "vector").
+
+        Each budget is measured from the start of its own leg, so the
+        worst-case latency is the sum of the two. Leg status and the
+        contributing legs are available from ``last_trace`` (per task) and,
+        when ``trace_id`` is given, recorded as a trace step.
+        """
+        start = time.perf_counter()
+        embed_task = asyncio.ensure_future(embedding_fn(query))
+        # Mark a failure as retrieved even if the vector leg never awaits it
+        embed_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        try:
+            prefilter_result, prefilter_leg, _ = await _run_leg(
+                "prefilter",
+                self.prefilter(query, top_k, filters),
+                self._budget("prefilter"),
+            )
+        except BaseException:
+            embed_task.cancel()
+            raise
+        keyword_hits = prefilter_result.keyword_hits if prefilter_result else []
+        candidate_ids = prefilter_result.candidate_ids if prefilter_result else None
+        prefilter_leg["hits"] = len(keyword_hits)
+
+        async def _embedded(_: str) -> List[float]:
+            return await embed_task
+
+        # The vector budget starts when recall starts; embedding time spent
+        # while the prefilter ran is not charged to it
+        vec_results, vector_leg, vec_error = await _run_leg(
+            "vector",
+            self.vector_store.search(
+                query=query,
+                top_k=self.vector_top_k,
+                filters=filters,
+                ids=candidate_ids or None,
+                embedding_fn=_embedded,
+            ),
+            self._budget("vector"),
         )
+        if not embed_task.done():
+            embed_task.cancel()
+        _finish_trace(
+            self,
+            "hsr_search", {"prefilter": prefilter_leg, "vector": vector_leg}, start, trace_id
+        )
+
+        if vec_error is not None and prefilter_leg["status"] == "error":
+            raise vec_error
+
         return HybridSearchEngine(self.vector_store, self.vector_store, rrf_k=self.rrf_k).rrf_fusion(
-            vec_results,
-            prefilter_result.keyword_hits,
+            vec_results or [],
+            keyword_hits,
             top_k,
         )
 
@@ -472,7 +697,7 @@ class HSRSearchEngine:
         """
         try:
             reranker = BGEReranker.get_instance()
-            return reranker.rerank(query, results, top_k)
+            return await reranker.arerank(query, results, top_k)
         except Exception as e:
             logger.error(f"Reranking failed: {e}", exc_info=True)
             return results
@@ -0,0 +1,132 @@
+"""
+Incremental extraction of a string field from a streamed JSON object.
+
+LLM agents are prompted to answer as ``{"content": "...", "mood": ...}``.
+When the answer is streamed, only the text inside ``content`` should reach
+the user, and it should reach them as soon as each token arrives rather than
+after the closing brace.
+"""
+import json
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class JSONFieldStreamExtractor:
+    """
+    Feed raw JSON text chunks, get back the decoded characters of one field.
+
+    Output that does not start with ``{`` is treated as plain text and passed
+    through unchanged, mirroring how agents fall back to the raw response when
+    the model ignores the JSON instruction.
+
+    Example:
+        >>> extractor = JSONFieldStreamExtractor("content")
+        >>> extractor.feed('{"content": "Hel')
+        'Hel'
+        >>> extractor.feed('lo", "mood": 0.5}')
+        'lo'
+    """
+
+    def __init__(self, field: str = "content"):
+        self.field = field
+        self._key_pattern = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._raw = ""
+        self._pos = 0
+        self._mode = "detect"  # detect -> seek -> value -> done | plain
+
+    @property
+    def done(self) -> bool:
+        return self._mode == "done"
+
+    @property
+    def raw(self) -> str:
+        """Everything fed so far."""
+        return self._raw
+
+    def feed(self, chunk: str) -> str:
+        """Consume a chunk and return newly decoded field text (may be empty)."""
+        if not chunk:
+            return ""
+        self._raw += chunk
+
+        if self._mode == "detect":
+            stripped = self._raw.lstrip()
+            if not stripped:
+                return ""
+            if stripped[0] != "{":
+                self._mode = "plain"
+                return self._raw
+            self._mode = "seek"
+        elif self._mode == "plain":
+            return chunk
+
+        if self._mode == "seek":
+            match = self._key_pattern.search(self._raw, self._pos)
+            if not match:
+                return ""
+            self._pos = match.end()
+            self._mode = "value"
+
+        if self._mode == "value":
+            return self._decode_value()
+        return ""
+
+    def _decode_value(self) -> str:
+        out = []
+        raw = self._raw
+        pos = self._pos
+        while pos < len(raw):
+            char = raw[pos]
+            if char == '"':
+                self._mode = "done"
+                pos += 1
+                break
+            if char != "\\":
+                out.append(char)
+                pos += 1
+                continue
+            # Escape sequence; wait for more input if it is incomplete
+            if pos + 1 >= len(raw):
+                break
+            kind = raw[pos + 1]
+            if kind in _SIMPLE_ESCAPES:
+                out.append(_SIMPLE_ESCAPES[kind])
+                pos += 2
+                continue
+            if kind != "u":
+                logger.debug("Invalid JSON escape \\%s in streamed field", kind)
+                out.append(kind)
+                pos += 2
+                continue
+            length = 6
+            if pos + 6 <= len(raw) and 0xD800 <= _hex(raw[pos + 2:pos + 6]) <= 0xDBFF:
+                length = 12  # High surrogate, decode together with its pair
+            if pos + length > len(raw):
+                break
+            try:
+                out.append(json.loads('"%s"' % raw[pos:pos + length]))
+            except ValueError:
+                out.append("�")
+            pos += length
+        self._pos = pos
+        return "".join(out)
+
+
+def _hex(digits: str) -> int:
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return -1
@@ -5,8 +5,10 @@ Production-ready Qdrant client with connection pooling, retry logic, and error h
 
 Features:
 - Collection management (create, delete, list)
-- Document upsert with automatic batching
-- Hybrid search (dense + sparse vectors)
+- Document upsert with pipelined batches (bounded concurrency, one final
+  confirmation instead of waiting on every batch)
+- Hybrid search (dense + sparse vectors) in a single Query API request,
+  fused server-side with weighted RRF
 - Connection pooling and health checks
 - Retry logic with exponential backoff
 - Comprehensive error handling
@@ -25,10 +27,13 @@ Usage:
 
     # Search
     results = await store.search("knowledge_base", query_vector, top_k=5)
+
+Pass ``url=":memory:"`` for Qdrant's local in-memory mode (tests).
 """
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
@@ -45,12 +50,13 @@ try:
         Filter,
         FieldCondition,
         MatchValue,
-        SearchParams,
         SparseVector,
         SparseVectorParams,
-        NamedVector,
-        NamedSparseVector,
+        Prefetch,
+        Rrf,
+        RrfQuery,
     )
+    from qdrant_client.http.exceptions import UnexpectedResponse
     QDRANT_AVAILABLE = True
 except ImportError:
     QDRANT_AVAILABLE = False
@@ -97,8 +103,11 @@ class QdrantVectorStore:
         timeout: Request timeout in seconds (default: 30)
         max_retries: Maximum number of retries (default: 3)
         retry_delay: Initial retry delay in seconds (default: 1.0)
+        upsert_concurrency: Upsert batches in flight at once (default: 4)
     """
 
+    RRF_K = 60
+
     _instance: Optional["QdrantVectorStore"] = None
     _client: Optional[AsyncQdrantClient] = None
 
@@ -109,13 +118,17 @@ class QdrantVectorStore:
         timeout: int = 30,
         max_retries: int = 3,
         retry_delay: float = 1.0,
+        upsert_concurrency: int = 4,
     ):
         self.url = url
         self.api_key = api_key
         self.timeout = timeout
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.upsert_concurrency = max(1, upsert_concurrency)
         self._initialized = False
+        # Cleared when the server cannot run the fused query (pre-1.16 Qdrant)
+        self._server_fusion = True
 
     @classmethod
     def get_instance(
@@ -144,11 +157,14 @@ class QdrantVectorStore:
 
         try:
             # Create async client
-            QdrantVectorStore._client = AsyncQdrantClient(
-                url=self.url,
-                api_key=self.api_key,
-                timeout=self.timeout,
-            )
+            if self.url == ":memory:":
+                QdrantVectorStore._client = AsyncQdrantClient(location=":memory:")
+            else:
+                QdrantVectorStore._client = AsyncQdrantClient(
+                    url=self.url,
+                    api_key=self.api_key,
+                    timeout=self.timeout,
+                )
 
             # Verify connection
             collections = await QdrantVectorStore._client.get_collections()
@@ -275,6 +291,34 @@ class QdrantVectorStore:
             logger.error(f"Failed to list collections: {e}")
             return []
 
+    @staticmethod
+    def _to_point(doc: Document, created_at: str) -> PointStruct:
+        """Convert a document to a Qdrant point."""
+        # Prepare vectors
+        vectors = {
+            "dense": doc.dense_vector
+        }
+
+        # Add sparse vector if available
+        if doc.sparse_vector:
+            vectors["sparse"] = SparseVector(
+                indices=list(doc.sparse_vector.keys()),
+                values=list(doc.sparse_vector.values()),
+            )
+
+        # Prepare payload
+        payload = {
+            "content": doc.content,
+            "metadata": doc.metadata or {},
+            "created_at": created_at,
+        }
+
+        return PointStruct(
+            id=doc.id,
+            vector=vectors,
+            payload=payload,
+        )
+
     async def upsert_documents(
         self,
         collection_name: str,
@@ -284,6 +328,12 @@ class QdrantVectorStore:
         """
         Upsert documents with automatic batching.
 
+        Batches are sent concurrently (at most ``upsert_concurrency`` in
+        flight) with ``wait=False``, so each request returns once Qdrant has
+        accepted it into its write-ahead log. The last batch is sent with
+        ``wait=True`` after all others were accepted; updates are applied in
+        order, so its completion confirms the whole upsert.
+
         Args:
             collection_name: Name of the collection
             documents: List of documents to upsert
@@ -300,61 +350,57 @@ class QdrantVectorStore:
             logger.warning("No documents to upsert")
             return True
 
-        try:
-            # Process in batches
-            for i in range(0, len(documents), batch_size):
-                batch = documents[i:i + batch_size]
-                points = []
-
-                for doc in batch:
-                    # Prepare vectors
-                    vectors = {
-                        "dense": doc.dense_vector
-                    }
-
-                    # Add sparse vector if available
-                    if doc.sparse_vector:
-                        # Convert dict to SparseVector
-                        indices = list(doc.sparse_vector.keys())
-                        values = list(doc.sparse_vector.values())
-                        vectors["sparse"] = SparseVector(
-                            indices=indices,
-                            values=values,
-                        )
-
-                    # Prepare payload
-                    payload = {
-                        "content": doc.content,
-                        "metadata": doc.metadata or {},
-                        "created_at": datetime.now().isoformat(),
-                    }
-
-                    # Create point
-                    point = PointStruct(
-                        id=doc.id,
-                        vector=vectors,
-                        payload=payload,
-                    )
-                    points.append(point)
-
-                # Upsert batch
-                await QdrantVectorStore._client.upsert(
+        client = QdrantVectorStore._client
+        created_at = datetime.now().isoformat()
+        batches = [documents[i:i + batch_size] for i in range(0, len(documents), batch_size)]
+        semaphore = asyncio.Semaphore(self.upsert_concurrency)
+
+        async def send(batch_num: int, batch: List[Document], wait: bool) -> None:
+            async with semaphore:
+                await client.upsert(
                     collection_name=collection_name,
-                    points=points,
+                    points=[self._to_point(doc, created_at) for doc in batch],
+                    wait=wait,
                 )
+            logger.debug(
+                f"Upserted batch {batch_num + 1}/{len(batches)} "
+                f"({len(batch)} documents) to {collection_name}"
+            )
 
-                logger.info(
-                    f"Upserted batch {i // batch_size + 1} "
-                    f"({len(batch)} documents) to {collection_name}"
-                )
+        try:
+            await asyncio.gather(
+                *(send(i, batch, wait=False) for i, batch in enumerate(batches[:-1]))
+            )
+            await send(len(batches) - 1, batches[-1], wait=True)
 
-            logger.info(f"Successfully upserted {len(documents)} documents")
+            logger.info(f"Successfully upserted {len(documents)} documents in {len(batches)} batches")
             return True
 
         except Exception as e:
             logger.error(f"Failed to upsert documents: {e}")
             return False
 
+    @staticmethod
+    def _metadata_filter(filters: Optional[Dict[str, Any]]) -> Optional[Filter]:
+        """Build an equality filter on ``metadata.<key>`` payload fields."""
+        if not filters:
+            return None
+        conditions = [
+            FieldCondition(key=f"metadata.{key}", match=MatchValue(value=value))
+            for key, value in filters.items()
+        ]
+        return Filter(must=conditions) if conditions else None
+
+    @staticmethod
+    def _to_result(point: Any, score: Optional[float] = None) -> SearchResult:
+        payload = point.payload or {}
+        return SearchResult(
+            id=str(point.id),
+            score=point.score if score is None else score,
+            content=payload.get("content", ""),
+            metadata=payload.get("metadata", {}),
+        )
+
     async def search(
         self,
         collection_name: str,
@@ -382,31 +428,22 @@ class QdrantVectorStore:
 
         try:
             # Build filter
-            qdrant_filter = None
-            if filters:
-                conditions = []
-                for key, value in filters.items():
-                    conditions.append(
-                        FieldCondition(
-                            key=f"metadata.{key}",
-                            match=MatchValue(value=value),
-                        )
-                    )
-                if conditions:
-                    qdrant_filter = Filter(must=conditions)
+            qdrant_filter = self._metadata_filter(filters)
 
             # Search
-            search_result = await QdrantVectorStore._client.search(
+            response = await QdrantVectorStore._client.query_points(
                 collection_name=collection_name,
-                query_vector=("dense", query_vector),
+                query=query_vector,
+                using="dense",
                 limit=top_k,
                 query_filter=qdrant_filter,
                 score_threshold=score_threshold,
+                with_payload=True,
             )
 
             # Convert to SearchResult
             results = []
-            for hit in search_result:
+            for hit in response.points:
                 result = SearchResult(
                     id=str(hit.id),
                     score=hit.score,
@@ -438,7 +475,10 @@ class QdrantVectorStore:
         """
         Hybrid search with dense + sparse vectors.
 
-        Uses RRF (Reciprocal Rank Fusion) to combine results.
+        Uses weighted RRF (Reciprocal Rank Fusion) to combine results. Both
+        legs are prefetched and fused by Qdrant in one Query API request; if
+        the server does not support weighted fusion, the two legs run
+        concurrently and are fused client-side.
 
         Args:
             collection_name: Name of the collection
@@ -462,82 +502,25 @@ class QdrantVectorStore:
             dense_weight = dense_weight / total_weight
             sparse_weight = sparse_weight / total_weight
 
-            # Build filter
-            qdrant_filter = None
-            if filters:
-                conditions = []
-                for key, value in filters.items():
-                    conditions.append(
-                        FieldCondition(
-                            key=f"metadata.{key}",
-                            match=MatchValue(value=value),
-                        )
-                    )
-                if conditions:
-                    qdrant_filter = Filter(must=conditions)
-
-            # Dense search
-            dense_results = await QdrantVectorStore._client.search(
-                collection_name=collection_name,
-                query_vector=("dense", dense_vector),
-                limit=top_k * 2,  # Get more for fusion
-                query_filter=qdrant_filter,
-            )
-
-            # Sparse search
-            sparse_indices = list(sparse_vector.keys())
-            sparse_values = list(sparse_vector.values())
-            sparse_results = await QdrantVectorStore._client.search(
-                collection_name=collection_name,
-                query_vector=(
-                    "sparse",
-                    SparseVector(indices=sparse_indices, values=sparse_values),
-                ),
-                limit=top_k * 2,
-                query_filter=qdrant_filter,
+            qdrant_filter = self._metadata_filter(filters)
+            sparse_query = SparseVector(
+                indices=list(sparse_vector.keys()),
+                values=list(sparse_vector.values()),
             )
-
-            # RRF fusion
-            rrf_k = 60
-            scores = {}
-
-            # Add dense scores
-            for rank, hit in enumerate(dense_results):
-                doc_id = str(hit.id)
-                rrf_score = dense_weight / (rrf_k + rank + 1)
-                scores[doc_id] = scores.get(doc_id, 0) + rrf_score
-
-            # Add sparse scores
-            for rank, hit in enumerate(sparse_results):
-                doc_id = str(hit.id)
-                rrf_score = sparse_weight / (rrf_k + rank + 1)
-                scores[doc_id] = scores.get(doc_id, 0) + rrf_score
-
-            # Sort by fused score
-            sorted_ids = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-            top_ids = [doc_id for doc_id, _ in sorted_ids[:top_k]]
-
-            # Retrieve full documents
-            points = await QdrantVectorStore._client.retrieve(
-                collection_name=collection_name,
-                ids=top_ids,
-                with_vectors=False,
-            )
-
-            # Build results
-            results = []
-            id_to_point = {str(p.id): p for p in points}
-
-            for doc_id, score in sorted_ids[:top_k]:
-                if doc_id in id_to_point:
-                    point = id_to_point[doc_id]
-                    result = SearchResult(
-                        id=doc_id,
-                        score=score,
-                        content=point.payload.get("content", ""),
-                        metadata=point.payload.get("metadata", {}),
-                    )
-                    results.append(result)
+            legs = [
+                Prefetch(query=dense_vector, using="dense", limit=top_k * 2, filter=qdrant_filter),
+                Prefetch(query=sparse_query, using="sparse", limit=top_k * 2, filter=qdrant_filter),
+            ]
+
+            results = None
+            if self._server_fusion:
+                results = await self._server_fused_search(
+                    collection_name, legs, [dense_weight, sparse_weight], top_k
+                )
+            if results is None:
+                results = await self._client_fused_search(
+                    collection_name, legs, [dense_weight, sparse_weight], top_k
+                )
 
             logger.info(
                 f"Hybrid search returned {len(results)} results "
@@ -549,6 +532,85 @@ class QdrantVectorStore:
             logger.error(f"Hybrid search failed: {e}")
             return []
 
+    async def _server_fused_search(
+        self,
+        collection_name: str,
+        legs: List[Prefetch],
+        weights: List[float],
+        top_k: int,
+    ) -> Optional[List[SearchResult]]:
+        """One request: prefetch both legs, weighted RRF on the server."""
+        try:
+            response = await QdrantVectorStore._client.query_points(
+                collection_name=collection_name,
+                prefetch=legs,
+                query=RrfQuery(rrf=Rrf(k=self.RRF_K, weights=weights)),
+                limit=top_k,
+                with_payload=True,
+            )
+        except UnexpectedResponse as e:
+            if self._fusion_unsupported(e):
+                logger.warning(f"Server-side RRF unavailable, fusing client-side: {e}")
+                self._server_fusion = False
+                return None
+            raise
+        return [self._to_result(point) for point in response.points]
+
+    @staticmethod
+    def _fusion_unsupported(error: UnexpectedResponse) -> bool:
+        """
+        Whether the server rejected the fused query itself, not this request.
+
+        Pre-1.10 servers have no Query API (404 on the route); pre-1.16 ones
+        reject the weighted RRF body (400/422 naming the unknown field). A
+        missing collection, wrong vector name or dimension is a request error
+        and must not switch fusion off for the life of the process.
+        """
+        text = str(error).lower()
+        if "collection" in text and ("not found" in text or "doesn't exist" in text):
+            return False
+        if error.status_code == 404:
+            return True
+        if error.status_code in (400, 422):
+            return any(
+                marker in text
+                for marker in ("rrf", "weights", "prefetch", "unknown field", "unknown variant")
+            )
+        return False
+
+    async def _client_fused_search(
+        self,
+        collection_name: str,
+        legs: List[Prefetch],
+        weights: List[float],
+        top_k: int,
+    ) -> List[SearchResult]:
+        """Run the legs concurrently (payloads included) and fuse with weighted RRF."""
+        responses = await asyncio.gather(
+            *(
+                QdrantVectorStore._client.query_points(
+                    collection_name=collection_name,
+                    query=leg.query,
+                    using=leg.using,
+                    query_filter=leg.filter,
+                    limit=leg.limit,
+                    with_payload=True,
+                )
+                for leg in legs
+            )
+        )
+
+        scores: Dict[str, float] = {}
+        points: Dict[str, Any] = {}
+        for weight, response in zip(weights, responses):
+            for rank, point in enumerate(response.points):
+                doc_id = str(point.id)
+                scores[doc_id] = scores.get(doc_id, 0.0) + weight / (self.RRF_K + rank + 1)
+                points.setdefault(doc_id, point)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [self._to_result(points[doc_id], score) for doc_id, score in ranked]
+
     async def delete_documents(
         self,
         collection_name: str,
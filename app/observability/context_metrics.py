@@ -0,0 +1,47 @@
+"""
+Context Pipeline Metrics for Prometheus
+Monitors the background context-maintenance queue (scoring, compression, state sync)
+"""
+from prometheus_client import Counter, Gauge, Histogram
+
+context_queue_depth = Gauge(
+    'context_pipeline_queue_depth',
+    'Turns waiting in the context pipeline'
+)
+
+context_queue_lag_seconds = Histogram(
+    'context_pipeline_queue_lag_seconds',
+    'Time between a turn being submitted and its processing starting',
+    buckets=[0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+context_batch_total = Counter(
+    'context_pipeline_batches_total',
+    'Context pipeline batches processed',
+    ['status']
+)
+
+context_batch_turns = Histogram(
+    'context_pipeline_batch_turns',
+    'Turns coalesced into one context update',
+    buckets=[1, 2, 3, 4, 6, 8]
+)
+
+context_processing_duration_seconds = Histogram(
+    'context_pipeline_processing_duration_seconds',
+    'Duration of one context update',
+    buckets=[0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+
+def update_context_queue_depth(depth: int):
+    """Set the number of turns waiting in the pipeline"""
+    context_queue_depth.set(depth)
+
+
+def record_context_batch(lag_seconds: float, turns: int, status: str, duration_seconds: float):
+    """Record one processed batch and the queue lag of its oldest turn"""
+    context_queue_lag_seconds.observe(lag_seconds)
+    context_batch_total.labels(status=status).inc()
+    context_batch_turns.observe(turns)
+    context_processing_duration_seconds.observe(duration_seconds)
@@ -10,6 +10,8 @@ Metrics:
 - tool_errors_total: Counter for tool errors by type
 - tool_cache_hit_rate: Gauge for cache hit rate
 - tool_cache_operations_total: Counter for cache operations
+- tool_coalesced_executions_total: Counter for calls served by an in-flight execution
+- tool_cache_refreshes_total: Counter for stale-while-revalidate refreshes
 
 Usage:
     from app.observability.tool_metrics import tool_metrics_collector
@@ -90,6 +92,22 @@ class ToolMetricsCollector:
             registry=self.registry
         )
 
+        # Counter: Calls that joined an identical in-flight execution
+        self.tool_coalesced_executions = Counter(
+            'tool_coalesced_executions_total',
+            'Tool calls served by an identical in-flight execution',
+            labelnames=['tool_name'],
+            registry=self.registry
+        )
+
+        # Counter: Background refreshes of stale cache entries
+        self.tool_cache_refreshes = Counter(
+            'tool_cache_refreshes_total',
+            'Background refreshes of stale tool cache entries',
+            labelnames=['tool_name', 'status'],
+            registry=self.registry
+        )
+
         logger.info("ToolMetricsCollector initialized")
 
     def record_execution(
@@ -181,6 +199,25 @@ class ToolMetricsCollector:
             attempt_number=str(attempt_number)
         ).inc()
 
+    def record_coalesced_execution(self, tool_name: str):
+        """
+        Record a call that awaited an identical in-flight execution.
+
+        Args:
+            tool_name: Name of the tool
+        """
+        self.tool_coalesced_executions.labels(tool_name=tool_name).inc()
+
+    def record_cache_refresh(self, tool_name: str, status: str):
+        """
+        Record a background cache refresh.
+
+        Args:
+            tool_name: Name of the tool
+            status: Refresh outcome ("success" or "error")
+        """
+        self.tool_cache_refreshes.labels(tool_name=tool_name, status=status).inc()
+
     def get_stats(self) -> dict:
         """
         Get current metrics statistics.
@@ -231,3 +268,13 @@ def update_cache_hit_rate(tool_name: str, hit_rate: float):
 def record_retry_attempt(tool_name: str, attempt_number: int):
     """Convenience function to record retry attempt"""
     tool_metrics_collector.record_retry_attempt(tool_name, attempt_number)
+
+
+def record_coalesced_execution(tool_name: str):
+    """Convenience function to record a coalesced execution"""
+    tool_metrics_collector.record_coalesced_execution(tool_name)
+
+
+def record_cache_refresh(tool_name: str, status: str):
+    """Convenience function to record a background cache refresh"""
+    tool_metrics_collector.record_cache_refresh(tool_name, status)
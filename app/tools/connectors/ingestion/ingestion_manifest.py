@@ -0,0 +1,120 @@
+"""
+Ingestion manifest for incremental re-ingestion.
+
+Records, per source, what the last successful ingestion stored:
+
+- File level: SHA-256 of the raw bytes plus a fingerprint of the chunking
+  configuration; an identical file is skipped before extraction
+- Section level: content hash of every section -> IDs of its chunks; an
+  unchanged section is neither re-chunked nor re-embedded
+- Chunk level: chunk IDs are derived from the chunk content, so a chunk
+  that reappears in a changed section is not re-embedded either, and
+  chunks missing from the new version are known exactly
+
+One JSON file per source keeps each update proportional to that source.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Union
+
+logger = logging.getLogger(__name__)
+
+# Namespace for content-derived document and chunk IDs (valid Qdrant point IDs)
+INGESTION_NAMESPACE = uuid.UUID("6f1c3a52-9a7e-4f0b-8d0e-3b5f0c2d7a41")
+
+
+def content_hash(text: str) -> str:
+    """SHA-1 of UTF-8 text."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def stable_id(*parts: str) -> str:
+    """Deterministic UUID for a tuple of strings."""
+    return str(uuid.uuid5(INGESTION_NAMESPACE, "\x00".join(parts)))
+
+
+@dataclass
+class ManifestEntry:
+    """What the last ingestion of one source stored."""
+
+    source_id: str
+    doc_id: str
+    file_hash: str
+    config: str
+    sections: Dict[str, List[str]] = field(default_factory=dict)  # section hash -> chunk IDs
+    updated_at: float = 0.0
+
+    @property
+    def chunk_ids(self) -> Set[str]:
+        return {chunk_id for ids in self.sections.values() for chunk_id in ids}
+
+
+class IngestionManifest:
+    """Directory of per-source manifest entries."""
+
+    VERSION = 1
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Args:
+            path: Manifest directory (created on first write)
+        """
+        self.path = Path(path)
+
+    def _file(self, source_id: str) -> Path:
+        return self.path / f"{hashlib.sha1(source_id.encode('utf-8')).hexdigest()}.json"
+
+    @staticmethod
+    def _read(file: Path) -> Optional[ManifestEntry]:
+        try:
+            data = json.loads(file.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable ingestion manifest {file}: {e}")
+            return None
+        if data.pop("version", None) != IngestionManifest.VERSION:
+            return None
+        return ManifestEntry(**data)
+
+    def get(self, source_id: str) -> Optional[ManifestEntry]:
+        """Entry for a source, or None if it was never ingested."""
+        file = self._file(source_id)
+        if not file.exists():
+            return None
+        entry = self._read(file)
+        return entry if entry is not None and entry.source_id == source_id else None
+
+    def put(self, entry: ManifestEntry) -> None:
+        """Write an entry atomically."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry.updated_at = time.time()
+        file = self._file(entry.source_id)
+        tmp = file.with_suffix(".tmp")
+        tmp.write_text(
+            json.dumps({"version": self.VERSION, **asdict(entry)}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, file)
+
+    def delete(self, source_id: str) -> Optional[ManifestEntry]:
+        """Remove and return the entry for a source."""
+        entry = self.get(source_id)
+        if entry is not None:
+            self._file(source_id).unlink(missing_ok=True)
+        return entry
+
+    def entries(self) -> Iterator[ManifestEntry]:
+        """All recorded sources."""
+        if not self.path.exists():
+            return
+        for file in sorted(self.path.glob("*.json")):
+            entry = self._read(file)
+            if entry is not None:
+                yield entry
@@ -11,7 +11,7 @@ from __future__ import annotations
 import io
 import logging
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 logger = logging.getLogger(__name__)
 
@@ -304,3 +304,53 @@ async def process_document(
     """
     processor = ProcessorFactory.get_processor(processor_name)
     return await processor.process(content, metadata)
+
+
+# Processors whose work is CPU-bound Python/C code; the streaming pipeline
+# runs them in a process pool instead of on the event loop.
+CPU_BOUND_PROCESSORS = frozenset({"pymupdf", "unstructured", "basic_ocr", "pandas", "whisper"})
+
+
+def process_document_sync(
+    content: bytes, filename: str, processor_name: str, metadata: Dict[str, Any]
+) -> str:
+    """
+    Blocking variant of ``process_document`` for worker processes.
+
+    Processor instances (and loaded models such as Whisper) are cached per
+    worker process by ``ProcessorFactory``.
+    """
+    import asyncio
+
+    return asyncio.run(process_document(content, filename, processor_name, metadata))
+
+
+def pdf_page_count(path: str) -> int:
+    """Number of pages of a PDF on disk."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return len(doc)
+
+
+def extract_pdf_pages(path: str, start: int, end: int) -> List[str]:
+    """
+    Extract a page range of a PDF on disk (for worker processes).
+
+    Sections use the same ``## Page N`` layout as ``PyMuPDFProcessor``.
+
+    Args:
+        path: PDF file path
+        start: First page (0-based)
+        end: Page after the last one
+
+    Returns:
+        One Markdown section per page
+    """
+    import fitz  # PyMuPDF
+
+    with fitz.open(path) as doc:
+        return [
+            f"## Page {page_num + 1}\n\n{doc[page_num].get_text()}"
+            for page_num in range(start, min(end, len(doc)))
+        ]
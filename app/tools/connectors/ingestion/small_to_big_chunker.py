@@ -12,7 +12,9 @@ from __future__ import annotations
 import logging
 import uuid
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.tools.connectors.ingestion.text_stream import SlidingWindow
 
 logger = logging.getLogger(__name__)
 
@@ -93,62 +95,102 @@ class SmallToBigChunker:
             return []
 
         doc_id = doc_id or str(uuid.uuid4())
-        base_metadata = base_metadata or {}
+        chunk_pairs = list(self.iter_chunk_pairs([text], doc_id, base_metadata))
 
-        # Step 1: Create parent chunks
-        parent_chunks = self._create_chunks(
-            text=text,
-            chunk_size=self.parent_size,
-            overlap=self.parent_overlap,
+        logger.info(
+            f"Created {len(chunk_pairs)} child chunks from "
+            f"{len(set(p.parent_id for p in chunk_pairs))} parent chunks "
+            f"for document {doc_id}"
         )
 
-        # Step 2: Create child chunks for each parent
-        chunk_pairs: List[ChunkPair] = []
-
-        for parent_idx, (parent_text, parent_start, parent_end) in enumerate(parent_chunks):
-            parent_id = f"{doc_id}_parent_{parent_idx}"
+        return chunk_pairs
 
-            # Create child chunks within this parent
-            child_chunks = self._create_chunks(
-                text=parent_text,
-                chunk_size=self.child_size,
-                overlap=self.child_overlap,
-            )
+    def iter_chunk_pairs(
+        self,
+        sections: Iterable[str],
+        doc_id: str,
+        base_metadata: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[ChunkPair]:
+        """
+        Chunk a stream of text sections (pages, decoded blocks) into pairs.
 
-            for child_idx, (child_text, child_start_rel, child_end_rel) in enumerate(child_chunks):
-                child_id = f"{doc_id}_child_{parent_idx}_{child_idx}"
-
-                # Calculate absolute positions
-                child_start_abs = parent_start + child_start_rel
-                child_end_abs = parent_start + child_end_rel
-
-                chunk_pair = ChunkPair(
-                    parent_id=parent_id,
-                    parent_text=parent_text,
-                    parent_start=parent_start,
-                    parent_end=parent_end,
-                    child_id=child_id,
-                    child_text=child_text,
-                    child_start=child_start_abs,
-                    child_end=child_end_abs,
-                    metadata={
-                        **base_metadata,
-                        "doc_id": doc_id,
-                        "parent_idx": parent_idx,
-                        "child_idx": child_idx,
-                        "chunk_type": "child",  # Mark as child for retrieval
-                        "parent_id": parent_id,  # Link to parent
-                    },
-                )
+        Yields the same pairs as ``chunk_text`` on the concatenated text,
+        but only holds one section plus one parent window in memory.
 
-                chunk_pairs.append(chunk_pair)
+        Args:
+            sections: Text sections in document order
+            doc_id: Document ID
+            base_metadata: Base metadata to attach to all chunks
 
-        logger.info(
-            f"Created {len(chunk_pairs)} child chunks from {len(parent_chunks)} parent chunks "
-            f"for document {doc_id}"
+        Yields:
+            ChunkPair objects
+        """
+        window = SlidingWindow(self.parent_size, self.parent_overlap)
+        parent_idx = 0
+        for section in sections:
+            for parent in window.feed(section):
+                yield from self._pairs_for_parent(parent, parent_idx, doc_id, base_metadata)
+                parent_idx += 1
+        for parent in window.finish():
+            yield from self._pairs_for_parent(parent, parent_idx, doc_id, base_metadata)
+            parent_idx += 1
+
+    async def aiter_chunk_pairs(
+        self,
+        sections: AsyncIterable[str],
+        doc_id: str,
+        base_metadata: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[ChunkPair]:
+        """Async variant of ``iter_chunk_pairs`` for streamed extraction."""
+        window = SlidingWindow(self.parent_size, self.parent_overlap)
+        parent_idx = 0
+        async for section in sections:
+            for parent in window.feed(section):
+                for pair in self._pairs_for_parent(parent, parent_idx, doc_id, base_metadata):
+                    yield pair
+                parent_idx += 1
+        for parent in window.finish():
+            for pair in self._pairs_for_parent(parent, parent_idx, doc_id, base_metadata):
+                yield pair
+            parent_idx += 1
+
+    def _pairs_for_parent(
+        self,
+        parent: Tuple[str, int, int],
+        parent_idx: int,
+        doc_id: str,
+        base_metadata: Optional[Dict[str, Any]],
+    ) -> Iterator[ChunkPair]:
+        parent_text, parent_start, parent_end = parent
+        parent_id = f"{doc_id}_parent_{parent_idx}"
+
+        # Create child chunks within this parent
+        child_chunks = self._create_chunks(
+            text=parent_text,
+            chunk_size=self.child_size,
+            overlap=self.child_overlap,
         )
 
-        return chunk_pairs
+        for child_idx, (child_text, child_start_rel, child_end_rel) in enumerate(child_chunks):
+            yield ChunkPair(
+                parent_id=parent_id,
+                parent_text=parent_text,
+                parent_start=parent_start,
+                parent_end=parent_end,
+                child_id=f"{doc_id}_child_{parent_idx}_{child_idx}",
+                child_text=child_text,
+                # Absolute positions
+                child_start=parent_start + child_start_rel,
+                child_end=parent_start + child_end_rel,
+                metadata={
+                    **(base_metadata or {}),
+                    "doc_id": doc_id,
+                    "parent_idx": parent_idx,
+                    "child_idx": child_idx,
+                    "chunk_type": "child",  # Mark as child for retrieval
+                    "parent_id": parent_id,  # Link to parent
+                },
+            )
 
     def _create_chunks(
         self,
@@ -167,26 +209,8 @@ class SmallToBigChunker:
         Returns:
             List of (chunk_text, start_pos, end_pos) tuples
         """
-        chunks: List[Tuple[str, int, int]] = []
-        start = 0
-        text_len = len(text)
-
-        while start < text_len:
-            end = min(start + chunk_size, text_len)
-            chunk_text = text[start:end]
-
-            # Skip empty chunks
-            if chunk_text.strip():
-                chunks.append((chunk_text, start, end))
-
-            # Move to next chunk with overlap
-            start = end - overlap
-
-            # Prevent infinite loop
-            if start >= text_len:
-                break
-
-        return chunks
+        window = SlidingWindow(chunk_size, overlap)
+        return window.feed(text) + window.finish()
 
     def prepare_for_storage(
         self,
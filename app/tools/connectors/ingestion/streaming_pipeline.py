@@ -1,17 +1,74 @@
-"""Streaming ingestion pipeline with Smart Routing and Small-to-Big chunking."""
+"""
+Streaming ingestion pipeline with Smart Routing and Small-to-Big chunking.
+
+Three overlapping stages:
+
+1. Extraction: CPU-bound processors run in a shared process pool; PDFs are
+   split into page ranges that are extracted in parallel and yielded in
+   order as text sections (bounded number of ranges in flight)
+2. Chunking: sliding windows over absolute offsets of the section stream
+   (``SlidingWindow``), no re-slicing or concatenation of the full text
+3. Storage: batches go through a bounded queue to concurrent writers, so
+   embedding/upsert of one batch overlaps extraction and chunking of the next
+
+With a manifest, ingestion is incremental: unchanged files are skipped,
+text is cut into content-defined sections that are chunked independently,
+only chunks that are not already stored are embedded, and chunks that
+disappeared are deleted from the vector store and the keyword index.
+"""
 from __future__ import annotations
 
-import codecs
+import asyncio
+import hashlib
+import json
 import logging
+import os
+import tempfile
+import threading
 import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
 
 from app.infra.search.vector_store import VectorStore
 from app.tools.connectors.ingestion.small_to_big_chunker import SmallToBigChunker
 from app.tools.connectors.ingestion.smart_router import SmartIngestionRouter
-from app.tools.connectors.ingestion.processors import process_document
+from app.tools.connectors.ingestion.processors import (
+    CPU_BOUND_PROCESSORS,
+    extract_pdf_pages,
+    pdf_page_count,
+    process_document,
+    process_document_sync,
+)
+from app.tools.connectors.ingestion.ingestion_manifest import (
+    IngestionManifest,
+    ManifestEntry,
+    content_hash,
+    stable_id,
+)
+from app.tools.connectors.ingestion.text_stream import ContentSectioner, SlidingWindow, iter_decoded
 
 logger = logging.getLogger(__name__)
 
+StorageItem = Tuple[str, str, Dict[str, Any]]  # (id, text, metadata)
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_workers = 0
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool(max_workers: int) -> ProcessPoolExecutor:
+    """Shared extraction pool (recreated only if a larger one is requested)."""
+    global _process_pool, _process_pool_workers
+    with _process_pool_lock:
+        if _process_pool is None or _process_pool_workers < max_workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers)
+            _process_pool_workers = max_workers
+        return _process_pool
+
 
 class StreamingIngestionPipeline:
     """
@@ -34,6 +91,16 @@ class StreamingIngestionPipeline:
         use_smart_routing: Enable smart routing (default: True)
         parent_size: Parent chunk size for Small-to-Big (default: 1024)
         child_size: Child chunk size for Small-to-Big (default: 256)
+        use_process_pool: Run CPU-bound extraction in a process pool (default: True)
+        extraction_workers: Process pool size (default: CPU count)
+        pdf_pages_per_task: PDF pages extracted per pool task (default: 16)
+        batch_size: Chunks per vector store write (default: 50)
+        queue_size: Batches buffered between chunking and storage (default: 4)
+        storage_workers: Concurrent vector store writers (default: 2)
+        manifest: Ingestion manifest (or its directory) enabling incremental
+            re-ingestion (default: None, every ingestion stores a new document)
+        keyword_index: Keyword index kept in sync with the vector store, e.g.
+            ``BM25Retriever`` (``add_documents`` / ``delete_documents``)
     """
 
     def __init__(
@@ -45,12 +112,30 @@ class StreamingIngestionPipeline:
         use_smart_routing: bool = True,
         parent_size: int = 1024,
         child_size: int = 256,
+        use_process_pool: bool = True,
+        extraction_workers: Optional[int] = None,
+        pdf_pages_per_task: int = 16,
+        batch_size: int = 50,
+        queue_size: int = 4,
+        storage_workers: int = 2,
+        manifest: Optional[Union[IngestionManifest, str, Path]] = None,
+        keyword_index=None,
     ):
         self.vector_store = vector_store or VectorStore()
         self.chunk_size = chunk_size
         self.overlap = overlap
         self.use_small_to_big = use_small_to_big
         self.use_smart_routing = use_smart_routing
+        self.use_process_pool = use_process_pool
+        self.extraction_workers = extraction_workers or os.cpu_count() or 1
+        self.pdf_pages_per_task = max(1, pdf_pages_per_task)
+        self.batch_size = max(1, batch_size)
+        self.queue_size = max(1, queue_size)
+        self.storage_workers = max(1, storage_workers)
+        if manifest is not None and not isinstance(manifest, IngestionManifest):
+            manifest = IngestionManifest(manifest)
+        self.manifest = manifest
+        self.keyword_index = keyword_index
 
         # Initialize Smart Router
         if use_smart_routing:
@@ -88,7 +173,7 @@ class StreamingIngestionPipeline:
         Workflow:
         1. Smart Router evaluates complexity
         2. Route to appropriate processor
-        3. Extract text/markdown
+        3. Extract text/markdown (streamed as sections)
         4. Apply chunking strategy
         5. Store in vector database
 
@@ -101,7 +186,65 @@ class StreamingIngestionPipeline:
         Returns:
             Ingestion result with status and statistics
         """
+        return await self._ingest(source_id, filename, data, base_metadata, path=None)
+
+    async def ingest_file(
+        self,
+        source_id: str,
+        path: Union[str, Path],
+        base_metadata: Optional[dict] = None,
+    ) -> dict:
+        """
+        Ingest a file from disk (large PDFs, books).
+
+        PDF page ranges are extracted by the worker processes straight from
+        ``path``, so the document is never pickled to the pool.
+
+        Args:
+            source_id: Source identifier
+            path: File path
+            base_metadata: Base metadata to attach
+
+        Returns:
+            Ingestion result with status and statistics
+        """
+        path = Path(path)
+        data = await asyncio.to_thread(path.read_bytes)
+        return await self._ingest(source_id, path.name, data, base_metadata or {}, path=str(path))
+
+    async def _ingest(
+        self,
+        source_id: str,
+        filename: str,
+        data: bytes,
+        base_metadata: dict,
+        path: Optional[str],
+    ) -> dict:
         try:
+            previous = None
+            file_hash = None
+            config = None
+            if self.manifest is not None:
+                file_hash = hashlib.sha256(data).hexdigest()
+                # Fingerprint the caller's metadata before routing info is added
+                config = self._manifest_config(base_metadata)
+                previous = self.manifest.get(source_id)
+                if (
+                    previous is not None
+                    and previous.file_hash == file_hash
+                    and previous.config == config
+                ):
+                    logger.info(f"Skipping unchanged {filename} (source {source_id})")
+                    return {
+                        "document_id": previous.doc_id,
+                        "source_id": source_id,
+                        "filename": filename,
+                        "chunks_count": len(previous.chunk_ids),
+                        "chunks_added": 0,
+                        "chunks_deleted": 0,
+                        "status": "unchanged",
+                    }
+
             # Step 1: Smart routing (if enabled)
             if self.use_smart_routing and self.router:
                 routing_decision = self.router.route(data, filename)
@@ -115,11 +258,12 @@ class StreamingIngestionPipeline:
                 )
 
                 # Step 2: Process with selected processor
-                text = await process_document(
-                    content=data,
-                    filename=filename,
-                    processor_name=routing_decision.processor,
-                    metadata=routing_decision.metadata,
+                sections = self._extract_sections(
+                    data,
+                    filename,
+                    routing_decision.processor,
+                    routing_decision.metadata,
+                    path=path,
                 )
 
                 # Add routing info to metadata
@@ -132,28 +276,32 @@ class StreamingIngestionPipeline:
                 )
 
             else:
-                # Legacy: decode as text
-                decoder = codecs.getincrementaldecoder("utf-8")("ignore")
-                text = ""
-
-                for offset in range(0, len(data), 4096):
-                    text += decoder.decode(data[offset : offset + 4096])
-
-                text += decoder.decode(b"", final=True)
+                # Legacy: decode as text, block by block
+                sections = self._iter_async(iter_decoded(data))
 
             # Step 3: Apply chunking strategy
+            if self.manifest is not None:
+                return await self._ingest_incremental(
+                    source_id=source_id,
+                    filename=filename,
+                    sections=sections,
+                    base_metadata=base_metadata,
+                    file_hash=file_hash,
+                    config=config,
+                    previous=previous,
+                )
             if self.use_small_to_big and self.chunker:
                 return await self._ingest_with_small_to_big(
                     source_id=source_id,
                     filename=filename,
-                    text=text,
+                    sections=sections,
                     base_metadata=base_metadata,
                 )
             else:
                 return await self._ingest_with_legacy_chunking(
                     source_id=source_id,
                     filename=filename,
-                    text=text,
+                    sections=sections,
                     base_metadata=base_metadata,
                 )
 
@@ -161,11 +309,176 @@ class StreamingIngestionPipeline:
             logger.error("Ingestion failed: %s", e, exc_info=True)
             return {"error": str(e), "status": "failed"}
 
+    @staticmethod
+    async def _iter_async(sections) -> AsyncIterator[str]:
+        for section in sections:
+            yield section
+
+    def _pool(self) -> Optional[ProcessPoolExecutor]:
+        return _get_process_pool(self.extraction_workers) if self.use_process_pool else None
+
+    async def _extract_sections(
+        self,
+        data: bytes,
+        filename: str,
+        processor: str,
+        metadata: Dict[str, Any],
+        path: Optional[str] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Extraction stage: yield the document text as consecutive sections.
+
+        Network-bound processors (OCR/LLM services) and plain text stay on
+        the event loop; CPU-bound ones run in the process pool. A failing
+        pool falls back to in-loop processing.
+        """
+        pool = self._pool() if processor in CPU_BOUND_PROCESSORS else None
+        if pool is None:
+            yield await process_document(
+                content=data, filename=filename, processor_name=processor, metadata=metadata
+            )
+            return
+
+        loop = asyncio.get_running_loop()
+        if processor == "pymupdf":
+            yielded = False
+            try:
+                async for section in self._extract_pdf_pages(pool, data, path):
+                    yielded = True
+                    yield section
+                return
+            except Exception as e:
+                if yielded:
+                    raise
+                logger.warning(f"Parallel PDF extraction failed for {filename}, falling back: {e}")
+        else:
+            try:
+                yield await loop.run_in_executor(
+                    pool, process_document_sync, data, filename, processor, metadata
+                )
+                return
+            except Exception as e:
+                logger.warning(f"Process pool extraction failed for {filename}, falling back: {e}")
+
+        yield await process_document(
+            content=data, filename=filename, processor_name=processor, metadata=metadata
+        )
+
+    async def _extract_pdf_pages(
+        self,
+        pool: ProcessPoolExecutor,
+        data: bytes,
+        path: Optional[str],
+    ) -> AsyncIterator[str]:
+        """
+        Extract PDF page ranges in parallel, yielding pages in order.
+
+        At most two ranges per worker are in flight, so memory stays bounded
+        regardless of the page count. Sections are joined with blank lines
+        exactly like ``PyMuPDFProcessor``.
+        """
+        loop = asyncio.get_running_loop()
+        tmp_path = None
+        if path is None:
+            # Workers open the PDF from disk instead of receiving the bytes per task
+            def write_tmp() -> str:
+                with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+                    tmp.write(data)
+                    return tmp.name
+
+            path = tmp_path = await asyncio.to_thread(write_tmp)
+
+        pending: deque = deque()
+        try:
+            num_pages = await loop.run_in_executor(pool, pdf_page_count, path)
+            max_in_flight = self.extraction_workers * 2
+            next_page = 0
+            first = True
+            while next_page < num_pages or pending:
+                while next_page < num_pages and len(pending) < max_in_flight:
+                    end = next_page + self.pdf_pages_per_task
+                    pending.append(loop.run_in_executor(pool, extract_pdf_pages, path, next_page, end))
+                    next_page = end
+
+                for page in await pending.popleft():
+                    yield page if first else "\n\n" + page
+                    first = False
+        finally:
+            for future in pending:
+                future.cancel()
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+    async def _store_stream(self, items: AsyncIterator[StorageItem]) -> int:
+        """
+        Storage stage: batch items and write them with concurrent writers.
+
+        The bounded queue applies backpressure to extraction and chunking.
+        The first writer error stops the pipeline and is re-raised.
+
+        Returns:
+            Number of stored items
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        stored = 0
+        errors: List[BaseException] = []
+
+        async def writer():
+            nonlocal stored
+            while True:
+                batch = await queue.get()
+                if batch is None:
+                    return
+                if errors:
+                    continue  # drain so the producer never blocks
+                try:
+                    await self.vector_store.add_documents(
+                        documents=[text for _, text, _ in batch],
+                        metadatas=[meta for _, _, meta in batch],
+                        ids=[item_id for item_id, _, _ in batch],
+                    )
+                    if self.keyword_index is not None:
+                        self.keyword_index.add_documents(
+                            [
+                                {"id": item_id, "content": text, "metadata": meta}
+                                for item_id, text, meta in batch
+                            ]
+                        )
+                    stored += len(batch)
+                except Exception as e:
+                    errors.append(e)
+
+        writers = [asyncio.create_task(writer()) for _ in range(self.storage_workers)]
+        try:
+            batch: List[StorageItem] = []
+            async for item in items:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    await queue.put(batch)
+                    batch = []
+                    if errors:
+                        break
+            if batch and not errors:
+                await queue.put(batch)
+            for _ in writers:
+                await queue.put(None)
+            await asyncio.gather(*writers)
+        finally:
+            for task in writers:
+                task.cancel()
+
+        if errors:
+            raise errors[0]
+        return stored
+
     async def _ingest_with_small_to_big(
         self,
         source_id: str,
         filename: str,
-        text: str,
+        sections: AsyncIterator[str],
         base_metadata: dict,
     ) -> dict:
         """
@@ -175,19 +488,26 @@ class StreamingIngestionPipeline:
         for retrieval while keeping parent text in metadata.
         """
         doc_id = str(uuid.uuid4())
+        parent_ids = set()
 
-        # Create chunk pairs
-        chunk_pairs = self.chunker.chunk_text(
-            text=text,
-            doc_id=doc_id,
-            base_metadata={
-                **base_metadata,
-                "source_id": source_id,
-                "filename": filename,
-            },
-        )
+        async def items() -> AsyncIterator[StorageItem]:
+            pairs = self.chunker.aiter_chunk_pairs(
+                sections,
+                doc_id=doc_id,
+                base_metadata={
+                    **base_metadata,
+                    "source_id": source_id,
+                    "filename": filename,
+                },
+            )
+            async for pair in pairs:
+                parent_ids.add(pair.parent_id)
+                ids, texts, metadatas = self.chunker.prepare_for_storage([pair])
+                yield ids[0], texts[0], metadatas[0]
 
-        if not chunk_pairs:
+        total_stored = await self._store_stream(items())
+
+        if not total_stored:
             logger.warning(f"No chunks created for {filename}")
             return {
                 "document_id": doc_id,
@@ -197,29 +517,9 @@ class StreamingIngestionPipeline:
                 "status": "empty",
             }
 
-        # Prepare for storage
-        ids, texts, metadatas = self.chunker.prepare_for_storage(chunk_pairs)
-
-        # Store in batches
-        batch_size = 50
-        total_stored = 0
-
-        for i in range(0, len(ids), batch_size):
-            batch_ids = ids[i : i + batch_size]
-            batch_texts = texts[i : i + batch_size]
-            batch_metas = metadatas[i : i + batch_size]
-
-            await self.vector_store.add_documents(
-                documents=batch_texts,
-                metadatas=batch_metas,
-                ids=batch_ids,
-            )
-
-            total_stored += len(batch_ids)
-
         logger.info(
             f"Ingested {filename}: {total_stored} child chunks "
-            f"from {len(set(p.parent_id for p in chunk_pairs))} parent chunks"
+            f"from {len(parent_ids)} parent chunks"
         )
 
         return {
@@ -227,7 +527,7 @@ class StreamingIngestionPipeline:
             "source_id": source_id,
             "filename": filename,
             "chunks_count": total_stored,
-            "parent_chunks_count": len(set(p.parent_id for p in chunk_pairs)),
+            "parent_chunks_count": len(parent_ids),
             "chunking_strategy": "small_to_big",
             "status": "indexed",
         }
@@ -236,56 +536,44 @@ class StreamingIngestionPipeline:
         self,
         source_id: str,
         filename: str,
-        text: str,
+        sections: AsyncIterator[str],
         base_metadata: dict,
     ) -> dict:
         """
         Ingest using legacy fixed-size chunking.
 
-        This is the original implementation for backward compatibility.
+        Windows start at 0, size - overlap, ... over absolute offsets of the
+        section stream, and the last one ends at the end of the text. Unlike
+        the original loop, no trailing overlap-only chunk is stored after it
+        (8 characters, size 5, overlap 2 give [0:5] and [3:8], not [6:8]
+        as well): that text is already contained in the previous chunk.
         """
+        window = SlidingWindow(self.chunk_size, self.overlap, skip_blank=False)
         chunk_index = 0
-        batch_docs = []
-        batch_meta = []
-        batch_ids = []
-        batch_size = 50
-
-        async def flush_batch():
-            if batch_docs:
-                await self.vector_store.add_documents(batch_docs, batch_meta, batch_ids)
-                batch_docs.clear()
-                batch_meta.clear()
-                batch_ids.clear()
-
-        async def enqueue_chunk(chunk_text: str):
+
+        def to_item(chunk_text: str) -> StorageItem:
             nonlocal chunk_index
-            if not chunk_text:
-                return
-            batch_docs.append(chunk_text)
-            batch_meta.append(
+            item = (
+                f"{source_id}_{chunk_index}",
+                chunk_text,
                 {
                     **base_metadata,
                     "source_id": source_id,
                     "chunk_index": chunk_index,
                     "filename": filename,
-                }
+                },
             )
-            batch_ids.append(f"{source_id}_{chunk_index}")
             chunk_index += 1
-            if len(batch_docs) >= batch_size:
-                await flush_batch()
+            return item
 
-        # Simple sliding window chunking
-        buffer = text
-        while len(buffer) >= self.chunk_size:
-            chunk_text = buffer[: self.chunk_size]
-            await enqueue_chunk(chunk_text)
-            buffer = buffer[self.chunk_size - self.overlap :]
+        async def items() -> AsyncIterator[StorageItem]:
+            async for section in sections:
+                for chunk_text, _, _ in window.feed(section):
+                    yield to_item(chunk_text)
+            for chunk_text, _, _ in window.finish():
+                yield to_item(chunk_text)
 
-        if buffer:
-            await enqueue_chunk(buffer)
-
-        await flush_batch()
+        await self._store_stream(items())
 
         return {
             "document_id": str(uuid.uuid4()),
@@ -295,3 +583,169 @@ class StreamingIngestionPipeline:
             "chunking_strategy": "legacy",
             "status": "indexed",
         }
+
+    def _manifest_config(self, base_metadata: dict) -> str:
+        """Fingerprint of everything that determines chunk IDs and payloads."""
+        if self.use_small_to_big and self.chunker:
+            config = {
+                "strategy": "small_to_big",
+                "parent": [self.chunker.parent_size, self.chunker.parent_overlap],
+                "child": [self.chunker.child_size, self.chunker.child_overlap],
+            }
+        else:
+            config = {"strategy": "legacy", "chunk": [self.chunk_size, self.overlap]}
+        # Payload metadata and target collection: a change re-stores every chunk
+        config["metadata"] = content_hash(json.dumps(base_metadata, sort_keys=True, default=str))
+        config["collection"] = getattr(self.vector_store, "collection_name", None)
+        return json.dumps(config, sort_keys=True)
+
+    def _section_items(
+        self,
+        section: str,
+        section_hash: str,
+        doc_id: str,
+        source_id: str,
+        filename: str,
+        base_metadata: dict,
+    ) -> Iterator[StorageItem]:
+        """Chunk one section; chunk IDs are derived from the stored content."""
+        metadata = {
+            **base_metadata,
+            "source_id": source_id,
+            "filename": filename,
+            "section_hash": section_hash,
+        }
+        if self.use_small_to_big and self.chunker:
+            # Section-scoped doc id keeps parent ids unique and stable
+            pairs = self.chunker.iter_chunk_pairs(
+                [section], doc_id=f"{doc_id}_{section_hash[:16]}", base_metadata=metadata
+            )
+            for pair in pairs:
+                _, texts, metadatas = self.chunker.prepare_for_storage([pair])
+                metadatas[0]["doc_id"] = doc_id
+                chunk_id = stable_id(doc_id, content_hash(pair.parent_text), content_hash(pair.child_text))
+                yield chunk_id, texts[0], metadatas[0]
+        else:
+            window = SlidingWindow(self.chunk_size, self.overlap)
+            for chunk_index, (chunk_text, _, _) in enumerate(window.feed(section) + window.finish()):
+                yield (
+                    stable_id(doc_id, content_hash(chunk_text)),
+                    chunk_text,
+                    {**metadata, "chunk_index": chunk_index},
+                )
+
+    async def _ingest_incremental(
+        self,
+        source_id: str,
+        filename: str,
+        sections: AsyncIterator[str],
+        base_metadata: dict,
+        file_hash: str,
+        config: str,
+        previous: Optional[ManifestEntry],
+    ) -> dict:
+        """
+        Ingest against the manifest: store only new chunks, delete vanished ones.
+
+        Sections come from ``ContentSectioner`` so an edit only changes the
+        sections it touches. The manifest is written after the store has
+        been updated; a failed run leaves it untouched and the next run
+        redoes the work (upserts use deterministic IDs).
+        """
+        doc_id = previous.doc_id if previous is not None else stable_id("document", source_id)
+        old_sections = previous.sections if previous is not None and previous.config == config else {}
+        old_chunks = previous.chunk_ids if previous is not None else set()
+        known_chunks = {chunk_id for ids in old_sections.values() for chunk_id in ids}
+
+        base = self.chunker.parent_size if self.use_small_to_big and self.chunker else self.chunk_size
+        sectioner = ContentSectioner(min_size=4 * base, max_size=16 * base)
+        new_sections: Dict[str, List[str]] = {}
+        counts = {"sections_changed": 0, "chunks_unchanged": 0}
+
+        def section_items(section: str) -> Iterator[StorageItem]:
+            section_hash = content_hash(section)
+            if section_hash in new_sections:
+                return  # duplicate section within the document
+            if section_hash in old_sections:
+                new_sections[section_hash] = old_sections[section_hash]
+                counts["chunks_unchanged"] += len(old_sections[section_hash])
+                return
+
+            counts["sections_changed"] += 1
+            chunk_ids: List[str] = []
+            new_sections[section_hash] = chunk_ids
+            items = self._section_items(section, section_hash, doc_id, source_id, filename, base_metadata)
+            for chunk_id, text, metadata in items:
+                if chunk_id in chunk_ids:
+                    continue
+                chunk_ids.append(chunk_id)
+                if chunk_id in known_chunks:
+                    counts["chunks_unchanged"] += 1
+                    continue
+                known_chunks.add(chunk_id)
+                yield chunk_id, text, metadata
+
+        async def items() -> AsyncIterator[StorageItem]:
+            async for text in sections:
+                for section in sectioner.feed(text):
+                    for item in section_items(section):
+                        yield item
+            for section in sectioner.finish():
+                for item in section_items(section):
+                    yield item
+
+        added = await self._store_stream(items())
+
+        entry = ManifestEntry(
+            source_id=source_id,
+            doc_id=doc_id,
+            file_hash=file_hash,
+            config=config,
+            sections=new_sections,
+        )
+        deleted = await self._delete_chunks(sorted(old_chunks - entry.chunk_ids))
+        self.manifest.put(entry)
+
+        total = len(entry.chunk_ids)
+        logger.info(
+            f"Incrementally ingested {filename}: {added} added, {deleted} deleted, "
+            f"{counts['chunks_unchanged']} unchanged chunks"
+        )
+        return {
+            "document_id": doc_id,
+            "source_id": source_id,
+            "filename": filename,
+            "chunks_count": total,
+            "chunks_added": added,
+            "chunks_deleted": deleted,
+            **counts,
+            "chunking_strategy": "small_to_big" if self.use_small_to_big and self.chunker else "legacy",
+            "status": "indexed" if total else "empty",
+        }
+
+    async def _delete_chunks(self, ids: List[str]) -> int:
+        """Remove chunks from the vector store and the keyword index."""
+        if not ids:
+            return 0
+        for i in range(0, len(ids), self.batch_size * 10):
+            await self.vector_store.delete(ids[i : i + self.batch_size * 10])
+        if self.keyword_index is not None:
+            self.keyword_index.delete_documents(ids)
+        return len(ids)
+
+    async def remove_source(self, source_id: str) -> int:
+        """
+        Delete everything stored for a source (e.g. a file removed from the
+        knowledge base) and forget it in the manifest.
+
+        Returns:
+            Number of deleted chunks
+        """
+        if self.manifest is None:
+            raise RuntimeError("remove_source requires an ingestion manifest")
+        entry = self.manifest.get(source_id)
+        if entry is None:
+            return 0
+        deleted = await self._delete_chunks(sorted(entry.chunk_ids))
+        self.manifest.delete(source_id)
+        return deleted
@@ -0,0 +1,189 @@
+"""
+Streaming text helpers for ingestion.
+
+- ``iter_decoded``: incremental UTF-8 decoding over ``memoryview`` blocks
+  (no ``text += ...`` accumulation, no byte copies)
+- ``SlidingWindow``: fixed-size overlapping windows over a stream of text
+  sections, addressed by absolute character offsets. Only the unconsumed
+  tail (< window size) is carried between sections, so chunking a document
+  is linear in its length and memory is bounded by section + window size.
+- ``ContentSectioner``: paragraph-aligned, content-defined sections whose
+  boundaries survive local edits (used for incremental re-ingestion)
+"""
+from __future__ import annotations
+
+import codecs
+import zlib
+from typing import Iterator, List, Tuple
+
+Window = Tuple[str, int, int]  # (text, absolute start, absolute end)
+
+
+def iter_decoded(data: bytes, block_size: int = 1 << 20, errors: str = "ignore") -> Iterator[str]:
+    """
+    Decode UTF-8 bytes block by block.
+
+    Args:
+        data: Raw bytes
+        block_size: Bytes per block
+        errors: Decoder error handler
+
+    Yields:
+        Decoded text sections (concatenation equals ``data.decode("utf-8", errors)``)
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")(errors)
+    view = memoryview(data)
+    for offset in range(0, len(view), block_size):
+        text = decoder.decode(view[offset : offset + block_size])
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+class SlidingWindow:
+    """
+    Overlapping fixed-size windows over streamed text.
+
+    Produces exactly the windows of a single pass over the concatenated
+    sections: starts at 0, size - overlap, ...; the last window ends at the
+    end of the text and nothing is emitted after it.
+    """
+
+    def __init__(self, size: int, overlap: int, skip_blank: bool = True):
+        """
+        Args:
+            size: Window size in characters
+            overlap: Characters shared by consecutive windows
+            skip_blank: Drop whitespace-only windows
+        """
+        if size <= 0 or not 0 <= overlap < size:
+            raise ValueError("window requires size > 0 and 0 <= overlap < size")
+        self.size = size
+        self.step = size - overlap
+        self.skip_blank = skip_blank
+
+        self._buffer = ""
+        self._buffer_start = 0  # absolute offset of _buffer[0]
+        self._next = 0  # absolute start of the next window
+        self._last_end = -1  # absolute end of the last emitted window
+
+    def _emit(self, start: int, end: int, out: List[Window]) -> None:
+        text = self._buffer[start - self._buffer_start : end - self._buffer_start]
+        self._last_end = end
+        if text and (not self.skip_blank or text.strip()):
+            out.append((text, start, end))
+
+    def feed(self, section: str) -> List[Window]:
+        """Add a section; return the windows it completes."""
+        if not section:
+            return []
+        # Carry only the unconsumed tail (< size characters)
+        keep_from = self._next - self._buffer_start
+        self._buffer = self._buffer[keep_from:] + section
+        self._buffer_start = self._next
+
+        out: List[Window] = []
+        buffer_end = self._buffer_start + len(self._buffer)
+        while self._next + self.size <= buffer_end:
+            self._emit(self._next, self._next + self.size, out)
+            self._next += self.step
+        return out
+
+    def finish(self) -> List[Window]:
+        """Flush the final partial window."""
+        out: List[Window] = []
+        buffer_end = self._buffer_start + len(self._buffer)
+        if self._last_end != buffer_end and self._next < buffer_end:
+            self._emit(self._next, buffer_end, out)
+        self._buffer = ""
+        self._buffer_start = self._next = buffer_end
+        return out
+
+
+class ContentSectioner:
+    """
+    Content-defined sections over streamed text.
+
+    Text is cut at paragraph boundaries (blank lines). A cut happens after a
+    non-blank paragraph once the section holds at least ``min_size``
+    characters and the paragraph's CRC32 is divisible by ``divisor``, or
+    when the section reaches ``max_size``. Because the cut decision depends
+    only on the paragraph itself, an edit changes the sections around it
+    while the boundaries before and after it stay where they were.
+
+    Text without blank lines is cut at the last line break before
+    ``max_size`` (or hard at ``max_size``), so the carried tail stays below
+    ``max_size`` and sectioning stays linear in the input length.
+    """
+
+    def __init__(self, min_size: int, max_size: int, divisor: int = 4):
+        """
+        Args:
+            min_size: Minimum section size in characters
+            max_size: Force a cut at the first paragraph end past this size;
+                a paragraph that does not fit is split at this size
+            divisor: Expected number of paragraphs between content-defined cuts
+        """
+        if min_size <= 0 or max_size < min_size or divisor <= 0:
+            raise ValueError("sectioner requires 0 < min_size <= max_size and divisor > 0")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.divisor = divisor
+
+        self._pending = ""  # incomplete trailing paragraph
+        self._parts: List[str] = []
+        self._size = 0
+
+    def _cut(self, out: List[str]) -> None:
+        if self._parts:
+            out.append("".join(self._parts))
+        self._parts = []
+        self._size = 0
+
+    def feed(self, text: str) -> List[str]:
+        """Add text; return the sections it completes."""
+        out: List[str] = []
+        if not text:
+            return out
+        buffer = self._pending + text
+        end = buffer.rfind("\n\n")
+        tail = buffer[end + 2:] if end >= 0 else buffer
+
+        if end >= 0:
+            for paragraph in buffer[:end].split("\n\n"):
+                self._parts.append(paragraph + "\n\n")
+                self._size += len(paragraph) + 2
+                if not paragraph.strip():
+                    continue
+                if self._size >= self.max_size or (
+                    self._size >= self.min_size
+                    and zlib.crc32(paragraph.encode("utf-8")) % self.divisor == 0
+                ):
+                    self._cut(out)
+
+        # Split an oversized trailing paragraph so only a bounded tail is kept
+        pos = 0
+        while self._size + len(tail) - pos >= self.max_size:
+            room = self.max_size - self._size
+            if room > 0:
+                limit = pos + room
+                cut = tail.rfind("\n", pos, limit) + 1
+                if cut <= pos:
+                    cut = limit
+                self._parts.append(tail[pos:cut])
+                self._size += cut - pos
+                pos = cut
+            self._cut(out)
+        self._pending = tail[pos:]
+        return out
+
+    def finish(self) -> List[str]:
+        """Flush the last section."""
+        out: List[str] = []
+        if self._pending:
+            self._parts.append(self._pending)
+            self._pending = ""
+        self._cut(out)
+        return out
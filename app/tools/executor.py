@@ -14,7 +14,12 @@ from app.tools.reflection import ReflectionAgent
 from app.tools.dependencies import ExecutionContext
 from app.cognitive.tools import run_with_timeout
 from app.cognitive.errors import TimeoutError
-from app.observability.tool_metrics import record_tool_execution, record_retry_attempt
+from app.observability.tool_metrics import (
+    record_cache_refresh,
+    record_coalesced_execution,
+    record_retry_attempt,
+    record_tool_execution,
+)
 from core.config import get_settings
 
 logger = logging.getLogger(__name__)
@@ -108,6 +113,9 @@ class ToolExecutor:
         self._retry_policy = retry_policy
         self._reflection_agent = reflection_agent or ReflectionAgent()
         self._enable_self_correction = enable_self_correction
+        # Single-flight: cache signature -> running execution shared by identical calls
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._coalesce_stats = {"executions": 0, "coalesced": 0, "refreshes": 0}
 
     async def execute(
         self,
@@ -127,6 +135,7 @@ class ToolExecutor:
         error_code = None
         cache_hit = False
         cache_key: Optional[str] = None
+        coalesced = False
         retry_count = 0
 
         if not caller_role and agent_type:
@@ -170,17 +179,12 @@ class ToolExecutor:
                     result = cached[1]
                     cache_hit = True
                     cache_key = cached[0]
+                    self._maybe_refresh(name, tool, cache_key, context, caller_role)
                 else:
-                    # Set up execution context for dependency injection
-                    async with ExecutionContext(
-                        context=context,
-                        session_id=context.get("session_id") if context else None,
-                        user_id=context.get("user_id") if context else None,
-                        agent_type=caller_role
-                    ):
-                        result = await run_with_timeout(tool.run(payload), timeout=self._timeout)
+                    result, coalesced = await self._run_single_flight(
+                        name, tool, payload, context, caller_role
+                    )
                     ok = True
-                    await self._cache.set(name, payload, result)
 
                 # Success - break out of retry loop
                 break
@@ -244,6 +248,7 @@ class ToolExecutor:
             "tool": name,
             "error_code": error_code,
             "retry_count": retry_count,
+            "coalesced": coalesced,
             "context": context or {},
         }
 
@@ -293,9 +298,113 @@ class ToolExecutor:
             "error": error,
             "cached": cache_hit,
             "cache_key": cache_key,
+            "coalesced": coalesced,
             "audit": audit,
         }
 
+    async def _run_tool(
+        self,
+        name: str,
+        tool: Any,
+        payload: Dict[str, Any],
+        context: Optional[Dict[str, Any]],
+        caller_role: str,
+    ) -> Any:
+        # Set up execution context for dependency injection
+        async with ExecutionContext(
+            context=context,
+            session_id=context.get("session_id") if context else None,
+            user_id=context.get("user_id") if context else None,
+            agent_type=caller_role
+        ):
+            result = await run_with_timeout(tool.run(payload), timeout=self._timeout)
+        await self._cache.set(name, payload, result)
+        return result
+
+    async def _run_single_flight(
+        self,
+        name: str,
+        tool: Any,
+        payload: Dict[str, Any],
+        context: Optional[Dict[str, Any]],
+        caller_role: str,
+    ) -> tuple[Any, bool]:
+        """
+        Run the tool, sharing one execution between identical concurrent calls.
+
+        Only cacheable tools are coalesced: their results are already shared
+        across sessions through the cache. Returns (result, coalesced).
+        """
+        settings = get_settings()
+        if not settings.TOOL_COALESCE_ENABLED or name not in settings.TOOL_CACHE_TOOLS:
+            return await self._run_tool(name, tool, payload, context, caller_role), False
+
+        key = self._cache.signature(name, payload)
+        task = self._inflight.get(key)
+        coalesced = task is not None
+        if task is None:
+            task = asyncio.create_task(self._run_tool(name, tool, payload, context, caller_role))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._release_flight(k, t))
+            self._coalesce_stats["executions"] += 1
+        else:
+            self._coalesce_stats["coalesced"] += 1
+            record_coalesced_execution(tool_name=name)
+            logger.debug(f"Tool {name} call coalesced onto in-flight execution")
+
+        # Shield so one caller's cancellation doesn't cancel the shared run
+        return await asyncio.shield(task), coalesced
+
+    def _release_flight(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved; waiters already saw it
+
+    def _maybe_refresh(
+        self,
+        name: str,
+        tool: Any,
+        cache_key: str,
+        context: Optional[Dict[str, Any]],
+        caller_role: str,
+    ) -> None:
+        """Revalidate a stale-but-served cache entry in the background."""
+        payload = self._cache.stale_payload(cache_key)
+        if payload is None or cache_key in self._inflight:
+            return
+
+        async def refresh() -> Any:
+            # Returns the result: concurrent misses may coalesce onto this task
+            try:
+                result = await self._run_tool(name, tool, payload, context, caller_role)
+            except Exception as exc:
+                record_cache_refresh(tool_name=name, status="error")
+                logger.warning(f"Background refresh of {name} failed: {exc}")
+                raise
+            record_cache_refresh(tool_name=name, status="success")
+            return result
+
+        task = asyncio.create_task(refresh())
+        self._inflight[cache_key] = task
+        task.add_done_callback(lambda t, k=cache_key: self._release_flight(k, t))
+        self._coalesce_stats["refreshes"] += 1
+
+    def get_coalescing_stats(self) -> Dict[str, Any]:
+        """
+        Get single-flight statistics.
+
+        Returns:
+            Dictionary with executions started, calls coalesced onto them,
+            background refreshes and currently in-flight keys
+        """
+        total = self._coalesce_stats["executions"] + self._coalesce_stats["coalesced"]
+        return {
+            **self._coalesce_stats,
+            "coalesce_rate": self._coalesce_stats["coalesced"] / total if total else 0.0,
+            "in_flight": len(self._inflight),
+        }
+
     def _generate_result_preview(self, result: Any, max_length: int = 100) -> str:
         """
         Generate a preview of the tool result for display.
@@ -347,132 +456,161 @@ class ToolExecutor:
         max_concurrent: Optional[int] = None,
         status_callback: Optional[ToolStatusCallback] = None,
         auto_classify: bool = True,
+        resource_limits: Optional[Dict[str, int]] = None,
     ) -> list[Dict[str, Any]]:
         """
-        Execute multiple tools in parallel with intelligent read/write classification.
-
-        This method automatically classifies tools as read or write operations:
-        - Read operations: Run in parallel for maximum speed
-        - Write operations: Run sequentially to avoid conflicts
+        Execute multiple tools as a dependency graph.
+
+        Every call becomes a node that starts as soon as the nodes it depends on
+        have finished, so independent branches run concurrently and the batch
+        completes in critical-path time. Dependencies come from:
+        - Explicit ``depends_on`` ids
+        - ``inputs`` that feed an upstream node's result into the payload
+        - Shared resources: a write waits for earlier calls on the same
+          resource, a read waits for earlier writes to it (input order).
+          These edges only order calls; a failed earlier call does not skip
+          a later one
+
+        Writes are classified as before (see ``_classify_tool_calls``). Calls
+        default to the tool name as their resource, so reads and writes on one
+        tool follow input order while calls on unrelated tools overlap. ``status_callback``
+        receives each node's completion event as soon as that node finishes.
 
         Args:
             tool_calls: List of tool call specifications, each containing:
                 - name: Tool name
                 - payload: Tool payload
                 - tool_call_id: Optional tool call ID
+                - id: Optional node id (default: tool_call_id, then list index)
+                - depends_on: Optional list of node ids to wait for
+                - inputs: Optional {payload_key: "node_id[.path.to.field]"}
+                  mapping filled from upstream results before execution
+                - resources: Optional list of resource names the call touches
+                  (default: [name])
                 - is_write: Optional explicit write flag (overrides auto-classification)
             caller_role: Caller role for all executions
             max_concurrent: Maximum concurrent executions (default from settings)
             status_callback: Optional callback for status events
             auto_classify: Enable automatic read/write classification (default: True)
+            resource_limits: Optional {resource: max concurrent calls} for
+                calls that share a resource
 
         Returns:
-            List of execution results in same order as input
+            List of execution results in same order as input. Nodes whose
+            ``depends_on``/``inputs`` dependencies failed are not run and
+            report DEPENDENCY_FAILED.
+
+        Raises:
+            ToolInputError: On duplicate ids, unknown dependencies or cycles
 
         Example:
             results = await executor.execute_parallel([
-                {"name": "knowledge_retriever", "payload": {"query": "A"}},  # Read
-                {"name": "crm_integration", "payload": {"action": "list"}},  # Read
-                {"name": "crm_integration", "payload": {"action": "create"}},  # Write
+                {"id": "kb", "name": "knowledge_retriever", "payload": {"query": "A"}},
+                {"id": "crm", "name": "crm_integration", "payload": {"action": "list"}},
+                {"name": "crm_integration", "payload": {"action": "create"},
+                 "inputs": {"notes": "kb.documents"}},
             ], caller_role="coach")
         """
         settings = get_settings()
 
-        # Check if parallel execution is enabled
+        # Determine concurrency limit
+        if max_concurrent is None:
+            max_concurrent = settings.TOOL_PARALLEL_MAX_CONCURRENT
         if not settings.TOOL_PARALLEL_ENABLED:
             logger.warning("Parallel execution disabled, falling back to sequential")
-            results = []
-            for call in tool_calls:
-                result = await self.execute(
-                    name=call["name"],
-                    payload=call["payload"],
-                    caller_role=caller_role,
-                    tool_call_id=call.get("tool_call_id"),
-                    status_callback=status_callback
-                )
-                results.append(result)
-            return results
+            max_concurrent = 1
 
         # Classify tools as read or write
         if auto_classify:
-            read_calls, write_calls = self._classify_tool_calls(tool_calls)
+            _, write_calls = self._classify_tool_calls(tool_calls)
         else:
             # Use explicit is_write flag
-            read_calls = [(i, call) for i, call in enumerate(tool_calls) if not call.get("is_write", False)]
             write_calls = [(i, call) for i, call in enumerate(tool_calls) if call.get("is_write", False)]
+        write_indexes = {i for i, _ in write_calls}
 
+        ids, deps, order_deps = self._build_tool_graph(tool_calls, write_indexes)
         logger.info(
-            f"Executing {len(tool_calls)} tools: "
-            f"{len(read_calls)} read (parallel), {len(write_calls)} write (sequential)"
+            f"Executing {len(tool_calls)} tools as a graph: "
+            f"{len(write_indexes)} write, {sum(1 for d in deps if d)} with dependencies"
         )
 
-        # Determine concurrency limit
-        if max_concurrent is None:
-            max_concurrent = settings.TOOL_PARALLEL_MAX_CONCURRENT
-
-        # Create semaphore for concurrency control
         semaphore = asyncio.Semaphore(max_concurrent)
+        resource_semaphores = {
+            resource: asyncio.Semaphore(limit)
+            for resource, limit in (resource_limits or {}).items()
+        }
+        done: list[asyncio.Future] = [
+            asyncio.get_running_loop().create_future() for _ in tool_calls
+        ]
 
-        async def execute_with_semaphore(call: Dict[str, Any], index: int) -> tuple[int, Dict[str, Any]]:
-            """Execute single tool with semaphore"""
-            async with semaphore:
-                try:
-                    result = await self.execute(
+        async def run_node(index: int) -> Dict[str, Any]:
+            call = tool_calls[index]
+            # Resource ordering only sequences the call; a failed earlier
+            # access does not make this one fail
+            for d in sorted(order_deps[index]):
+                await done[d]
+            upstream = [await done[d] for d in sorted(deps[index])]
+            failed = [ids[d] for d, r in zip(sorted(deps[index]), upstream) if not r.get("ok", False)]
+            if failed:
+                result = self._dependency_failed_result(call, failed)
+                if status_callback:
+                    try:
+                        await status_callback({
+                            "tool_name": call["name"],
+                            "status": "skipped",
+                            "tool_call_id": call.get("tool_call_id"),
+                            "caller_role": caller_role,
+                            "error": result["error"]["message"],
+                            "error_code": result["error"]["code"],
+                        })
+                    except Exception as e:
+                        logger.warning(f"Failed to emit tool skipped event: {e}")
+                return result
+
+            payload = dict(call["payload"])
+            try:
+                for key, ref in (call.get("inputs") or {}).items():
+                    payload[key] = self._resolve_input(ref, ids, done)
+            except Exception as e:
+                logger.error(f"Could not resolve inputs for {call['name']}: {e}")
+                return self._parallel_error_result(call, e)
+
+            # Acquire in a fixed order so overlapping resource sets can't deadlock
+            held = [
+                resource_semaphores[r]
+                for r in sorted(set(self._call_resources(call)))
+                if r in resource_semaphores
+            ]
+            for resource_semaphore in held:
+                await resource_semaphore.acquire()
+            try:
+                async with semaphore:
+                    return await self.execute(
                         name=call["name"],
-                        payload=call["payload"],
+                        payload=payload,
                         caller_role=caller_role,
                         tool_call_id=call.get("tool_call_id"),
                         context=call.get("context"),
                         status_callback=status_callback
                     )
-                    return index, result
-                except Exception as e:
-                    # Return error result instead of raising
-                    logger.error(f"Parallel execution failed for {call['name']}: {e}")
-                    return index, {
-                        "ok": False,
-                        "tool": call["name"],
-                        "error": {
-                            "type": e.__class__.__name__,
-                            "message": str(e),
-                            "code": "PARALLEL_EXECUTION_FAILED"
-                        },
-                        "audit": {
-                            "status": "error",
-                            "error_code": "PARALLEL_EXECUTION_FAILED"
-                        }
-                    }
-
-        # Execute read operations in parallel
-        read_tasks = [
-            execute_with_semaphore(call, index)
-            for index, call in read_calls
-        ]
-
-        read_results = []
-        if read_tasks:
-            logger.debug(f"Executing {len(read_tasks)} read operations in parallel")
-            read_results = await asyncio.gather(*read_tasks)
-
-        # Execute write operations sequentially
-        write_results = []
-        if write_calls:
-            logger.debug(f"Executing {len(write_calls)} write operations sequentially")
-            for index, call in write_calls:
-                result = await self.execute(
-                    name=call["name"],
-                    payload=call["payload"],
-                    caller_role=caller_role,
-                    tool_call_id=call.get("tool_call_id"),
-                    context=call.get("context"),
-                    status_callback=status_callback
-                )
-                write_results.append((index, result))
+            except Exception as e:
+                # Return error result instead of raising
+                logger.error(f"Parallel execution failed for {call['name']}: {e}")
+                return self._parallel_error_result(call, e)
+            finally:
+                for resource_semaphore in reversed(held):
+                    resource_semaphore.release()
+
+        async def run_and_publish(index: int) -> Dict[str, Any]:
+            try:
+                result = await run_node(index)
+            except BaseException:
+                done[index].cancel()
+                raise
+            done[index].set_result(result)
+            return result
 
-        # Combine and sort results by original index
-        all_results = list(read_results) + write_results
-        sorted_results = sorted(all_results, key=lambda x: x[0])
-        results = [result for _, result in sorted_results]
+        results = list(await asyncio.gather(*(run_and_publish(i) for i in range(len(tool_calls)))))
 
         # Log summary
         success_count = sum(1 for r in results if r.get("ok", False))
@@ -482,6 +620,128 @@ class ToolExecutor:
 
         return results
 
+    def _call_resources(self, call: Dict[str, Any]) -> list[str]:
+        if "resources" in call:
+            return list(call["resources"])
+        return [call["name"]]
+
+    def _build_tool_graph(
+        self,
+        tool_calls: list[Dict[str, Any]],
+        write_indexes: set[int],
+    ) -> tuple[list[str], list[set[int]], list[set[int]]]:
+        """
+        Resolve node ids and dependency sets for execute_parallel.
+
+        Returns:
+            (ids, deps, order_deps) - node id per call, the data dependencies
+            whose failure skips the call, and the earlier calls on a shared
+            resource it only waits for
+        """
+        ids = [
+            str(call.get("id") or call.get("tool_call_id") or i)
+            for i, call in enumerate(tool_calls)
+        ]
+        index_of: Dict[str, int] = {}
+        for i, node_id in enumerate(ids):
+            if node_id in index_of:
+                raise ToolInputError(f"Duplicate tool call id '{node_id}'")
+            index_of[node_id] = i
+
+        deps: list[set[int]] = [set() for _ in tool_calls]
+        order_deps: list[set[int]] = [set() for _ in tool_calls]
+        readers: Dict[str, list[int]] = {}
+        last_writer: Dict[str, int] = {}
+        for i, call in enumerate(tool_calls):
+            refs = list(call.get("depends_on") or [])
+            refs += [str(ref).split(".", 1)[0] for ref in (call.get("inputs") or {}).values()]
+            for ref in refs:
+                if str(ref) not in index_of:
+                    raise ToolInputError(f"Tool call '{ids[i]}' depends on unknown id '{ref}'")
+                deps[i].add(index_of[str(ref)])
+
+            # Order conflicting accesses to shared resources by input position
+            is_write = i in write_indexes
+            for resource in self._call_resources(call):
+                if resource in last_writer:
+                    order_deps[i].add(last_writer[resource])
+                if is_write:
+                    order_deps[i].update(readers.pop(resource, []))
+                    last_writer[resource] = i
+                else:
+                    readers.setdefault(resource, []).append(i)
+            deps[i].discard(i)
+            order_deps[i].discard(i)
+            order_deps[i] -= deps[i]
+
+        # Kahn's algorithm: every node must be reachable without a cycle
+        edges = [d | o for d, o in zip(deps, order_deps)]
+        remaining = [len(e) for e in edges]
+        dependents: list[list[int]] = [[] for _ in tool_calls]
+        for i, e in enumerate(edges):
+            for j in e:
+                dependents[j].append(i)
+        ready = [i for i, n in enumerate(remaining) if n == 0]
+        visited = 0
+        while ready:
+            node = ready.pop()
+            visited += 1
+            for child in dependents[node]:
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+        if visited != len(tool_calls):
+            cyclic = [ids[i] for i, n in enumerate(remaining) if n > 0]
+            raise ToolInputError(f"Tool call dependencies contain a cycle: {cyclic}")
+
+        return ids, deps, order_deps
+
+    def _resolve_input(self, ref: str, ids: list[str], done: list[asyncio.Future]) -> Any:
+        """Look up "node_id[.path.to.field]" in a finished node's result."""
+        node_id, _, path = str(ref).partition(".")
+        value = done[ids.index(node_id)].result().get("result")
+        for part in path.split(".") if path else []:
+            if isinstance(value, (list, tuple)) and part.isdigit():
+                value = value[int(part)]
+            elif isinstance(value, dict):
+                value = value.get(part)
+            else:
+                value = getattr(value, part, None)
+        return value
+
+    def _parallel_error_result(self, call: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        return {
+            "ok": False,
+            "tool": call["name"],
+            "error": {
+                "type": error.__class__.__name__,
+                "message": str(error),
+                "code": "PARALLEL_EXECUTION_FAILED"
+            },
+            "audit": {
+                "status": "error",
+                "error_code": "PARALLEL_EXECUTION_FAILED"
+            }
+        }
+
+    def _dependency_failed_result(self, call: Dict[str, Any], failed: list[str]) -> Dict[str, Any]:
+        message = f"Skipped because dependencies failed: {', '.join(failed)}"
+        return {
+            "ok": False,
+            "tool": call["name"],
+            "tool_call_id": call.get("tool_call_id"),
+            "result": None,
+            "error": {
+                "type": "DependencyFailed",
+                "message": message,
+                "code": "DEPENDENCY_FAILED"
+            },
+            "audit": {
+                "status": "skipped",
+                "error_code": "DEPENDENCY_FAILED"
+            }
+        }
+
     def _classify_tool_calls(
         self,
         tool_calls: list[Dict[str, Any]]
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import zlib
+from collections import Counter
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+# Mersenne prime for the universal hash family; a * h + b stays below 2**64
+# because a, b and the crc32 shingle hashes are all < 2**32
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+
+
+class MinHashLSHIndex:
+    """
+    Near-duplicate lookup over short query strings (MinHash + banded LSH).
+
+    Each text is shingled into character n-grams and summarised by a MinHash
+    signature of ``bands * rows`` values. The signature is split into bands,
+    and each band is hashed into a bucket. A lookup only touches the buckets of
+    the query's own bands. Its cost therefore depends on how many near
+    neighbours exist, not on the index size. Candidates come back ranked by
+    the number of shared bands, which tracks Jaccard similarity; callers
+    verify the top few with an exact metric.
+
+    With the default 21 bands of 3 rows, pairs with shingle Jaccard 0.55
+    (roughly one edited character in a ten-character query) collide with
+    ~98% probability; pairs below 0.1 collide ~2% of the time.
+
+    Keys are partitioned (e.g. by tool name) so that lookups never cross
+    partitions.
+    """
+
+    def __init__(self, bands: int = 21, rows: int = 3, ngram: int = 2, seed: int = 1) -> None:
+        self.bands = bands
+        self.rows = rows
+        self.ngram = ngram
+        rng = np.random.default_rng(seed)
+        num_perm = bands * rows
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._buckets: Dict[Tuple[str, int, bytes], Set[str]] = {}
+        self._keys: Dict[str, Tuple[str, List[bytes]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def _band_hashes(self, text: str) -> List[bytes]:
+        n = self.ngram
+        shingles = {text[i:i + n] for i in range(max(1, len(text) - n + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(s.encode("utf-8")) for s in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # (num_perm, n_shingles) -> min over shingles per permutation
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % _MERSENNE_PRIME
+        signature = permuted.min(axis=1)
+        return [band.tobytes() for band in signature.reshape(self.bands, self.rows)]
+
+    def add(self, key: str, partition: str, text: str) -> None:
+        """Index ``text`` under ``key``; re-adding a key replaces it."""
+        if key in self._keys:
+            self.remove(key)
+        if not text:
+            return
+        bands = self._band_hashes(text)
+        for i, band in enumerate(bands):
+            self._buckets.setdefault((partition, i, band), set()).add(key)
+        self._keys[key] = (partition, bands)
+
+    def remove(self, key: str) -> bool:
+        entry = self._keys.pop(key, None)
+        if entry is None:
+            return False
+        partition, bands = entry
+        for i, band in enumerate(bands):
+            bucket_key = (partition, i, band)
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[bucket_key]
+        return True
+
+    def candidates(self, partition: str, text: str, limit: int = 16) -> List[str]:
+        """Keys sharing at least one band with ``text``, most shared bands first."""
+        if not text or not self._keys:
+            return []
+        shared: Counter[str] = Counter()
+        for i, band in enumerate(self._band_hashes(text)):
+            bucket = self._buckets.get((partition, i, band))
+            if bucket:
+                shared.update(bucket)
+        return [key for key, _ in shared.most_common(limit)]
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._keys.clear()
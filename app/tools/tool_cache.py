@@ -7,13 +7,19 @@ from collections import OrderedDict
 from difflib import SequenceMatcher
 from typing import Any, Dict, Optional, Tuple
 
+from app.tools.query_index import MinHashLSHIndex
 from core.config import get_settings
 
 
 class ToolCache:
-    def __init__(self) -> None:
+    # Near-duplicate candidates verified with SequenceMatcher per lookup
+    SEMANTIC_CANDIDATES = 8
+
+    def __init__(self, similarity_index: Optional[MinHashLSHIndex] = None) -> None:
         # Use OrderedDict for efficient LRU tracking
         self._entries: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        # Per-tool LSH index over cached queries; mirrors self._entries
+        self._index = similarity_index or MinHashLSHIndex()
         self._logger = logging.getLogger(__name__)
 
         # Statistics tracking
@@ -43,9 +49,9 @@ class ToolCache:
             self._stats["by_tool"][tool_name] = {"hits": 0, "misses": 0}
 
         # Exact match by signature
-        signature = self._signature(tool_name, payload)
+        signature = self.signature(tool_name, payload)
         entry = self._entries.get(signature)
-        if entry and now - entry["timestamp"] <= ttl:
+        if entry and (now - entry["timestamp"] <= ttl or self._servable_stale(entry, now)):
             # Update access tracking
             if settings.TOOL_CACHE_ACCESS_TRACKING:
                 entry["access_count"] = entry.get("access_count", 0) + 1
@@ -59,17 +65,21 @@ class ToolCache:
             self._stats["hits"] += 1
             self._stats["by_tool"][tool_name]["hits"] += 1
 
-            self._logger.info("[ToolCache] Hit for key: %s (tool=%s, type=exact)", signature, tool_name)
+            self._logger.info(
+                "[ToolCache] Hit for key: %s (tool=%s, type=%s)",
+                signature,
+                tool_name,
+                "stale" if now - entry["timestamp"] > ttl else "exact",
+            )
             return signature, entry["result"]
 
-        # Semantic-ish match by query similarity
+        # Semantic-ish match: LSH candidates, verified by query similarity
         if query:
             best_key = None
             best_score = 0.0
-            for key, value in self._entries.items():
-                if value.get("tool") != tool_name:
-                    continue
-                if now - value["timestamp"] > ttl:
+            for key in self._index.candidates(tool_name, query, limit=self.SEMANTIC_CANDIDATES):
+                value = self._entries.get(key)
+                if value is None or now - value["timestamp"] > ttl:
                     continue
                 cached_query = value.get("query", "")
                 if not cached_query:
@@ -116,7 +126,7 @@ class ToolCache:
         if tool_name not in settings.TOOL_CACHE_TOOLS:
             return
 
-        signature = self._signature(tool_name, payload)
+        signature = self.signature(tool_name, payload)
         now = time.time()
 
         # Create entry with access tracking
@@ -133,6 +143,7 @@ class ToolCache:
             entry["last_accessed"] = now
 
         self._entries[signature] = entry
+        self._index.add(signature, tool_name, entry["query"])
 
         # Move to end (most recently added)
         if settings.TOOL_CACHE_LRU_ENABLED:
@@ -158,6 +169,7 @@ class ToolCache:
             while len(self._entries) > max_entries:
                 # popitem(last=False) removes from beginning
                 key, _ = self._entries.popitem(last=False)
+                self._index.remove(key)
                 evicted += 1
                 self._logger.debug(f"[ToolCache] Evicted LRU entry: {key}")
         else:
@@ -166,15 +178,38 @@ class ToolCache:
                 # Find oldest entry
                 oldest_key = min(self._entries.keys(), key=lambda k: self._entries[k]["timestamp"])
                 self._entries.pop(oldest_key)
+                self._index.remove(oldest_key)
                 evicted += 1
                 self._logger.debug(f"[ToolCache] Evicted oldest entry: {oldest_key}")
 
         return evicted
 
-    def _signature(self, tool_name: str, payload: Dict[str, Any]) -> str:
+    def signature(self, tool_name: str, payload: Dict[str, Any]) -> str:
         serialized = json.dumps(payload or {}, sort_keys=True, ensure_ascii=True)
         return f"{tool_name}:{serialized}"
 
+    def _servable_stale(self, entry: Dict[str, Any], now: float) -> bool:
+        """Expired entries stay servable for a grace window if they are hot."""
+        settings = get_settings()
+        age = now - entry["timestamp"]
+        return (
+            age <= settings.SEMANTIC_CACHE_TTL_SECONDS + settings.TOOL_CACHE_STALE_TTL_SECONDS
+            and entry.get("access_count", 0) >= settings.TOOL_CACHE_HOT_MIN_HITS
+        )
+
+    def stale_payload(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Payload to refresh with if the entry under ``key`` is past its TTL.
+
+        Returns None for fresh or missing entries.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.time() - entry["timestamp"] <= get_settings().SEMANTIC_CACHE_TTL_SECONDS:
+            return None
+        return entry["payload"]
+
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get cache statistics.
@@ -248,6 +283,7 @@ class ToolCache:
     def clear(self) -> None:
         """Clear all cache entries and reset statistics."""
         self._entries.clear()
+        self._index.clear()
         self._stats = {
             "hits": 0,
             "misses": 0,
@@ -274,6 +310,7 @@ class ToolCache:
 
         for key in keys_to_remove:
             self._entries.pop(key)
+            self._index.remove(key)
 
         self._logger.info(f"[ToolCache] Cleared {len(keys_to_remove)} entries for tool: {tool_name}")
         return len(keys_to_remove)
@@ -68,6 +68,12 @@ class Settings(BaseSettings):
     WEBSOCKET_PING_INTERVAL: int = 30
     WEBSOCKET_PING_TIMEOUT: int = 10
     WEBSOCKET_MANAGER_TYPE: str = "memory"  # memory|redis (use redis for horizontal scaling)
+    WEBSOCKET_STREAMING_ENABLED: bool = True  # Allow clients to request token-streamed turns ("stream": true)
+    TURN_WRITE_BEHIND_INTERVAL_SECONDS: float = 0.5  # Max time a completed turn waits before it is persisted (capped at 2s)
+    TURN_WRITE_BEHIND_MAX_BATCH: int = 64  # Queued turns that trigger an immediate flush
+    TURN_WRITE_BEHIND_MAX_ATTEMPTS: int = 5  # Transient write failures before a turn is dead-lettered
+    CONTEXT_PIPELINE_MAX_COALESCE: int = 4  # Queued turns of one session folded into a single context update
+    CONTEXT_PIPELINE_MAX_CONCURRENCY: int = 8  # Sessions whose context updates may run at once
 
     # Session management
     SESSION_TIMEOUT_MINUTES: int = 60
@@ -99,6 +105,9 @@ class Settings(BaseSettings):
     MEMORY_STORAGE_BACKEND: str = "sqlite"  # redis|sqlite|local
     MEMORY_STORAGE_PATH: str = "./storage/memory"
 
+    # Knowledge ingestion
+    INGESTION_MANIFEST_PATH: str = "./storage/ingestion_manifest"
+
     # Context summarization
     CONTEXT_MAX_TOKENS: int = 4000
     CONTEXT_SUMMARY_ENABLED: bool = True
@@ -130,6 +139,12 @@ class Settings(BaseSettings):
     # Tool Cache Enhancement
     TOOL_CACHE_LRU_ENABLED: bool = True
     TOOL_CACHE_ACCESS_TRACKING: bool = True
+    # Hot entries (>= TOOL_CACHE_HOT_MIN_HITS accesses) are served for this long
+    # past their TTL while a background refresh replaces them
+    TOOL_CACHE_STALE_TTL_SECONDS: int = 300
+    TOOL_CACHE_HOT_MIN_HITS: int = 3
+    # Concurrent identical calls to cacheable tools share one execution
+    TOOL_COALESCE_ENABLED: bool = True
 
     # Tool Bandit Configuration
     TOOL_BANDIT_ENABLED: bool = False
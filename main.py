@@ -192,6 +192,24 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.warning(f"Error stopping background task manager: {e}")
 
+    # Persist turns still queued by the WebSocket turn loop
+    try:
+        from app.engine.state.turn_context import turn_write_behind
+
+        await turn_write_behind.stop()
+        logger.info("Turn write-behind queue flushed ✅")
+    except Exception as e:
+        logger.warning(f"Error flushing turn write-behind queue: {e}")
+
+    # Finish queued context updates (scoring, compression, state sync)
+    try:
+        from app.context_manager import context_pipeline
+
+        await context_pipeline.stop()
+        logger.info("Context pipeline drained ✅")
+    except Exception as e:
+        logger.warning(f"Error draining context pipeline: {e}")
+
     # Stop metrics exporter
     try:
         from app.observability.metrics_exporter import stop_metrics_export
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Streaming Knowledge Base Ingestion
+流式知识库导入（大PDF / 书籍 / SOP）
+
+Ingests every supported file under a directory through
+StreamingIngestionPipeline.ingest_file: PDF pages are extracted in the
+process pool, chunking runs over offsets and storage overlaps with
+extraction, so memory stays flat for large books.
+
+With the ingestion manifest (default: INGESTION_MANIFEST_PATH/<collection>)
+re-runs are incremental: unchanged files are skipped, edited files only
+store their changed chunks, and --prune deletes files that left the
+directory.
+
+Usage:
+    python scripts/ingestion/ingest_streaming.py --dir data/knowledge --collection sales_knowledge --prune
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from core.config import get_settings
+from app.infra.search.vector_store import VectorStoreAdapter
+from app.tools.connectors.ingestion.streaming_pipeline import StreamingIngestionPipeline
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+SUPPORTED_SUFFIXES = {".pdf", ".txt", ".md", ".csv", ".xlsx", ".xls"}
+
+
+def find_files(data_dir: Path):
+    """Supported files under data_dir, keyed by their relative path (source id)"""
+    return {
+        path.relative_to(data_dir).as_posix(): path
+        for path in sorted(data_dir.rglob("*"))
+        if path.is_file() and path.suffix.lower() in SUPPORTED_SUFFIXES
+    }
+
+
+async def ingest_directory(args) -> int:
+    data_dir = Path(args.dir)
+    if not data_dir.is_dir():
+        logger.error(f"Directory not found: {data_dir}")
+        return 1
+
+    manifest = args.manifest or str(Path(get_settings().INGESTION_MANIFEST_PATH) / args.collection)
+    pipeline = StreamingIngestionPipeline(
+        vector_store=VectorStoreAdapter(collection_name=args.collection),
+        manifest=manifest,
+        use_small_to_big=not args.legacy_chunking,
+    )
+
+    files = find_files(data_dir)
+    logger.info(f"Found {len(files)} files in {data_dir} (manifest: {manifest})")
+
+    # Pages of one file already fan out over the process pool; a few files in
+    # flight keep the pool busy while others are embedding and upserting
+    semaphore = asyncio.Semaphore(max(1, args.concurrency))
+    failed = 0
+
+    async def ingest(source_id: str, path: Path):
+        nonlocal failed
+        async with semaphore:
+            result = await pipeline.ingest_file(source_id, path, {"source": path.name})
+        if result.get("status") == "failed":
+            failed += 1
+            logger.error(f"{source_id}: {result.get('error')}")
+        else:
+            logger.info(
+                f"{source_id}: {result['status']}, {result.get('chunks_added', 0)} added, "
+                f"{result.get('chunks_deleted', 0)} deleted"
+            )
+
+    await asyncio.gather(*(ingest(source_id, path) for source_id, path in files.items()))
+
+    if args.prune:
+        for entry in list(pipeline.manifest.entries()):
+            if entry.source_id not in files:
+                deleted = await pipeline.remove_source(entry.source_id)
+                logger.info(f"{entry.source_id}: removed, {deleted} chunks deleted")
+
+    logger.info(f"Done: {len(files) - failed} ingested, {failed} failed")
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming, incremental knowledge base ingestion")
+    parser.add_argument("--dir", required=True, help="Directory of documents to ingest")
+    parser.add_argument("--collection", default="sales_knowledge", help="Target vector collection")
+    parser.add_argument("--manifest", default=None, help="Manifest directory (default: per collection)")
+    parser.add_argument("--concurrency", type=int, default=2, help="Files ingested at once")
+    parser.add_argument("--prune", action="store_true", help="Delete sources no longer in --dir")
+    parser.add_argument("--legacy-chunking", action="store_true", help="Fixed-size windows instead of Small-to-Big")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(ingest_directory(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -196,13 +196,13 @@ model = SentenceTransformer('BAAI/bge-m3')
 query = "信用卡有哪些权益？"
 query_vector = model.encode(query, normalize_embeddings=True)
 
-results = client.search(
+results = client.query_points(
     collection_name="sales_knowledge",
-    query_vector=query_vector.tolist(),
+    query=query_vector.tolist(),
     limit=5
 )
 
-for result in results:
+for result in results.points:
     print(f"Score: {result.score:.4f}")
     print(f"Text: {result.payload['text'][:100]}...")
     print()
@@ -22,6 +22,7 @@ sys.path.insert(0, str(project_root))
 from redis.asyncio import Redis
 
 from app.a2a.message_bus import A2AMessageBus
+from app.a2a.stream_bus import A2AStreamBus
 from app.agents.autonomous.sdr_agent_a2a import SDRAgentA2A
 from app.agents.roles.coach_agent_a2a import CoachAgentA2A
 from app.agents.roles.compliance_agent_a2a import ComplianceAgentA2A
@@ -56,11 +57,26 @@ async def create_message_bus(config: dict) -> A2AMessageBus:
     logger.info(f"Connected to Redis: {redis_url}")
 
     # Create message bus
-    message_bus = A2AMessageBus(
-        redis_client=redis_client,
-        channel_prefix=bus_config.get("channels", {}).get("prefix", "a2a"),
-        history_ttl=bus_config.get("history", {}).get("ttl", 3600),
-    )
+    channel_prefix = bus_config.get("channels", {}).get("prefix", "a2a")
+    history_ttl = bus_config.get("history", {}).get("ttl", 3600)
+    if bus_config.get("transport") == "redis_streams":
+        streams_config = bus_config.get("streams", {})
+        message_bus = A2AStreamBus(
+            redis_client=redis_client,
+            channel_prefix=channel_prefix,
+            history_ttl=history_ttl,
+            read_count=streams_config.get("read_count", 100),
+            block_ms=streams_config.get("block_ms", 1000),
+            claim_interval=streams_config.get("claim_interval", 15.0),
+            claim_idle_ms=streams_config.get("claim_idle_ms", 60000),
+            stream_maxlen=streams_config.get("maxlen", 10000),
+        )
+    else:
+        message_bus = A2AMessageBus(
+            redis_client=redis_client,
+            channel_prefix=channel_prefix,
+            history_ttl=history_ttl,
+        )
 
     return message_bus
 
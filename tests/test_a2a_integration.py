@@ -38,7 +38,14 @@ async def redis_client():
     client.expire = AsyncMock()
     client.delete = AsyncMock()
     client.hlen = AsyncMock(return_value=0)
-    client.pubsub = MagicMock()
+    pipeline = MagicMock()
+    pipeline.execute = AsyncMock(return_value=[])
+    client.pipeline = MagicMock(return_value=pipeline)
+    pubsub = MagicMock()
+    pubsub.subscribe = AsyncMock()
+    pubsub.unsubscribe = AsyncMock()
+    pubsub.close = AsyncMock()
+    client.pubsub = MagicMock(return_value=pubsub)
     return client
 
 
@@ -146,8 +153,10 @@ class TestA2AMessageBus:
 
         await message_bus.publish(message)
 
-        message_bus.redis.publish.assert_called()
-        message_bus.redis.lpush.assert_called()
+        pipeline = message_bus.redis.pipeline.return_value
+        pipeline.publish.assert_called_once()
+        pipeline.lpush.assert_called_once()
+        pipeline.execute.assert_awaited_once()
 
     @pytest.mark.asyncio
     async def test_discover_agents(self, message_bus):
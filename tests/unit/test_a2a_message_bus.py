@@ -0,0 +1,170 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.a2a.message_bus import A2AMessageBus
+from app.a2a.protocol import A2AMessage, MessageType
+
+
+async def _wait_for(predicate, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest_asyncio.fixture
+async def bus():
+    bus = A2AMessageBus(fakeredis.aioredis.FakeRedis(), agent_concurrency=2)
+    yield bus
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_publish_is_one_pipeline_and_keeps_history(bus):
+    message = A2AMessage(from_agent="a", to_agent="b", conversation_id="c1", payload={"x": 1})
+    await bus.publish(message)
+
+    history = await bus.get_conversation_history("c1")
+    assert [m.message_id for m in history] == [message.message_id]
+    assert await bus.redis.ttl("a2a:history:c1") > 0
+
+
+@pytest.mark.asyncio
+async def test_shared_connection_demultiplexes_and_slow_agent_does_not_block(bus):
+    release = asyncio.Event()
+    slow_seen, fast_seen = [], []
+
+    async def slow(message):
+        slow_seen.append(message.payload["n"])
+        await release.wait()
+
+    async def fast(message):
+        fast_seen.append(message.payload["n"])
+
+    await bus.subscribe("slow", slow)
+    await bus.subscribe("fast", fast)
+    await asyncio.sleep(0.05)
+
+    for n in range(3):
+        await bus.publish(A2AMessage(from_agent="x", to_agent="slow", payload={"n": n}))
+        await bus.publish(A2AMessage(from_agent="x", to_agent="fast", payload={"n": n}))
+    await bus.publish(A2AMessage(message_type=MessageType.EVENT, from_agent="fast", payload={"n": 99}))
+
+    await _wait_for(lambda: len(fast_seen) == 3 and len(slow_seen) == 2)
+    assert sorted(fast_seen) == [0, 1, 2]  # broadcast from "fast" is not echoed back
+    assert (await bus.get_stats())["queued_messages"] == 2  # message 2 and the broadcast wait for slow
+    release.set()
+    await _wait_for(lambda: len(slow_seen) == 4)
+    assert sorted(slow_seen) == [0, 1, 2, 99]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("serializer", ["orjson", "msgpack"])
+async def test_request_response_with_binary_serializers(serializer):
+    pytest.importorskip(serializer)
+    bus = A2AMessageBus(fakeredis.aioredis.FakeRedis(), serializer=serializer)
+
+    async def responder(message):
+        await bus.publish(message.create_response({"echo": message.payload["q"]}, from_agent="server"))
+
+    async def client_handler(message):
+        pass
+
+    await bus.subscribe("server", responder)
+    await bus.subscribe("client", client_handler)
+    await asyncio.sleep(0.05)
+
+    request = A2AMessage(from_agent="client", to_agent="server", conversation_id="c", payload={"q": "hi"})
+    response = await bus.request(request, timeout=2.0)
+    assert response.payload == {"echo": "hi"}
+    assert len(await bus.get_conversation_history("c")) == 2
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_listener_reconnects_and_resubscribes_agents():
+    redis = fakeredis.aioredis.FakeRedis()
+    open_pubsub = redis.pubsub
+    opened = []
+
+    def flaky_pubsub():
+        pubsub = open_pubsub()
+        opened.append(pubsub)
+        if len(opened) == 1:
+            async def broken_listen():
+                raise ConnectionError("connection reset")
+                yield
+
+            pubsub.listen = broken_listen
+        return pubsub
+
+    redis.pubsub = flaky_pubsub
+    bus = A2AMessageBus(redis, reconnect_min_delay=0.01)
+    seen = []
+
+    async def handler(message):
+        seen.append(message.payload["n"])
+
+    try:
+        await bus.subscribe("a", handler)
+        await _wait_for(lambda: len(opened) == 2)
+        await asyncio.sleep(0.05)
+        await bus.publish(A2AMessage(from_agent="x", to_agent="a", payload={"n": 1}))
+        await _wait_for(lambda: seen == [1])
+
+        stats = await bus.get_stats()
+        assert stats["listener_running"] and stats["listener_connected"]
+        assert stats["listener_reconnects"] == 1
+        assert stats["listener_last_error"] == "connection reset"
+    finally:
+        await bus.shutdown()
+
+
+def test_unknown_serializer_is_rejected():
+    with pytest.raises(ValueError):
+        A2AMessageBus(fakeredis.aioredis.FakeRedis(), serializer="pickle")
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure_and_keeps_order():
+    bus = A2AMessageBus(fakeredis.aioredis.FakeRedis(), agent_queue_size=1)
+    release = asyncio.Event()
+    seen = []
+
+    async def slow(message):
+        await release.wait()
+        seen.append(message.payload["n"])
+
+    await bus.subscribe("slow", slow)
+    await asyncio.sleep(0.05)
+    for n in range(5):
+        await bus.publish(A2AMessage(from_agent="x", to_agent="slow", payload={"n": n}))
+
+    await _wait_for(lambda: bus.subscriptions["slow"].deferred > 0)
+    release.set()
+    # Nothing is dropped, and the single default worker keeps publish order
+    await _wait_for(lambda: len(seen) == 5)
+    assert seen == [0, 1, 2, 3, 4]
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_failed_pubsub_subscribe_does_not_leak_workers(monkeypatch):
+    bus = A2AMessageBus(fakeredis.aioredis.FakeRedis())
+
+    async def broken_pubsub():
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(bus, "_ensure_pubsub", broken_pubsub)
+    with pytest.raises(ConnectionError):
+        await bus.subscribe("agent", lambda message: None)
+
+    assert bus.subscriptions == {}
+    assert bus._channel_agents == {}
+    await asyncio.sleep(0)
+    assert not [t for t in asyncio.all_tasks() if "_agent_worker" in repr(t.get_coro())]
+    await bus.shutdown()
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.a2a.protocol import A2AMessage, MessageType
+from app.a2a.stream_bus import A2AStreamBus
+
+
+async def _wait_for(predicate, timeout=3.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline
+        await asyncio.sleep(0.01)
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def _bus(server, name, **kwargs):
+    kwargs.setdefault("block_ms", 20)
+    return A2AStreamBus(fakeredis.aioredis.FakeRedis(server=server), consumer_name=name, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_response_reaches_requesting_worker(server):
+    worker_a, worker_b = _bus(server, "a"), _bus(server, "b")
+
+    async def echo(message):
+        await worker_a.publish(message.create_response({"echo": message.payload["q"]}, from_agent="echo"))
+
+    await worker_a.subscribe("echo", echo)
+
+    request = A2AMessage(from_agent="caller", to_agent="echo", conversation_id="c", payload={"q": 1})
+    response = await worker_b.request(request, timeout=2.0)
+
+    assert response.message_type == MessageType.RESPONSE
+    assert response.payload == {"echo": 1}
+    await worker_a.shutdown()
+    await worker_b.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_replicas_share_inbox_without_duplicates(server):
+    handled = []
+
+    async def record(message):
+        handled.append(message.payload["n"])
+
+    replicas = [_bus(server, f"r{i}") for i in range(2)]
+    for bus in replicas:
+        await bus.subscribe("worker", record)
+
+    for n in range(20):
+        await replicas[0].publish(A2AMessage(from_agent="x", to_agent="worker", payload={"n": n}))
+
+    await _wait_for(lambda: len(handled) == 20)
+    await asyncio.sleep(0.1)
+    assert sorted(handled) == list(range(20))
+    pending = await replicas[0].redis.xpending("a2a:stream:worker", "a2a")
+    assert pending["pending"] == 0
+    for bus in replicas:
+        await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_pending_entries_of_dead_consumer_are_claimed(server):
+    publisher = _bus(server, "publisher")
+    message = A2AMessage(from_agent="x", to_agent="worker", payload={"n": 7})
+    await publisher._create_group("a2a:stream:worker")
+    await publisher.publish(message)
+
+    # A consumer reads the entry and dies before acknowledging it
+    await publisher.redis.xreadgroup("a2a", "dead", {"a2a:stream:worker": ">"}, count=10)
+
+    handled = []
+
+    async def record(message):
+        handled.append(message.payload["n"])
+
+    survivor = _bus(server, "survivor", claim_interval=0.05, claim_idle_ms=50)
+    await survivor.subscribe("worker", record)
+
+    await _wait_for(lambda: handled == [7])
+    await survivor.shutdown()
+    await publisher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_inbox_and_broadcast_are_durable_before_subscribe(server):
+    bus = _bus(server, "a")
+    await bus.register_agent("listener", "Test", [])
+    await bus.register_agent("other", "Test", [])
+    await bus.publish(A2AMessage(message_type=MessageType.EVENT, from_agent="other", payload={"e": 1}))
+
+    seen = []
+
+    async def record(message):
+        seen.append((message.from_agent, message.payload))
+
+    await bus.subscribe("listener", record)
+    await _wait_for(lambda: ("other", {"e": 1}) in seen)
+    # "agent_online" from "other" was fanned out to the listener's inbox as well
+    assert any(payload.get("event_type") == "agent_online" for _, payload in seen)
+    await bus.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_queued_entries_are_redelivered_after_resubscribe(server):
+    release = asyncio.Event()
+    handled = []
+
+    async def blocked(message):
+        await release.wait()
+
+    bus = _bus(server, "a", agent_concurrency=1, claim_interval=0.05, claim_idle_ms=50)
+    await bus.subscribe("worker", blocked)
+    for n in range(3):
+        await bus.publish(A2AMessage(from_agent="x", to_agent="worker", payload={"n": n}))
+    await _wait_for(lambda: len(bus._in_flight) == 3)
+
+    await bus.unsubscribe("worker")
+    await _wait_for(lambda: not bus._in_flight)
+
+    async def record(message):
+        handled.append(message.payload["n"])
+
+    await bus.subscribe("worker", record)
+    await _wait_for(lambda: sorted(handled) == [0, 1, 2])
+    await _wait_for(lambda: not bus._in_flight)
+    pending = await bus.redis.xpending("a2a:stream:worker", "a2a")
+    assert pending["pending"] == 0
+    await bus.shutdown()
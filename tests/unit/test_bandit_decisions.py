@@ -0,0 +1,193 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.engine.coordinator.bandit import SimpleContextualBandit
+from app.engine.coordinator.bandit_decisions import (
+    DecisionFeedbackUpdater,
+    DecisionLog,
+    DecisionRecord,
+    FileDecisionSpill,
+)
+from app.engine.coordinator.bandit_linucb import LinUCBBandit
+
+
+def _context(i):
+    stages = ["opening", "discovery", "demo", "negotiation", "closing"]
+    return {"confidence": (i % 5) / 5, "fsm_stage": stages[i % 5], "need_tools": i % 2 == 0}
+
+
+def test_decision_log_is_bounded_and_expires():
+    log = DecisionLog(capacity=3, ttl_seconds=10.0, vector_dim=2)
+    for i in range(5):
+        log.put(f"d{i}", "npc", np.array([[i], [1.0]]), timestamp=100.0 + i)
+
+    assert len(log) == 3
+    assert log.evicted == 2
+    assert log.pop("d0", now=105.0) is None
+
+    record = log.pop("d3", now=105.0)
+    assert record.chosen == "npc"
+    np.testing.assert_allclose(record.context_vector[:, 0], [3.0, 1.0])
+
+    assert log.purge_expired(now=113.0) == 1  # d2 expired, d4 not yet
+    assert "d4" in log and len(log) == 1
+    assert log.pop("d4", now=120.0) is None
+
+
+def test_simple_bandit_without_updater_applies_inline():
+    bandit = SimpleContextualBandit(epsilon=0.0, decision_capacity=2)
+    decisions = [bandit.choose({}, ["npc", "tools"]) for _ in range(3)]
+
+    assert not bandit.record_feedback(decisions[0]["decision_id"], 1.0)  # evicted
+    assert bandit.record_feedback(decisions[2]["decision_id"], 1.0)
+    assert bandit.get_stats()["npc"] == {"count": 1.0, "value": 1.0}
+
+
+@pytest.mark.asyncio
+async def test_batched_linucb_feedback_matches_inline_updates():
+    inline = LinUCBBandit(arms=["npc", "tools", "knowledge"], context_dim=8)
+    batched = LinUCBBandit(arms=["npc", "tools", "knowledge"], context_dim=8)
+    updater = DecisionFeedbackUpdater(batched, interval_seconds=3600)
+    rng = np.random.default_rng(1)
+
+    for i in range(40):
+        reward = float(rng.uniform(-1, 1))
+        arm = inline.arms[i % 3]
+        inline.record_feedback(inline.choose(_context(i), candidates=[arm])["decision_id"], reward)
+        batched.record_feedback(batched.choose(_context(i), candidates=[arm])["decision_id"], reward)
+
+    assert all(batched.get_stats()[arm]["pulls"] == inline.get_stats()[arm]["pulls"] for arm in inline.arms)
+    await updater.stop()
+
+    for arm in inline.arms:
+        np.testing.assert_allclose(batched.get_theta(arm), inline.get_theta(arm), atol=1e-8)
+    assert updater.applied == 40
+    assert len(batched.decision_log) == 0
+
+
+@pytest.mark.asyncio
+async def test_file_spill_joins_feedback_on_another_worker(tmp_path):
+    worker_a = SimpleContextualBandit(epsilon=0.0)
+    worker_b = SimpleContextualBandit(epsilon=0.0)
+    updater_a = DecisionFeedbackUpdater(worker_a, spill=FileDecisionSpill(str(tmp_path)), interval_seconds=3600)
+    updater_b = DecisionFeedbackUpdater(worker_b, spill=FileDecisionSpill(str(tmp_path)), interval_seconds=3600)
+
+    decision = worker_a.choose({}, ["tools"])
+    await updater_a.flush()
+
+    # Feedback arrives on worker B, which never saw the decision locally
+    assert worker_b.record_feedback(decision["decision_id"], 0.5)
+    assert await updater_b.flush() == 1
+    assert worker_b.get_stats()["tools"]["count"] == 1.0
+
+    assert await updater_a.flush() == 1
+    assert worker_a.get_stats()["tools"]["value"] == 0.5
+
+    # Unmatched feedback is retried, then dropped
+    worker_b.record_feedback("unknown", 1.0)
+    updater_b.feedback_ttl_seconds = 0.0
+    assert await updater_b.flush() == 0
+    assert await updater_b.flush() == 0
+    assert updater_b.dropped == 1
+    await updater_a.stop()
+    await updater_b.stop()
+
+
+class FlakySpill(FileDecisionSpill):
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.publish_failures = 1
+
+    async def publish(self, decisions, feedback):
+        if self.publish_failures:
+            self.publish_failures -= 1
+            raise ConnectionError("spill down")
+        await super().publish(decisions, feedback)
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_decisions_and_feedback(tmp_path):
+    bandit = SimpleContextualBandit(epsilon=0.0)
+    updater = DecisionFeedbackUpdater(bandit, spill=FlakySpill(str(tmp_path)), interval_seconds=3600)
+
+    decision = bandit.choose({}, ["tools"])
+    assert bandit.record_feedback(decision["decision_id"], 0.5)
+    with pytest.raises(ConnectionError):
+        await updater.flush()
+    assert len(updater._new_decisions) == 1 and len(updater._new_feedback) == 1
+
+    def failing_apply(records, rewards):
+        raise ConnectionError("redis down")
+
+    apply_feedback = bandit.apply_feedback
+    bandit.apply_feedback = failing_apply
+    with pytest.raises(ConnectionError):
+        await updater.flush()
+    assert decision["decision_id"] in bandit.decision_log
+    assert decision["decision_id"] in updater._unmatched
+
+    bandit.apply_feedback = apply_feedback
+    assert await updater.flush() == 1
+    assert bandit.get_stats()["tools"] == {"count": 1.0, "value": 0.5}
+    await updater.stop()
+
+
+@pytest.mark.asyncio
+async def test_redis_bandit_loads_scores_lazily_and_migrates_legacy_hashes():
+    fakeredis = pytest.importorskip("fakeredis")
+    from app.engine.coordinator.bandit_redis import RedisContextualBandit
+
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    # Written by the previous {count, value} layout
+    await client.hset("bandit:tools", mapping={"count": 10.0, "value": 0.8})
+    await client.hset("bandit:npc", mapping={"count": 4.0, "total": 1.2})
+
+    bandit = RedisContextualBandit("redis://localhost:6379/0", epsilon=0.0, flush_interval=3600)
+    bandit._client = client
+    bandit.feedback_updater.spill = None
+
+    bandit.choose({}, ["npc", "tools"])  # schedules the load, picks arms[0]
+    await asyncio.gather(*bandit._tasks)
+    assert bandit.choose({}, ["npc", "tools"])["chosen"] == "tools"
+    assert float(await client.hget("bandit:tools", "total")) == pytest.approx(8.0)
+
+    await bandit.apply_feedback([DecisionRecord("d1", "tools", 0.0)], [0.0])
+    assert bandit._scores["tools"] == pytest.approx(8.0 / 11.0)
+    await bandit.feedback_updater.stop()
+
+
+@pytest.mark.asyncio
+async def test_redis_bandit_releases_claims_when_increment_fails():
+    fakeredis = pytest.importorskip("fakeredis")
+    from app.engine.coordinator.bandit_redis import RedisContextualBandit
+
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    bandit = RedisContextualBandit("redis://localhost:6379/0", epsilon=0.0, flush_interval=3600)
+    bandit._client = client
+    bandit.feedback_updater.spill = None
+
+    real_pipeline = client.pipeline
+
+    def failing_pipeline(*args, **kwargs):
+        pipe = real_pipeline(*args, **kwargs)
+        if kwargs.get("transaction"):
+            async def execute(*a, **k):
+                raise ConnectionError("redis down")
+
+            pipe.execute = execute
+        return pipe
+
+    client.pipeline = failing_pipeline
+    with pytest.raises(ConnectionError):
+        await bandit.apply_feedback([DecisionRecord("d1", "tools", 0.0)], [1.0])
+    assert not await client.exists("bandit:applied:d1")
+
+    # The retry is counted exactly once
+    client.pipeline = real_pipeline
+    await bandit.apply_feedback([DecisionRecord("d1", "tools", 0.0)], [1.0])
+    await bandit.apply_feedback([DecisionRecord("d1", "tools", 0.0)], [1.0])
+    assert float(await client.hget("bandit:tools", "count")) == 1.0
+    assert bandit._scores["tools"] == pytest.approx(1.0)
+    await bandit.feedback_updater.stop()
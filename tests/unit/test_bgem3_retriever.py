@@ -0,0 +1,124 @@
+import numpy as np
+import pytest
+
+from app.infra.search.bgem3_retriever import (
+    BGEM3CorpusIndex,
+    BGEM3DualPathRetriever,
+    BGEM3Embedding,
+)
+
+
+class FakeEncoder:
+    def __init__(self, embedding: BGEM3Embedding):
+        self.embedding = embedding
+
+    def encode_single(self, text, **kwargs):
+        return self.embedding
+
+
+def _corpus(n=50, dim=8, vocab=30, seed=3):
+    rng = np.random.default_rng(seed)
+    docs = []
+    for i in range(n):
+        tokens = rng.choice(vocab, size=4, replace=False)
+        docs.append({
+            "id": f"doc{i}",
+            "content": f"content {i}",
+            "dense_vector": rng.normal(size=dim).tolist(),
+            # FlagEmbedding returns lexical weights keyed by token-id strings
+            "sparse_vector": {str(t): float(rng.random()) for t in tokens},
+        })
+    return docs
+
+
+def _naive_scores(query: BGEM3Embedding, docs):
+    q = np.asarray(query.dense_vector)
+    q = q / np.linalg.norm(q)
+    dense, sparse = [], []
+    for doc in docs:
+        d = np.asarray(doc["dense_vector"])
+        dense.append(float(d @ q / np.linalg.norm(d)))
+        sparse.append(sum(w * doc["sparse_vector"].get(t, 0.0) for t, w in query.sparse_vector.items()))
+    return np.array(dense), np.array(sparse)
+
+
+def test_corpus_index_matches_naive_scoring():
+    docs = _corpus()
+    rng = np.random.default_rng(11)
+    query = BGEM3Embedding(
+        dense_vector=rng.normal(size=8).tolist(),
+        sparse_vector={"1": 0.5, "7": 0.3, "29": 0.9, "999": 1.0},
+    )
+
+    index = BGEM3CorpusIndex()
+    index.add_documents(docs[:20])
+    index.add_documents(docs[20:])
+
+    dense, sparse = _naive_scores(query, docs)
+    assert index.dense_scores(query.dense_vector) == pytest.approx(dense, abs=1e-5)
+    assert index.sparse_scores(query.sparse_vector) == pytest.approx(sparse, abs=1e-5)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fusion_method", ["rrf", "weighted"])
+async def test_prebuilt_index_and_adhoc_documents_agree(fusion_method):
+    docs = _corpus()
+    query = BGEM3Embedding(dense_vector=docs[5]["dense_vector"], sparse_vector=docs[5]["sparse_vector"])
+    retriever = BGEM3DualPathRetriever(FakeEncoder(query), fusion_method=fusion_method)
+    retriever.index_documents(docs)
+
+    prebuilt = await retriever.retrieve("q", top_k=5)
+    adhoc = await retriever.retrieve("q", documents=docs, top_k=5)
+
+    assert [r["id"] for r in prebuilt] == [r["id"] for r in adhoc]
+    assert prebuilt[0]["id"] == "doc5"
+
+    dense, sparse = _naive_scores(query, docs)
+    expected = retriever.fuse_scores(dense.tolist(), sparse.tolist(), [d["id"] for d in docs])[:5]
+    assert [r["id"] for r in prebuilt] == [doc_id for doc_id, _ in expected]
+    assert [r["score"] for r in prebuilt] == pytest.approx([score for _, score in expected])
+
+
+@pytest.mark.asyncio
+async def test_removed_and_replaced_documents_are_not_returned():
+    docs = _corpus(n=10)
+    query = BGEM3Embedding(dense_vector=docs[0]["dense_vector"], sparse_vector=docs[0]["sparse_vector"])
+    retriever = BGEM3DualPathRetriever(FakeEncoder(query), fusion_method="weighted")
+    retriever.add_documents(docs)
+
+    assert retriever.remove_documents(["doc0", "missing"]) == 1
+    results = await retriever.retrieve("q", top_k=10)
+    assert "doc0" not in {r["id"] for r in results}
+    assert len(results) == 9
+
+    retriever.add_documents([{**docs[0], "content": "updated"}])
+    results = await retriever.retrieve("q", top_k=1)
+    assert results[0]["id"] == "doc0"
+    assert results[0]["content"] == "updated"
+    assert len(retriever.index) == 10
+
+
+def test_corpus_index_compacts_dead_rows():
+    docs = _corpus(n=20)
+    query = BGEM3Embedding(dense_vector=docs[3]["dense_vector"], sparse_vector={"1": 0.5, "7": 0.3})
+
+    index = BGEM3CorpusIndex(compact_threshold=0.25)
+    index.add_documents(docs)
+    index.remove_documents([f"doc{i}" for i in range(0, 20, 5)])  # 4/20 dead: below threshold
+    assert index.num_rows == 20
+
+    # Replacing doc1-doc4 and restoring doc5 leaves 8/25 dead rows: compacted
+    index.add_documents([{**doc, "content": "updated"} for doc in docs[1:6]])
+    assert index.num_rows == len(index) == 17
+    assert index.alive_mask().all()
+
+    by_id = {doc["id"]: doc for doc in docs if doc["id"] not in {"doc0", "doc10", "doc15"}}
+    rows = [index.documents[row]["id"] for row in range(index.num_rows)]
+    dense, sparse = _naive_scores(query, [by_id[doc_id] for doc_id in rows])
+    assert index.dense_scores(query.dense_vector) == pytest.approx(dense, abs=1e-5)
+    assert index.sparse_scores(query.sparse_vector) == pytest.approx(sparse, abs=1e-5)
+    assert {index.documents[index._row_by_id[doc_id]]["id"] for doc_id in by_id} == set(by_id)
+
+    # Appends after compaction keep the CSR row pointers consistent
+    index.add_documents([docs[0]])
+    assert len(index._indptr) == index.num_rows + 1 and index._indptr[-1] == index._nnz
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from app.infra.search.bm25_index import InvertedIndexBM25
+from app.infra.search.bm25_retriever import BM25Retriever
+
+
+def _brute_force(index: InvertedIndexBM25, corpus, query):
+    """Reference BM25 over live documents, using the index's own stats."""
+    scores = {}
+    for slot, tokens in corpus.items():
+        score = 0.0
+        for term in query:
+            tf = tokens.count(term)
+            if not tf:
+                continue
+            norm = index.k1 * (1 - index.b + index.b * len(tokens) / index.avgdl)
+            score += index.idf(term) * tf * (index.k1 + 1) / (tf + norm)
+        if score > 0:
+            scores[slot] = score
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def test_top_k_matches_exhaustive_scoring_with_pruning():
+    rng = np.random.default_rng(7)
+    vocab = [f"t{i}" for i in range(40)]
+    index = InvertedIndexBM25()
+    corpus = {}
+    for _ in range(300):
+        tokens = list(rng.choice(vocab, size=rng.integers(3, 30), p=None))
+        corpus[index.add(tokens)] = tokens
+
+    query = ["t1", "t2", "t3", "t30", "t39"]
+    expected = _brute_force(index, corpus, query)[:5]
+    actual = index.top_k(query, 5)
+
+    assert [slot for slot, _ in actual] == [slot for slot, _ in expected]
+    assert [score for _, score in actual] == pytest.approx([score for _, score in expected], rel=1e-5)
+
+
+def test_delete_updates_stats_and_compaction_remaps_slots():
+    index = InvertedIndexBM25(compact_ratio=0.3)
+    a = index.add(["price", "discount"])
+    b = index.add(["price"])
+    c = index.add(["contract", "sign", "price"])
+
+    assert index.delete(b, ["price"])
+    assert not index.delete(b, ["price"])
+    assert index.num_docs == 2
+    assert index.total_len == 5
+    assert [slot for slot, _ in index.top_k(["price"], 10)] == [a, c]
+
+    assert index.needs_compaction()
+    remap = index.compact()
+    assert remap.tolist() == [0, -1, 1]
+    assert index.num_slots == 2
+    assert {slot for slot, _ in index.top_k(["price"], 10)} == {0, 1}
+
+
+@pytest.mark.asyncio
+async def test_retriever_incremental_add_replace_delete_and_snapshot(tmp_path):
+    retriever = BM25Retriever(use_jieba=False)
+    retriever.add_documents([
+        {"id": "d1", "content": "annual fee waived first year", "metadata": {"stage": "objection"}},
+        {"id": "d2", "content": "points redemption feature", "metadata": {"stage": "presentation"}},
+    ])
+    retriever.add_documents([
+        {"id": "d3", "content": "closing needs urgency", "metadata": {"stage": "closing"}},
+        {"id": "d1", "content": "fee discount for new customers", "metadata": {"stage": "objection"}},
+    ])
+
+    assert retriever.get_document_count() == 3
+    results = await retriever.search("fee", top_k=5)
+    assert [r.id for r in results] == ["d1"]
+    assert "discount" in results[0].content
+
+    filtered = await retriever.search("fee urgency", top_k=5, filters={"stage": "closing"})
+    assert [r.id for r in filtered] == ["d3"]
+
+    retriever.save(tmp_path / "bm25")
+    loaded = BM25Retriever.load(tmp_path / "bm25", use_jieba=False)
+    assert [r.id for r in await loaded.search("fee urgency", top_k=5)] == \
+        [r.id for r in await retriever.search("fee urgency", top_k=5)]
+
+    loaded.add_documents([{"id": "d4", "content": "fee table", "metadata": {}}])
+    assert loaded.delete_documents(["d1", "missing"]) == 1
+    assert [r.id for r in await loaded.search("fee", top_k=5)] == ["d4"]
+
+
+@pytest.mark.asyncio
+async def test_metadata_bitmap_filters_match_generic_filter_path():
+    retriever = BM25Retriever(use_jieba=False)
+    retriever.add_documents([
+        {"id": f"d{i}", "content": f"fee policy {i % 3}",
+         "metadata": {"tenant": f"t{i % 2}", "stage": ["opening", "closing", "objection"][i % 3],
+                      "tags": ["a", "b"]}}
+        for i in range(30)
+    ])
+    retriever.delete_documents(["d0"])
+
+    filters = {"tenant": "t0", "stage": ["closing", "objection"]}
+    mask = retriever.metadata_index.mask(filters, retriever.index.num_slots)
+    assert mask is not None
+    assert np.array_equal(mask & np.frombuffer(retriever.index._alive, dtype=np.int8).astype(bool),
+                          retriever._filter_mask(filters))
+
+    results = await retriever.search("fee", top_k=50, filters=filters)
+    assert results
+    assert all(r.metadata["tenant"] == "t0" and r.metadata["stage"] != "opening" for r in results)
+    assert "d0" not in {r.id for r in results}
+
+    # Non-scalar filter values are served by the generic path
+    assert retriever.metadata_index.mask({"tags": [["a", "b"]]}, retriever.index.num_slots) is None
+    assert len(await retriever.search("fee", top_k=50, filters={"tags": [["a", "b"]]})) == 29
+    assert await retriever.search("fee", top_k=5, filters={"tenant": "missing"}) == []
@@ -0,0 +1,194 @@
+"""
+Unit tests for the background context pipeline and batched ContextManagerEngine updates.
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.context_manager import engine as engine_module
+from app.context_manager.compression import CompressionResult, StructuredFacts
+from app.context_manager.engine import ContextManagerEngine
+from app.context_manager.pipeline import ContextPipeline, ContextTurn
+from app.context_manager.scoring import ImportanceScores
+
+
+def _turn(turn_id):
+    return ContextTurn(
+        turn_id=turn_id,
+        current_stage="opening",
+        previous_stage="opening",
+        user_input=f"user {turn_id}",
+        npc_response=f"npc {turn_id}",
+    )
+
+
+class FakeEngine:
+    def __init__(self, fail_first=False):
+        self.batches = []
+        self.release = asyncio.Event()
+        self.fail_first = fail_first
+
+    async def process_turns(self, session_id, user_id, tenant_id, turns):
+        await self.release.wait()
+        self.batches.append((session_id, [turn.turn_id for turn in turns]))
+        if self.fail_first and len(self.batches) == 1:
+            raise RuntimeError("llm down")
+
+
+@pytest.mark.asyncio
+async def test_pipeline_keeps_session_order_and_coalesces_backlog():
+    engine = FakeEngine()
+    pipeline = ContextPipeline(engine, max_coalesce=3, max_concurrency=4)
+
+    pipeline.submit("s1", "u", "t", _turn(1))
+    await asyncio.sleep(0)  # worker picks up turn 1 and blocks in the engine
+    for turn_id in (2, 3, 4, 5):
+        pipeline.submit("s1", "u", "t", _turn(turn_id))
+    pipeline.submit("s2", "u", "t", _turn(1))
+    assert engine.batches == []  # submit never waits for the engine
+    assert pipeline.depth == 5
+
+    engine.release.set()
+    await pipeline.drain()
+
+    assert [ids for sid, ids in engine.batches if sid == "s1"] == [[1], [2, 3, 4], [5]]
+    assert [ids for sid, ids in engine.batches if sid == "s2"] == [[1]]
+    assert pipeline.stats["coalesced"] == 2
+    assert pipeline.depth == 0
+    assert pipeline._sessions == {}
+
+
+@pytest.mark.asyncio
+async def test_pipeline_failed_batch_does_not_stall_session():
+    engine = FakeEngine(fail_first=True)
+    engine.release.set()
+    pipeline = ContextPipeline(engine, max_coalesce=1, max_concurrency=1)
+
+    pipeline.submit("s1", "u", "t", _turn(1))
+    pipeline.submit("s1", "u", "t", _turn(2))
+    await pipeline.stop()
+
+    assert engine.batches == [("s1", [1]), ("s1", [2])]
+    assert pipeline.stats["failed"] == 1
+
+
+class FakePipe:
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.commands.append((name, args))
+            return self
+        return queue
+
+    async def execute(self):
+        self.redis.executed.append([name for name, _ in self.commands])
+        results = []
+        for name, args in self.commands:
+            if name == "get":
+                results.append(self.redis.store.get(args[0]))
+            elif name == "lrange":
+                results.append(list(self.redis.lists.get(args[0], [])))
+            elif name == "lpush":
+                self.redis.lists[args[0]] = list(reversed(args[1:])) + self.redis.lists.get(args[0], [])
+                results.append(len(self.redis.lists[args[0]]))
+            elif name == "ltrim":
+                self.redis.lists[args[0]] = self.redis.lists[args[0]][args[1]:args[2] + 1]
+                results.append(True)
+            elif name == "set":
+                self.redis.store[args[0]] = args[1]
+                results.append(True)
+            else:
+                results.append("0-1")
+        return results
+
+
+class FakeRedis:
+    def __init__(self):
+        self.store = {}
+        self.lists = {}
+        self.executed = []
+
+    def lock(self, name, timeout=None):
+        return asyncio.Lock()
+
+    def pipeline(self, transaction=True):
+        return FakePipe(self)
+
+
+def _patch_engine(monkeypatch, redis, fake_score, fake_compress):
+    async def fake_get_redis():
+        return redis
+
+    monkeypatch.setattr(engine_module, "get_redis", fake_get_redis)
+    monkeypatch.setattr(engine_module, "compute_importance_score", fake_score)
+    monkeypatch.setattr(engine_module, "compress_history", fake_compress)
+    monkeypatch.setattr(engine_module, "AdapterFactory", SimpleNamespace(get_adapter=lambda provider: None))
+
+
+@pytest.mark.asyncio
+async def test_engine_batch_runs_llm_calls_concurrently_and_pipelines_redis(monkeypatch):
+    redis = FakeRedis()
+    running = {"now": 0, "peak": 0}
+
+    async def overlapping(result):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        await asyncio.sleep(0.01)
+        running["now"] -= 1
+        return result
+
+    async def fake_score(**kwargs):
+        assert kwargs["user_input"] == "user 1\nuser 2"
+        return await overlapping(ImportanceScores(0.5, 0.5, 0.0, 0.5, 0.5, 0.5, 0.5, False, "routine"))
+
+    async def fake_compress(**kwargs):
+        assert [m["content"] for m in kwargs["history"]] == ["npc 0", "user 1", "npc 1", "user 2", "npc 2"]
+        return await overlapping(CompressionResult(StructuredFacts(current_stage="discovery"), "summary", False))
+
+    _patch_engine(monkeypatch, redis, fake_score, fake_compress)
+
+    engine = ContextManagerEngine()
+    turns = [_turn(1), _turn(2)]
+    turns[0].history_window = [{"role": "npc", "content": "npc 0"}]
+    result = await engine.process_turns("s1", "u1", "t1", turns)
+
+    assert running["peak"] == 2
+    assert len(redis.executed) == 2  # one read round trip, one write round trip
+    assert redis.executed[0] == ["get", "get", "get", "lrange"]
+    assert [turn.turn_number for turn in result["blackboard"].history] == [1, 2]
+    assert result["blackboard"].stage_estimate.current == "discovery"
+    assert [json.loads(m)["content"] for m in redis.lists["ctx:s0:{s1}"]] == ["npc 2", "user 2", "npc 1", "user 1"]
+    assert json.loads(redis.store["sales_state:s1"])["turn_id"] == 2
+    assert json.loads(redis.store["ctx:s1:s1"])["narrative_summary"] == "summary"
+
+
+@pytest.mark.asyncio
+async def test_failed_context_write_is_counted_as_failed_batch(monkeypatch):
+    redis = FakeRedis()
+    real_execute = FakePipe.execute
+
+    async def failing_write(pipe):
+        if "lpush" in [name for name, _ in pipe.commands]:
+            raise ConnectionError("redis down")
+        return await real_execute(pipe)
+
+    async def fake_score(**kwargs):
+        return ImportanceScores(0.5, 0.5, 0.0, 0.5, 0.5, 0.5, 0.5, False, "routine")
+
+    async def fake_compress(**kwargs):
+        return CompressionResult(StructuredFacts(), "summary", False)
+
+    _patch_engine(monkeypatch, redis, fake_score, fake_compress)
+    monkeypatch.setattr(FakePipe, "execute", failing_write)
+
+    pipeline = ContextPipeline(ContextManagerEngine(), max_coalesce=4, max_concurrency=1)
+    pipeline.submit("s1", "u1", "t1", _turn(1))
+    await pipeline.drain()
+
+    assert pipeline.stats["failed"] == 1
+    assert redis.lists == {}
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+from app.infra.search.embedding_service import EmbeddingService
+
+
+class RecordingEncoder:
+    def __init__(self, delay: float = 0.0, fail: bool = False):
+        self.calls = []
+        self.delay = delay
+        self.fail = fail
+
+    async def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_micro_batched_and_deduplicated():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encoder, max_batch_size=16, max_wait_ms=5)
+
+    results = await asyncio.gather(
+        service.embed("a"), service.embed("bb"), service.embed("a"), service.embed("ccc")
+    )
+
+    assert results == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0], [3.0, 1.0]]
+    assert encoder.calls == [["a", "bb", "ccc"]]
+
+    stats = service.get_stats()
+    assert stats["coalesced"] == 1
+    assert stats["batches"] == 1
+    assert stats["avg_batch_size"] == 3
+
+
+@pytest.mark.asyncio
+async def test_memo_serves_repeats_and_full_batches_flush_immediately():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encoder, max_batch_size=2, max_wait_ms=1000)
+
+    first = await asyncio.wait_for(service.embed_many(["x", "yy"]), timeout=0.5)
+    second = await service.embed_many(["yy", "x"])
+
+    assert second == list(reversed(first))
+    assert len(encoder.calls) == 1
+    assert service.get_stats()["memo_hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_memo_is_lru_bounded():
+    encoder = RecordingEncoder()
+    service = EmbeddingService(encoder, cache_size=2, max_wait_ms=0)
+
+    for text in ["a", "b", "c"]:
+        await service.embed(text)
+    await service.embed("a")
+
+    assert encoder.calls[-1] == ["a"]
+    assert service.get_stats()["memo_size"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_propagates_to_every_waiter():
+    encoder = RecordingEncoder(fail=True)
+    service = EmbeddingService(encoder, max_wait_ms=1)
+
+    results = await asyncio.gather(
+        service.embed("a"), service.embed("a"), return_exceptions=True
+    )
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert service.get_stats()["errors"] == 1
+    assert service.get_stats()["memo_size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_batch_releases_its_keys():
+    encoder = RecordingEncoder(delay=10)
+    service = EmbeddingService(encoder, max_wait_ms=0)
+
+    waiter = asyncio.ensure_future(service.embed("a"))
+    await asyncio.sleep(0.01)
+    for task in list(service._batcher._tasks):
+        task.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert service._batcher._inflight == {}
+
+    # A later caller starts a fresh batch instead of hanging on the old future
+    encoder.delay = 0
+    assert await asyncio.wait_for(service.embed("a"), timeout=1.0) == [1.0, 1.0]
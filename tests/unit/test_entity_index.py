@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+from app.infra.search.entity_index import EntityNameIndex
+from app.infra.search.graph_rag_enhanced import EnhancedGraphRAGService
+
+
+def test_single_pass_finds_overlapping_names_and_aliases():
+    index = EntityNameIndex()
+    index.add("fee", ["年费", "annual fee"])
+    index.add("fee_high", ["年费太贵"])
+    index.add("rights", ["权益"])
+
+    assert index.match("客户说年费太贵，权益不够") == ["fee", "fee_high", "rights"]
+    assert index.match("The ANNUAL FEE is high") == ["fee"]
+    assert index.match("价格异议") == []
+
+
+def test_incremental_add_replace_and_remove():
+    index = EntityNameIndex()
+    index.add("a", ["分期"])
+    assert index.match("可以分期吗") == ["a"]
+
+    index.add("b", ["分期免息"])
+    index.add("a", ["积分"])  # rename drops the old term
+    assert index.match("分期免息积分") == ["b", "a"]
+
+    index.remove("b")
+    assert index.match("分期免息") == []
+    assert len(index) == 1
+
+
+class FakeLLM:
+    def __init__(self, entities):
+        self.entities = entities
+
+    async def generate(self, prompt, **kwargs):
+        if "识别实体之间的关系" in prompt:
+            return json.dumps({"relations": []})
+        return json.dumps({"entities": self.entities})
+
+
+@pytest.mark.asyncio
+async def test_service_links_entities_added_by_ingestion():
+    llm = FakeLLM([
+        {"name": "年费太贵", "type": "objection", "properties": {"aliases": ["年费贵"]}},
+        {"name": "权益话术", "type": "response"},
+    ])
+    service = EnhancedGraphRAGService(org_id="test", llm_client=llm)
+
+    assert service._find_query_entities("客户嫌年费贵怎么办") == []
+    await service.ingest_sales_conversation("c1", "...")
+
+    linked = service._find_query_entities("客户嫌年费贵怎么办")
+    assert [e.name for e in linked] == ["年费太贵"]
+    # Short queries still match names that contain them
+    assert [e.name for e in service._find_query_entities("话术")] == ["权益话术"]
@@ -0,0 +1,77 @@
+import pytest
+
+from app.infra.search.graph_rag import Entity, EntityType, KnowledgeGraph, Relation, RelationType
+from app.infra.search.graph_rag_enhanced import MultiHopReasoner
+
+
+def _graph():
+    graph = KnowledgeGraph()
+    graph.add_entity(Entity(id="o1", name="年费太贵", type=EntityType.OBJECTION))
+    graph.add_entity(Entity(id="r1", name="权益话术", type=EntityType.RESPONSE))
+    graph.add_entity(Entity(id="r2", name="分期方案", type=EntityType.RESPONSE))
+    graph.add_entity(Entity(id="t1", name="价值转化", type=EntityType.TECHNIQUE))
+    graph.add_relation(Relation(id="a1", source_id="r1", target_id="o1", type=RelationType.ADDRESSES, weight=0.9))
+    graph.add_relation(Relation(id="a2", source_id="r2", target_id="o1", type=RelationType.ADDRESSES, weight=0.4))
+    graph.add_relation(Relation(id="p1", source_id="o1", target_id="r1", type=RelationType.SIMILAR_TO, weight=0.9))
+    graph.add_relation(Relation(id="p2", source_id="o1", target_id="r2", type=RelationType.SIMILAR_TO, weight=0.4))
+    graph.add_relation(Relation(id="p3", source_id="r1", target_id="t1", type=RelationType.PART_OF, weight=0.8))
+    return graph
+
+
+def test_reverse_and_type_indexed_edges():
+    graph = _graph()
+
+    assert {r.id for r in graph.in_relations("o1")} == {"a1", "a2"}
+    assert [r.id for r in graph.out_relations("r1", RelationType.PART_OF)] == ["p3"]
+    assert {r.id for r in graph.relations_of_type(RelationType.ADDRESSES)} == {"a1", "a2"}
+    assert graph.get_neighbors("o1", direction="in") == {"r1", "r2"}
+
+    # Same ID replaces the relation everywhere
+    graph.add_relation(Relation(id="a2", source_id="r2", target_id="t1", type=RelationType.PART_OF))
+    assert {r.id for r in graph.in_relations("o1")} == {"a1"}
+    assert {r.id for r in graph.relations_of_type(RelationType.PART_OF)} == {"p3", "a2"}
+    assert len(graph.relations) == 5
+
+
+def test_find_paths_beam_and_target_type():
+    graph = _graph()
+
+    paths = graph.find_paths("o1", max_hops=2, target_type=EntityType.TECHNIQUE)
+    assert [[r.id for _, r in path] for path in paths if path[-1][0].id == "t1"] == [["p1", "p3"]]
+
+    # Beam of 1 keeps only the heaviest first hop (o1 -> r1)
+    beam = graph.find_paths("o1", max_hops=1, beam_width=1)
+    assert {path[0][1].id for path in beam} == {"p1", "p2"}
+    narrow = graph.find_paths("o1", max_hops=2, beam_width=1)
+    assert all(path[0][1].id == "p1" for path in narrow if len(path) == 2)
+
+    # Paths are simple: no cycle back to the start
+    assert all(entity.id != "o1" for path in graph.find_paths("o1", max_hops=3) for entity, _ in path)
+
+
+@pytest.mark.asyncio
+async def test_reasoner_uses_indexed_paths():
+    reasoner = MultiHopReasoner(_graph(), llm_client=None, max_hops=2)
+
+    paths = await reasoner.reason("年费太贵怎么办", ["o1"], target_type=EntityType.TECHNIQUE)
+
+    target_paths = [p for p in paths if p.entities[-1].id == "t1"]
+    assert [[r.id for r in p.relations] for p in target_paths] == [["p1", "p3"]]
+
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_snapshot_roundtrip(tmp_path, mmap):
+    graph = _graph()
+    graph.remove_relation("a2")
+    graph.save(tmp_path)
+
+    loaded = KnowledgeGraph.load(tmp_path, mmap=mmap)
+    assert loaded.get_stats() == graph.get_stats()
+    assert {r.id for r in loaded.in_relations("o1")} == {"a1"}
+    assert [[r.id for _, r in p] for p in loaded.find_paths("o1", max_hops=2)] == [
+        [r.id for _, r in p] for p in graph.find_paths("o1", max_hops=2)
+    ]
+
+    # Snapshot-backed graphs keep accepting incremental edges
+    loaded.add_relation(Relation(id="n1", source_id="t1", target_id="o1", type=RelationType.REQUIRES))
+    assert {r.id for r in loaded.in_relations("o1")} == {"a1", "n1"}
@@ -0,0 +1,63 @@
+import numpy as np
+
+from app.engine.coordinator.bandit_linucb import LinUCBBandit
+
+
+def _context(i):
+    stages = ["opening", "discovery", "demo", "negotiation", "closing"]
+    return {
+        "confidence": (i % 7) / 7,
+        "fsm_stage": stages[i % 5],
+        "need_tools": i % 2 == 0,
+        "risk_flags": ["x"] * (i % 4),
+        "intent": "price" if i % 3 else "",
+    }
+
+
+def test_incremental_inverse_matches_direct_solution():
+    bandit = LinUCBBandit(arms=["npc", "tools", "knowledge"], context_dim=12, lambda_=0.7)
+    rng = np.random.default_rng(0)
+
+    for i in range(200):
+        decision = bandit.choose(_context(i))
+        assert bandit.record_feedback(decision["decision_id"], float(rng.uniform(-1, 1)))
+
+    for arm in bandit.arms:
+        expected = np.linalg.solve(bandit._A[arm], bandit._b[arm])
+        np.testing.assert_allclose(bandit.get_theta(arm), expected, atol=1e-8)
+        i = bandit._arm_index[arm]
+        np.testing.assert_allclose(bandit._A_inv[i], np.linalg.inv(bandit._A[arm]), atol=1e-8)
+
+
+def test_choose_matches_reference_ucb():
+    bandit = LinUCBBandit(arms=["a", "b", "c", "d"], context_dim=10, alpha=0.3)
+    for i in range(50):
+        decision = bandit.choose(_context(i))
+        bandit.record_feedback(decision["decision_id"], 1.0 if decision["chosen"] == "c" else 0.0)
+
+    context = _context(3)
+    x = bandit._context_to_features(context)
+    reference = {}
+    for arm in bandit.arms:
+        A_inv = np.linalg.inv(bandit._A[arm])
+        theta = A_inv @ bandit._b[arm]
+        reference[arm] = (theta.T @ x)[0, 0] + 0.3 * np.sqrt((x.T @ A_inv @ x)[0, 0])
+
+    decision = bandit.choose(context)
+    assert decision["chosen"] == max(reference, key=reference.get)
+    for arm, score in reference.items():
+        assert abs(decision["all_scores"][arm] - score) < 1e-9
+
+
+def test_choose_many_scores_each_context_and_respects_candidates():
+    bandit = LinUCBBandit(arms=["npc", "tools", "knowledge"], context_dim=10)
+    contexts = [_context(i) for i in range(8)]
+
+    decisions = bandit.choose_many(contexts, candidates=["tools", "knowledge", "unknown"])
+
+    assert len(decisions) == 8
+    assert len({d["decision_id"] for d in decisions}) == 8
+    assert all(d["chosen"] in {"tools", "knowledge"} for d in decisions)
+    assert all(set(d["all_scores"]) == {"tools", "knowledge"} for d in decisions)
+    assert all(bandit.record_feedback(d["decision_id"], 0.5) for d in decisions)
+    assert bandit.choose_many([]) == []
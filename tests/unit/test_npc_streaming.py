@@ -0,0 +1,169 @@
+"""
+Unit tests for token streaming of NPC replies (gateway -> NPCGenerator -> coordinator).
+"""
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents.practice.npc_simulator import NPCGenerator
+from app.infra.streaming.json_field import JSONFieldStreamExtractor
+
+REPLY = '你好，"年费"怎么算？\n😀'
+
+
+class FakeGateway:
+    def __init__(self, chunks, delay=0.0, fail_after=None):
+        self.chunks = chunks
+        self.delay = delay
+        self.fail_after = fail_after
+
+    async def stream_call(self, call, context):
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise ConnectionError("stream reset")
+            await asyncio.sleep(self.delay)
+            yield chunk
+
+
+def _generator(chunks, delay=0.0, fail_after=None):
+    generator = NPCGenerator.__new__(NPCGenerator)
+    generator.gateway = FakeGateway(chunks, delay, fail_after)
+    generator.knowledge = SimpleNamespace(get_product_info=lambda **kwargs: {"found": False})
+    return generator
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+@pytest.mark.parametrize("step", [1, 2, 5])
+def test_extractor_decodes_content_across_any_split(ensure_ascii, step):
+    raw = json.dumps({"content": REPLY, "mood": 0.3}, ensure_ascii=ensure_ascii)
+    extractor = JSONFieldStreamExtractor("content")
+
+    out = "".join(extractor.feed(raw[i:i + step]) for i in range(0, len(raw), step))
+
+    assert out == REPLY
+    assert extractor.done
+    assert extractor.raw == raw
+
+
+def test_extractor_passes_plain_text_through():
+    extractor = JSONFieldStreamExtractor("content")
+    assert extractor.feed("  I need") == "  I need"
+    assert extractor.feed(" to think.") == " to think."
+
+
+@pytest.mark.asyncio
+async def test_stream_response_emits_only_content_and_parses_mood():
+    raw = json.dumps({"content": REPLY, "mood": 0.3}, ensure_ascii=False).encode("utf-8")
+    # Byte chunks that split multi-byte characters
+    chunks = [raw[i:i + 4] for i in range(0, len(raw), 4)]
+    deltas = []
+
+    async def on_delta(text):
+        deltas.append(text)
+
+    response = await _generator(chunks).stream_response("hi", [], None, "opening", on_delta)
+
+    assert "".join(deltas) == REPLY
+    assert len(deltas) > 1
+    assert response.content == REPLY
+    assert response.mood == 0.3
+
+
+@pytest.mark.asyncio
+async def test_stream_failure_after_output_is_raised_not_replaced():
+    raw = json.dumps({"content": "hello there", "mood": 0.3})
+    chunks = [raw[i:i + 4] for i in range(0, len(raw), 4)]
+    deltas = []
+
+    async def on_delta(text):
+        deltas.append(text)
+
+    with pytest.raises(ConnectionError):
+        await _generator(chunks, fail_after=5).stream_response("hi", [], None, "opening", on_delta)
+    assert deltas and "hello there".startswith("".join(deltas))
+
+    # Nothing reached the client yet: the usual fallback reply is still fine
+    deltas.clear()
+    response = await _generator(chunks, fail_after=1).stream_response("hi", [], None, "opening", on_delta)
+    assert deltas == []
+    assert response.content.startswith("[System Error]")
+
+
+@pytest.mark.asyncio
+async def test_gateway_does_not_replay_a_stream_that_already_produced_output(monkeypatch):
+    from app.infra.gateway import model_gateway as gateway_module
+    from app.infra.gateway.model_gateway import ModelGateway
+    from app.infra.gateway.schemas import ModelCall, ModelConfig
+
+    attempts = []
+
+    class FlakyAdapter:
+        async def stream(self, messages, config, tools=None, tool_choice=None):
+            attempts.append(1)
+            yield '{"content": "hel'
+            raise ConnectionError("stream reset")
+
+    monkeypatch.setattr(gateway_module.AdapterFactory, "get_adapter", lambda provider: FlakyAdapter())
+    call = ModelCall(prompt="hi", config=ModelConfig(provider="openai", model_name="test"))
+
+    received = []
+    with pytest.raises(ConnectionError):
+        async for chunk in ModelGateway().stream_call(call, None):
+            received.append(chunk)
+    assert received == ['{"content": "hel']
+    assert len(attempts) == 1
+
+
+@pytest.mark.asyncio
+async def test_workflow_forwards_tokens_before_compliance():
+    pytest.importorskip("langgraph")
+    from app.engine.coordinator.dynamic_workflow import DynamicWorkflowCoordinator, NodeType, WorkflowConfig
+
+    events = []
+    raw = json.dumps({"content": "hello there", "mood": 0.7})
+
+    class StubCoordinator(DynamicWorkflowCoordinator):
+        def _init_node_implementations(self):
+            self.reasoning_engine = None
+            self.routing_advisor = None
+            self.bandit = None
+            self.npc_agent = _generator([raw[i:i + 3] for i in range(0, len(raw), 3)], delay=0.001)
+
+        async def _intent_node(self, state, config=None):
+            return {"intent": "greeting", "route_choice": "npc"}
+
+        async def _compliance_node(self, state):
+            events.append(("compliance", state["npc_response"]))
+            return {"compliance_result": {"risk_level": "OK"}}
+
+    config = WorkflowConfig(
+        enabled_nodes={NodeType.INTENT, NodeType.NPC, NodeType.COMPLIANCE},
+        routing_rules={"intent": ["npc"], "npc": ["compliance"]},
+        enable_reasoning=False,
+        enable_routing_policy=False,
+        enable_bandit=False,
+    )
+    coordinator = StubCoordinator(model_gateway=None, budget_manager=None, persona={}, config=config)
+
+    async def on_token(text):
+        events.append(("token", text))
+
+    result = await coordinator.execute_turn(1, "hi", [], {}, on_token=on_token)
+
+    tokens = [text for kind, text in events if kind == "token"]
+    assert "".join(tokens) == "hello there"
+    assert events[-1] == ("compliance", "hello there")
+    assert result["npc_reply"] == "hello there"
+    assert result["compliance_result"]["risk_level"] == "OK"
+    assert coordinator._token_sinks == {}
+
+    # Without a callback the reply is generated in one piece
+    events.clear()
+    coordinator.npc_agent = SimpleNamespace(
+        generate_response=lambda **kwargs: asyncio.sleep(0, SimpleNamespace(content="whole", mood=0.5))
+    )
+    result = await coordinator.execute_turn(2, "hi", [], {})
+    assert result["npc_reply"] == "whole"
+    assert not any(kind == "token" for kind, _ in events)
@@ -0,0 +1,97 @@
+import pytest
+
+pytest.importorskip("qdrant_client")
+
+from app.infra.vector_store.qdrant_client import Document, QdrantVectorStore
+
+
+@pytest.fixture
+async def store():
+    store = QdrantVectorStore(url=":memory:", upsert_concurrency=2)
+    assert await store.initialize()
+    assert await store.create_collection("kb", vector_size=4)
+    yield store
+    await store.close()
+
+
+def _docs(n):
+    docs = []
+    for i in range(n):
+        dense = [0.0] * 4
+        dense[i % 4] = 1.0
+        docs.append(
+            Document(
+                id=i,
+                content=f"doc {i}",
+                dense_vector=dense,
+                sparse_vector={i: 1.0, 100: 0.1},
+                metadata={"group": "even" if i % 2 == 0 else "odd"},
+            )
+        )
+    return docs
+
+
+@pytest.mark.asyncio
+async def test_batched_upsert_is_complete_on_return(store):
+    assert await store.upsert_documents("kb", _docs(25), batch_size=4)
+    info = await QdrantVectorStore._client.count("kb")
+    assert info.count == 25
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_fuses_both_legs(store):
+    await store.upsert_documents("kb", _docs(8), batch_size=3)
+
+    # Dense favours doc 0 (and 4); sparse only matches doc 5
+    results = await store.hybrid_search(
+        "kb", dense_vector=[1.0, 0.0, 0.0, 0.0], sparse_vector={5: 1.0}, top_k=3
+    )
+    ids = [r.id for r in results]
+    assert "5" in ids
+    assert ids[0] in {"0", "4", "5"}
+    assert all(r.content.startswith("doc ") for r in results)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_search_client_fallback_matches_filters(store):
+    await store.upsert_documents("kb", _docs(8), batch_size=3)
+    store._server_fusion = False
+
+    results = await store.hybrid_search(
+        "kb",
+        dense_vector=[1.0, 0.0, 0.0, 0.0],
+        sparse_vector={5: 1.0},
+        top_k=4,
+        filters={"group": "odd"},
+    )
+    assert results
+    assert all(r.metadata["group"] == "odd" for r in results)
+    assert results[0].id == "5"
+
+
+@pytest.mark.asyncio
+async def test_only_unsupported_fusion_disables_server_fusion(store, monkeypatch):
+    from httpx import Headers
+    from qdrant_client.http.exceptions import UnexpectedResponse
+
+    await store.upsert_documents("kb", _docs(8), batch_size=3)
+    client = QdrantVectorStore._client
+    query_points = client.query_points
+
+    def failing_fused_query(error):
+        async def fake(*args, **kwargs):
+            if "prefetch" in kwargs:
+                raise error
+            return await query_points(*args, **kwargs)
+        return fake
+
+    missing = UnexpectedResponse(404, "Not Found", b'{"status":{"error":"Collection `kb` doesn\'t exist!"}}', Headers())
+    monkeypatch.setattr(client, "query_points", failing_fused_query(missing))
+    assert await store.hybrid_search("kb", [1.0, 0.0, 0.0, 0.0], {5: 1.0}, top_k=3) == []
+    assert store._server_fusion is True
+
+    unsupported = UnexpectedResponse(400, "Bad Request", b"Format error in JSON body: unknown field `weights`", Headers())
+    monkeypatch.setattr(client, "query_points", failing_fused_query(unsupported))
+    results = await store.hybrid_search("kb", [1.0, 0.0, 0.0, 0.0], {5: 1.0}, top_k=3)
+    assert store._server_fusion is False
+    assert "5" in [r.id for r in results]
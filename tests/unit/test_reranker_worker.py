@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.infra.search.reranker_worker import RerankerWorker
+from app.infra.search.vector_store import BGEReranker, SearchResult
+
+
+class RecordingScorer:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.threads = set()
+        self.fail = fail
+
+    def __call__(self, pairs):
+        self.calls.append(list(pairs))
+        self.threads.add(threading.get_ident())
+        if self.fail:
+            raise RuntimeError("model crashed")
+        return [float(len(doc)) for _, doc in pairs]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_one_off_loop_batch():
+    scorer = RecordingScorer()
+    worker = RerankerWorker(scorer, max_batch_size=16, max_wait_ms=5)
+
+    first, second = await asyncio.gather(
+        worker.score("q1", [("a", "xxx"), ("b", "x")]),
+        worker.score("q2", [("a", "xx")]),
+    )
+
+    assert first == [3.0, 1.0]
+    assert second == [2.0]
+    assert len(scorer.calls) == 1
+    # Pairs are handed to the model shortest first to minimise padding
+    assert [len(doc) for _, doc in scorer.calls[0]] == [1, 2, 3]
+    assert threading.get_ident() not in scorer.threads
+
+
+@pytest.mark.asyncio
+async def test_scores_are_memoized_per_query_and_doc_id():
+    scorer = RecordingScorer()
+    worker = RerankerWorker(scorer, max_wait_ms=0)
+
+    await worker.score("q", [("a", "xx"), ("b", "yyy")])
+    again = await worker.score("q", [("b", "yyy"), ("a", "xx"), ("c", "z")])
+
+    assert again == [3.0, 2.0, 1.0]
+    assert scorer.calls[1] == [("q", "z")]
+    stats = worker.get_stats()
+    assert stats["memo_hits"] == 2
+    assert stats["batches"] == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_propagates_and_is_not_cached():
+    scorer = RecordingScorer(fail=True)
+    worker = RerankerWorker(scorer, max_wait_ms=0)
+
+    with pytest.raises(RuntimeError):
+        await worker.score("q", [("a", "x")])
+    assert worker.get_stats()["errors"] == 1
+    assert worker.get_stats()["memo_size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_bge_arerank_uses_worker():
+    model = MagicMock()
+    model.compute_score.side_effect = lambda pairs, batch_size: [float(len(d)) for _, d in pairs]
+    BGEReranker._model = model
+    BGEReranker._worker = None
+    try:
+        reranker = BGEReranker()
+        results = [
+            SearchResult(id="1", content="short", score=0.5),
+            SearchResult(id="2", content="much longer", score=0.4),
+        ]
+        reranked = await reranker.arerank("query", results, top_k=1)
+
+        assert [r.id for r in reranked] == ["2"]
+        assert reranked[0].rank == 0
+        assert reranker.worker.get_stats()["batches"] == 1
+    finally:
+        BGEReranker._model = None
+        BGEReranker._worker = None
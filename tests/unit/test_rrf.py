@@ -1,6 +1,15 @@
+import asyncio
+import time
+
 import pytest
 from typing import List
-from app.infra.search.vector_store import HybridSearchEngine, VectorStore, SearchResult
+from app.infra.search.vector_store import (
+    HSRSearchEngine,
+    HybridSearchEngine,
+    PrefilterResult,
+    SearchResult,
+    VectorStore,
+)
 
 class MockVectorStore(VectorStore):
     def __init__(self, results: List[SearchResult]):
@@ -52,3 +61,119 @@ async def test_rrf_fusion():
     # Score A: 1/61 + 1/62
     # Score B: 1/62 + 1/61
     assert abs(results_def[0].score - results_def[1].score) < 0.0001
+
+
+class SlowStore(VectorStore):
+    def __init__(self, results: List[SearchResult], delay: float):
+        self.results = results
+        self.delay = delay
+
+    async def search(self, query: str, top_k: int = 10, **kwargs) -> List[SearchResult]:
+        await asyncio.sleep(self.delay)
+        return self.results
+
+
+@pytest.mark.asyncio
+async def test_hybrid_legs_run_concurrently():
+    engine = HybridSearchEngine(
+        SlowStore([SearchResult(id="A", content="A")], 0.1),
+        SlowStore([SearchResult(id="B", content="B")], 0.1),
+    )
+
+    start = time.perf_counter()
+    results = await engine.search("query", top_k=2)
+
+    assert time.perf_counter() - start < 0.18
+    assert {r.id for r in results} == {"A", "B"}
+    assert engine.last_trace["contributing"] == ["vector", "keyword"]
+
+
+@pytest.mark.asyncio
+async def test_hybrid_fuses_partial_results_when_leg_misses_budget():
+    engine = HybridSearchEngine(
+        SlowStore([SearchResult(id="A", content="A")], 0.0),
+        SlowStore([SearchResult(id="B", content="B")], 1.0),
+        leg_timeouts={"keyword": 0.05},
+    )
+
+    results = await engine.search("query", top_k=2)
+
+    assert [r.id for r in results] == ["A"]
+    assert engine.last_trace["legs"]["keyword"]["status"] == "timeout"
+    assert engine.last_trace["contributing"] == ["vector"]
+
+
+@pytest.mark.asyncio
+async def test_hsr_overlaps_prefilter_with_embedding_and_degrades_on_timeout():
+    calls = []
+
+    async def embed(query):
+        await asyncio.sleep(0.05)
+        return [1.0]
+
+    async def slow_prefilter(query, top_k, filters):
+        await asyncio.sleep(1.0)
+        return PrefilterResult(keyword_hits=[SearchResult(id="K", content="K")], candidate_ids=["K"])
+
+    class RecordingVectorStore(VectorStore):
+        async def search(self, query, top_k=10, filters=None, ids=None, embedding_fn=None):
+            calls.append({"ids": ids, "vector": await embedding_fn(query)})
+            return [SearchResult(id="V", content="V")]
+
+    engine = HSRSearchEngine(
+        RecordingVectorStore(), slow_prefilter, leg_timeouts={"prefilter": 0.05}
+    )
+
+    start = time.perf_counter()
+    results = await engine.search("query", top_k=3, filters={}, embedding_fn=embed)
+
+    assert time.perf_counter() - start < 0.2
+    assert [r.id for r in results] == ["V"]
+    assert calls == [{"ids": None, "vector": [1.0]}]
+    assert engine.last_trace["legs"]["prefilter"]["status"] == "timeout"
+    assert engine.last_trace["contributing"] == ["vector"]
+
+
+@pytest.mark.asyncio
+async def test_hsr_single_leg_timeout_gives_vector_leg_its_own_budget():
+    async def embed(query):
+        return [1.0]
+
+    async def slow_prefilter(query, top_k, filters):
+        await asyncio.sleep(1.0)
+        return PrefilterResult(keyword_hits=[], candidate_ids=[])
+
+    class SlowVectorStore(VectorStore):
+        async def search(self, query, top_k=10, filters=None, ids=None, embedding_fn=None):
+            await embedding_fn(query)
+            await asyncio.sleep(0.05)
+            return [SearchResult(id="V", content="V")]
+
+    engine = HSRSearchEngine(SlowVectorStore(), slow_prefilter, leg_timeout=0.1)
+
+    results = await engine.search("query", top_k=3, filters={}, embedding_fn=embed)
+
+    assert [r.id for r in results] == ["V"]
+    assert engine.last_trace["legs"]["prefilter"]["status"] == "timeout"
+    assert engine.last_trace["legs"]["vector"]["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_concurrent_searches_keep_their_own_trace():
+    engine = HybridSearchEngine(
+        SlowStore([SearchResult(id="A", content="A")], 0.0),
+        SlowStore([SearchResult(id="B", content="B")], 0.2),
+        leg_timeouts={"keyword": 0.1},
+    )
+
+    async def search_and_trace(timeout):
+        engine.leg_timeouts = {"keyword": timeout}
+        await engine.search("query", top_k=2)
+        return engine.last_trace["legs"]["keyword"]["status"]
+
+    slow = asyncio.ensure_future(search_and_trace(1.0))
+    await asyncio.sleep(0)
+    fast = await search_and_trace(0.05)
+
+    assert fast == "timeout"
+    assert await slow == "ok"
@@ -0,0 +1,216 @@
+import hashlib
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.infra.cache.memory_vector_index import MemoryVectorIndex
+from app.infra.cache.redis_vector_index import RedisVectorIndex
+from app.infra.cache.semantic_cache import SemanticCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class FakeEmbeddings:
+    """Deterministic embeddings keyed on the input text."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create(self, model: str, input):
+        self.calls += 1
+        texts = [input] if isinstance(input, str) else input
+        data = []
+        for text in texts:
+            seed = int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+            vector = np.random.default_rng(seed).normal(size=16)
+            data.append(SimpleNamespace(embedding=vector.tolist()))
+        return SimpleNamespace(data=data)
+
+
+def _make_cache(**kwargs):
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    openai_client = SimpleNamespace(embeddings=FakeEmbeddings())
+    return SemanticCache(redis_client, openai_client, **kwargs), redis_client
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_hit_is_partitioned_by_context():
+    cache, _ = _make_cache()
+    await cache.set("如何提升销售业绩？", {"response": "A"}, context={"stage": "closing"})
+
+    # Drop L1 so the lookup has to go through the Redis vector index
+    cache.memory_index.clear()
+
+    assert await cache._check_redis_cache(
+        await cache._generate_embedding("如何提升销售业绩？"), {"stage": "closing"}
+    ) is not None
+    assert await cache._check_redis_cache(
+        await cache._generate_embedding("如何提升销售业绩？"), {"stage": "greeting"}
+    ) is None
+
+    result = await cache.get("如何提升销售业绩？", context={"stage": "closing"})
+    assert result == {"response": "A"}
+    assert cache.stats["redis_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_get_then_set_shares_one_embedding_call():
+    cache, _ = _make_cache()
+    assert await cache.get("有什么优惠吗") is None
+    await cache.set("有什么优惠吗", {"response": "C"})
+
+    assert cache.openai.embeddings.calls == 1
+    assert cache.get_stats()["embedding"]["memo_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fallback_index_returns_top_k_and_bounds_partition():
+    redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    index = RedisVectorIndex(redis_client, fallback_candidates=8)
+
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(20, 4)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    for i, vector in enumerate(vectors):
+        await index.add(f"e{i}", "p", vector, payload=f"payload-{i}", ttl=60)
+
+    assert index.use_search is False
+    assert await redis_client.zcard("semantic_cache:partition:p") == 8
+
+    results = await index.search(vectors[19], "p", k=3)
+    assert results[0][1] == "payload-19"
+    assert results[0][0] == pytest.approx(1.0, abs=1e-5)
+    assert [score for score, _ in results] == sorted((s for s, _ in results), reverse=True)
+
+    assert await index.search(vectors[19], "other", k=3) == []
+
+
+@pytest.mark.asyncio
+async def test_clear_removes_redis_entries():
+    cache, redis_client = _make_cache()
+    await cache.set("价格是多少", {"response": "B"})
+    assert await redis_client.dbsize() > 0
+
+    await cache.clear()
+
+    assert await redis_client.dbsize() == 0
+    assert cache.get_stats()["memory_cache_size"] == 0
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def test_memory_index_lru_eviction_and_stable_ids():
+    index = MemoryVectorIndex(capacity=2, initial_rows=1)
+    index.add("a", _unit([1, 0, 0]), "A")
+    index.add("b", _unit([0, 1, 0]), "B")
+    index.add("a", _unit([1, 0.1, 0]), "A2")  # same id overwrites in place
+    assert len(index) == 2
+
+    # Touch "b" so "a" becomes least recently used
+    assert index.search(_unit([0, 1, 0]))[0] == "b"
+    index.add("c", _unit([0, 0, 1]), "C")
+
+    assert "a" not in index
+    assert index.search(_unit([0, 0, 1]), threshold=0.9) == ("c", pytest.approx(1.0), "C")
+    assert index.search(_unit([1, 0, 0]), threshold=0.9) is None
+
+
+def test_memory_index_ttl_and_partition_masking():
+    index = MemoryVectorIndex(capacity=4)
+    index.add("live", _unit([1, 1]), "live", partition="p1")
+    index.add("stale", _unit([1, 0]), "stale", partition="p1", ttl=-1)
+    index.add("other", _unit([1, 0]), "other", partition="p2")
+
+    hit = index.search(_unit([1, 0]), partition="p1")
+    assert hit[0] == "live"
+    assert index.search(_unit([1, 0]), partition="missing") is None
+
+    # A full index reclaims expired slots before evicting live entries
+    index.add("d", _unit([0, 1]), "D", partition="p1")
+    index.add("e", _unit([0, 1]), "E", partition="p1")
+    assert "stale" not in index
+    assert {"live", "other", "d", "e"} == set(index._slots)
+
+
+def test_memory_index_reclaims_partition_codes():
+    index = MemoryVectorIndex(capacity=2)
+    for i in range(50):
+        index.add(f"q{i}", _unit([1, 0]), i, partition=f"tenant-{i}")
+    # Only the partitions of live entries keep a code
+    assert set(index._partitions) == {"tenant-48", "tenant-49"}
+    assert max(index._partitions.values()) <= 3
+
+    # Moving an entry to another partition frees the old one
+    index.add("q49", _unit([1, 0]), 49, partition="tenant-48")
+    assert set(index._partitions) == {"tenant-48"}
+    assert index.search(_unit([1, 0]), partition="tenant-49") is None
+    assert index.search(_unit([1, 0]), partition="tenant-48")[0] in {"q48", "q49"}
+
+    index.remove("q48")
+    index.remove("q49")
+    assert index._partitions == {}
+
+    index.add("x", _unit([0, 1]), "X", partition="fresh")
+    index.clear()
+    assert index._partitions == {} and index._partition_counts == {}
+    index.add("y", _unit([0, 1]), "Y", partition="fresh")
+    assert index._partitions == {"fresh": 1}
+
+
+class ScriptedRedis:
+    """Answers FT.* commands from a script of results/exceptions."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.commands = []
+
+    async def execute_command(self, *args):
+        self.commands.append(args[0])
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+
+def _ft_info(dim):
+    return [
+        "index_name", "idx:semantic_cache",
+        "attributes", [
+            ["identifier", "partition", "attribute", "partition", "type", "TAG"],
+            ["identifier", "embedding", "attribute", "embedding", "type", "VECTOR", "dim", dim],
+        ],
+    ]
+
+
+@pytest.mark.asyncio
+async def test_transient_error_does_not_disable_redisearch():
+    redis_client = ScriptedRedis(ConnectionError("timeout"), "OK")
+    index = RedisVectorIndex(redis_client)
+
+    with pytest.raises(ConnectionError):
+        await index.ensure_index(16)
+    assert index.use_search is None
+
+    assert await index.ensure_index(16) is True
+    assert await index.ensure_index(16) is True
+    assert redis_client.commands == ["FT.CREATE", "FT.CREATE"]
+
+    unsupported = RedisVectorIndex(ScriptedRedis(Exception("ERR unknown command 'FT.CREATE'")))
+    assert await unsupported.ensure_index(16) is False
+
+
+@pytest.mark.asyncio
+async def test_existing_index_with_other_dim_is_recreated():
+    redis_client = ScriptedRedis(Exception("Index already exists"), _ft_info(8), "OK", "OK")
+    index = RedisVectorIndex(redis_client)
+
+    assert await index.ensure_index(16) is True
+    assert redis_client.commands == ["FT.CREATE", "FT.INFO", "FT.DROPINDEX", "FT.CREATE"]
+
+    same = ScriptedRedis(Exception("Index already exists"), _ft_info(16))
+    assert await RedisVectorIndex(same).ensure_index(16) is True
+    assert same.commands == ["FT.CREATE", "FT.INFO"]
@@ -0,0 +1,235 @@
+import asyncio
+
+import pytest
+
+from app.infra.search.bm25_retriever import BM25Retriever
+from app.tools.connectors.ingestion.streaming_pipeline import StreamingIngestionPipeline
+from app.tools.connectors.ingestion.text_stream import ContentSectioner, SlidingWindow, iter_decoded
+
+
+def _reference_windows(text, size, overlap):
+    """Single-pass sliding window over the whole string (no overlap-only tail)."""
+    windows, start = [], 0
+    while True:
+        windows.append(text[start:start + size])
+        if start + size >= len(text):
+            return windows
+        start += size - overlap
+
+
+class FakeStore:
+    def __init__(self, delay=0.0, fail_after=None):
+        self.delay = delay
+        self.fail_after = fail_after
+        self.batches = []
+        self.deleted = []
+        self.active = 0
+        self.max_active = 0
+
+    async def add_documents(self, documents, metadatas, ids):
+        if self.fail_after is not None and len(self.batches) >= self.fail_after:
+            raise RuntimeError("store down")
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        self.batches.append(list(zip(ids, documents, metadatas)))
+
+    async def delete(self, ids):
+        self.deleted.extend(ids)
+
+
+def test_iter_decoded_splits_multibyte_characters():
+    text = "年费太贵，首年免年费。" * 50
+    sections = list(iter_decoded(text.encode("utf-8"), block_size=7))
+    assert len(sections) > 1
+    assert "".join(sections) == text
+
+
+@pytest.mark.parametrize("cuts", [[], [3], [1, 2, 50, 51], list(range(0, 120, 7))])
+def test_sliding_window_matches_single_pass(cuts):
+    text = "".join(chr(0x4E00 + i % 500) for i in range(117))
+    bounds = [0, *cuts, len(text)]
+    window = SlidingWindow(20, 5)
+
+    windows = []
+    for start, end in zip(bounds, bounds[1:]):
+        windows.extend(window.feed(text[start:end]))
+    windows.extend(window.finish())
+
+    assert [w[0] for w in windows] == _reference_windows(text, 20, 5)
+    assert all(text[start:end] == chunk for chunk, start, end in windows)
+
+
+@pytest.mark.asyncio
+async def test_legacy_pipeline_streams_batches_to_concurrent_writers():
+    store = FakeStore(delay=0.01)
+    pipeline = StreamingIngestionPipeline(
+        vector_store=store,
+        chunk_size=40,
+        overlap=10,
+        use_small_to_big=False,
+        use_smart_routing=False,
+        batch_size=4,
+        storage_workers=3,
+    )
+    text = "客户说太贵时强调长期价值。" * 200
+
+    result = await pipeline.ingest_bytes("src", "a.txt", text.encode("utf-8"), {"type": "script"})
+
+    stored = sorted((item for batch in store.batches for item in batch), key=lambda i: i[2]["chunk_index"])
+    assert result["status"] == "indexed"
+    assert result["chunks_count"] == len(stored)
+    assert [doc for _, doc, _ in stored] == _reference_windows(text, 40, 10)
+    assert stored[0][0] == "src_0" and stored[0][2]["type"] == "script"
+    assert store.max_active > 1
+
+
+@pytest.mark.asyncio
+async def test_small_to_big_pipeline_and_writer_failure():
+    pipeline = StreamingIngestionPipeline(
+        vector_store=FakeStore(),
+        use_smart_routing=False,
+        parent_size=200,
+        child_size=50,
+        overlap=10,
+        batch_size=5,
+    )
+    data = ("销售话术：先认同，再澄清，最后给出方案。" * 100).encode("utf-8")
+
+    result = await pipeline.ingest_bytes("src", "b.txt", data, {})
+    assert result["chunking_strategy"] == "small_to_big"
+    assert result["chunks_count"] == sum(len(b) for b in pipeline.vector_store.batches)
+    assert result["parent_chunks_count"] > 1
+
+    pipeline.vector_store = FakeStore(fail_after=1)
+    failed = await pipeline.ingest_bytes("src", "b.txt", data, {})
+    assert failed == {"error": "store down", "status": "failed"}
+
+
+def _paragraphs(n, edited=None):
+    return "\n\n".join(
+        f"第{i}段：{'已修订的' if i == edited else ''}客户异议处理要点，先倾听再回应。" * 3 for i in range(n)
+    )
+
+
+def test_content_sections_resync_after_edit():
+    def sections(text):
+        sectioner = ContentSectioner(min_size=200, max_size=800)
+        out = []
+        for start in range(0, len(text), 97):
+            out.extend(sectioner.feed(text[start:start + 97]))
+        return out + sectioner.finish()
+
+    original, edited = _paragraphs(400), _paragraphs(400, edited=60)
+    before, after = sections(original), sections(edited)
+
+    assert "".join(before) == original
+    assert len(before) > 10
+    assert len(set(before) - set(after)) <= 3
+
+
+def test_content_sections_are_bounded_without_blank_lines():
+    sectioner = ContentSectioner(min_size=200, max_size=800)
+    lines = "".join(f"第{i}行客户异议处理要点\n" for i in range(2000))
+    sections = []
+    for start in range(0, len(lines), 97):
+        sections.extend(sectioner.feed(lines[start:start + 97]))
+        assert len(sectioner._pending) < 800
+    sections += sectioner.finish()
+
+    assert "".join(sections) == lines
+    assert max(len(s) for s in sections) <= 800
+    # Cuts fall on line breaks when one exists before max_size
+    assert all(s.endswith("\n") for s in sections)
+
+    unbroken = "无换行" * 1000
+    sectioner = ContentSectioner(min_size=200, max_size=800)
+    sections = sectioner.feed(unbroken) + sectioner.finish()
+    assert "".join(sections) == unbroken
+    assert [len(s) for s in sections[:-1]] == [800] * 3
+
+
+@pytest.mark.asyncio
+async def test_incremental_reingestion_touches_only_changes(tmp_path):
+    store = FakeStore()
+    keyword_index = BM25Retriever(use_jieba=False)
+    pipeline = StreamingIngestionPipeline(
+        vector_store=store,
+        chunk_size=100,
+        overlap=20,
+        use_small_to_big=False,
+        use_smart_routing=False,
+        manifest=tmp_path / "manifest",
+        keyword_index=keyword_index,
+    )
+
+    first = await pipeline.ingest_bytes("sop", "sop.md", _paragraphs(400).encode("utf-8"), {})
+    assert first["chunks_added"] == first["chunks_count"] > 0
+    assert len(keyword_index._slot_by_id) == first["chunks_count"]
+
+    again = await pipeline.ingest_bytes("sop", "sop.md", _paragraphs(400).encode("utf-8"), {})
+    assert again["status"] == "unchanged"
+
+    edited = await pipeline.ingest_bytes("sop", "sop.md", _paragraphs(400, edited=60).encode("utf-8"), {})
+    assert 0 < edited["chunks_added"] < first["chunks_count"] // 4
+    assert edited["chunks_deleted"] > 0
+    assert edited["document_id"] == first["document_id"]
+    assert sorted(store.deleted) == sorted(set(store.deleted))
+    assert len(keyword_index._slot_by_id) == edited["chunks_count"]
+
+    assert await pipeline.remove_source("sop") == edited["chunks_count"]
+    assert len(keyword_index._slot_by_id) == 0
+    assert pipeline.manifest.get("sop") is None
+
+
+@pytest.mark.asyncio
+async def test_reingestion_with_new_metadata_or_collection_restores_payloads(tmp_path):
+    store = FakeStore()
+    store.collection_name = "sales_knowledge"
+    pipeline = StreamingIngestionPipeline(
+        vector_store=store,
+        chunk_size=100,
+        overlap=20,
+        use_small_to_big=False,
+        use_smart_routing=False,
+        manifest=tmp_path / "manifest",
+    )
+    data = _paragraphs(50).encode("utf-8")
+
+    first = await pipeline.ingest_bytes("sop", "sop.md", data, {"stage": "opening"})
+    relabelled = await pipeline.ingest_bytes("sop", "sop.md", data, {"stage": "closing"})
+    assert relabelled["status"] == "indexed"
+    assert relabelled["chunks_added"] == first["chunks_count"]
+    assert relabelled["chunks_deleted"] == 0
+    assert {m["stage"] for _, _, m in store.batches[-1]} == {"closing"}
+
+    store.collection_name = "sales_knowledge_v2"
+    moved = await pipeline.ingest_bytes("sop", "sop.md", data, {"stage": "closing"})
+    assert moved["chunks_added"] == first["chunks_count"]
+    assert (await pipeline.ingest_bytes("sop", "sop.md", data, {"stage": "closing"}))["status"] == "unchanged"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("abcdefgh", ["abcde", "defgh"]),  # no overlap-only tail "gh"
+        ("abcdefghi", ["abcde", "defgh", "ghi"]),
+        ("abc", ["abc"]),
+    ],
+)
+async def test_legacy_chunking_windows(text, expected):
+    store = FakeStore()
+    pipeline = StreamingIngestionPipeline(
+        vector_store=store,
+        chunk_size=5,
+        overlap=2,
+        use_small_to_big=False,
+        use_smart_routing=False,
+    )
+
+    result = await pipeline.ingest_bytes("src", "a.txt", text.encode("utf-8"), {})
+
+    assert [doc for batch in store.batches for _, doc, _ in batch] == expected
+    assert result["chunks_count"] == len(expected)
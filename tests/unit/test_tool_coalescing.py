@@ -0,0 +1,136 @@
+"""
+Unit tests for single-flight coalescing and stale-while-revalidate in ToolExecutor.
+"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.tools.executor import ToolExecutor, ToolRetryPolicy
+from app.tools.rate_limiter import get_rate_limiter
+from app.tools.registry import ToolRegistry
+from app.tools.tool_cache import ToolCache
+from core.config import get_settings
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    get_rate_limiter().reset()
+    yield
+    get_rate_limiter().reset()
+
+
+@pytest.fixture
+def slow_tool():
+    tool = Mock()
+    calls = []
+
+    async def run(payload):
+        calls.append(payload)
+        await asyncio.sleep(0.05)
+        return {"documents": [payload["query"]], "call": len(calls)}
+
+    tool.run = AsyncMock(side_effect=run)
+    return tool
+
+
+@pytest.fixture
+def executor(slow_tool):
+    registry = Mock(spec=ToolRegistry)
+    registry.get_tool.return_value = slow_tool
+    return ToolExecutor(
+        registry=registry,
+        cache=ToolCache(),
+        retry_policy=ToolRetryPolicy(max_retries=0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_calls_share_one_execution(executor, slow_tool):
+    with patch("app.tools.executor.record_tool_execution"):
+        results = await asyncio.gather(*[
+            executor.execute("knowledge_retriever", {"query": "pricing"}, caller_role="coach")
+            for _ in range(5)
+        ])
+
+    assert slow_tool.run.call_count == 1
+    assert all(r["ok"] and r["result"]["call"] == 1 for r in results)
+    assert sum(r["coalesced"] for r in results) == 4
+    stats = executor.get_coalescing_stats()
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_distinct_payloads_and_uncacheable_tools_are_not_coalesced(executor, slow_tool):
+    with patch("app.tools.executor.record_tool_execution"):
+        await asyncio.gather(
+            executor.execute("knowledge_retriever", {"query": "a"}, caller_role="coach"),
+            executor.execute("knowledge_retriever", {"query": "b"}, caller_role="coach"),
+            executor.execute("crm_integration", {"query": "a"}, caller_role="coach"),
+            executor.execute("crm_integration", {"query": "a"}, caller_role="coach"),
+        )
+
+    assert slow_tool.run.call_count == 4
+    assert executor.get_coalescing_stats()["coalesced"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failure_propagates_to_every_waiter(executor, slow_tool):
+    async def boom(payload):
+        await asyncio.sleep(0.01)
+        raise ValueError("vector store down")
+
+    slow_tool.run.side_effect = boom
+    with patch("app.tools.executor.record_tool_execution"):
+        results = await asyncio.gather(*[
+            executor.execute("knowledge_retriever", {"query": "x"}, caller_role="coach")
+            for _ in range(3)
+        ])
+
+    assert slow_tool.run.call_count == 1
+    assert all(not r["ok"] and r["error"]["message"] == "vector store down" for r in results)
+    assert executor.get_coalescing_stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_hot_stale_entry_is_served_while_refreshing(executor, slow_tool):
+    settings = get_settings()
+    cache = executor._cache
+    payload = {"query": "pricing"}
+    with patch("app.tools.executor.record_tool_execution"):
+        await executor.execute("knowledge_retriever", payload, caller_role="coach")
+        for _ in range(settings.TOOL_CACHE_HOT_MIN_HITS):
+            await executor.execute("knowledge_retriever", payload, caller_role="coach")
+
+        # Age the entry past its TTL but inside the stale window
+        entry = cache._entries[cache.signature("knowledge_retriever", payload)]
+        entry["timestamp"] -= settings.SEMANTIC_CACHE_TTL_SECONDS + 1
+
+        result = await executor.execute("knowledge_retriever", payload, caller_role="coach")
+        assert result["cached"] is True
+        assert result["result"]["call"] == 1
+
+        await asyncio.sleep(0.1)
+
+    assert slow_tool.run.call_count == 2
+    assert executor.get_coalescing_stats()["refreshes"] == 1
+    assert entry is not cache._entries[cache.signature("knowledge_retriever", payload)]
+    refreshed = await cache.get("knowledge_retriever", payload)
+    assert refreshed[1]["call"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cold_expired_entry_is_not_served(executor, slow_tool):
+    settings = get_settings()
+    cache = executor._cache
+    payload = {"query": "pricing"}
+    with patch("app.tools.executor.record_tool_execution"):
+        await executor.execute("knowledge_retriever", payload, caller_role="coach")
+        entry = cache._entries[cache.signature("knowledge_retriever", payload)]
+        entry["timestamp"] -= settings.SEMANTIC_CACHE_TTL_SECONDS + 1
+
+        result = await executor.execute("knowledge_retriever", payload, caller_role="coach")
+
+    assert result["cached"] is False
+    assert slow_tool.run.call_count == 2
@@ -0,0 +1,204 @@
+"""
+Unit tests for dependency-aware DAG scheduling in ToolExecutor.execute_parallel.
+"""
+import asyncio
+import time
+
+import pytest
+from unittest.mock import Mock, patch
+
+from app.tools.errors import ToolInputError
+from app.tools.executor import ToolExecutor, ToolRetryPolicy
+from app.tools.rate_limiter import get_rate_limiter
+from app.tools.registry import ToolRegistry
+from app.tools.tool_cache import ToolCache
+
+
+class FakeTool:
+    def __init__(self, name, delay=0.05, is_side_effect_free=True, fail=False, log=None):
+        self.name = name
+        self.delay = delay
+        self.is_side_effect_free = is_side_effect_free
+        self.fail = fail
+        self.log = log if log is not None else []
+
+    async def run(self, payload):
+        self.log.append(("start", self.name, payload.get("tag")))
+        await asyncio.sleep(self.delay)
+        self.log.append(("end", self.name, payload.get("tag")))
+        if self.fail:
+            raise ValueError(f"{self.name} failed")
+        return {"tag": payload.get("tag"), "echo": payload}
+
+
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    get_rate_limiter().reset()
+    yield
+    get_rate_limiter().reset()
+
+
+@pytest.fixture
+def log():
+    return []
+
+
+@pytest.fixture
+def tools(log):
+    return {
+        "search": FakeTool("search", log=log),
+        "lookup": FakeTool("lookup", log=log),
+        "save_note": FakeTool("save_note", is_side_effect_free=False, log=log),
+        "send_mail": FakeTool("send_mail", is_side_effect_free=False, log=log),
+        "broken": FakeTool("broken", fail=True, log=log),
+    }
+
+
+@pytest.fixture
+def executor(tools):
+    registry = Mock(spec=ToolRegistry)
+    registry.get_tool.side_effect = lambda name, agent_type=None: tools[name]
+    return ToolExecutor(
+        registry=registry,
+        cache=ToolCache(),
+        retry_policy=ToolRetryPolicy(max_retries=0),
+    )
+
+
+@pytest.mark.asyncio
+async def test_independent_branches_run_in_critical_path_time(executor, log):
+    calls = [
+        {"id": "a", "name": "search", "payload": {"tag": "a"}},
+        {"id": "b", "name": "lookup", "payload": {"tag": "b"}},
+        {"id": "c", "name": "lookup", "payload": {"tag": "c"}, "depends_on": ["a"]},
+        {"id": "d", "name": "save_note", "payload": {"tag": "d"}},
+    ]
+    with patch("app.tools.executor.record_tool_execution"):
+        start = time.perf_counter()
+        results = await executor.execute_parallel(calls, caller_role="coach")
+        elapsed = time.perf_counter() - start
+
+    assert [r["result"]["tag"] for r in results] == ["a", "b", "c", "d"]
+    # Critical path is a -> c (two hops); four serial calls would take 0.2s
+    assert elapsed < 0.15
+    assert log.index(("end", "search", "a")) < log.index(("start", "lookup", "c"))
+
+
+@pytest.mark.asyncio
+async def test_inputs_feed_upstream_results_into_payload(executor):
+    calls = [
+        {"id": "kb", "name": "search", "payload": {"tag": "kb"}},
+        {"name": "save_note", "payload": {"tag": "note"}, "inputs": {"source": "kb.echo.tag"}},
+    ]
+    with patch("app.tools.executor.record_tool_execution"):
+        results = await executor.execute_parallel(calls, caller_role="coach")
+
+    assert results[1]["result"]["echo"]["source"] == "kb"
+
+
+@pytest.mark.asyncio
+async def test_writes_are_ordered_per_resource_only(executor, log):
+    calls = [
+        {"name": "save_note", "payload": {"tag": "w1"}},
+        {"name": "send_mail", "payload": {"tag": "m1"}},
+        {"name": "save_note", "payload": {"tag": "w2"}},
+        {"name": "search", "payload": {"tag": "r"}, "resources": ["save_note"]},
+    ]
+    with patch("app.tools.executor.record_tool_execution"):
+        await executor.execute_parallel(calls, caller_role="coach")
+
+    # Same-tool writes keep input order; the read waits for the last write to
+    # its resource; the unrelated write overlaps with the first one
+    assert log.index(("end", "save_note", "w1")) < log.index(("start", "save_note", "w2"))
+    assert log.index(("end", "save_note", "w2")) < log.index(("start", "search", "r"))
+    assert log.index(("start", "send_mail", "m1")) < log.index(("end", "save_note", "w1"))
+
+
+@pytest.mark.asyncio
+async def test_read_and_write_on_same_tool_follow_input_order(executor, log):
+    # e.g. crm_integration "list" then "create": the read must not race the write
+    calls = [
+        {"name": "lookup", "payload": {"tag": "list"}, "is_write": False},
+        {"name": "lookup", "payload": {"tag": "create"}, "is_write": True},
+        {"name": "lookup", "payload": {"tag": "get"}, "is_write": False},
+        {"name": "search", "payload": {"tag": "other"}},
+    ]
+    with patch("app.tools.executor.record_tool_execution"):
+        await executor.execute_parallel(calls, caller_role="coach", auto_classify=False)
+
+    assert log.index(("end", "lookup", "list")) < log.index(("start", "lookup", "create"))
+    assert log.index(("end", "lookup", "create")) < log.index(("start", "lookup", "get"))
+    # Calls on another tool still overlap with the chain
+    assert log.index(("start", "search", "other")) < log.index(("end", "lookup", "list"))
+
+
+@pytest.mark.asyncio
+async def test_failed_write_does_not_skip_independent_write(executor, tools, log):
+    tools["flaky_note"] = FakeTool("flaky_note", is_side_effect_free=False, fail=True, log=log)
+    calls = [
+        {"name": "flaky_note", "payload": {"tag": "w1"}, "resources": ["notes"]},
+        {"name": "save_note", "payload": {"tag": "w2"}, "resources": ["notes"]},
+    ]
+    with patch("app.tools.executor.record_tool_execution"):
+        results = await executor.execute_parallel(calls, caller_role="coach")
+
+    # Still ordered on the shared resource, but the second write runs
+    assert results[0]["ok"] is False
+    assert results[1]["ok"] is True
+    assert log.index(("end", "flaky_note", "w1")) < log.index(("start", "save_note", "w2"))
+
+
+@pytest.mark.asyncio
+async def test_resource_limits_cap_concurrency(executor, log):
+    calls = [
+        {"name": "search", "payload": {"tag": str(i)}, "resources": ["vector_db"]}
+        for i in range(4)
+    ]
+    with patch("app.tools.executor.record_tool_execution"):
+        await executor.execute_parallel(
+            calls, caller_role="coach", resource_limits={"vector_db": 2}
+        )
+
+    running = peak = 0
+    for event, _, _ in log:
+        running += 1 if event == "start" else -1
+        peak = max(peak, running)
+    assert peak == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_dependency_skips_dependents_and_streams_events(executor, log):
+    events = []
+
+    async def callback(event):
+        events.append((event["tool_call_id"], event["status"]))
+
+    calls = [
+        {"tool_call_id": "x", "name": "broken", "payload": {"tag": "x"}},
+        {"tool_call_id": "y", "name": "lookup", "payload": {"tag": "y"}, "depends_on": ["x"]},
+        {"tool_call_id": "z", "name": "search", "payload": {"tag": "z"}},
+    ]
+    with patch("app.tools.executor.record_tool_execution"):
+        results = await executor.execute_parallel(calls, caller_role="coach", status_callback=callback)
+
+    assert results[0]["ok"] is False
+    assert results[1]["error"]["code"] == "DEPENDENCY_FAILED"
+    assert results[2]["ok"] is True
+    assert ("start", "lookup", "y") not in log
+    assert ("x", "failed") in events
+    assert ("y", "skipped") in events
+    assert ("z", "completed") in events
+
+
+@pytest.mark.asyncio
+async def test_invalid_graphs_are_rejected(executor):
+    with pytest.raises(ToolInputError):
+        await executor.execute_parallel([
+            {"id": "a", "name": "search", "payload": {}, "depends_on": ["b"]},
+            {"id": "b", "name": "search", "payload": {}, "depends_on": ["a"]},
+        ], caller_role="coach")
+
+    with pytest.raises(ToolInputError):
+        await executor.execute_parallel([
+            {"id": "a", "name": "search", "payload": {}, "depends_on": ["missing"]},
+        ], caller_role="coach")
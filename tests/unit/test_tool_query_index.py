@@ -0,0 +1,65 @@
+"""
+Unit tests for the MinHash LSH index behind ToolCache semantic hits.
+"""
+import time
+
+import pytest
+
+from app.tools.query_index import MinHashLSHIndex
+from app.tools.tool_cache import ToolCache
+from core.config import get_settings
+
+
+def test_near_duplicates_are_candidates_and_partitions_are_isolated():
+    index = MinHashLSHIndex()
+    index.add("a", "knowledge_retriever", "信用卡年费怎么减免")
+    index.add("b", "knowledge_retriever", "客户说价格太贵怎么办")
+    index.add("c", "profile_reader", "信用卡年费怎么减免")
+
+    assert index.candidates("knowledge_retriever", "信用卡年费怎么减免？")[0] == "a"
+    assert "c" not in index.candidates("knowledge_retriever", "信用卡年费怎么减免")
+    assert index.candidates("knowledge_retriever", "zzzz") == []
+
+
+def test_remove_and_replace_keep_buckets_consistent():
+    index = MinHashLSHIndex()
+    index.add("a", "t", "how do I waive the annual fee")
+    index.add("a", "t", "what is the interest rate")
+    assert index.candidates("t", "how do I waive the annual fee") == []
+    assert index.candidates("t", "what is the interest rate") == ["a"]
+
+    assert index.remove("a") is True
+    assert index.remove("a") is False
+    assert len(index) == 0
+    assert index._buckets == {}
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_semantic_hit_through_index():
+    cache = ToolCache()
+    await cache.set("knowledge_retriever", {"query": "信用卡年费怎么减免"}, {"answer": 1})
+    await cache.set("knowledge_retriever", {"query": "客户说价格太贵怎么办"}, {"answer": 2})
+
+    hit = await cache.get("knowledge_retriever", {"query": "信用卡年费怎么减免呢"})
+    assert hit is not None
+    assert hit[1] == {"answer": 1}
+
+
+@pytest.mark.asyncio
+async def test_tool_cache_index_follows_eviction_and_ttl():
+    settings = get_settings()
+    cache = ToolCache()
+    for i in range(settings.SEMANTIC_CACHE_MAX_ENTRIES + 5):
+        await cache.set("knowledge_retriever", {"query": f"question number {i:04d} about fees"}, i)
+
+    assert len(cache._index) == len(cache._entries) == settings.SEMANTIC_CACHE_MAX_ENTRIES
+    assert cache.signature("knowledge_retriever", {"query": "question number 0000 about fees"}) not in cache._index
+
+    key = cache.signature("knowledge_retriever", {"query": "question number 0050 about fees"})
+    cache._entries[key]["timestamp"] = time.time() - settings.SEMANTIC_CACHE_TTL_SECONDS - 1
+    hit = await cache.get("knowledge_retriever", {"query": "question number 0050 about fees?"})
+    assert hit is None or hit[0] != key
+
+    removed = cache.clear_tool("knowledge_retriever")
+    assert removed == settings.SEMANTIC_CACHE_MAX_ENTRIES
+    assert len(cache._index) == 0
@@ -0,0 +1,189 @@
+"""
+Unit tests for the in-memory TurnContext and write-behind turn persistence.
+"""
+import uuid
+from datetime import datetime
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.engine.state.turn_context import TurnWrite, TurnWriteBehind, load_turn_context
+from models.runtime_models import Message, Session, SessionState
+
+
+@pytest_asyncio.fixture
+async def session_factory():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    tables = [Session.__table__, SessionState.__table__, Message.__table__]
+    async with engine.begin() as conn:
+        await conn.run_sync(lambda sync_conn: Session.metadata.create_all(sync_conn, tables=tables))
+    factory = async_sessionmaker(engine, expire_on_commit=False)
+    async with factory() as db:
+        for session_id in ("s1", "s2"):
+            now = datetime.utcnow()
+            db.add(Session(
+                id=session_id, user_id="u", course_id="c", scenario_id="sc", persona_id="p",
+                started_at=now, last_activity_at=now, total_turns=0,
+            ))
+            db.add(SessionState(
+                id=str(uuid.uuid4()), session_id=session_id, current_stage="opening",
+                stage_history=[], slot_values={}, stage_coverages={}, goal_achieved={},
+                npc_mood=0.5, turn_count=0, context_snapshot={},
+            ))
+        await db.commit()
+    yield factory
+    await engine.dispose()
+
+
+def _write(session_id, turn_number, stage="opening"):
+    return TurnWrite(
+        session_id=session_id,
+        turn_id=f"{session_id}-t{turn_number}",
+        turn_number=turn_number,
+        user_message=f"user {turn_number}",
+        user_stage="opening",
+        npc_response=f"npc {turn_number}",
+        npc_stage=stage,
+        npc_mood=0.6,
+        history_tail=[],
+    )
+
+
+@pytest.mark.asyncio
+async def test_flush_persists_batch_in_one_transaction_and_reloads(session_factory):
+    commits = []
+    writer = TurnWriteBehind(session_factory=session_factory, interval_seconds=60, max_batch=100)
+    for turn_number in (1, 2, 3):
+        writer.enqueue(_write("s1", turn_number, stage="discovery" if turn_number == 3 else "opening"))
+    writer.enqueue(_write("s2", 1))
+
+    async with session_factory() as probe:
+        engine = probe.bind
+    event.listen(engine.sync_engine, "commit", lambda conn: commits.append(1))
+    assert await writer.flush() == 4
+    await writer.stop()
+    assert len(commits) == 1
+
+    async with session_factory() as db:
+        ctx = await load_turn_context(db, "s1")
+        state = (await db.execute(select(SessionState).where(SessionState.session_id == "s1"))).scalar_one()
+
+    assert ctx.total_turns == 3
+    assert ctx.current_stage == "discovery"
+    assert state.turn_count == 3
+    assert state.context_snapshot["stage"] == "discovery"
+    assert [m["content"] for m in ctx.history_window()] == ["npc 1", "user 2", "npc 2", "user 3", "npc 3"]
+    record = ctx.get_turn("s1-t2")
+    assert record.committed and record.npc_response == "npc 2"
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_order_for_retry(session_factory):
+    calls = {"n": 0}
+
+    def flaky_factory():
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise ConnectionError("db down")
+        return session_factory()
+
+    writer = TurnWriteBehind(session_factory=flaky_factory, interval_seconds=60, max_batch=1)
+    writer.enqueue(_write("s1", 1))
+    writer.enqueue(_write("s1", 2))
+
+    with pytest.raises(ConnectionError):
+        await writer.flush()
+    assert [w.turn_number for w in writer._queue] == [1, 2]
+
+    assert await writer.flush() == 2
+    await writer.stop()
+    async with session_factory() as db:
+        session_row = (await db.execute(select(Session).where(Session.id == "s1"))).scalar_one()
+    assert session_row.total_turns == 2
+
+
+@pytest.mark.asyncio
+async def test_turn_context_dedupes_and_aborts_in_memory(session_factory):
+    async with session_factory() as db:
+        ctx = await load_turn_context(db, "s1")
+        assert await load_turn_context(db, "missing") is None
+
+    ctx.begin_turn("t1", 1, "hello")
+    assert ctx.get_turn("t1").committed is False
+    assert ctx.last_committed_turn() is None
+
+    ctx.abort_turn("t1")
+    assert ctx.get_turn("t1") is None
+
+    ctx.begin_turn("t1", 1, "hello")
+    ctx.commit_turn("t1", "hi there", 0.7, "discovery")
+    assert ctx.total_turns == 1
+    assert ctx.current_stage == "discovery"
+    assert ctx.last_committed_turn().npc_response == "hi there"
+    ctx.abort_turn("t1")  # committed turns are kept
+    assert ctx.get_turn("t1") is not None
+
+
+@pytest.mark.asyncio
+async def test_permanent_error_dead_letters_only_the_bad_session(session_factory):
+    writer = TurnWriteBehind(session_factory=session_factory, interval_seconds=60, max_batch=100)
+    bad = _write("s1", 1)
+    duplicate = _write("s1", 2)
+    duplicate.user_message_id = bad.user_message_id  # primary key violation
+    writer.enqueue(bad)
+    writer.enqueue(duplicate)
+    writer.enqueue(_write("s2", 1))
+
+    assert await writer.flush() == 1
+    await writer.stop()
+    assert len(writer) == 0
+    assert writer.dead_lettered == 2
+    assert [w.turn_id for w, _ in writer.dead_letters] == ["s1-t1", "s1-t2"]
+
+    async with session_factory() as db:
+        assert (await load_turn_context(db, "s2")).total_turns == 1
+        assert (await load_turn_context(db, "s1")).total_turns == 0
+
+
+@pytest.mark.asyncio
+async def test_transient_error_is_retried_a_bounded_number_of_times():
+    def down():
+        raise ConnectionError("db down")
+
+    writer = TurnWriteBehind(session_factory=down, interval_seconds=60, max_batch=10, max_attempts=2)
+    writer.enqueue(_write("s1", 1))
+
+    with pytest.raises(ConnectionError):
+        await writer.flush()
+    assert len(writer) == 1
+
+    assert await writer.flush() == 0
+    assert len(writer) == 0
+    assert writer.dead_lettered == 1
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_drain_retries_transient_errors_and_caps_interval(session_factory):
+    calls = {"n": 0}
+
+    def flaky_factory():
+        calls["n"] += 1
+        if calls["n"] <= 2:
+            raise ConnectionError("db down")
+        return session_factory()
+
+    writer = TurnWriteBehind(session_factory=flaky_factory, interval_seconds=60, max_batch=10)
+    assert writer.interval_seconds == TurnWriteBehind.MAX_INTERVAL_SECONDS
+
+    writer.enqueue(_write("s1", 1))
+    writer.enqueue(_write("s1", 2))
+    # Shutdown keeps retrying instead of dropping the buffered turns
+    await writer.stop()
+    assert len(writer) == 0
+    assert writer.dead_lettered == 0
+
+    async with session_factory() as db:
+        assert (await load_turn_context(db, "s1")).total_turns == 2
@@ -0,0 +1,168 @@
+"""
+Unit tests for speculative NPC / knowledge execution in DynamicWorkflowCoordinator.
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from app.engine.coordinator.dynamic_workflow import DynamicWorkflowCoordinator, get_full_config
+
+LLM_DELAY = 0.1
+NPC_DELAY = 0.15
+TOOL_DELAY = 0.03
+
+
+class StubCoordinator(DynamicWorkflowCoordinator):
+    """Coordinator whose dependencies are timed stubs."""
+
+    intent = "greeting"
+    routed_to = "npc"
+
+    def _init_node_implementations(self):
+        self.calls = []
+        self.bandit = None
+
+        async def classify_with_context(message, history, fsm_state):
+            return SimpleNamespace(intent=self.intent, confidence=0.9, stage_suggestion="")
+
+        async def analyze(state):
+            await asyncio.sleep(LLM_DELAY)
+            return {"need_tools": False}, "llm"
+
+        async def advise(state, reasoning, candidates):
+            await asyncio.sleep(LLM_DELAY)
+            return {"target_node": self.routed_to, "confidence": 0.9, "reason": "stub"}, "llm"
+
+        async def generate_response(message, history, persona, stage):
+            self.calls.append("npc")
+            await asyncio.sleep(NPC_DELAY)
+            return SimpleNamespace(content="hello", mood=0.6)
+
+        async def execute(name, payload, caller_role, tool_call_id=None):
+            self.calls.append(name)
+            await asyncio.sleep(TOOL_DELAY)
+            result = {"risk_level": "OK"} if name == "compliance_check" else {"documents": ["d"]}
+            return {"ok": True, "result": result, "audit": {"status": "success"}}
+
+        self.intent_classifier = SimpleNamespace(classify_with_context=classify_with_context)
+        self.reasoning_engine = SimpleNamespace(analyze=analyze)
+        self.routing_advisor = SimpleNamespace(advise=advise)
+        self.npc_agent = SimpleNamespace(generate_response=generate_response)
+        self.tool_executor = SimpleNamespace(execute=execute)
+
+
+def _coordinator(enable_speculation=True, intent="greeting", routed_to="npc"):
+    config = get_full_config().model_copy(
+        update={"enable_bandit": False, "enable_speculation": enable_speculation}
+    )
+    coordinator = StubCoordinator(model_gateway=None, budget_manager=None, persona={}, config=config)
+    coordinator.intent = intent
+    coordinator.routed_to = routed_to
+    return coordinator
+
+
+def _trace(result, node):
+    return next(e for e in result["trace"] if e["node"] == node)
+
+
+@pytest.mark.asyncio
+async def test_hit_overlaps_npc_with_reasoning_and_routing():
+    coordinator = _coordinator()
+
+    start = time.perf_counter()
+    result = await coordinator.execute_turn(1, "hi", [], {}, skip_coach=True)
+    elapsed = time.perf_counter() - start
+
+    # Sequential would be 2 * LLM_DELAY + NPC_DELAY + TOOL_DELAY = 0.38s
+    assert elapsed < 2 * LLM_DELAY + TOOL_DELAY + 0.06
+    assert result["npc_reply"] == "hello"
+    assert coordinator.calls.count("npc") == 1
+    assert _trace(result, "intent")["detail"]["speculation"]["hit"] is True
+    npc_detail = _trace(result, "npc")["detail"]
+    assert npc_detail["speculative"] is True
+    assert npc_detail["saved_ms"] >= NPC_DELAY * 1000 * 0.9
+
+    stats = coordinator.get_speculation_stats()
+    assert stats["hit_rate"] == 1.0
+    assert stats["npc_committed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_miss_cancels_knowledge_prefetch_but_keeps_npc_draft():
+    # price_inquiry predicts knowledge; routing picks npc
+    coordinator = _coordinator(intent="price_inquiry", routed_to="npc")
+
+    result = await coordinator.execute_turn(1, "多少钱", [], {}, skip_coach=True)
+    await asyncio.sleep(TOOL_DELAY * 2)
+
+    speculation = _trace(result, "intent")["detail"]["speculation"]
+    assert speculation == {"predicted_route": "knowledge", "hit": False, "pending": ["npc"]}
+    assert not any(e["node"] == "knowledge" for e in result["trace"])
+    assert _trace(result, "npc")["detail"]["speculative"] is True
+    assert coordinator.get_speculation_stats()["cancelled"] == 1
+    assert coordinator._speculations == {}
+
+
+@pytest.mark.asyncio
+async def test_unpredicted_knowledge_route_is_run_fresh():
+    coordinator = _coordinator(intent="greeting", routed_to="knowledge")
+
+    result = await coordinator.execute_turn(1, "hi", [], {}, skip_coach=True)
+
+    assert _trace(result, "intent")["detail"]["speculation"]["hit"] is False
+    assert "speculative" not in _trace(result, "knowledge")["detail"]
+    assert _trace(result, "npc")["detail"]["speculative"] is True
+    assert coordinator.calls.count("knowledge_retriever") == 1
+
+
+@pytest.mark.asyncio
+async def test_predicted_knowledge_prefetch_is_committed():
+    coordinator = _coordinator(intent="price_inquiry", routed_to="knowledge")
+
+    result = await coordinator.execute_turn(1, "多少钱", [], {}, skip_coach=True)
+
+    assert _trace(result, "knowledge")["detail"]["speculative"] is True
+    assert coordinator.calls.count("knowledge_retriever") == 1
+    assert coordinator.get_speculation_stats()["knowledge_committed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_disabled_speculation_runs_nodes_in_sequence():
+    coordinator = _coordinator(enable_speculation=False)
+
+    start = time.perf_counter()
+    result = await coordinator.execute_turn(1, "hi", [], {}, skip_coach=True)
+    elapsed = time.perf_counter() - start
+
+    assert elapsed >= 2 * LLM_DELAY + NPC_DELAY
+    assert "speculation" not in _trace(result, "intent")["detail"]
+    assert "speculative" not in _trace(result, "npc")["detail"]
+
+
+@pytest.mark.asyncio
+async def test_streamed_draft_failing_mid_reply_aborts_the_turn():
+    coordinator = _coordinator()
+
+    async def stream_response(on_delta, **kwargs):
+        coordinator.calls.append("npc")
+        await on_delta("hel")
+        raise ConnectionError("stream reset")
+
+    coordinator.npc_agent = SimpleNamespace(stream_response=stream_response)
+    deltas = []
+
+    async def on_token(text):
+        deltas.append(text)
+
+    with pytest.raises(ConnectionError):
+        await coordinator.execute_turn(1, "hi", [], {}, skip_coach=True, on_token=on_token)
+
+    # The partial reply is not followed by a second, re-generated one
+    assert deltas == ["hel"]
+    assert coordinator.calls.count("npc") == 1
+    assert coordinator._speculations == {}
+    assert coordinator._token_sinks == {}
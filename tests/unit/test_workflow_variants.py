@@ -0,0 +1,149 @@
+"""
+Unit tests for precompiled workflow variants in DynamicWorkflowCoordinator.
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("langgraph")
+
+from langgraph.graph import StateGraph
+
+from app.engine.coordinator.dynamic_workflow import (
+    DynamicWorkflowCoordinator,
+    NodeType,
+    get_ab_test_configs,
+    get_full_config,
+    without_coach,
+)
+
+
+class StubCoordinator(DynamicWorkflowCoordinator):
+    """Coordinator with trivial nodes, recording which ones ran."""
+
+    def _init_node_implementations(self):
+        self.reasoning_engine = None
+        self.routing_advisor = None
+        self.bandit = None
+        self.visited = []
+
+    async def _intent_node(self, state, config=None):
+        config = config or self.config
+        await asyncio.sleep(0.01)
+        self.visited.append((state["session_id"], "intent"))
+        return {"intent": "greeting", "route_choice": self._get_intent_candidates(config)[-1]}
+
+    async def _knowledge_node(self, state):
+        return {}
+
+    async def _npc_node(self, state):
+        self.visited.append((state["session_id"], "npc"))
+        return {"npc_response": "hello"}
+
+    async def _coach_node(self, state):
+        self.visited.append((state["session_id"], "coach"))
+        return {"coach_advice": "tip"}
+
+    async def _compliance_node(self, state):
+        self.visited.append((state["session_id"], "compliance"))
+        return {}
+
+
+def _coordinator(**kwargs):
+    return StubCoordinator(
+        model_gateway=None, budget_manager=None, persona={}, config=get_full_config(), **kwargs
+    )
+
+
+def test_fingerprint_ignores_metadata_and_dedupes_variants():
+    full = get_full_config()
+    renamed = full.model_copy(update={"name": "other", "description": "x"})
+    assert renamed.fingerprint() == full.fingerprint()
+    assert without_coach(full).fingerprint() != full.fingerprint()
+
+    ab = get_ab_test_configs()
+    assert ab["variant_A"].fingerprint() != ab["variant_B"].fingerprint()
+    # B without its coach is exactly the control group
+    assert without_coach(ab["variant_B"]).fingerprint() == ab["variant_A"].fingerprint()
+
+
+@pytest.mark.asyncio
+async def test_turns_never_recompile_or_mutate_config():
+    real_compile = StateGraph.compile
+    with patch.object(StateGraph, "compile", autospec=True, side_effect=real_compile) as compile_spy:
+        coordinator = _coordinator(variants=get_ab_test_configs())
+        # full, full-no-coach, A (== B-no-coach), B
+        assert compile_spy.call_count == 4
+
+        fingerprint = coordinator.config.fingerprint()
+        for skip_coach in (True, False, True):
+            await coordinator.execute_turn(1, "hi", [], {}, skip_coach=skip_coach)
+        await coordinator.execute_turn(1, "hi", [], {}, variant="variant_B")
+
+        assert compile_spy.call_count == 4
+    assert coordinator.config.fingerprint() == fingerprint
+    assert NodeType.COACH in coordinator.config.enabled_nodes
+
+
+@pytest.mark.asyncio
+async def test_concurrent_sessions_get_their_own_variant():
+    coordinator = _coordinator()
+
+    fast, full = await asyncio.gather(
+        coordinator.execute_turn(1, "hi", [], {}, session_id="fast", skip_coach=True),
+        coordinator.execute_turn(1, "hi", [], {}, session_id="full", skip_coach=False),
+    )
+
+    assert fast["coach_advice"] is None
+    assert full["coach_advice"] == "tip"
+    assert ("fast", "coach") not in coordinator.visited
+    assert ("full", "coach") in coordinator.visited
+    # Both variants still end in compliance
+    assert ("fast", "compliance") in coordinator.visited
+
+
+@pytest.mark.asyncio
+async def test_unknown_variant_is_rejected():
+    coordinator = _coordinator()
+    with pytest.raises(ValueError):
+        await coordinator.execute_turn(1, "hi", [], {}, variant="missing")
+
+
+@pytest.mark.asyncio
+async def test_variant_flags_decide_reasoning_and_routing_per_turn():
+    calls = []
+
+    class Recorder:
+        async def analyze(self, state):
+            calls.append("reasoning")
+            return {}, "llm"
+
+        async def advise(self, state, reasoning, candidates):
+            calls.append("routing")
+            return None, "llm"
+
+    class IntentCoordinator(StubCoordinator):
+        def _init_node_implementations(self):
+            super()._init_node_implementations()
+            self.intent_classifier = SimpleNamespace(
+                classify_with_context=lambda **kwargs: asyncio.sleep(
+                    0, SimpleNamespace(intent="greeting", confidence=0.9, stage_suggestion=None)
+                )
+            )
+            self.reasoning_engine = Recorder()
+            self.routing_advisor = Recorder()
+
+        _intent_node = DynamicWorkflowCoordinator._intent_node
+
+    full = get_full_config().model_copy(update={"enable_speculation": False})
+    coordinator = IntentCoordinator(
+        model_gateway=None, budget_manager=None, persona={}, config=full, variants=get_ab_test_configs()
+    )
+
+    await coordinator.execute_turn(1, "hi", [], {}, variant="variant_A")
+    assert calls == []
+
+    await coordinator.execute_turn(2, "hi", [], {})
+    assert calls == ["reasoning", "routing"]